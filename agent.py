@@ -71,6 +71,11 @@ fetch real market data:
 
 - **Daily data**: `python -m tools.alpha_vantage daily SYMBOL [--full]`
 - **Intraday data**: `python -m tools.alpha_vantage intraday SYMBOL [--interval 5min] [--full]`
+- **Several symbols at once**: `python -m tools.alpha_vantage batch AAPL MSFT SPY@5min [--full]` \
+fetches them concurrently in one process and prints one JSON line per symbol \
+(`{"symbol", "interval", "data"}`, or `"error"` instead of `"data"`) as each loads. \
+Prefer it over separate calls when you need more than one symbol.
+- **Remaining API budget**: `python -m tools.alpha_vantage quota`
 
 Intervals for intraday: 1min, 5min, 15min, 30min, 60min.
 
@@ -80,13 +85,55 @@ sorted by date ascending, ready for Plotly charting.
 You can also import the functions directly in your generated code:
 ```python
 from tools.alpha_vantage import fetch_daily, fetch_intraday
-data = fetch_daily("AAPL")  # Returns list of dicts
+data = fetch_daily("AAPL")  # Returns a columnar TimeSeries
+```
+
+The returned `TimeSeries` behaves like a list of `{date, open, high, low, \
+close, volume}` dicts (`len(data)`, `data[-1]["close"]`, `for r in data`), and \
+can be passed straight to `px.line(data, x="date", y="close")`. Prefer its \
+column arrays for charts and calculations — they need no per-row Python: \
+`data.dates` (datetime64), `data["close"]`, `data["volume"]` (NumPy arrays).
+For a date range, pass `start=` / `end=` (strings or `datetime.date`) to \
+`fetch_daily` / `fetch_intraday` instead of filtering rows in a loop — the \
+range is found by binary search and costs almost nothing on every rerun.
+For weekly/monthly or coarser intraday bars, use \
+`fetch_resampled("AAPL", "weekly")` / `fetch_resampled("AAPL", "15min")`: the \
+bars are aggregated locally from daily or 1min data, with no extra API call.
+For technical indicators, never write per-row loops — use `tools.indicators` \
+(`sma`, `ema`, `rsi`, `macd`, `bollinger`, `atr`, `vwap`), e.g. \
+`sma(data, 50)` or `rsi(data)`. They return NumPy arrays aligned with `data` \
+(dicts of arrays for `macd` / `bollinger`) and are memoized, so reruns and \
+refreshed data only compute the new bars.
+To compare symbols, build one date-aligned matrix instead of one trace loop \
+per symbol: `m = build_matrix(["AAPL", "MSFT"], fill="ffill")` (from \
+`tools.matrix`), then `px.line(m.normalized().columns(), x="date", \
+y=list(m.symbols))`, `m.summary()` for metric rows, `m.spread("AAPL", "MSFT")` \
+and `m.returns()`. Symbols that failed to load are listed in `m.errors`.
+For comparison statistics use `tools.analytics` on that matrix: \
+`cumulative_returns(m)`, `correlation(m, window=60)` (N×N, for a heatmap), \
+`volatility(m)`, `beta(m, "SPY")`, `drawdown(m)` / `max_drawdown(m)`, and \
+`summary(m, benchmark="SPY")` for metric tiles.
+Long series (full daily history, 1min bars) should not be charted point by \
+point: pass `max_points=2000` to `fetch_daily` / `fetch_intraday` for \
+candles that keep every high and low, or use `downsample_line(data)` / \
+`downsample_ohlc(data)` from `tools.downsample` on a series you already have.
+
+To load several symbols at once, use `fetch_many_sync`, which fetches them \
+concurrently and returns `{symbol: records or exception}` in one call \
+instead of a slow one-by-one loop:
+```python
+from tools.alpha_vantage_async import fetch_many_sync
+results = fetch_many_sync(["AAPL", "MSFT", "GOOGL"])  # function="intraday" also works
 ```
 
 The tool caches results for 5 minutes to avoid hitting the API rate limit \
-(25 requests/day on free tier). Handle errors gracefully — the tool raises \
-clear exceptions for invalid tickers, rate limits, missing API keys, and \
-network issues.
+(25 requests/day on free tier). The cache is shared on disk by every process, \
+so data fetched via the CLI is served instantly to the app and vice versa. \
+In dashboards, pass `max_stale=3600` to `fetch_daily` / `fetch_intraday` so \
+that expired data is returned instantly and refreshed in the background — \
+reruns then never wait on the network for symbols already loaded. \
+Handle errors gracefully — the tool raises clear exceptions for invalid \
+tickers, rate limits, missing API keys, and network issues.
 
 ## Error Handling
 
@@ -386,8 +433,8 @@ with col2:
     )
 
 try:
-    data = fetch_daily("AAPL")
-    filtered = [r for r in data if start_date.isoformat() <= r["date"] <= end_date.isoformat()]
+    # start/end are answered by binary search on the cached series
+    filtered = fetch_daily("AAPL", start=start_date, end=end_date)
     if filtered:
         fig = px.line(filtered, x="date", y="close", title="AAPL — Filtered by date range")
         fig.update_layout(**STEGO_LAYOUT)
@@ -555,11 +602,7 @@ if submitted:
     symbol = symbol.strip().upper()
     if symbol:
         try:
-            data = fetch_daily(symbol)
-            filtered = [
-                r for r in data
-                if start_date.isoformat() <= r["date"] <= end_date.isoformat()
-            ]
+            filtered = fetch_daily(symbol, start=start_date, end=end_date)
             if filtered:
                 fig = px.line(
                     filtered, x="date", y="close",
@@ -755,28 +798,28 @@ demonstrates the "Compare top 5 tech stocks" use case:
 import plotly.graph_objects as go
 from chart_theme import STEGO_LAYOUT
 from tools.alpha_vantage import (
-    InvalidTickerError, RateLimitError, MissingApiKeyError, ApiError, fetch_daily,
+    InvalidTickerError, RateLimitError, MissingApiKeyError, ApiError,
 )
+from tools.alpha_vantage_async import fetch_many_sync
 
 st.subheader("Tech Stock Dashboard")
 
 symbols = ["AAPL", "MSFT", "GOOGL", "AMZN", "META"]
 stock_data = {}
 
-# Fetch all data up front to minimise API calls
-for symbol in symbols:
-    try:
-        stock_data[symbol] = fetch_daily(symbol)
-    except InvalidTickerError:
+# Fetch all data up front, concurrently, in a single call
+for symbol, result in fetch_many_sync(symbols).items():
+    if isinstance(result, InvalidTickerError):
         st.warning(f"Ticker '{symbol}' not found. Skipping.")
-    except RateLimitError:
-        st.toast("Rate limit reached. Some data may be missing.")
-        break
-    except MissingApiKeyError:
+    elif isinstance(result, RateLimitError):
+        st.toast(f"Rate limit reached. {symbol} is missing.")
+    elif isinstance(result, MissingApiKeyError):
         st.warning("Alpha Vantage API key not configured.")
         break
-    except ApiError as exc:
-        st.warning(f"Could not load {symbol}: {exc}")
+    elif isinstance(result, ApiError):
+        st.warning(f"Could not load {symbol}: {result}")
+    else:
+        stock_data[symbol] = result
 
 if stock_data:
     # Metrics row
@@ -28,6 +28,7 @@ from agent import (
     query_agent_streaming,
 )
 from dynamic_defaults import reset_dynamic_section
+from tools.warmer import format_progress, start_warmer
 
 if TYPE_CHECKING:
     from agent import MessageType
@@ -252,7 +253,10 @@ with st.sidebar:
 # ---------------------------------------------------------------------------
 
 _anthropic_key = os.environ.get("ANTHROPIC_API_KEY", "").strip()
-_alphavantage_key = os.environ.get("ALPHAVANTAGE_API_KEY", "").strip()
+_alphavantage_key = (
+    os.environ.get("ALPHAVANTAGE_API_KEY", "").strip()
+    or os.environ.get("ALPHAVANTAGE_API_KEYS", "").replace(",", "").strip()
+)
 
 if not _anthropic_key:
     st.error(
@@ -269,6 +273,17 @@ if not _alphavantage_key:
         "Get a free key at https://www.alphavantage.co/support/#api-key"
     )
 
+# Keep the configured watchlist warm in the data cache (started once per
+# server process; a no-op without ALPHAVANTAGE_WATCHLIST)
+if _alphavantage_key:
+    try:
+        _cache_warmer = start_warmer()
+    except ValueError as exc:
+        st.warning(f"**Cache warmer not started.** {exc}")
+    else:
+        if _cache_warmer is not None:
+            st.sidebar.caption(format_progress(_cache_warmer.progress()))
+
 # === SCAFFOLD END ===
 
 # === DYNAMIC START ===
@@ -0,0 +1,5 @@
+"""Stegosource benchmarks.
+
+Standalone scripts that measure the market data layer. Run them as modules
+from the project root, e.g. ``python -m benchmarks.timeseries_memory``.
+"""
@@ -0,0 +1,79 @@
+"""Timing benchmark for the comparison analytics.
+
+Builds a synthetic aligned price matrix (random walks, with a few symbols
+listing part-way through so the gap handling is exercised) and times each
+statistic in :mod:`tools.analytics` plus the alignment itself.
+
+Usage:
+    python -m benchmarks.analytics_speed [--symbols 36] [--days 5000] [--repeat 10]
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+
+from tools import analytics
+from tools.matrix import PriceMatrix, _align, align
+from tools.timeseries import TimeSeries
+
+
+def make_series(symbols: int, days: int) -> dict[str, TimeSeries]:
+    """Return ``symbols`` random-walk daily series; every fifth lists late."""
+    rng = np.random.default_rng(0)
+    dates = np.datetime64("2005-01-03") + np.arange(days)
+    series = {}
+    for i in range(symbols):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, days)))
+        start = days // 3 if i % 5 == 4 else 0
+        volume = np.full(days - start, 1_000_000, dtype=np.int64)
+        columns = (close[start:],) * 4
+        series[f"S{i:02d}"] = TimeSeries(dates[start:], *columns, volume)
+    return series
+
+
+def best_ms(run: Callable[[], Any], repeat: int) -> float:
+    """Return the fastest of ``repeat`` single runs, in milliseconds."""
+    return min(timeit.repeat(run, number=1, repeat=repeat)) * 1e3
+
+
+def main() -> None:
+    """Run the benchmark and print a summary."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=36)
+    parser.add_argument("--days", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    series = make_series(args.symbols, args.days)
+    m: PriceMatrix = align(series, fill="ffill")
+    benchmark = m.symbols[0]
+    recent = m.between(m.dates[-252])
+    cases: list[tuple[str, Callable[[], Any]]] = [
+        ("align (uncached)", lambda: _align(series, "close", "outer", "ffill")),
+        ("cumulative_returns", lambda: analytics.cumulative_returns(m)),
+        ("volatility", lambda: analytics.volatility(m)),
+        ("volatility, rolling 60", lambda: analytics.volatility(m, window=60)),
+        ("correlation", lambda: analytics.correlation(m)),
+        ("correlation, last 60", lambda: analytics.correlation(m, window=60)),
+        (
+            "rolling_correlation 60, 1y",
+            lambda: analytics.rolling_correlation(recent, 60),
+        ),
+        ("rolling_correlation 60, all", lambda: analytics.rolling_correlation(m, 60)),
+        ("beta", lambda: analytics.beta(m, benchmark)),
+        ("max_drawdown", lambda: analytics.max_drawdown(m)),
+        ("summary", lambda: analytics.summary(m, benchmark)),
+    ]
+
+    print(f"{len(m.symbols)} symbols x {len(m.dates):,} dates")
+    for label, run in cases:
+        print(f"  {label:<30} {best_ms(run, args.repeat):8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
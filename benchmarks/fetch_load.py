@@ -0,0 +1,108 @@
+"""Load benchmark for the fetch path, against the offline stand-in server.
+
+Starts :class:`~tools.fake_alpha_vantage.FakeAlphaVantage` in-process with
+a fixed latency, points the client at it and lifts the client-side rate
+limits, then times loading a set of symbols:
+
+- cold, one after another (the pre-concurrency dashboard pattern);
+- cold, through ``fetch_many_sync`` with bounded concurrency;
+- full histories as JSON and as CSV;
+- warm, served from the in-memory cache.
+
+The disk tier points at a temporary database so runs never touch the real
+cache.
+
+Usage:
+    python -m benchmarks.fetch_load [--symbols 20] [--latency 0.2] [--concurrency 4]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from collections.abc import Callable
+from typing import Any
+
+from tools import alpha_vantage
+from tools.alpha_vantage import clear_cache, fetch_daily
+from tools.alpha_vantage_async import fetch_many_sync
+from tools.fake_alpha_vantage import FakeAlphaVantage
+
+
+def timed(run: Callable[[], Any]) -> float:
+    """Return the wall time of one call to ``run``, in seconds."""
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """Run the benchmark and print a summary."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--days", type=int, default=5000)
+    args = parser.parse_args()
+
+    symbols = [f"SYM{i:03d}" for i in range(args.symbols)]
+    with (
+        tempfile.TemporaryDirectory() as tmp,
+        FakeAlphaVantage(latency=args.latency, days=args.days).start() as server,
+    ):
+        os.environ.update(
+            ALPHAVANTAGE_BASE_URL=server.url,
+            ALPHAVANTAGE_API_KEY=os.environ.get("ALPHAVANTAGE_API_KEY") or "bench",
+            ALPHAVANTAGE_CACHE_DB=os.path.join(tmp, "cache.db"),
+        )
+        # The key pool is rebuilt from these module settings on next use
+        alpha_vantage.RATE_LIMIT_PER_MINUTE = 1_000_000
+        alpha_vantage.RATE_LIMIT_PER_DAY = 1_000_000
+
+        def sequential(**kwargs: Any) -> None:
+            for symbol in symbols:
+                fetch_daily(symbol, **kwargs)
+
+        def cold(run: Callable[[], Any]) -> float:
+            clear_cache()
+            return timed(run)
+
+        cases = [
+            ("compact, sequential", lambda: cold(sequential)),
+            (
+                f"compact, fetch_many x{args.concurrency}",
+                lambda: cold(
+                    lambda: fetch_many_sync(symbols, concurrency=args.concurrency)
+                ),
+            ),
+            (
+                "full JSON, sequential",
+                lambda: cold(lambda: sequential(outputsize="full")),
+            ),
+            (
+                "full CSV, sequential",
+                lambda: cold(lambda: sequential(outputsize="full", datatype="csv")),
+            ),
+            ("compact, warm cache", lambda: timed(sequential)),
+        ]
+
+        print(
+            f"{args.symbols} symbols, {args.latency * 1e3:.0f} ms latency, "
+            f"{args.days:,}-day full histories"
+        )
+        for label, run in cases:
+            before = server.stats()
+            seconds = run()
+            after = server.stats()
+            requests = after["requests"] - before["requests"]
+            sent = (after["bytes_sent"] - before["bytes_sent"]) / 2**20
+            print(
+                f"  {label:<28} {seconds * 1e3:9.1f} ms  "
+                f"{requests:4d} requests  {sent:7.2f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
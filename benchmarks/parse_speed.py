@@ -0,0 +1,113 @@
+"""Parse-time benchmark: JSON vs. CSV wire format.
+
+Builds synthetic full-history payloads in both formats Alpha Vantage serves
+(``datatype=json`` and ``datatype=csv``) holding the same bars, and times how
+long each takes to decode into a :class:`~tools.timeseries.TimeSeries`. The
+JSON timing includes ``json.loads``, since that is part of the work
+``response.json()`` does on every fetch.
+
+Usage:
+    python -m benchmarks.parse_speed [--days 5000] [--minutes 7800] [--repeat 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import timeit
+from collections.abc import Callable
+
+from tools.alpha_vantage import _parse_csv_time_series, _parse_time_series
+from tools.timeseries import TimeSeries
+
+CSV_HEADER = "timestamp,open,high,low,close,volume"
+
+
+def make_bars(count: int, intraday: bool) -> list[tuple[str, float, int]]:
+    """Return ``count`` synthetic ``(timestamp, price, volume)`` bars, newest first."""
+    start = dt.datetime(2000, 1, 3, 9, 30)
+    step = dt.timedelta(minutes=1) if intraday else dt.timedelta(days=1)
+    fmt = "%Y-%m-%d %H:%M:%S" if intraday else "%Y-%m-%d"
+    bars = []
+    price = 100.0
+    for i in range(count):
+        price *= 1.0 + ((i * 7919) % 200 - 100) / 10_000
+        bars.append(((start + i * step).strftime(fmt), price, 1_000_000 + i))
+    bars.reverse()
+    return bars
+
+
+def to_json(bars: list[tuple[str, float, int]], time_series_key: str) -> str:
+    """Encode bars as a ``datatype=json`` response body."""
+    series = {
+        date: {
+            "1. open": f"{price:.4f}",
+            "2. high": f"{price * 1.01:.4f}",
+            "3. low": f"{price * 0.99:.4f}",
+            "4. close": f"{price * 1.002:.4f}",
+            "5. volume": str(volume),
+        }
+        for date, price, volume in bars
+    }
+    return json.dumps({"Meta Data": {}, time_series_key: series}, indent=4)
+
+
+def to_csv(bars: list[tuple[str, float, int]]) -> str:
+    """Encode bars as a ``datatype=csv`` response body."""
+    rows = [CSV_HEADER] + [
+        f"{date},{price:.4f},{price * 1.01:.4f},{price * 0.99:.4f},"
+        f"{price * 1.002:.4f},{volume}"
+        for date, price, volume in bars
+    ]
+    return "\r\n".join(rows) + "\r\n"
+
+
+def best_time(parse: Callable[[], TimeSeries], repeat: int) -> float:
+    """Return the fastest of ``repeat`` single runs, in seconds."""
+    return min(timeit.repeat(parse, number=1, repeat=repeat))
+
+
+def run_case(label: str, bars: list[tuple[str, float, int]], key: str, repeat: int):
+    """Time both parsers on one payload and print the comparison."""
+    json_text = to_json(bars, key)
+    csv_text = to_csv(bars)
+
+    from_json = _parse_time_series(json.loads(json_text), key)
+    from_csv = _parse_csv_time_series(csv_text)
+    assert from_json == from_csv, "parsers disagree"
+
+    json_s = best_time(lambda: _parse_time_series(json.loads(json_text), key), repeat)
+    csv_s = best_time(lambda: _parse_csv_time_series(csv_text), repeat)
+
+    print(f"{label}: {len(bars):,} bars")
+    print(f"  JSON  {len(json_text) / 2**20:6.2f} MiB body  {json_s * 1e3:8.2f} ms")
+    print(f"  CSV   {len(csv_text) / 2**20:6.2f} MiB body  {csv_s * 1e3:8.2f} ms")
+    print(f"  CSV is {json_s / csv_s:.1f}x faster")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=5000, help="daily bars")
+    parser.add_argument(
+        "--minutes", type=int, default=7800, help="intraday bars (~20 sessions)"
+    )
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    run_case(
+        "Daily (full)",
+        make_bars(args.days, intraday=False),
+        "Time Series (Daily)",
+        args.repeat,
+    )
+    run_case(
+        "Intraday 1min (full)",
+        make_bars(args.minutes, intraday=True),
+        "Time Series (1min)",
+        args.repeat,
+    )
+
+
+if __name__ == "__main__":
+    main()
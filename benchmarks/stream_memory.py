@@ -0,0 +1,90 @@
+"""Peak-memory benchmark: ``response.json()`` vs. streaming decode.
+
+Encodes a synthetic full-history JSON body, then decodes it into a
+:class:`~tools.timeseries.TimeSeries` two ways and reports the peak memory
+each one allocates on top of the raw body bytes, measured with
+:mod:`tracemalloc`:
+
+- whole body: decode the text, ``json.loads`` it into a dict-of-dicts and
+  parse that, as ``response.json()`` does;
+- streaming: feed the body through :func:`tools.json_stream.decode_time_series`
+  in network-sized chunks.
+
+Usage:
+    python -m benchmarks.stream_memory [--days 5000] [--minutes 7800]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import tracemalloc
+from collections.abc import Callable, Iterator
+from typing import Any
+
+from benchmarks.parse_speed import make_bars, to_json
+from tools.alpha_vantage import (
+    _RESPONSE_FIELDS,
+    STREAM_CHUNK_SIZE,
+    _parse_time_series,
+)
+from tools.json_stream import decode_time_series
+
+
+def iter_chunks(body: bytes, size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield ``body`` in slices, as ``response.iter_content`` would."""
+    view = memoryview(body)
+    for i in range(0, len(body), size):
+        yield bytes(view[i : i + size])
+
+
+def peak_bytes(decode: Callable[[], Any]) -> int:
+    """Return the peak bytes allocated while running ``decode()``."""
+    gc.collect()
+    tracemalloc.start()
+    result = decode()
+    _size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak
+
+
+def run_case(label: str, body: bytes, key: str) -> None:
+    """Measure both decoders on one body and print the comparison."""
+    whole = peak_bytes(lambda: _parse_time_series(json.loads(body.decode()), key))
+    streamed = peak_bytes(
+        lambda: decode_time_series(iter_chunks(body), key, _RESPONSE_FIELDS)
+    )
+    mib = 1024 * 1024
+    print(f"{label}: {len(body) / mib:.2f} MiB body")
+    print(f"  whole body : {whole / mib:8.2f} MiB peak")
+    print(f"  streaming  : {streamed / mib:8.2f} MiB peak")
+    print(f"  reduction  : {whole / streamed:8.1f}x")
+
+
+def main() -> None:
+    """Run the benchmark and print a summary."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=5000, help="daily bars")
+    parser.add_argument(
+        "--minutes", type=int, default=7800, help="intraday bars (~20 sessions)"
+    )
+    args = parser.parse_args()
+
+    daily_key = "Time Series (Daily)"
+    intraday_key = "Time Series (1min)"
+    run_case(
+        "Daily (full)",
+        to_json(make_bars(args.days, intraday=False), daily_key).encode(),
+        daily_key,
+    )
+    run_case(
+        "Intraday 1min (full)",
+        to_json(make_bars(args.minutes, intraday=True), intraday_key).encode(),
+        intraday_key,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Memory benchmark: columnar TimeSeries vs. legacy list[dict] records.
+
+Builds synthetic full-history daily payloads for many symbols, parses them
+into both representations and reports the memory each one retains, measured
+with :mod:`tracemalloc`.
+
+Usage:
+    python -m benchmarks.timeseries_memory [--symbols 50] [--days 5000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import gc
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+from tools.alpha_vantage import _parse_time_series
+
+TIME_SERIES_KEY = "Time Series (Daily)"
+
+
+def make_payload(days: int, seed: int = 0) -> dict[str, Any]:
+    """Return a synthetic TIME_SERIES_DAILY JSON payload."""
+    start = dt.date(2000, 1, 3)
+    series: dict[str, dict[str, str]] = {}
+    price = 100.0 + seed
+    for i in range(days):
+        price *= 1.0 + ((i * 7919 + seed) % 200 - 100) / 10_000
+        series[(start + dt.timedelta(days=i)).isoformat()] = {
+            "1. open": f"{price:.4f}",
+            "2. high": f"{price * 1.01:.4f}",
+            "3. low": f"{price * 0.99:.4f}",
+            "4. close": f"{price * 1.002:.4f}",
+            "5. volume": str(1_000_000 + i),
+        }
+    return {"Meta Data": {}, TIME_SERIES_KEY: series}
+
+
+def legacy_records(raw: dict[str, Any]) -> list[dict[str, Any]]:
+    """Parse a payload the way the client did before TimeSeries existed."""
+    records = [
+        {
+            "date": date,
+            "open": float(values["1. open"]),
+            "high": float(values["2. high"]),
+            "low": float(values["3. low"]),
+            "close": float(values["4. close"]),
+            "volume": int(values["5. volume"]),
+        }
+        for date, values in raw[TIME_SERIES_KEY].items()
+    ]
+    records.sort(key=lambda r: r["date"])
+    return records
+
+
+def retained_bytes(build: Callable[[], list[Any]]) -> int:
+    """Return the bytes still allocated by the result of ``build()``."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main() -> None:
+    """Run the benchmark and print a summary table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--days", type=int, default=5000)
+    args = parser.parse_args()
+
+    payloads = [make_payload(args.days, seed) for seed in range(args.symbols)]
+
+    legacy = retained_bytes(lambda: [legacy_records(p) for p in payloads])
+    columnar = retained_bytes(
+        lambda: [_parse_time_series(p, TIME_SERIES_KEY) for p in payloads]
+    )
+
+    mib = 1024 * 1024
+    print(f"{args.symbols} symbols x {args.days} daily bars")
+    print(f"  list[dict] records : {legacy / mib:8.1f} MiB")
+    print(f"  TimeSeries columns : {columnar / mib:8.1f} MiB")
+    print(f"  reduction          : {legacy / columnar:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
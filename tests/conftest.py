@@ -0,0 +1,22 @@
+"""Shared pytest fixtures."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _isolated_disk_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Point the shared disk cache at a per-test database.
+
+    Keeps tests from reading or polluting the real host-wide cache.
+    """
+    monkeypatch.setenv("ALPHAVANTAGE_CACHE_DB", str(tmp_path / "cache.db"))
+
+
+@pytest.fixture(autouse=True)
+def _no_daemon(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Run CLI commands in-process, never through a daemon running on the host."""
+    monkeypatch.setenv("ALPHAVANTAGE_DAEMON_SOCKET", "")
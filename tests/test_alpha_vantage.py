@@ -2,17 +2,27 @@
 
 from __future__ import annotations
 
+import datetime as dt
 import json
 import os
+import sys
+import threading
 import time
-from typing import Any
+from collections.abc import Callable
+from typing import Any, ClassVar
 from unittest.mock import MagicMock, patch
 
+import numpy as np
 import pytest
 import requests
 
 from tools.alpha_vantage import (
+    _RESPONSE_FIELDS,
+    CACHE_RETENTION,
     CACHE_TTL,
+    COMPACT_SIZE,
+    MAX_RETRIES,
+    RATE_LIMIT_PER_DAY,
     VALID_INTERVALS,
     AlphaVantageError,
     ApiError,
@@ -21,14 +31,31 @@ from tools.alpha_vantage import (
     RateLimitError,
     _cache,
     _cache_key,
-    _get_api_key,
+    _get_api_keys,
+    _get_disk_cache,
+    _get_session,
+    _inflight,
+    _parse_csv_time_series,
     _parse_time_series,
+    _peek_cached,
+    _purge_disk_cache,
+    _revalidating,
+    _single_flight,
+    background_calls,
+    cache_stats,
     clear_cache,
+    fetch_batch,
     fetch_daily,
     fetch_intraday,
+    fetch_resampled,
+    format_entry,
     get_cached,
+    parse_entries,
+    quota_status,
     set_cached,
 )
+from tools.rate_limit import KeyPool
+from tools.timeseries import TimeSeries
 
 
 # ---------------------------------------------------------------------------
@@ -42,6 +69,12 @@ def _clear_cache() -> None:
     clear_cache()
 
 
+@pytest.fixture(autouse=True)
+def _no_retry_delay(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Retry transient failures without sleeping."""
+    monkeypatch.setattr("tools.alpha_vantage.RETRY_BACKOFF", 0.0)
+
+
 @pytest.fixture()
 def api_key_env() -> dict[str, str]:
     """Return an environment dict with a test API key."""
@@ -72,6 +105,26 @@ def _make_daily_response(
     }
 
 
+def _make_history_response(
+    last_day: dt.date,
+    num_days: int,
+    close: float = 100.0,
+) -> dict[str, Any]:
+    """Create a daily response of ``num_days`` consecutive days ending at
+    ``last_day``, every bar closing at ``close``."""
+    time_series: dict[str, dict[str, str]] = {}
+    for i in range(num_days):
+        date = (last_day - dt.timedelta(days=i)).isoformat()
+        time_series[date] = {
+            "1. open": "100.0",
+            "2. high": "101.0",
+            "3. low": "99.0",
+            "4. close": f"{close:.4f}",
+            "5. volume": "1000",
+        }
+    return {"Meta Data": {}, "Time Series (Daily)": time_series}
+
+
 def _make_intraday_response(
     symbol: str = "AAPL",
     interval: str = "5min",
@@ -102,32 +155,39 @@ def _make_intraday_response(
 # ---------------------------------------------------------------------------
 
 
-class TestGetApiKey:
+class TestGetApiKeys:
     """Verify API key retrieval and validation."""
 
     def test_returns_key_when_set(self) -> None:
         with patch.dict(os.environ, {"ALPHAVANTAGE_API_KEY": "my-key"}):
-            assert _get_api_key() == "my-key"
+            assert _get_api_keys() == ("my-key",)
 
     def test_raises_when_missing(self) -> None:
         with patch.dict(os.environ, {}, clear=True):
             os.environ.pop("ALPHAVANTAGE_API_KEY", None)
             with pytest.raises(MissingApiKeyError, match="ALPHAVANTAGE_API_KEY"):
-                _get_api_key()
+                _get_api_keys()
 
     def test_raises_when_empty(self) -> None:
-        with patch.dict(os.environ, {"ALPHAVANTAGE_API_KEY": ""}):
-            with pytest.raises(MissingApiKeyError):
-                _get_api_key()
+        with (
+            patch.dict(os.environ, {"ALPHAVANTAGE_API_KEY": ""}),
+            pytest.raises(MissingApiKeyError),
+        ):
+            _get_api_keys()
 
     def test_raises_when_whitespace(self) -> None:
-        with patch.dict(os.environ, {"ALPHAVANTAGE_API_KEY": "   "}):
-            with pytest.raises(MissingApiKeyError):
-                _get_api_key()
+        env = {"ALPHAVANTAGE_API_KEY": "   ", "ALPHAVANTAGE_API_KEYS": " , "}
+        with patch.dict(os.environ, env), pytest.raises(MissingApiKeyError):
+            _get_api_keys()
 
     def test_strips_whitespace(self) -> None:
         with patch.dict(os.environ, {"ALPHAVANTAGE_API_KEY": "  my-key  "}):
-            assert _get_api_key() == "my-key"
+            assert _get_api_keys() == ("my-key",)
+
+    def test_pooled_keys(self) -> None:
+        env = {"ALPHAVANTAGE_API_KEYS": "k1, k2,,k1", "ALPHAVANTAGE_API_KEY": "k3"}
+        with patch.dict(os.environ, env):
+            assert _get_api_keys() == ("k1", "k2", "k3")
 
 
 # ---------------------------------------------------------------------------
@@ -162,11 +222,22 @@ class TestCache:
 
     def test_cache_expiry(self) -> None:
         data = [{"date": "2025-01-15", "close": 150.0}]
-        # Manually set with an old timestamp
-        _cache["test-key"] = (time.time() - CACHE_TTL - 1, data)
+        # Manually set with an expiry in the past
+        _cache["test-key"] = (time.time() - 1, data)
         assert get_cached("test-key") is None
-        # Stale entry should be removed
-        assert "test-key" not in _cache
+        # Kept for stale serving and incremental refresh
+        assert _peek_cached("test-key") == data
+
+    def test_default_ttl(self) -> None:
+        set_cached("test-key", [{"a": 1}])
+        expires_at, _ = _cache["test-key"]
+        assert expires_at == pytest.approx(time.time() + CACHE_TTL, abs=5)
+
+    def test_per_key_ttl(self) -> None:
+        set_cached("short", [{"a": 1}], ttl=-1)
+        set_cached("long", [{"b": 2}], ttl=3600)
+        assert get_cached("short") is None
+        assert get_cached("long") == [{"b": 2}]
 
     def test_clear_cache(self) -> None:
         set_cached("key1", [{"a": 1}])
@@ -175,6 +246,111 @@ class TestCache:
         clear_cache()
         assert len(_cache) == 0
 
+    def test_memory_stats(self) -> None:
+        set_cached("key1", [{"a": 1}])
+        memory = cache_stats()["memory"]
+        assert memory["entries"] == 1
+        assert 0 < memory["bytes"] <= memory["max_bytes"]
+
+    def test_memory_budget_evicts_from_l1_only(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(_cache, "max_bytes", 1_300)
+        set_cached("key1", [{"a": 1}])
+        set_cached("key2", ["x" * 900])
+        assert "key1" not in _cache
+        assert cache_stats()["memory"]["evictions"] == 1
+        # Still served from the disk tier
+        assert get_cached("key1") == [{"a": 1}]
+
+    def test_sweep_purges_long_expired_disk_entries(self) -> None:
+        set_cached("old", [1], ttl=-(CACHE_RETENTION + 60))
+        set_cached("recent", [2], ttl=-1)
+        _purge_disk_cache()
+        disk = _get_disk_cache()
+        assert disk.get("old", allow_expired=True) is None
+        assert disk.get("recent", allow_expired=True) is not None
+
+    def test_memory_sweep_keeps_recently_expired_entries(self) -> None:
+        set_cached("old", [1], ttl=-(CACHE_RETENTION + 60))
+        set_cached("recent", [2], ttl=-1)
+        _cache.purge_expired(grace=CACHE_RETENTION)
+        assert "old" not in _cache
+        assert _cache.get("recent") is not None
+
+
+class TestDiskCacheTier:
+    """Verify the shared SQLite tier behind the in-memory cache."""
+
+    def test_set_writes_through_to_disk(self) -> None:
+        set_cached("test-key", [{"close": 1.0}])
+        disk = _get_disk_cache()
+        assert disk is not None
+        hit = disk.get("test-key")
+        assert hit is not None
+        assert hit[1] == [{"close": 1.0}]
+
+    def test_disk_hit_after_memory_loss(self) -> None:
+        """A fresh process (empty L1) is served from disk."""
+        set_cached("test-key", [{"close": 1.0}])
+        _cache.clear()
+        assert get_cached("test-key") == [{"close": 1.0}]
+
+    def test_disk_hit_promoted_to_memory(self) -> None:
+        set_cached("test-key", [{"close": 1.0}], ttl=120)
+        _cache.clear()
+        get_cached("test-key")
+        expires_at, data = _cache["test-key"]
+        assert data == [{"close": 1.0}]
+        # Promotion keeps the disk entry's remaining TTL
+        assert expires_at == pytest.approx(time.time() + 120, abs=5)
+
+    def test_expired_disk_entry_is_miss(self) -> None:
+        set_cached("test-key", [{"close": 1.0}], ttl=-1)
+        _cache.clear()
+        assert get_cached("test-key") is None
+
+    def test_clear_cache_clears_disk(self) -> None:
+        set_cached("test-key", [{"close": 1.0}])
+        clear_cache()
+        disk = _get_disk_cache()
+        assert disk is not None
+        assert disk.get("test-key") is None
+
+    def test_disabled_by_empty_env(self) -> None:
+        with patch.dict(os.environ, {"ALPHAVANTAGE_CACHE_DB": ""}):
+            assert _get_disk_cache() is None
+            set_cached("test-key", [{"close": 1.0}])
+            _cache.clear()
+            assert get_cached("test-key") is None
+
+    def test_timeseries_roundtrip_through_disk(self) -> None:
+        series = _parse_time_series(_make_daily_response(), "Time Series (Daily)")
+        set_cached("test-key", series)
+        _cache.clear()
+        cached = get_cached("test-key")
+        assert isinstance(cached, TimeSeries)
+        assert cached == series
+
+    def test_fetch_served_from_disk_without_network(
+        self, api_key_env: dict[str, str]
+    ) -> None:
+        mock_response = MagicMock()
+        mock_response.json.return_value = _make_daily_response()
+        mock_response.raise_for_status = MagicMock()
+
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get", return_value=mock_response
+            ) as mock_get,
+        ):
+            data1 = fetch_daily("AAPL")
+            _cache.clear()  # Simulate another process
+            data2 = fetch_daily("AAPL")
+            assert mock_get.call_count == 1
+            assert data1 == data2
+
 
 # ---------------------------------------------------------------------------
 # Response parsing tests
@@ -217,6 +393,12 @@ class TestParseTimeSeries:
         with pytest.raises(ApiError, match="Alpha Vantage API error"):
             _parse_time_series(raw, "Time Series (Daily)")
 
+    def test_rejected_api_key_is_not_a_ticker_error(self) -> None:
+        raw = {"Error Message": "the parameter apikey is invalid or missing."}
+        with pytest.raises(ApiError, match="rejected the API key") as exc_info:
+            _parse_time_series(raw, "Time Series (Daily)")
+        assert not isinstance(exc_info.value, InvalidTickerError)
+
     def test_raises_on_rate_limit_note(self) -> None:
         raw = {
             "Note": "Thank you for using Alpha Vantage! Our call frequency limit is 5 calls per minute."
@@ -243,6 +425,68 @@ class TestParseTimeSeries:
         dates = [r["date"] for r in records]
         assert dates == sorted(dates)
 
+    def test_returns_columnar_series(self) -> None:
+        raw = _make_daily_response(num_days=3)
+        series = _parse_time_series(raw, "Time Series (Daily)")
+        assert isinstance(series, TimeSeries)
+        assert series["close"].tolist() == [154.0, 153.0, 152.0]
+        assert series["volume"].dtype.kind == "i"
+
+    def test_intraday_dates_keep_time(self) -> None:
+        raw = _make_intraday_response(num_points=2)
+        series = _parse_time_series(raw, "Time Series (5min)")
+        assert series[0]["date"] == "2025-01-15 10:00:00"
+        assert series.intraday
+
+
+def _to_csv(raw: dict[str, Any], time_series_key: str) -> str:
+    """Re-encode a JSON time series response as a ``datatype=csv`` body."""
+    rows = ["timestamp,open,high,low,close,volume"]
+    for date, values in raw[time_series_key].items():
+        rows.append(",".join([date, *(values[f] for f in _RESPONSE_FIELDS)]))
+    return "\r\n".join(rows) + "\r\n"
+
+
+def _text_response(text: str) -> MagicMock:
+    """Create a successful mock response with body ``text``."""
+    response = MagicMock()
+    response.text = text
+    response.raise_for_status = MagicMock()
+    return response
+
+
+class TestParseCsvTimeSeries:
+    """Verify the bulk CSV parser."""
+
+    def test_matches_json_parser_daily(self) -> None:
+        raw = _make_daily_response(num_days=5)
+        key = "Time Series (Daily)"
+        assert _parse_csv_time_series(_to_csv(raw, key)) == _parse_time_series(raw, key)
+
+    def test_matches_json_parser_intraday(self) -> None:
+        raw = _make_intraday_response(interval="5min", num_points=5)
+        key = "Time Series (5min)"
+        series = _parse_csv_time_series(_to_csv(raw, key))
+        assert series.intraday
+        assert series == _parse_time_series(raw, key)
+
+    def test_sorted_ascending(self) -> None:
+        raw = _make_daily_response(num_days=3)
+        series = _parse_csv_time_series(_to_csv(raw, "Time Series (Daily)"))
+        assert series["date"].tolist() == ["2025-01-13", "2025-01-14", "2025-01-15"]
+
+    def test_header_only(self) -> None:
+        assert len(_parse_csv_time_series("timestamp,open,high,low,close,volume")) == 0
+
+    def test_unexpected_header(self) -> None:
+        with pytest.raises(InvalidTickerError):
+            _parse_csv_time_series("<html>Service unavailable</html>")
+
+    def test_malformed_rows(self) -> None:
+        text = "timestamp,open,high,low,close,volume\n2025-01-15,1.0,2.0\n"
+        with pytest.raises(ApiError, match="Unexpected CSV"):
+            _parse_csv_time_series(text)
+
 
 # ---------------------------------------------------------------------------
 # fetch_daily tests
@@ -259,21 +503,21 @@ class TestFetchDaily:
 
         with (
             patch.dict(os.environ, api_key_env),
-            patch("tools.alpha_vantage.requests.get", return_value=mock_response),
+            patch(
+                "tools.alpha_vantage.requests.Session.get", return_value=mock_response
+            ),
         ):
             data = fetch_daily("AAPL")
             assert len(data) == 3
             assert all("date" in r for r in data)
 
     def test_passes_correct_params(self, api_key_env: dict[str, str]) -> None:
-        mock_response = MagicMock()
-        mock_response.json.return_value = _make_daily_response()
-        mock_response.raise_for_status = MagicMock()
+        mock_response = _json_response(_make_daily_response())
 
         with (
             patch.dict(os.environ, api_key_env),
             patch(
-                "tools.alpha_vantage.requests.get", return_value=mock_response
+                "tools.alpha_vantage.requests.Session.get", return_value=mock_response
             ) as mock_get,
         ):
             fetch_daily("AAPL", outputsize="full")
@@ -293,7 +537,7 @@ class TestFetchDaily:
         with (
             patch.dict(os.environ, api_key_env),
             patch(
-                "tools.alpha_vantage.requests.get", return_value=mock_response
+                "tools.alpha_vantage.requests.Session.get", return_value=mock_response
             ) as mock_get,
         ):
             fetch_daily("aapl")
@@ -310,7 +554,7 @@ class TestFetchDaily:
         with (
             patch.dict(os.environ, api_key_env),
             patch(
-                "tools.alpha_vantage.requests.get", return_value=mock_response
+                "tools.alpha_vantage.requests.Session.get", return_value=mock_response
             ) as mock_get,
         ):
             # First call should hit the API
@@ -332,23 +576,23 @@ class TestFetchDaily:
         with (
             patch.dict(os.environ, api_key_env),
             patch(
-                "tools.alpha_vantage.requests.get",
+                "tools.alpha_vantage.requests.Session.get",
                 side_effect=requests.ConnectionError("Connection refused"),
             ),
+            pytest.raises(ApiError, match="Network error"),
         ):
-            with pytest.raises(ApiError, match="Network error"):
-                fetch_daily("AAPL")
+            fetch_daily("AAPL")
 
     def test_handles_timeout(self, api_key_env: dict[str, str]) -> None:
         with (
             patch.dict(os.environ, api_key_env),
             patch(
-                "tools.alpha_vantage.requests.get",
+                "tools.alpha_vantage.requests.Session.get",
                 side_effect=requests.Timeout("Timed out"),
             ),
+            pytest.raises(ApiError, match="timed out"),
         ):
-            with pytest.raises(ApiError, match="timed out"):
-                fetch_daily("AAPL")
+            fetch_daily("AAPL")
 
     def test_handles_http_error(self, api_key_env: dict[str, str]) -> None:
         mock_response = MagicMock()
@@ -360,10 +604,12 @@ class TestFetchDaily:
 
         with (
             patch.dict(os.environ, api_key_env),
-            patch("tools.alpha_vantage.requests.get", return_value=mock_response),
+            patch(
+                "tools.alpha_vantage.requests.Session.get", return_value=mock_response
+            ),
+            pytest.raises(ApiError, match="HTTP error"),
         ):
-            with pytest.raises(ApiError, match="HTTP error"):
-                fetch_daily("AAPL")
+            fetch_daily("AAPL")
 
     def test_invalid_ticker(self, api_key_env: dict[str, str]) -> None:
         mock_response = MagicMock()
@@ -374,10 +620,12 @@ class TestFetchDaily:
 
         with (
             patch.dict(os.environ, api_key_env),
-            patch("tools.alpha_vantage.requests.get", return_value=mock_response),
+            patch(
+                "tools.alpha_vantage.requests.Session.get", return_value=mock_response
+            ),
+            pytest.raises(InvalidTickerError),
         ):
-            with pytest.raises(InvalidTickerError):
-                fetch_daily("INVALIDTICKER")
+            fetch_daily("INVALIDTICKER")
 
     def test_rate_limit(self, api_key_env: dict[str, str]) -> None:
         mock_response = MagicMock()
@@ -388,10 +636,164 @@ class TestFetchDaily:
 
         with (
             patch.dict(os.environ, api_key_env),
-            patch("tools.alpha_vantage.requests.get", return_value=mock_response),
+            patch(
+                "tools.alpha_vantage.requests.Session.get", return_value=mock_response
+            ),
+            pytest.raises(RateLimitError),
         ):
-            with pytest.raises(RateLimitError):
-                fetch_daily("AAPL")
+            fetch_daily("AAPL")
+
+    def test_csv_datatype(self, api_key_env: dict[str, str]) -> None:
+        raw = _make_daily_response(num_days=3)
+        body = _to_csv(raw, "Time Series (Daily)")
+
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                return_value=_text_response(body),
+            ) as mock_get,
+        ):
+            data = fetch_daily("AAPL", datatype="csv")
+
+        assert mock_get.call_args.kwargs["params"]["datatype"] == "csv"
+        assert data == _parse_time_series(raw, "Time Series (Daily)")
+
+    def test_csv_datatype_json_error(self, api_key_env: dict[str, str]) -> None:
+        """Errors come back as JSON even when CSV was requested."""
+        body = json.dumps({"Error Message": "Invalid API call."})
+
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                return_value=_text_response(body),
+            ),
+            pytest.raises(InvalidTickerError),
+        ):
+            fetch_daily("INVALIDTICKER", datatype="csv")
+
+    def test_full_history_is_streamed(self, api_key_env: dict[str, str]) -> None:
+        raw = _make_daily_response(num_days=3)
+        response = _json_response(raw)
+
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get", return_value=response
+            ) as mock_get,
+        ):
+            data = fetch_daily("AAPL", outputsize="full")
+
+        assert mock_get.call_args.kwargs["stream"] is True
+        response.json.assert_not_called()
+        response.close.assert_called_once()
+        assert data == _parse_time_series(raw, "Time Series (Daily)")
+
+    @pytest.mark.parametrize(
+        ("payload", "error"),
+        [
+            ({"Error Message": "Invalid API call."}, InvalidTickerError),
+            ({"Note": "Our standard API call frequency is 5 calls"}, RateLimitError),
+            ({"Information": "Please subscribe to a premium plan"}, RateLimitError),
+            ({"Meta Data": {}}, InvalidTickerError),
+        ],
+    )
+    def test_streamed_error_payloads(
+        self,
+        api_key_env: dict[str, str],
+        payload: dict[str, Any],
+        error: type[Exception],
+    ) -> None:
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                return_value=_json_response(payload),
+            ),
+            pytest.raises(error),
+        ):
+            fetch_daily("AAPL", outputsize="full")
+
+    def test_streamed_malformed_body(self, api_key_env: dict[str, str]) -> None:
+        response = MagicMock()
+        response.iter_content.return_value = iter([b"<html>Bad gateway</html>"])
+
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch("tools.alpha_vantage.requests.Session.get", return_value=response),
+            pytest.raises(ApiError, match="Malformed JSON"),
+        ):
+            fetch_daily("AAPL", outputsize="full")
+        response.close.assert_called_once()
+
+    def test_date_range(self, api_key_env: dict[str, str]) -> None:
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                return_value=_json_response(_make_daily_response(num_days=5)),
+            ) as mock_get,
+        ):
+            window = fetch_daily("AAPL", start="2025-01-12", end="2025-01-14")
+            everything = fetch_daily("AAPL")
+
+        assert mock_get.call_count == 1
+        assert window["date"].tolist() == ["2025-01-12", "2025-01-13", "2025-01-14"]
+        assert np.shares_memory(window.close, everything.close)
+
+    def test_invalid_date_fails_before_request(
+        self, api_key_env: dict[str, str]
+    ) -> None:
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch("tools.alpha_vantage.requests.Session.get") as mock_get,
+            pytest.raises(ValueError, match="Invalid date"),
+        ):
+            fetch_daily("AAPL", start="soon")
+        mock_get.assert_not_called()
+
+    def test_max_points(self, api_key_env: dict[str, str]) -> None:
+        full = _make_history_response(dt.date(2025, 3, 9), 30)
+        full["Time Series (Daily)"]["2025-02-20"]["2. high"] = "150.0"
+
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                return_value=_json_response(full),
+            ) as mock_get,
+        ):
+            candles = fetch_daily("AAPL", max_points=7)
+            again = fetch_daily("AAPL", max_points=7)
+            window = fetch_daily("AAPL", start="2025-03-01", max_points=3)
+
+        assert mock_get.call_count == 1
+        assert len(candles) == 7
+        assert again is candles
+        assert candles.high.max() == 150.0
+        assert candles.volume.sum() == 30 * 1000
+        assert candles["date"].tolist()[0] == "2025-02-08"
+        assert window["date"].tolist() == ["2025-03-01", "2025-03-04", "2025-03-07"]
+
+    @pytest.mark.parametrize("max_points", [0, -5, 2.5])
+    def test_invalid_max_points_fails_before_request(
+        self, api_key_env: dict[str, str], max_points: Any
+    ) -> None:
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch("tools.alpha_vantage.requests.Session.get") as mock_get,
+            pytest.raises(ValueError, match="max_points"),
+        ):
+            fetch_daily("AAPL", max_points=max_points)
+        mock_get.assert_not_called()
+
+    def test_invalid_datatype(self, api_key_env: dict[str, str]) -> None:
+        with (
+            patch.dict(os.environ, api_key_env),
+            pytest.raises(ValueError, match="Invalid datatype"),
+        ):
+            fetch_daily("AAPL", datatype="xml")
 
 
 # ---------------------------------------------------------------------------
@@ -409,7 +811,9 @@ class TestFetchIntraday:
 
         with (
             patch.dict(os.environ, api_key_env),
-            patch("tools.alpha_vantage.requests.get", return_value=mock_response),
+            patch(
+                "tools.alpha_vantage.requests.Session.get", return_value=mock_response
+            ),
         ):
             data = fetch_intraday("AAPL")
             assert len(data) == 3
@@ -422,7 +826,7 @@ class TestFetchIntraday:
         with (
             patch.dict(os.environ, api_key_env),
             patch(
-                "tools.alpha_vantage.requests.get", return_value=mock_response
+                "tools.alpha_vantage.requests.Session.get", return_value=mock_response
             ) as mock_get,
         ):
             fetch_intraday("MSFT", interval="15min")
@@ -443,15 +847,19 @@ class TestFetchIntraday:
 
         with (
             patch.dict(os.environ, api_key_env),
-            patch("tools.alpha_vantage.requests.get", return_value=mock_response),
+            patch(
+                "tools.alpha_vantage.requests.Session.get", return_value=mock_response
+            ),
         ):
             data = fetch_intraday("AAPL", interval=interval)
-            assert isinstance(data, list)
+            assert isinstance(data, TimeSeries)
 
     def test_invalid_interval(self, api_key_env: dict[str, str]) -> None:
-        with patch.dict(os.environ, api_key_env):
-            with pytest.raises(ValueError, match="Invalid interval"):
-                fetch_intraday("AAPL", interval="2min")
+        with (
+            patch.dict(os.environ, api_key_env),
+            pytest.raises(ValueError, match="Invalid interval"),
+        ):
+            fetch_intraday("AAPL", interval="2min")
 
     def test_uses_cache(self, api_key_env: dict[str, str]) -> None:
         mock_response = MagicMock()
@@ -461,7 +869,7 @@ class TestFetchIntraday:
         with (
             patch.dict(os.environ, api_key_env),
             patch(
-                "tools.alpha_vantage.requests.get", return_value=mock_response
+                "tools.alpha_vantage.requests.Session.get", return_value=mock_response
             ) as mock_get,
         ):
             data1 = fetch_intraday("AAPL", interval="5min")
@@ -482,7 +890,7 @@ class TestFetchIntraday:
         with (
             patch.dict(os.environ, api_key_env),
             patch(
-                "tools.alpha_vantage.requests.get",
+                "tools.alpha_vantage.requests.Session.get",
                 side_effect=[mock_response_5, mock_response_15],
             ) as mock_get,
         ):
@@ -500,88 +908,1397 @@ class TestFetchIntraday:
         with (
             patch.dict(os.environ, api_key_env),
             patch(
-                "tools.alpha_vantage.requests.get",
+                "tools.alpha_vantage.requests.Session.get",
                 side_effect=requests.ConnectionError("No connection"),
             ),
+            pytest.raises(ApiError, match="Network error"),
         ):
-            with pytest.raises(ApiError, match="Network error"):
-                fetch_intraday("AAPL")
+            fetch_intraday("AAPL")
 
 
 # ---------------------------------------------------------------------------
-# Error hierarchy tests
+# HTTP session and retry tests
 # ---------------------------------------------------------------------------
 
 
-class TestErrorHierarchy:
-    """Verify the error class hierarchy."""
+def _http_error_response(status: int, reason: str) -> MagicMock:
+    """Create a mock response whose raise_for_status raises HTTPError."""
+    response = MagicMock()
+    response.status_code = status
+    response.reason = reason
+    response.raise_for_status.side_effect = requests.HTTPError(response=response)
+    return response
 
-    def test_missing_api_key_is_alpha_vantage_error(self) -> None:
-        assert issubclass(MissingApiKeyError, AlphaVantageError)
 
-    def test_invalid_ticker_is_alpha_vantage_error(self) -> None:
-        assert issubclass(InvalidTickerError, AlphaVantageError)
+class TestHttpSession:
+    """Verify the shared pooled session and transient-error retries."""
 
-    def test_rate_limit_is_alpha_vantage_error(self) -> None:
-        assert issubclass(RateLimitError, AlphaVantageError)
+    def test_session_is_shared(self) -> None:
+        assert _get_session() is _get_session()
 
-    def test_api_error_is_alpha_vantage_error(self) -> None:
-        assert issubclass(ApiError, AlphaVantageError)
+    def test_session_requests_gzip(self) -> None:
+        assert "gzip" in _get_session().headers["Accept-Encoding"]
 
-    def test_base_is_exception(self) -> None:
-        assert issubclass(AlphaVantageError, Exception)
+    def test_session_shared_across_threads(self) -> None:
+        sessions = _run_concurrently(_get_session, 4)
+        assert all(s is sessions[0] for s in sessions)
 
+    def test_retries_transient_5xx(self, api_key_env: dict[str, str]) -> None:
+        ok = MagicMock()
+        ok.json.return_value = _make_daily_response()
+        ok.raise_for_status = MagicMock()
+        unavailable = _http_error_response(503, "Service Unavailable")
 
-# ---------------------------------------------------------------------------
-# CLI tests
-# ---------------------------------------------------------------------------
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                side_effect=[unavailable, ok],
+            ) as mock_get,
+        ):
+            data = fetch_daily("AAPL")
+        assert mock_get.call_count == 2
+        assert len(data) == 3
+        unavailable.close.assert_called_once()  # Its connection is released
 
+    def test_retries_timeout(self, api_key_env: dict[str, str]) -> None:
+        ok = MagicMock()
+        ok.json.return_value = _make_daily_response()
+        ok.raise_for_status = MagicMock()
 
-class TestCli:
-    """Verify the CLI interface."""
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                side_effect=[requests.Timeout("slow"), ok],
+            ) as mock_get,
+        ):
+            fetch_daily("AAPL")
+        assert mock_get.call_count == 2
 
-    def test_daily_command(self, api_key_env: dict[str, str]) -> None:
-        mock_response = MagicMock()
-        mock_response.json.return_value = _make_daily_response()
-        mock_response.raise_for_status = MagicMock()
+    def test_gives_up_after_max_retries(self, api_key_env: dict[str, str]) -> None:
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                side_effect=requests.ConnectionError("refused"),
+            ) as mock_get,
+            pytest.raises(ApiError, match="Network error"),
+        ):
+            fetch_daily("AAPL")
+        assert mock_get.call_count == MAX_RETRIES + 1
 
+    def test_does_not_retry_429(self, api_key_env: dict[str, str]) -> None:
         with (
             patch.dict(os.environ, api_key_env),
-            patch("tools.alpha_vantage.requests.get", return_value=mock_response),
-            patch("sys.argv", ["alpha_vantage", "daily", "AAPL"]),
-            patch("builtins.print") as mock_print,
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                return_value=_http_error_response(429, "Too Many Requests"),
+            ) as mock_get,
+            pytest.raises(ApiError, match="429"),
         ):
-            from tools.alpha_vantage import main
+            fetch_daily("AAPL")
+        assert mock_get.call_count == 1
 
-            main()
-            # Should print JSON output
-            mock_print.assert_called_once()
-            output = mock_print.call_args[0][0]
-            parsed = json.loads(output)
-            assert isinstance(parsed, list)
-            assert len(parsed) == 3
+    def test_does_not_retry_4xx(self, api_key_env: dict[str, str]) -> None:
+        not_found = _http_error_response(404, "Not Found")
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get", return_value=not_found
+            ) as mock_get,
+            pytest.raises(ApiError),
+        ):
+            fetch_daily("AAPL")
+        assert mock_get.call_count == 1
+        not_found.close.assert_called_once()
 
-    def test_intraday_command(self, api_key_env: dict[str, str]) -> None:
+    def test_does_not_retry_rate_limit_note(self, api_key_env: dict[str, str]) -> None:
         mock_response = MagicMock()
-        mock_response.json.return_value = _make_intraday_response(interval="15min")
+        mock_response.json.return_value = {
+            "Note": "Thank you for using Alpha Vantage! Our call frequency limit is reached."
+        }
         mock_response.raise_for_status = MagicMock()
 
         with (
             patch.dict(os.environ, api_key_env),
-            patch("tools.alpha_vantage.requests.get", return_value=mock_response),
             patch(
-                "sys.argv",
-                ["alpha_vantage", "intraday", "AAPL", "--interval", "15min"],
+                "tools.alpha_vantage.requests.Session.get",
+                return_value=mock_response,
+            ) as mock_get,
+            pytest.raises(RateLimitError),
+        ):
+            fetch_daily("AAPL")
+        assert mock_get.call_count == 1
+
+    def test_each_attempt_uses_rate_limit_slot(
+        self, api_key_env: dict[str, str]
+    ) -> None:
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                side_effect=requests.ConnectionError("refused"),
             ),
-            patch("builtins.print") as mock_print,
         ):
-            from tools.alpha_vantage import main
+            with pytest.raises(ApiError):
+                fetch_daily("AAPL")
+            assert quota_status()["calls_used_today"] == MAX_RETRIES + 1
 
-            main()
-            mock_print.assert_called_once()
-            output = mock_print.call_args[0][0]
-            parsed = json.loads(output)
-            assert isinstance(parsed, list)
+
+# ---------------------------------------------------------------------------
+# Incremental refresh tests
+# ---------------------------------------------------------------------------
+
+
+def _json_response(payload: dict[str, Any]) -> MagicMock:
+    """Create a successful mock response returning ``payload``.
+
+    The body can be read with ``.json()`` or streamed with ``.iter_content``.
+    """
+    body = json.dumps(payload).encode()
+    response = MagicMock()
+    response.json.return_value = payload
+    response.iter_content.side_effect = lambda chunk_size=1: (
+        body[i : i + chunk_size] for i in range(0, len(body), chunk_size)
+    )
+    response.raise_for_status = MagicMock()
+    return response
+
+
+def _outputsizes(mock_get: MagicMock) -> list[str]:
+    """Return the outputsize of each request made through ``mock_get``."""
+    return [c.kwargs["params"]["outputsize"] for c in mock_get.call_args_list]
+
+
+class TestIncrementalRefresh:
+    """Verify expired full histories are refreshed with compact deltas."""
+
+    def _seed_expired_history(self, last_day: dt.date) -> None:
+        history = _parse_time_series(
+            _make_history_response(last_day, 300), "Time Series (Daily)"
+        )
+        key = _cache_key("TIME_SERIES_DAILY", "AAPL", outputsize="full")
+        set_cached(key, history, ttl=-1)
+
+    def test_merges_compact_delta(self, api_key_env: dict[str, str]) -> None:
+        self._seed_expired_history(dt.date(2025, 3, 1))
+        delta = _make_history_response(dt.date(2025, 3, 10), 100, close=200.0)
+
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                return_value=_json_response(delta),
+            ) as mock_get,
+        ):
+            data = fetch_daily("AAPL", outputsize="full")
+
+        assert _outputsizes(mock_get) == ["compact"]
+        # 300 stored days up to Mar 1, plus 9 new days
+        assert len(data) == 309
+        assert data[-1]["date"] == "2025-03-10"
+        # Overlapping bars take the delta's values
+        assert data["close"][-100:].tolist() == [200.0] * 100
+        assert data[0]["close"] == 100.0
+
+    def test_memory_only(
+        self, api_key_env: dict[str, str], monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """The expired in-memory entry survives the fresh-cache lookup."""
+        monkeypatch.setenv("ALPHAVANTAGE_CACHE_DB", "")
+        self._seed_expired_history(dt.date(2025, 3, 1))
+        delta = _make_history_response(dt.date(2025, 3, 10), 100)
+
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                return_value=_json_response(delta),
+            ) as mock_get,
+        ):
+            data = fetch_daily("AAPL", outputsize="full")
+
+        assert _outputsizes(mock_get) == ["compact"]
+        assert len(data) == 309
+
+    def test_merged_history_is_cached(self, api_key_env: dict[str, str]) -> None:
+        self._seed_expired_history(dt.date(2025, 3, 1))
+        delta = _make_history_response(dt.date(2025, 3, 10), 100)
+
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                return_value=_json_response(delta),
+            ) as mock_get,
+        ):
+            fetch_daily("AAPL", outputsize="full")
+            again = fetch_daily("AAPL", outputsize="full")
+
+        assert mock_get.call_count == 1
+        assert len(again) == 309
+
+    def test_gap_falls_back_to_full(self, api_key_env: dict[str, str]) -> None:
+        self._seed_expired_history(dt.date(2024, 1, 1))
+        delta = _make_history_response(dt.date(2025, 3, 10), 100)
+        full = _make_history_response(dt.date(2025, 3, 10), 500)
+
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                side_effect=[_json_response(delta), _json_response(full)],
+            ) as mock_get,
+        ):
+            data = fetch_daily("AAPL", outputsize="full")
+
+        assert _outputsizes(mock_get) == ["compact", "full"]
+        assert len(data) == 500
+
+    def test_disabled(self, api_key_env: dict[str, str]) -> None:
+        self._seed_expired_history(dt.date(2025, 3, 1))
+        full = _make_history_response(dt.date(2025, 3, 10), 500)
+
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                return_value=_json_response(full),
+            ) as mock_get,
+        ):
+            fetch_daily("AAPL", outputsize="full", incremental=False)
+
+        assert _outputsizes(mock_get) == ["full"]
+
+    def test_short_base_not_treated_as_history(
+        self, api_key_env: dict[str, str]
+    ) -> None:
+        """A compact entry is never patched into a 'full' history."""
+        compact = _parse_time_series(
+            _make_history_response(dt.date(2025, 3, 1), 100), "Time Series (Daily)"
+        )
+        key = _cache_key("TIME_SERIES_DAILY", "AAPL", outputsize="compact")
+        set_cached(key, compact, ttl=-1)
+        full = _make_history_response(dt.date(2025, 3, 10), 500)
+
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                return_value=_json_response(full),
+            ) as mock_get,
+        ):
+            fetch_daily("AAPL", outputsize="full")
+
+        assert _outputsizes(mock_get) == ["full"]
+
+    def test_intraday_merge(self, api_key_env: dict[str, str]) -> None:
+        base = TimeSeries.from_values(
+            [f"2025-01-15 {9 + i // 60:02d}:{i % 60:02d}:00" for i in range(200)],
+            *([1.0] * 200 for _ in range(4)),
+            [10] * 200,
+        )
+        key = _cache_key("TIME_SERIES_INTRADAY", "AAPL", "1min", "full")
+        set_cached(key, base, ttl=-1)
+        delta = _make_intraday_response(interval="1min", num_points=3)
+        # Delta timestamps are 10:00, 10:05, 10:10 — inside the stored range
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                return_value=_json_response(delta),
+            ) as mock_get,
+        ):
+            data = fetch_intraday("AAPL", interval="1min", outputsize="full")
+
+        assert _outputsizes(mock_get) == ["compact"]
+        assert data[-1]["date"] == "2025-01-15 10:10:00"
+        assert len(data) == 60 + 3
+
+
+class TestOutputsizeCoverage:
+    """Verify cache entries are keyed by coverage and full answers compact."""
+
+    def test_cache_key_includes_outputsize(self) -> None:
+        key = _cache_key("TIME_SERIES_DAILY", "aapl", outputsize="full")
+        assert key == "TIME_SERIES_DAILY:AAPL:full"
+
+    def test_full_serves_compact(self, api_key_env: dict[str, str]) -> None:
+        full = _make_history_response(dt.date(2025, 3, 10), 500)
+
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                return_value=_json_response(full),
+            ) as mock_get,
+        ):
+            history = fetch_daily("AAPL", outputsize="full")
+            compact = fetch_daily("AAPL")
+
+        assert mock_get.call_count == 1
+        assert len(compact) == COMPACT_SIZE
+        assert compact == history[-COMPACT_SIZE:]
+        stats = cache_stats()["coverage"]
+        assert stats["full"] == {"hits": 0, "hits_derived": 0, "misses": 1}
+        assert stats["compact"] == {
+            "hits": 0,
+            "hits_from_full": 1,
+            "hits_derived": 0,
+            "misses": 0,
+        }
+
+    def test_compact_from_full_is_stable(self, api_key_env: dict[str, str]) -> None:
+        full = _make_history_response(dt.date(2025, 3, 10), 500)
+
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                return_value=_json_response(full),
+            ),
+        ):
+            fetch_daily("AAPL", outputsize="full")
+            first = fetch_daily("AAPL")
+            second = fetch_daily("AAPL")
+
+        # The same object, so memos keyed on the series keep hitting
+        assert second is first
+
+    def test_compact_from_full_reuses_candles(
+        self, api_key_env: dict[str, str]
+    ) -> None:
+        full = _make_history_response(dt.date(2025, 3, 10), 500)
+
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                return_value=_json_response(full),
+            ),
+        ):
+            fetch_daily("AAPL", outputsize="full")
+            candles = fetch_daily("AAPL", max_points=10)
+            again = fetch_daily("AAPL", max_points=10)
+
+        assert len(candles) == 10
+        assert again is candles
+
+    def test_compact_does_not_serve_full(self, api_key_env: dict[str, str]) -> None:
+        compact = _make_history_response(dt.date(2025, 3, 10), 100)
+        full = _make_history_response(dt.date(2025, 3, 10), 500)
+
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                side_effect=[_json_response(compact), _json_response(full)],
+            ) as mock_get,
+        ):
+            fetch_daily("AAPL")
+            fetch_daily("AAPL")
+            history = fetch_daily("AAPL", outputsize="full")
+
+        assert _outputsizes(mock_get) == ["compact", "full"]
+        assert len(history) == 500
+        stats = cache_stats()["coverage"]
+        assert stats["compact"]["hits"] == 1
+        assert stats["compact"]["misses"] == 1
+        assert stats["full"]["misses"] == 1
+
+    def test_invalid_outputsize(self, api_key_env: dict[str, str]) -> None:
+        with patch.dict(os.environ, api_key_env):
+            with pytest.raises(ValueError, match="Invalid outputsize"):
+                fetch_daily("AAPL", outputsize="huge")
+            with pytest.raises(ValueError, match="Invalid outputsize"):
+                fetch_intraday("AAPL", outputsize="huge")
+
+    def test_clear_cache_resets_stats(self, api_key_env: dict[str, str]) -> None:
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                return_value=_json_response(_make_daily_response()),
+            ),
+        ):
+            fetch_daily("AAPL")
+        clear_cache()
+        assert cache_stats()["coverage"]["compact"]["misses"] == 0
+
+
+def _make_minute_response(num_points: int) -> dict[str, Any]:
+    """Create a 1min response of consecutive bars from 09:30, bar ``i``
+    opening at ``i``."""
+    start = dt.datetime(2025, 1, 15, 9, 30)
+    time_series = {
+        (start + dt.timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M:%S"): {
+            "1. open": f"{i:.4f}",
+            "2. high": f"{i + 1:.4f}",
+            "3. low": f"{i - 1:.4f}",
+            "4. close": f"{i + 0.5:.4f}",
+            "5. volume": "10",
+        }
+        for i in range(num_points)
+    }
+    return {"Meta Data": {}, "Time Series (1min)": time_series}
+
+
+class TestResampledSeries:
+    """Verify coarser series are derived locally from cached finer ones."""
+
+    def test_full_finer_interval_serves_coarser(
+        self, api_key_env: dict[str, str]
+    ) -> None:
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                return_value=_json_response(_make_minute_response(60)),
+            ) as mock_get,
+        ):
+            fetch_intraday("AAPL", interval="1min", outputsize="full")
+            bars = fetch_intraday("AAPL", interval="15min", outputsize="full")
+            compact = fetch_intraday("AAPL", interval="30min")
+
+        assert mock_get.call_count == 1
+        assert bars["date"].tolist() == [
+            "2025-01-15 09:30:00",
+            "2025-01-15 09:45:00",
+            "2025-01-15 10:00:00",
+            "2025-01-15 10:15:00",
+        ]
+        assert bars["open"].tolist() == [0.0, 15.0, 30.0, 45.0]
+        assert bars["volume"].tolist() == [150] * 4
+        assert len(compact) == 2
+        stats = cache_stats()["coverage"]
+        assert stats["full"]["hits_derived"] == 1
+        assert stats["compact"]["hits_derived"] == 1
+
+    def test_compact_finer_interval_not_used(self, api_key_env: dict[str, str]) -> None:
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                side_effect=[
+                    _json_response(_make_minute_response(60)),
+                    _json_response(_make_intraday_response(interval="15min")),
+                ],
+            ) as mock_get,
+        ):
+            fetch_intraday("AAPL", interval="1min")
+            fetch_intraday("AAPL", interval="15min")
+
+        assert mock_get.call_count == 2
+
+    def test_fetch_resampled_weekly(self, api_key_env: dict[str, str]) -> None:
+        full = _make_history_response(dt.date(2025, 3, 9), 14)
+
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                return_value=_json_response(full),
+            ) as mock_get,
+        ):
+            weekly = fetch_resampled("AAPL", "weekly")
+            again = fetch_resampled("aapl", "weekly")
+            last = fetch_resampled("AAPL", "weekly", start="2025-03-03")
+
+        assert _outputsizes(mock_get) == ["full"]
+        assert again is weekly
+        assert weekly["date"].tolist() == ["2025-03-02", "2025-03-09"]
+        assert weekly["volume"].tolist() == [7000, 7000]
+        assert last["date"].tolist() == ["2025-03-09"]
+
+    def test_fetch_resampled_from_source(self, api_key_env: dict[str, str]) -> None:
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                return_value=_json_response(
+                    _make_intraday_response(interval="5min", num_points=6)
+                ),
+            ) as mock_get,
+        ):
+            bars = fetch_resampled("AAPL", "15min", source="5min")
+
+        assert mock_get.call_args.kwargs["params"]["interval"] == "5min"
+        assert bars["date"].tolist() == [
+            "2025-01-15 10:00:00",
+            "2025-01-15 10:15:00",
+        ]
+
+    @pytest.mark.parametrize(
+        ("target", "source"), [("15min", "30min"), ("15min", "10min"), ("daily", None)]
+    )
+    def test_fetch_resampled_invalid(self, target: str, source: str | None) -> None:
+        with (
+            patch("tools.alpha_vantage.requests.Session.get") as mock_get,
+            pytest.raises(ValueError),
+        ):
+            fetch_resampled("AAPL", target, source=source)
+        mock_get.assert_not_called()
+
+
+def _join_revalidations() -> None:
+    """Wait for every background refresh to finish."""
+    for thread in list(_revalidating.values()):
+        thread.join(timeout=5)
+
+
+class TestStaleWhileRevalidate:
+    """Verify expired entries can be served while refreshing in the background."""
+
+    def _seed_stale(self, age: float) -> TimeSeries:
+        stale = _parse_time_series(
+            _make_history_response(dt.date(2025, 3, 1), 100), "Time Series (Daily)"
+        )
+        key = _cache_key("TIME_SERIES_DAILY", "AAPL", outputsize="compact")
+        set_cached(key, stale, ttl=-age)
+        return stale
+
+    def test_returns_stale_and_refreshes(self, api_key_env: dict[str, str]) -> None:
+        stale = self._seed_stale(age=10)
+        fresh = _make_history_response(dt.date(2025, 3, 10), 100)
+
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                return_value=_json_response(fresh),
+            ) as mock_get,
+        ):
+            data = fetch_daily("AAPL", max_stale=60)
+            _join_revalidations()
+            again = fetch_daily("AAPL", max_stale=60)
+
+        assert data == stale
+        assert mock_get.call_count == 1
+        assert again[-1]["date"] == "2025-03-10"
+
+    def test_memory_only_serves_stale_repeatedly(
+        self, api_key_env: dict[str, str], monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Without a disk tier, every caller within ``max_stale`` gets the
+        stale entry while one refresh is in flight."""
+        monkeypatch.setenv("ALPHAVANTAGE_CACHE_DB", "")
+        stale = self._seed_stale(age=600)
+        release = threading.Event()
+
+        def slow_get(*args: Any, **kwargs: Any) -> MagicMock:
+            release.wait(5)
+            return _json_response(_make_history_response(dt.date(2025, 3, 10), 100))
+
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get", side_effect=slow_get
+            ) as mock_get,
+        ):
+            start = time.monotonic()
+            first = fetch_daily("AAPL", max_stale=3600)
+            second = fetch_daily("AAPL", max_stale=3600)
+            elapsed = time.monotonic() - start
+            release.set()
+            _join_revalidations()
+
+        assert first == stale
+        assert second == stale
+        assert elapsed < 1.0
+        assert mock_get.call_count == 1
+
+    def test_too_stale_blocks(self, api_key_env: dict[str, str]) -> None:
+        self._seed_stale(age=120)
+        fresh = _make_history_response(dt.date(2025, 3, 10), 100)
+
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                return_value=_json_response(fresh),
+            ),
+        ):
+            data = fetch_daily("AAPL", max_stale=60)
+
+        assert data[-1]["date"] == "2025-03-10"
+
+    def test_disabled_by_default(self, api_key_env: dict[str, str]) -> None:
+        self._seed_stale(age=10)
+        fresh = _make_history_response(dt.date(2025, 3, 10), 100)
+
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                return_value=_json_response(fresh),
+            ),
+        ):
+            data = fetch_daily("AAPL")
+
+        assert data[-1]["date"] == "2025-03-10"
+
+    def test_stale_full_history_serves_compact(
+        self, api_key_env: dict[str, str]
+    ) -> None:
+        history = _parse_time_series(
+            _make_history_response(dt.date(2025, 3, 1), 300), "Time Series (Daily)"
+        )
+        key = _cache_key("TIME_SERIES_DAILY", "AAPL", outputsize="full")
+        set_cached(key, history, ttl=-10)
+        fresh = _make_history_response(dt.date(2025, 3, 10), 100)
+
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                return_value=_json_response(fresh),
+            ),
+        ):
+            data = fetch_daily("AAPL", max_stale=60)
+            _join_revalidations()
+
+        assert data == history[-COMPACT_SIZE:]
+
+    def test_refresh_error_is_swallowed(self, api_key_env: dict[str, str]) -> None:
+        stale = self._seed_stale(age=10)
+
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                return_value=_json_response({"Error Message": "Invalid API call"}),
+            ),
+        ):
+            data = fetch_daily("AAPL", max_stale=60)
+            _join_revalidations()
+
+        assert data == stale
+        assert not _revalidating
+
+    def test_unexpected_refresh_error_is_logged(
+        self, api_key_env: dict[str, str], caplog: pytest.LogCaptureFixture
+    ) -> None:
+        stale = self._seed_stale(age=10)
+
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                side_effect=RuntimeError("disk full"),
+            ),
+        ):
+            data = fetch_daily("AAPL", max_stale=60)
+            _join_revalidations()
+
+        assert data == stale
+        assert not _revalidating
+        assert not _inflight
+        assert "Background refresh of TIME_SERIES_DAILY:AAPL:compact failed" in (
+            caplog.text
+        )
+        assert "disk full" in caplog.text
+
+    def test_single_background_refresh(self, api_key_env: dict[str, str]) -> None:
+        self._seed_stale(age=10)
+        release = threading.Event()
+        fresh = _make_history_response(dt.date(2025, 3, 10), 100)
+
+        def slow_get(*args: Any, **kwargs: Any) -> MagicMock:
+            release.wait(timeout=5)
+            return _json_response(fresh)
+
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get", side_effect=slow_get
+            ) as mock_get,
+        ):
+            for _ in range(5):
+                fetch_daily("AAPL", max_stale=60)
+            release.set()
+            _join_revalidations()
+
+        assert mock_get.call_count == 1
+
+
+# ---------------------------------------------------------------------------
+# Request coalescing tests
+# ---------------------------------------------------------------------------
+
+
+def _run_concurrently(target: Any, count: int) -> list[Any]:
+    """Call ``target`` from ``count`` threads and collect results or errors."""
+    results: list[Any] = [None] * count
+
+    def worker(i: int) -> None:
+        try:
+            results[i] = target()
+        except Exception as exc:  # noqa: BLE001
+            results[i] = exc
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=5)
+    return results
+
+
+class TestSingleFlight:
+    """Verify concurrent requests for the same key are coalesced."""
+
+    def test_concurrent_fetches_share_one_request(
+        self, api_key_env: dict[str, str]
+    ) -> None:
+        release = threading.Event()
+        mock_response = MagicMock()
+        mock_response.json.return_value = _make_daily_response()
+        mock_response.raise_for_status = MagicMock()
+
+        def slow_get(*args: Any, **kwargs: Any) -> MagicMock:
+            release.wait(timeout=5)
+            return mock_response
+
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get", side_effect=slow_get
+            ) as mock_get,
+        ):
+            timer = threading.Timer(0.2, release.set)
+            timer.start()
+            results = _run_concurrently(lambda: fetch_daily("AAPL"), 5)
+            timer.join()
+
+        assert mock_get.call_count == 1
+        assert all(r is results[0] for r in results)
+        assert len(results[0]) == 3
+
+    def test_concurrent_fetches_share_failure(
+        self, api_key_env: dict[str, str]
+    ) -> None:
+        release = threading.Event()
+        mock_response = MagicMock()
+        mock_response.json.return_value = {
+            "Note": "Thank you for using Alpha Vantage! Our call frequency limit is reached."
+        }
+        mock_response.raise_for_status = MagicMock()
+
+        def slow_get(*args: Any, **kwargs: Any) -> MagicMock:
+            release.wait(timeout=5)
+            return mock_response
+
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get", side_effect=slow_get
+            ) as mock_get,
+        ):
+            timer = threading.Timer(0.2, release.set)
+            timer.start()
+            results = _run_concurrently(lambda: fetch_daily("AAPL"), 5)
+            timer.join()
+
+        assert mock_get.call_count == 1
+        assert all(isinstance(r, RateLimitError) for r in results)
+
+    def test_different_keys_not_coalesced(self, api_key_env: dict[str, str]) -> None:
+        mock_response = MagicMock()
+        mock_response.json.return_value = _make_daily_response()
+        mock_response.raise_for_status = MagicMock()
+
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get", return_value=mock_response
+            ) as mock_get,
+        ):
+            fetch_daily("AAPL")
+            fetch_daily("MSFT")
+            assert mock_get.call_count == 2
+
+    def test_failure_not_remembered(self) -> None:
+        """After a failed flight completes, the next caller retries."""
+        calls: list[int] = []
+
+        def failing() -> list[dict[str, Any]]:
+            calls.append(1)
+            raise ApiError("boom")
+
+        with pytest.raises(ApiError):
+            _single_flight("key", failing)
+        with pytest.raises(ApiError):
+            _single_flight("key", failing)
+        assert len(calls) == 2
+        assert "key" not in _inflight
+
+    def test_inflight_cleared_after_success(self) -> None:
+        assert _single_flight("key", lambda: [{"a": 1}]) == [{"a": 1}]
+        assert "key" not in _inflight
+
+
+# ---------------------------------------------------------------------------
+# Rate limiting tests
+# ---------------------------------------------------------------------------
+
+
+class TestRateLimiting:
+    """Verify API calls are scheduled through the rate limiter."""
+
+    def test_quota_status_counts_calls(self, api_key_env: dict[str, str]) -> None:
+        mock_response = MagicMock()
+        mock_response.json.return_value = _make_daily_response()
+        mock_response.raise_for_status = MagicMock()
+
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get", return_value=mock_response
+            ),
+        ):
+            before = quota_status()
+            fetch_daily("AAPL")
+            fetch_daily("AAPL")  # Cache hit, no call spent
+            after = quota_status()
+
+        assert after["calls_used_today"] == before["calls_used_today"] + 1
+        assert after["calls_remaining_today"] == before["calls_remaining_today"] - 1
+
+    def test_fail_fast_skips_network(self, api_key_env: dict[str, str]) -> None:
+        pool = KeyPool(["test-api-key-123"], per_minute=1, per_day=25)
+        pool.acquire()
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch("tools.alpha_vantage._get_key_pool", return_value=pool),
+            patch("tools.alpha_vantage.requests.Session.get") as mock_get,
+        ):
+            with pytest.raises(RateLimitError, match="Next call possible"):
+                fetch_daily("AAPL", wait=False)
+            mock_get.assert_not_called()
+
+    def test_daily_budget_exhausted(self, api_key_env: dict[str, str]) -> None:
+        pool = KeyPool(["test-api-key-123"], per_minute=5, per_day=1)
+        pool.acquire()
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch("tools.alpha_vantage._get_key_pool", return_value=pool),
+            patch("tools.alpha_vantage.requests.Session.get") as mock_get,
+        ):
+            with pytest.raises(RateLimitError, match="Daily"):
+                fetch_intraday("AAPL")
+            mock_get.assert_not_called()
+
+    def test_background_calls_keep_reserve(self, api_key_env: dict[str, str]) -> None:
+        pool = KeyPool(["test-api-key-123"], per_minute=5, per_day=3)
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch("tools.alpha_vantage._get_key_pool", return_value=pool),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                return_value=_json_response(_make_daily_response()),
+            ) as mock_get,
+        ):
+            with background_calls(reserve=2):
+                fetch_daily("AAPL")
+                with pytest.raises(RateLimitError, match="reserved"):
+                    fetch_daily("MSFT")
+            fetch_daily("GOOGL")
+
+        assert mock_get.call_count == 2
+
+    def test_api_daily_limit_syncs_ledger(self, api_key_env: dict[str, str]) -> None:
+        mock_response = MagicMock()
+        mock_response.json.return_value = {
+            "Information": "Our standard API rate limit is 25 requests per day."
+        }
+        mock_response.raise_for_status = MagicMock()
+
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get", return_value=mock_response
+            ),
+        ):
+            with pytest.raises(RateLimitError):
+                fetch_daily("AAPL")
+            assert quota_status()["calls_remaining_today"] == 0
+
+    def test_calls_spread_across_pooled_keys(self) -> None:
+        env = {"ALPHAVANTAGE_API_KEYS": "key-1,key-2"}
+        with (
+            patch.dict(os.environ, env),
+            patch("tools.alpha_vantage.RATE_LIMIT_PER_MINUTE", 1),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                return_value=_json_response(_make_daily_response()),
+            ) as mock_get,
+        ):
+            fetch_daily("AAPL", wait=False)
+            fetch_daily("MSFT", wait=False)
+            with pytest.raises(RateLimitError):
+                fetch_daily("GOOGL", wait=False)
+            assert quota_status()["keys"] == 2
+
+        sent = [call.kwargs["params"]["apikey"] for call in mock_get.call_args_list]
+        assert sorted(sent) == ["key-1", "key-2"]
+
+    def test_daily_limit_marks_sending_key(self) -> None:
+        env = {"ALPHAVANTAGE_API_KEYS": "key-1,key-2"}
+        limit = _json_response(
+            {"Information": "Our standard API rate limit is 25 requests per day."}
+        )
+        with (
+            patch.dict(os.environ, env),
+            patch("tools.alpha_vantage.requests.Session.get", return_value=limit),
+        ):
+            with pytest.raises(RateLimitError):
+                fetch_daily("AAPL")
+            status = quota_status()
+
+        # Only the key the call went out with is spent
+        assert status["calls_remaining_today"] == RATE_LIMIT_PER_DAY
+
+    def test_quota_command(self, api_key_env: dict[str, str]) -> None:
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch("sys.argv", ["alpha_vantage", "quota"]),
+            patch("builtins.print") as mock_print,
+        ):
+            from tools.alpha_vantage import main
+
+            main()
+        parsed = json.loads(mock_print.call_args[0][0])
+        assert parsed["calls_remaining_today"] >= 0
+        assert "next_slot_at" in parsed
+
+
+class TestCircuitBreaker:
+    """Verify rate-limit responses stop further calls for the cool-down."""
+
+    _LIMIT: ClassVar[dict[str, str]] = {
+        "Note": "Our standard API call frequency is 5 calls per minute."
+    }
+
+    def test_rate_limit_response_fails_later_calls_locally(
+        self, api_key_env: dict[str, str]
+    ) -> None:
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                return_value=_json_response(self._LIMIT),
+            ) as mock_get,
+        ):
+            with pytest.raises(RateLimitError, match="rate limit exceeded"):
+                fetch_daily("AAPL")
+            for symbol in ("MSFT", "GOOGL"):
+                with pytest.raises(RateLimitError, match="paused"):
+                    fetch_daily(symbol)
+            assert quota_status()["calls_remaining_minute"] == 0
+
+        assert mock_get.call_count == 1
+
+    def test_standard_note_trips_instead_of_exhausting(
+        self, api_key_env: dict[str, str]
+    ) -> None:
+        note = {
+            "Note": "Thank you for using Alpha Vantage! Our standard API call "
+            "frequency is 5 calls per minute and 500 calls per day. Please visit "
+            "https://www.alphavantage.co/premium/ if you would like to target a "
+            "higher API call frequency."
+        }
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                return_value=_json_response(note),
+            ),
+        ):
+            with pytest.raises(RateLimitError):
+                fetch_daily("AAPL")
+            with pytest.raises(RateLimitError, match="paused"):
+                fetch_daily("MSFT")
+            status = quota_status()
+
+        assert status["calls_remaining_today"] > 0
+
+    def test_other_keys_keep_working(self) -> None:
+        env = {"ALPHAVANTAGE_API_KEYS": "key-1,key-2"}
+        with (
+            patch.dict(os.environ, env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                side_effect=[
+                    _json_response(self._LIMIT),
+                    _json_response(_make_daily_response()),
+                ],
+            ) as mock_get,
+        ):
+            with pytest.raises(RateLimitError):
+                fetch_daily("AAPL")
+            fetch_daily("MSFT")
+
+        first, second = (c.kwargs["params"]["apikey"] for c in mock_get.call_args_list)
+        assert first != second
+
+    def test_http_429_trips_breaker(self, api_key_env: dict[str, str]) -> None:
+        too_many = MagicMock()
+        too_many.raise_for_status.side_effect = requests.HTTPError(
+            response=MagicMock(status_code=429, reason="Too Many Requests")
+        )
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get", return_value=too_many
+            ) as mock_get,
+        ):
+            with pytest.raises(ApiError, match="429"):
+                fetch_daily("AAPL")
+            with pytest.raises(RateLimitError, match="paused"):
+                fetch_daily("AAPL")
+
+        assert mock_get.call_count == 1
+
+    def test_breaker_closes_after_cooldown(self, api_key_env: dict[str, str]) -> None:
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch("tools.alpha_vantage.RATE_LIMIT_COOLDOWN", 0.05),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                side_effect=[
+                    _json_response(self._LIMIT),
+                    _json_response(_make_daily_response()),
+                ],
+            ),
+        ):
+            with pytest.raises(RateLimitError):
+                fetch_daily("AAPL")
+            time.sleep(0.1)
+            assert len(fetch_daily("AAPL")) > 0
+
+
+class TestInvalidTickerCache:
+    """Verify rejected symbols are remembered for a short while."""
+
+    _INVALID: ClassVar[dict[str, str]] = {
+        "Error Message": "Invalid API call. Please retry."
+    }
+
+    def test_rejected_symbol_costs_one_call(self, api_key_env: dict[str, str]) -> None:
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                return_value=_json_response(self._INVALID),
+            ) as mock_get,
+        ):
+            for outputsize in ("compact", "compact", "full"):
+                with pytest.raises(InvalidTickerError, match="Invalid API call"):
+                    fetch_daily("NOPE", outputsize=outputsize)
+            # A different function is asked again
+            with pytest.raises(InvalidTickerError):
+                fetch_intraday("NOPE")
+
+        assert mock_get.call_count == 2
+
+    def test_entry_expires(self, api_key_env: dict[str, str]) -> None:
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch("tools.alpha_vantage.INVALID_TICKER_TTL", 0),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                side_effect=[
+                    _json_response(self._INVALID),
+                    _json_response(_make_daily_response()),
+                ],
+            ),
+        ):
+            with pytest.raises(InvalidTickerError):
+                fetch_daily("NEWCO")
+            assert len(fetch_daily("NEWCO")) > 0
+
+    def test_rejected_key_not_cached(self, api_key_env: dict[str, str]) -> None:
+        """A bad key must not mark valid symbols as nonexistent."""
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                side_effect=[
+                    _json_response(
+                        {"Error Message": "the parameter apikey is invalid or missing."}
+                    ),
+                    _json_response(_make_daily_response()),
+                ],
+            ),
+        ):
+            with pytest.raises(ApiError, match="API key"):
+                fetch_daily("AAPL")
+            assert len(fetch_daily("AAPL")) > 0
+
+    def test_other_errors_not_cached(self, api_key_env: dict[str, str]) -> None:
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                side_effect=[
+                    _json_response({"Error Message": "Service unavailable."}),
+                    _json_response(_make_daily_response()),
+                ],
+            ),
+        ):
+            with pytest.raises(ApiError):
+                fetch_daily("AAPL")
+            assert len(fetch_daily("AAPL")) > 0
+
+
+def _respond_by_symbol(delays: dict[str, float] | None = None) -> Callable[..., Any]:
+    """Return a ``Session.get`` stand-in answering for the requested symbol.
+
+    ``NOPE`` is rejected; any symbol in ``delays`` answers after that many
+    seconds.
+    """
+
+    def get(url: str, params: dict[str, str], **kwargs: Any) -> MagicMock:
+        symbol = params["symbol"]
+        time.sleep((delays or {}).get(symbol, 0.0))
+        if symbol == "NOPE":
+            return _json_response({"Error Message": "Invalid API call."})
+        if "interval" in params:
+            return _json_response(
+                _make_intraday_response(symbol, interval=params["interval"])
+            )
+        return _json_response(_make_daily_response(symbol))
+
+    return get
+
+
+class TestFetchBatch:
+    """Verify concurrent batch loads."""
+
+    def test_parse_entries(self) -> None:
+        entries = parse_entries(["aapl,MSFT@5min", " spy ", "AAPL", ""])
+        assert entries == [("AAPL", None), ("MSFT", "5min"), ("SPY", None)]
+        assert [format_entry(e) for e in entries] == ["AAPL", "MSFT@5min", "SPY"]
+
+    def test_parse_invalid_interval(self) -> None:
+        with pytest.raises(ValueError, match="Invalid interval '2min'"):
+            parse_entries(["AAPL@2min"])
+
+    def test_yields_in_completion_order(self, api_key_env: dict[str, str]) -> None:
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                side_effect=_respond_by_symbol({"AAPL": 0.2}),
+            ),
+        ):
+            entries = [("AAPL", None), ("NOPE", None), ("MSFT", "15min")]
+            results = list(fetch_batch(entries))
+
+        assert [entry for entry, _ in results][-1] == ("AAPL", None)
+        outcome = dict(results)
+        assert isinstance(outcome[("NOPE", None)], InvalidTickerError)
+        assert len(outcome[("MSFT", "15min")]) == 3
+        assert len(outcome[("AAPL", None)]) == 3
+
+    def test_invalid_concurrency(self) -> None:
+        with pytest.raises(ValueError, match="concurrency"):
+            next(fetch_batch([("AAPL", None)], concurrency=0))
+
+
+# ---------------------------------------------------------------------------
+# Error hierarchy tests
+# ---------------------------------------------------------------------------
+
+
+class TestErrorHierarchy:
+    """Verify the error class hierarchy."""
+
+    def test_missing_api_key_is_alpha_vantage_error(self) -> None:
+        assert issubclass(MissingApiKeyError, AlphaVantageError)
+
+    def test_invalid_ticker_is_alpha_vantage_error(self) -> None:
+        assert issubclass(InvalidTickerError, AlphaVantageError)
+
+    def test_rate_limit_is_alpha_vantage_error(self) -> None:
+        assert issubclass(RateLimitError, AlphaVantageError)
+
+    def test_api_error_is_alpha_vantage_error(self) -> None:
+        assert issubclass(ApiError, AlphaVantageError)
+
+    def test_base_is_exception(self) -> None:
+        assert issubclass(AlphaVantageError, Exception)
+
+
+# ---------------------------------------------------------------------------
+# CLI tests
+# ---------------------------------------------------------------------------
+
+
+class TestCli:
+    """Verify the CLI interface."""
+
+    def test_daily_command(self, api_key_env: dict[str, str]) -> None:
+        mock_response = MagicMock()
+        mock_response.json.return_value = _make_daily_response()
+        mock_response.raise_for_status = MagicMock()
+
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get", return_value=mock_response
+            ),
+            patch("sys.argv", ["alpha_vantage", "daily", "AAPL"]),
+            patch("builtins.print") as mock_print,
+        ):
+            from tools.alpha_vantage import main
+
+            main()
+            # Should print JSON output
+            mock_print.assert_called_once()
+            output = mock_print.call_args[0][0]
+            parsed = json.loads(output)
+            assert isinstance(parsed, list)
+            assert len(parsed) == 3
+
+    def test_daily_date_range(self, api_key_env: dict[str, str]) -> None:
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                return_value=_json_response(_make_daily_response(num_days=5)),
+            ),
+            patch(
+                "sys.argv",
+                ["alpha_vantage", "daily", "AAPL", "--start", "2025-01-14"],
+            ),
+            patch("builtins.print") as mock_print,
+        ):
+            from tools.alpha_vantage import main
+
+            main()
+            parsed = json.loads(mock_print.call_args[0][0])
+            assert [r["date"] for r in parsed] == ["2025-01-14", "2025-01-15"]
+
+    def test_daily_max_points(self, api_key_env: dict[str, str]) -> None:
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                return_value=_json_response(_make_daily_response(num_days=5)),
+            ),
+            patch(
+                "sys.argv",
+                ["alpha_vantage", "daily", "AAPL", "--max-points", "2"],
+            ),
+            patch("builtins.print") as mock_print,
+        ):
+            from tools.alpha_vantage import main
+
+            main()
+            parsed = json.loads(mock_print.call_args[0][0])
+            assert [r["date"] for r in parsed] == ["2025-01-11", "2025-01-13"]
+
+    def test_invalid_max_points_exits(self, api_key_env: dict[str, str]) -> None:
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch("tools.alpha_vantage.requests.Session.get") as mock_get,
+            patch(
+                "sys.argv",
+                ["alpha_vantage", "daily", "AAPL", "--max-points", "lots"],
+            ),
+            patch("builtins.print"),
+            pytest.raises(SystemExit) as exc_info,
+        ):
+            from tools.alpha_vantage import main
+
+            main()
+        assert exc_info.value.code == 1
+        mock_get.assert_not_called()
+
+    def test_intraday_command(self, api_key_env: dict[str, str]) -> None:
+        mock_response = MagicMock()
+        mock_response.json.return_value = _make_intraday_response(interval="15min")
+        mock_response.raise_for_status = MagicMock()
+
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get", return_value=mock_response
+            ),
+            patch(
+                "sys.argv",
+                ["alpha_vantage", "intraday", "AAPL", "--interval", "15min"],
+            ),
+            patch("builtins.print") as mock_print,
+        ):
+            from tools.alpha_vantage import main
+
+            main()
+            mock_print.assert_called_once()
+            output = mock_print.call_args[0][0]
+            parsed = json.loads(output)
+            assert isinstance(parsed, list)
+
+    def test_batch_command(self, api_key_env: dict[str, str]) -> None:
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                side_effect=_respond_by_symbol(),
+            ) as mock_get,
+            patch(
+                "sys.argv",
+                ["alpha_vantage", "batch", "AAPL,SPY@5min", "--max-points", "2"]
+                + ["NOPE", "aapl"],
+            ),
+            patch("builtins.print") as mock_print,
+            pytest.raises(SystemExit) as exc_info,
+        ):
+            from tools.alpha_vantage import main
+
+            main()
+
+        assert exc_info.value.code == 1  # One symbol failed
+        assert mock_get.call_count == 3
+        lines = {
+            (line["symbol"], line["interval"]): line
+            for line in (json.loads(c.args[0]) for c in mock_print.call_args_list)
+        }
+        assert set(lines) == {("AAPL", None), ("SPY", "5min"), ("NOPE", None)}
+        assert len(lines[("AAPL", None)]["data"]) == 2
+        assert lines[("SPY", "5min")]["data"][0]["date"].endswith(":00")
+        assert lines[("NOPE", None)]["error_type"] == "InvalidTickerError"
+        assert all(
+            c.kwargs == {"file": sys.stdout, "flush": True}
+            for c in mock_print.call_args_list
+        )
+
+    @pytest.mark.parametrize(
+        "args",
+        [
+            ["batch"],
+            ["batch", "AAPL@2min"],
+            ["batch", "AAPL", "--concurrency", "0"],
+            ["batch", "AAPL", "--start", "someday"],
+        ],
+    )
+    def test_batch_bad_arguments_exit(
+        self, api_key_env: dict[str, str], args: list[str]
+    ) -> None:
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch("tools.alpha_vantage.requests.Session.get") as mock_get,
+            patch("sys.argv", ["alpha_vantage", *args]),
+            patch("builtins.print"),
+            pytest.raises(SystemExit) as exc_info,
+        ):
+            from tools.alpha_vantage import main
+
+            main()
+        assert exc_info.value.code == 1
+        mock_get.assert_not_called()
 
     def test_no_args_exits(self) -> None:
         with (
@@ -0,0 +1,181 @@
+"""Tests for the asyncio Alpha Vantage interface."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from tests.test_alpha_vantage import _make_daily_response, _make_intraday_response
+from tools.alpha_vantage import InvalidTickerError, RateLimitError, clear_cache
+from tools.alpha_vantage_async import (
+    fetch_daily_async,
+    fetch_intraday_async,
+    fetch_many,
+    fetch_many_sync,
+)
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache() -> None:
+    """Ensure each test starts with a clean cache."""
+    clear_cache()
+
+
+@pytest.fixture()
+def api_key_env() -> dict[str, str]:
+    """Return an environment dict with a test API key."""
+    return {"ALPHAVANTAGE_API_KEY": "test-api-key-123"}
+
+
+def _fake_fetch(delay: float = 0.0) -> Any:
+    """Return a fake fetch function that records peak concurrency."""
+    state = {"active": 0, "peak": 0, "calls": []}
+    lock = threading.Lock()
+
+    def fetch(symbol: str, **kwargs: Any) -> list[dict[str, Any]]:
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+            state["calls"].append((symbol, kwargs))
+        try:
+            time.sleep(delay)
+            if symbol == "BAD":
+                raise InvalidTickerError("bad symbol")
+            if symbol == "LIMITED":
+                raise RateLimitError("limited")
+            return [{"date": "2025-01-15", "close": 1.0, "symbol": symbol}]
+        finally:
+            with lock:
+                state["active"] -= 1
+
+    fetch.state = state  # type: ignore[attr-defined]
+    return fetch
+
+
+class TestFetchMany:
+    """Verify concurrent multi-symbol fetching."""
+
+    async def test_returns_results_in_input_order(self) -> None:
+        fake = _fake_fetch()
+        with patch.dict("tools.alpha_vantage_async._FETCHERS", {"daily": fake}):
+            results = await fetch_many(["msft", "AAPL", "GOOGL"])
+        assert list(results) == ["MSFT", "AAPL", "GOOGL"]
+        assert results["AAPL"][0]["symbol"] == "AAPL"
+
+    async def test_errors_returned_per_symbol(self) -> None:
+        fake = _fake_fetch()
+        with patch.dict("tools.alpha_vantage_async._FETCHERS", {"daily": fake}):
+            results = await fetch_many(["AAPL", "BAD", "LIMITED"])
+        assert isinstance(results["AAPL"], list)
+        assert isinstance(results["BAD"], InvalidTickerError)
+        assert isinstance(results["LIMITED"], RateLimitError)
+
+    async def test_concurrency_is_bounded(self) -> None:
+        fake = _fake_fetch(delay=0.05)
+        symbols = [f"S{i}" for i in range(8)]
+        with patch.dict("tools.alpha_vantage_async._FETCHERS", {"daily": fake}):
+            await fetch_many(symbols, concurrency=3)
+        assert fake.state["peak"] == 3
+
+    async def test_runs_concurrently(self) -> None:
+        fake = _fake_fetch(delay=0.1)
+        symbols = [f"S{i}" for i in range(4)]
+        start = time.monotonic()
+        with patch.dict("tools.alpha_vantage_async._FETCHERS", {"daily": fake}):
+            await fetch_many(symbols, concurrency=4)
+        assert time.monotonic() - start < 0.35
+
+    async def test_duplicates_fetched_once(self) -> None:
+        fake = _fake_fetch()
+        with patch.dict("tools.alpha_vantage_async._FETCHERS", {"daily": fake}):
+            results = await fetch_many(["AAPL", "aapl", " AAPL "])
+        assert list(results) == ["AAPL"]
+        assert len(fake.state["calls"]) == 1
+
+    async def test_forwards_kwargs(self) -> None:
+        fake = _fake_fetch()
+        with patch.dict("tools.alpha_vantage_async._FETCHERS", {"intraday": fake}):
+            await fetch_many(["AAPL"], function="intraday", interval="15min")
+        assert fake.state["calls"] == [("AAPL", {"interval": "15min"})]
+
+    async def test_invalid_function(self) -> None:
+        with pytest.raises(ValueError, match="Invalid function"):
+            await fetch_many(["AAPL"], function="weekly")
+
+    async def test_invalid_concurrency(self) -> None:
+        with pytest.raises(ValueError, match="concurrency"):
+            await fetch_many(["AAPL"], concurrency=0)
+
+    async def test_shares_cache_with_sync_client(
+        self, api_key_env: dict[str, str]
+    ) -> None:
+        mock_response = MagicMock()
+        mock_response.json.return_value = _make_daily_response()
+        mock_response.raise_for_status = MagicMock()
+
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get", return_value=mock_response
+            ) as mock_get,
+        ):
+            first = await fetch_many(["AAPL"])
+            second = await fetch_many(["AAPL"])
+        assert mock_get.call_count == 1
+        assert first["AAPL"] == second["AAPL"]
+
+
+class TestSingleSymbolAsync:
+    """Verify the single-symbol async wrappers."""
+
+    async def test_fetch_daily_async(self, api_key_env: dict[str, str]) -> None:
+        mock_response = MagicMock()
+        mock_response.json.return_value = _make_daily_response()
+        mock_response.raise_for_status = MagicMock()
+
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get", return_value=mock_response
+            ),
+        ):
+            data = await fetch_daily_async("AAPL")
+        assert len(data) == 3
+
+    async def test_fetch_intraday_async(self, api_key_env: dict[str, str]) -> None:
+        mock_response = MagicMock()
+        mock_response.json.return_value = _make_intraday_response(interval="15min")
+        mock_response.raise_for_status = MagicMock()
+
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get", return_value=mock_response
+            ),
+        ):
+            data = await fetch_intraday_async("AAPL", interval="15min")
+        assert len(data) == 3
+
+
+class TestFetchManySync:
+    """Verify the blocking wrapper."""
+
+    def test_without_running_loop(self) -> None:
+        fake = _fake_fetch()
+        with patch.dict("tools.alpha_vantage_async._FETCHERS", {"daily": fake}):
+            results = fetch_many_sync(["AAPL", "BAD"])
+        assert isinstance(results["AAPL"], list)
+        assert isinstance(results["BAD"], InvalidTickerError)
+
+    async def test_inside_running_loop(self) -> None:
+        fake = _fake_fetch()
+        with patch.dict("tools.alpha_vantage_async._FETCHERS", {"daily": fake}):
+            results = fetch_many_sync(iter(["AAPL"]))
+        assert asyncio.get_running_loop() is not None
+        assert list(results) == ["AAPL"]
@@ -0,0 +1,159 @@
+"""Tests for the comparison analytics module."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from tools import analytics
+from tools.matrix import PriceMatrix
+
+
+def _matrix(values: np.ndarray, symbols: tuple[str, ...] | None = None) -> PriceMatrix:
+    values = np.asarray(values, dtype=np.float64)
+    symbols = symbols or tuple(f"S{i}" for i in range(len(values)))
+    dates = np.datetime64("2020-01-01") + np.arange(values.shape[1])
+    return PriceMatrix(symbols, dates, values)
+
+
+@pytest.fixture()
+def random_matrix() -> PriceMatrix:
+    """Five random walks; S3 lists 50 dates late."""
+    rng = np.random.default_rng(0)
+    values = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (5, 400)), axis=1))
+    values[3, :50] = np.nan
+    return _matrix(values)
+
+
+def _pair_returns(m: PriceMatrix, i: int, j: int) -> tuple[np.ndarray, np.ndarray]:
+    r = m.returns().values
+    both = ~np.isnan(r[i]) & ~np.isnan(r[j])
+    return r[i, both], r[j, both]
+
+
+class TestReturns:
+    """Verify cumulative returns and drawdowns."""
+
+    def test_cumulative_returns(self) -> None:
+        m = _matrix([[10, 12, 9], [np.nan, 50, 75]])
+        np.testing.assert_allclose(
+            analytics.cumulative_returns(m).values,
+            [[0, 0.2, -0.1], [np.nan, 0, 0.5]],
+        )
+
+    def test_drawdown(self) -> None:
+        m = _matrix([[100, 120, 90, 130, 117], [np.nan, 10, 10, 5, 20]])
+        np.testing.assert_allclose(
+            analytics.drawdown(m).values,
+            [[0, 0, -0.25, 0, -0.1], [np.nan, 0, 0, -0.5, 0]],
+        )
+        np.testing.assert_allclose(analytics.max_drawdown(m), [-0.25, -0.5])
+
+    def test_max_drawdown_of_empty_row(self) -> None:
+        m = _matrix([[np.nan, np.nan], [1, 2]])
+        assert np.isnan(analytics.max_drawdown(m)[0])
+
+
+class TestVolatility:
+    """Verify annualised volatility, whole-period and rolling."""
+
+    def test_whole_period(self, random_matrix: PriceMatrix) -> None:
+        r = random_matrix.returns().values
+        expected = [np.std(row[~np.isnan(row)], ddof=1) * np.sqrt(252) for row in r]
+        np.testing.assert_allclose(analytics.volatility(random_matrix), expected)
+
+    def test_rolling(self, random_matrix: PriceMatrix) -> None:
+        rolling = analytics.volatility(random_matrix, window=20).values
+        r = random_matrix.returns().values
+        assert np.isnan(rolling[:, :20]).all()
+        assert np.isnan(rolling[3, :70]).all()
+        np.testing.assert_allclose(
+            rolling[:, -1], r[:, -20:].std(axis=1, ddof=1) * np.sqrt(252)
+        )
+        np.testing.assert_allclose(
+            rolling[3, 70], r[3, 51:71].std(ddof=1) * np.sqrt(252)
+        )
+
+    def test_invalid_window(self, random_matrix: PriceMatrix) -> None:
+        with pytest.raises(ValueError, match="window"):
+            analytics.volatility(random_matrix, window=1)
+
+
+class TestCorrelation:
+    """Verify correlation matrices against np.corrcoef."""
+
+    def test_pairwise_complete(self, random_matrix: PriceMatrix) -> None:
+        corr = analytics.correlation(random_matrix)
+        assert corr.shape == (5, 5)
+        np.testing.assert_allclose(np.diag(corr), 1.0)
+        np.testing.assert_allclose(corr, corr.T)
+        for i, j in [(0, 1), (3, 4)]:
+            a, b = _pair_returns(random_matrix, i, j)
+            assert corr[i, j] == pytest.approx(np.corrcoef(a, b)[0, 1])
+
+    def test_trailing_window(self, random_matrix: PriceMatrix) -> None:
+        corr = analytics.correlation(random_matrix, window=30)
+        r = random_matrix.returns().values[:, -30:]
+        np.testing.assert_allclose(corr, np.corrcoef(r))
+
+    def test_perfectly_correlated(self) -> None:
+        m = _matrix([[100, 110, 99, 108.9], [5, 5.5, 4.95, 5.445], [100, 90, 99, 89.1]])
+        corr = analytics.correlation(m)
+        assert corr[0, 1] == pytest.approx(1.0)
+        assert corr[0, 2] == pytest.approx(-1.0)
+
+    def test_rolling(self, random_matrix: PriceMatrix) -> None:
+        rolling = analytics.rolling_correlation(random_matrix, window=30)
+        r = random_matrix.returns().values
+        assert rolling.shape == (400, 5, 5)
+        assert np.isnan(rolling[:30]).all()
+        np.testing.assert_allclose(rolling[-1], np.corrcoef(r[:, -30:]))
+        np.testing.assert_allclose(rolling[200], np.corrcoef(r[:, 171:201]))
+        # S3's first complete window ends at date 80
+        assert np.isnan(rolling[79, 3, 0])
+        assert rolling[80, 3, 0] == pytest.approx(
+            np.corrcoef(r[3, 51:81], r[0, 51:81])[0, 1]
+        )
+
+    def test_rolling_shorter_than_window(self) -> None:
+        rolling = analytics.rolling_correlation(_matrix([[1, 2], [3, 4]]), window=5)
+        assert rolling.shape == (2, 2, 2)
+        assert np.isnan(rolling).all()
+
+
+class TestBeta:
+    """Verify beta against a benchmark."""
+
+    def test_beta(self, random_matrix: PriceMatrix) -> None:
+        betas = analytics.beta(random_matrix, "s0")
+        assert betas[0] == pytest.approx(1.0)
+        a, b = _pair_returns(random_matrix, 3, 0)
+        assert betas[3] == pytest.approx(np.cov(a, b)[0, 1] / np.var(b, ddof=1))
+
+    def test_levered(self) -> None:
+        bench = np.array([100, 101, 99, 102, 100.5])
+        returns = np.diff(bench) / bench[:-1]
+        doubled = np.r_[50, 50 * np.cumprod(1 + 2 * returns)]
+        m = _matrix([bench, doubled], ("SPY", "LEV"))
+        assert analytics.beta(m, "SPY")[1] == pytest.approx(2.0)
+
+    def test_unknown_benchmark(self, random_matrix: PriceMatrix) -> None:
+        with pytest.raises(KeyError):
+            analytics.beta(random_matrix, "SPY")
+
+
+class TestSummary:
+    """Verify metric-tile rows."""
+
+    def test_summary(self, random_matrix: PriceMatrix) -> None:
+        summary = analytics.summary(random_matrix, benchmark="S0")
+        assert list(summary) == list(random_matrix.symbols)
+        row = summary["S3"]
+        values = random_matrix.values[3]
+        assert row["total_return"] == pytest.approx(values[-1] / values[50] - 1)
+        assert row["max_drawdown"] == analytics.max_drawdown(random_matrix)[3]
+        assert row["beta"] == pytest.approx(analytics.beta(random_matrix, "S0")[3])
+        assert isinstance(row["volatility"], float)
+
+    def test_without_benchmark(self, random_matrix: PriceMatrix) -> None:
+        assert "beta" not in analytics.summary(random_matrix)["S0"]
@@ -0,0 +1,140 @@
+"""Tests for record/replay cassettes."""
+
+from __future__ import annotations
+
+import datetime as dt
+import gzip
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from tools import alpha_vantage
+from tools.alpha_vantage import (
+    ApiError,
+    clear_cache,
+    fetch_daily,
+    fetch_intraday,
+    quota_status,
+)
+from tools.cassette import Cassette, cassette_key
+from tools.fake_alpha_vantage import FakeAlphaVantage
+
+END = dt.date(2025, 1, 17)
+PARAMS = {"function": "TIME_SERIES_DAILY", "symbol": "AAPL", "apikey": "secret"}
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache() -> None:
+    """Ensure each test starts with a clean cache."""
+    clear_cache()
+
+
+def _response(body: str) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response._content = body.encode("utf-8")
+    return response
+
+
+class TestCassette:
+    """Verify the cassette file format."""
+
+    def test_key_ignores_apikey_and_order(self) -> None:
+        reordered = {
+            "apikey": "other",
+            "symbol": "AAPL",
+            "function": "TIME_SERIES_DAILY",
+        }
+        assert cassette_key(PARAMS) == cassette_key(reordered)
+        assert cassette_key(PARAMS) == "function=TIME_SERIES_DAILY&symbol=AAPL"
+
+    def test_round_trip(self, tmp_path: Path) -> None:
+        path = tmp_path / "sub" / "av.jsonl.gz"
+        Cassette(path, "record").record(PARAMS, _response('{"a": 1}'))
+
+        replay = Cassette(path)
+        response = replay.play({**PARAMS, "apikey": "replay"})
+        assert response is not None
+        assert response.json() == {"a": 1}
+        assert b"".join(response.iter_content(2)) == b'{"a": 1}'
+        assert replay.play({**PARAMS, "symbol": "MSFT"}) is None
+
+    def test_appends_and_latest_wins(self, tmp_path: Path) -> None:
+        path = tmp_path / "av.jsonl.gz"
+        Cassette(path, "record").record(PARAMS, _response("old"))
+        second = Cassette(path, "record")
+        second.record(PARAMS, _response("new"))
+        second.record({**PARAMS, "symbol": "MSFT"}, _response("msft"))
+
+        replay = Cassette(path)
+        assert len(replay) == 2
+        assert replay.play(PARAMS).text == "new"
+
+    def test_skips_rate_limit_notices(self, tmp_path: Path) -> None:
+        cassette = Cassette(tmp_path / "av.jsonl.gz", "record")
+        cassette.record(PARAMS, _response('{"Note": "Thank you for using..."}'))
+        cassette.record(PARAMS, _response('{"Error Message": "Invalid API call."}'))
+        assert cassette.play(PARAMS).json() == {"Error Message": "Invalid API call."}
+        assert len(Cassette(cassette.path)) == 1
+
+    def test_truncated_tail_ignored(self, tmp_path: Path) -> None:
+        path = tmp_path / "av.jsonl.gz"
+        cassette = Cassette(path, "record")
+        cassette.record(PARAMS, _response("first"))
+        cassette.record({**PARAMS, "symbol": "MSFT"}, _response("second" * 100))
+        path.write_bytes(path.read_bytes()[:-20])
+
+        assert Cassette(path).keys() == [cassette_key(PARAMS)]
+
+    def test_not_a_cassette(self, tmp_path: Path) -> None:
+        path = tmp_path / "av.jsonl.gz"
+        with gzip.open(path, "wt") as out:
+            out.write("not json\n")
+        with pytest.raises(ValueError, match="Unreadable cassette"):
+            Cassette(path)
+
+    def test_invalid_mode(self, tmp_path: Path) -> None:
+        with pytest.raises(ValueError, match="Invalid cassette mode 'play'"):
+            Cassette(tmp_path / "av.jsonl.gz", "play")
+
+
+class TestClient:
+    """Verify the client records and replays through the environment."""
+
+    def test_record_then_replay(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        path = tmp_path / "av.jsonl.gz"
+        monkeypatch.setenv("ALPHAVANTAGE_CASSETTE", str(path))
+        monkeypatch.setenv("ALPHAVANTAGE_CASSETTE_MODE", "record")
+        monkeypatch.setenv("ALPHAVANTAGE_API_KEY", "test-api-key-123")
+        with FakeAlphaVantage(days=300, intraday_days=2, end=END).start() as server:
+            monkeypatch.setenv("ALPHAVANTAGE_BASE_URL", server.url)
+            daily = fetch_daily("AAPL", outputsize="full")
+            intraday = fetch_intraday("AAPL", interval="15min", datatype="csv")
+        assert len(Cassette(path)) == 2
+        quota = quota_status()["calls_used_today"]
+
+        clear_cache()
+        monkeypatch.setenv("ALPHAVANTAGE_CASSETTE_MODE", "replay")
+        monkeypatch.delenv("ALPHAVANTAGE_API_KEY")
+        with patch(
+            "tools.alpha_vantage.requests.Session.get",
+            side_effect=AssertionError("network used"),
+        ):
+            assert fetch_daily("AAPL", outputsize="full") == daily
+            assert fetch_intraday("AAPL", interval="15min", datatype="csv") == intraday
+            with pytest.raises(ApiError, match="No recorded response"):
+                fetch_daily("MSFT")
+        monkeypatch.setenv("ALPHAVANTAGE_API_KEY", "test-api-key-123")
+        assert quota_status()["calls_used_today"] == quota
+
+    def test_invalid_mode_env(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setenv("ALPHAVANTAGE_CASSETTE", str(tmp_path / "av.jsonl.gz"))
+        monkeypatch.setenv("ALPHAVANTAGE_CASSETTE_MODE", "rewind")
+        with pytest.raises(ValueError, match="Invalid cassette mode"):
+            alpha_vantage._get_cassette()
@@ -0,0 +1,247 @@
+"""Tests for the resident command daemon."""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import socket
+import stat
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TextIO
+from unittest.mock import patch
+
+import pytest
+
+from tools import alpha_vantage
+from tools.alpha_vantage import clear_cache, main
+from tools.daemon import CommandServer, Handler, forward
+from tools.fake_alpha_vantage import FakeAlphaVantage
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache() -> None:
+    """Ensure each test starts with a clean cache."""
+    clear_cache()
+
+
+@pytest.fixture
+def sock(tmp_path: Path) -> Path:
+    """Return a socket path in a fresh directory."""
+    return tmp_path / "run" / "d.sock"
+
+
+@contextmanager
+def _serving(path: Path, handler: Handler) -> Iterator[CommandServer]:
+    server = CommandServer(path, handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+@contextmanager
+def _hanging_up(path: Path, reply: bytes = b"") -> Iterator[None]:
+    """Accept one command on ``path``, send ``reply`` and hang up."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+        listener.bind(str(path))
+        listener.listen()
+
+        def hang_up() -> None:
+            conn, _ = listener.accept()
+            conn.makefile("rb").readline()
+            conn.sendall(reply)
+            conn.close()
+
+        thread = threading.Thread(target=hang_up)
+        thread.start()
+        try:
+            yield
+        finally:
+            thread.join()
+
+
+def _echo(argv: list[str], out: TextIO, err: TextIO) -> int:
+    print(" ".join(argv), file=out)
+    print("warning", file=err)
+    return len(argv)
+
+
+class TestCommandServer:
+    """Verify the server and the forwarding client."""
+
+    def test_round_trip(self, sock: Path) -> None:
+        out, err = io.StringIO(), io.StringIO()
+        with _serving(sock, _echo):
+            assert forward(sock, ["daily", "AAPL", "--full"], out, err) == 3
+        assert out.getvalue() == "daily AAPL --full\n"
+        assert err.getvalue() == "warning\n"
+
+    def test_socket_private_and_removed(self, sock: Path) -> None:
+        with _serving(sock, _echo):
+            assert stat.S_IMODE(sock.stat().st_mode) == 0o600
+        assert not sock.exists()
+
+    def test_no_server(self, sock: Path) -> None:
+        assert forward(sock, ["quota"]) is None
+
+    def test_stale_socket_replaced(self, sock: Path) -> None:
+        sock.parent.mkdir()
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as dead:
+            dead.bind(str(sock))  # Left behind without a listener
+        assert forward(sock, ["quota"]) is None
+        with _serving(sock, _echo):
+            assert forward(sock, ["quota"], io.StringIO(), io.StringIO()) == 1
+
+    def test_refuses_second_server(self, sock: Path) -> None:
+        with _serving(sock, _echo):
+            with pytest.raises(FileExistsError, match="already listening"):
+                CommandServer(sock, _echo)
+            assert sock.exists()
+
+    def test_handler_errors(self, sock: Path) -> None:
+        def handler(argv: list[str], out: TextIO, err: TextIO) -> int:
+            if argv == ["exit"]:
+                raise SystemExit(2)
+            raise RuntimeError("boom")
+
+        err = io.StringIO()
+        with _serving(sock, handler):
+            assert forward(sock, ["crash"], io.StringIO(), err) == 1
+            assert forward(sock, ["exit"], io.StringIO(), io.StringIO()) == 2
+        assert err.getvalue() == "Error: RuntimeError: boom\n"
+
+    def test_malformed_request(self, sock: Path) -> None:
+        with _serving(sock, _echo), socket.socket(socket.AF_UNIX) as client:
+            client.connect(str(sock))
+            client.sendall(b'{"argv": "daily AAPL"}\n')
+            reply = json.loads(client.makefile("rb").readline())
+        assert reply["exit"] == 2
+        assert "Malformed request" in reply["err"]
+
+    def test_connection_lost(self, sock: Path) -> None:
+        out = io.StringIO()
+        with (
+            _hanging_up(sock, b'{"out": "partial"}\n'),
+            pytest.raises(ConnectionError, match="before the command finished"),
+        ):
+            forward(sock, ["daily", "AAPL"], out, io.StringIO())
+        assert out.getvalue() == "partial"
+
+
+class TestCli:
+    """Verify the CLI forwards to a running daemon and falls back without one."""
+
+    def test_forwards_to_daemon(
+        self,
+        sock: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        capsys: pytest.CaptureFixture[str],
+    ) -> None:
+        forwarded: list[list[str]] = []
+
+        def handler(argv: list[str], out: TextIO, err: TextIO) -> int:
+            forwarded.append(argv)
+            return alpha_vantage._run_cli(argv, out, err)
+
+        monkeypatch.setenv("ALPHAVANTAGE_API_KEY", "test-api-key-123")
+        monkeypatch.setenv("ALPHAVANTAGE_DAEMON_SOCKET", str(sock))
+        with (
+            FakeAlphaVantage(days=200).start() as fake,
+            _serving(sock, handler),
+        ):
+            monkeypatch.setenv("ALPHAVANTAGE_BASE_URL", fake.url)
+            for _ in range(2):
+                with patch("sys.argv", ["alpha_vantage", "daily", "AAPL"]):
+                    main()
+                assert len(json.loads(capsys.readouterr().out)) == 100
+
+            with (
+                patch(
+                    "sys.argv", ["alpha_vantage", "daily", "AAPL", "--max-points", "x"]
+                ),
+                pytest.raises(SystemExit) as exc_info,
+            ):
+                main()
+            requests_made = fake.stats()["requests"]
+
+        assert exc_info.value.code == 1
+        assert "Invalid --max-points value 'x'" in capsys.readouterr().err
+        assert forwarded == [["daily", "AAPL"]] * 2 + [
+            ["daily", "AAPL", "--max-points", "x"]
+        ]
+        assert requests_made == 1  # The second call hit the daemon's warm cache
+
+    def test_refuses_nested_serve(
+        self, sock: Path, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        with _serving(sock, alpha_vantage._run_cli):
+            assert forward(sock, ["serve"]) == 1
+        assert "already running" in capsys.readouterr().err
+
+    def test_falls_back_without_daemon(
+        self,
+        sock: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        capsys: pytest.CaptureFixture[str],
+    ) -> None:
+        monkeypatch.setenv("ALPHAVANTAGE_API_KEY", "test-api-key-123")
+        monkeypatch.setenv("ALPHAVANTAGE_DAEMON_SOCKET", str(sock))
+        with (
+            FakeAlphaVantage(days=200).start() as fake,
+            patch("sys.argv", ["alpha_vantage", "daily", "AAPL"]),
+            patch("tools.alpha_vantage.forward", wraps=alpha_vantage.forward) as fwd,
+        ):
+            monkeypatch.setenv("ALPHAVANTAGE_BASE_URL", fake.url)
+            main()
+        fwd.assert_called_once()
+        assert len(json.loads(capsys.readouterr().out)) == 100
+        assert not os.path.exists(sock)
+
+    def test_retries_locally_when_daemon_dies(
+        self,
+        sock: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        capsys: pytest.CaptureFixture[str],
+    ) -> None:
+        monkeypatch.setenv("ALPHAVANTAGE_API_KEY", "test-api-key-123")
+        monkeypatch.setenv("ALPHAVANTAGE_DAEMON_SOCKET", str(sock))
+        with (
+            FakeAlphaVantage(days=200).start() as fake,
+            _hanging_up(sock, b'{"err": "working\\n"}\n'),
+            patch("sys.argv", ["alpha_vantage", "daily", "AAPL"]),
+        ):
+            monkeypatch.setenv("ALPHAVANTAGE_BASE_URL", fake.url)
+            main()
+        captured = capsys.readouterr()
+        assert len(json.loads(captured.out)) == 100
+        assert "Daemon connection lost" in captured.err
+        assert "retrying locally" in captured.err
+
+    def test_no_retry_after_partial_output(
+        self,
+        sock: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        capsys: pytest.CaptureFixture[str],
+    ) -> None:
+        monkeypatch.setenv("ALPHAVANTAGE_DAEMON_SOCKET", str(sock))
+        with (
+            _hanging_up(sock, b'{"out": "{\\"symbol\\": \\"AAPL\\"}\\n"}\n'),
+            patch("sys.argv", ["alpha_vantage", "batch", "AAPL", "MSFT"]),
+            patch("tools.alpha_vantage._run_cli") as run_cli,
+            pytest.raises(SystemExit) as exc_info,
+        ):
+            main()
+        captured = capsys.readouterr()
+        assert exc_info.value.code == 1
+        run_cli.assert_not_called()
+        assert captured.out == '{"symbol": "AAPL"}\n'
+        assert "before the command finished" in captured.err
@@ -0,0 +1,130 @@
+"""Tests for the SQLite-backed disk cache tier."""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from tools.disk_cache import DiskCache
+
+
+@pytest.fixture()
+def cache(tmp_path: Path) -> DiskCache:
+    """Return a disk cache backed by a temporary database."""
+    return DiskCache(tmp_path / "nested" / "cache.db")
+
+
+class TestDiskCache:
+    """Verify basic get/set/expiry behaviour."""
+
+    def test_miss(self, cache: DiskCache) -> None:
+        assert cache.get("missing") is None
+
+    def test_roundtrip(self, cache: DiskCache) -> None:
+        value = [{"date": "2025-01-15", "close": 150.5, "volume": 100}]
+        cache.set("key", value, ttl=60)
+        hit = cache.get("key")
+        assert hit is not None
+        expires_at, data = hit
+        assert data == value
+        assert expires_at == pytest.approx(time.time() + 60, abs=5)
+
+    def test_creates_parent_directories(self, cache: DiskCache) -> None:
+        cache.set("key", [1], ttl=60)
+        assert cache.path.exists()
+
+    def test_expired_entry_is_miss(self, cache: DiskCache) -> None:
+        cache.set("key", [1], ttl=-1)
+        assert cache.get("key") is None
+
+    def test_expired_entry_available_on_request(self, cache: DiskCache) -> None:
+        cache.set("key", [1], ttl=-1)
+        hit = cache.get("key", allow_expired=True)
+        assert hit is not None
+        assert hit[1] == [1]
+
+    def test_overwrite(self, cache: DiskCache) -> None:
+        cache.set("key", [1], ttl=60)
+        cache.set("key", [2], ttl=60)
+        hit = cache.get("key")
+        assert hit is not None
+        assert hit[1] == [2]
+
+    def test_delete(self, cache: DiskCache) -> None:
+        cache.set("key", [1], ttl=60)
+        cache.delete("key")
+        assert cache.get("key") is None
+
+    def test_clear(self, cache: DiskCache) -> None:
+        cache.set("a", [1], ttl=60)
+        cache.set("b", [2], ttl=60)
+        cache.clear()
+        assert cache.get("a") is None
+        assert cache.get("b") is None
+
+    def test_purge_expired(self, cache: DiskCache) -> None:
+        cache.set("old", [1], ttl=-1)
+        cache.set("new", [2], ttl=60)
+        assert cache.purge_expired() == 1
+        assert cache.get("old", allow_expired=True) is None
+        assert cache.get("new") is not None
+
+
+class TestDiskCacheSharing:
+    """Verify the cache is shared across handles and threads."""
+
+    def test_wal_mode(self, cache: DiskCache) -> None:
+        cache.set("key", [1], ttl=60)
+        conn = sqlite3.connect(cache.path)
+        mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        conn.close()
+        assert mode == "wal"
+
+    def test_visible_to_other_instance(self, cache: DiskCache) -> None:
+        """A second handle (as in another process) sees the same data."""
+        cache.set("key", [1], ttl=60)
+        other = DiskCache(cache.path)
+        hit = other.get("key")
+        assert hit is not None
+        assert hit[1] == [1]
+
+    def test_concurrent_threads(self, cache: DiskCache) -> None:
+        errors: list[Exception] = []
+
+        def worker(n: int) -> None:
+            try:
+                for i in range(20):
+                    cache.set(f"{n}:{i}", [n, i], ttl=60)
+                    assert cache.get(f"{n}:{i}") is not None
+            except Exception as exc:  # noqa: BLE001
+                errors.append(exc)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert errors == []
+
+
+class TestDiskCacheFailures:
+    """Verify disk errors degrade to cache misses."""
+
+    def test_unwritable_path_is_miss(self, tmp_path: Path) -> None:
+        blocker = tmp_path / "file"
+        blocker.write_text("not a directory")
+        cache = DiskCache(blocker / "cache.db")
+        cache.set("key", [1], ttl=60)
+        assert cache.get("key") is None
+
+    def test_corrupt_value_is_miss(self, cache: DiskCache) -> None:
+        cache.set("key", [1], ttl=60)
+        conn = sqlite3.connect(cache.path)
+        with conn:
+            conn.execute("UPDATE cache SET value = ?", (b"garbage",))
+        conn.close()
+        assert cache.get("key") is None
@@ -0,0 +1,145 @@
+"""Tests for chart-ready downsampling."""
+
+from __future__ import annotations
+
+import gc
+import weakref
+
+import numpy as np
+import pytest
+
+from tools import downsample
+from tools.downsample import downsample_line, downsample_ohlc, lttb_indices
+from tools.timeseries import TimeSeries
+
+
+@pytest.fixture(autouse=True)
+def _clear_memo() -> None:
+    """Ensure each test starts with no memoized results."""
+    downsample.clear_memo()
+
+
+def _walk(n: int, seed: int = 0) -> TimeSeries:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    dates = np.datetime64("2025-01-02T09:30", "s") + np.arange(n) * 60
+    return TimeSeries(
+        dates,
+        close,
+        close + rng.uniform(0, 1, n),
+        close - rng.uniform(0, 1, n),
+        close + rng.normal(0, 0.1, n),
+        rng.integers(1, 1000, n),
+    )
+
+
+def _reference_lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> list[int]:
+    """The published LTTB algorithm, point by point."""
+    n = len(x)
+    every = (n - 2) / (threshold - 2)
+    selected = [0]
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = int(i * every) + 1, int((i + 1) * every) + 1
+        nlo, nhi = hi, min(int((i + 2) * every) + 1, n)
+        if i == threshold - 3:
+            cx, cy = x[-1], y[-1]
+        else:
+            cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        best, best_area = lo, -1.0
+        for j in range(lo, hi):
+            area = abs((x[a] - cx) * (y[j] - y[a]) - (x[a] - x[j]) * (cy - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    return [*selected, n - 1]
+
+
+class TestLttb:
+    """Verify LTTB point selection."""
+
+    def test_matches_reference(self) -> None:
+        s = _walk(1000)
+        x = (s.dates - s.dates[0]).astype(np.int64).astype(float)
+        indices = lttb_indices(x, s.close, 50)
+        assert indices.tolist() == _reference_lttb(x, s.close, 50)
+
+    def test_keeps_spike(self) -> None:
+        y = np.zeros(1000)
+        y[437] = 50.0
+        indices = lttb_indices(np.arange(1000), y, 20)
+        assert 437 in indices
+        assert indices[0] == 0 and indices[-1] == 999
+
+    def test_under_budget_untouched(self) -> None:
+        assert lttb_indices(np.arange(5), np.arange(5), 10).tolist() == [0, 1, 2, 3, 4]
+
+
+class TestDownsampleLine:
+    """Verify line downsampling of whole series."""
+
+    def test_budget_and_rows(self) -> None:
+        s = _walk(10_000)
+        line = downsample_line(s, max_points=500)
+        assert len(line) == 500
+        rows = np.searchsorted(s.dates, line.dates)
+        assert np.array_equal(line.close, s.close[rows])
+        assert np.array_equal(line.volume, s.volume[rows])
+        assert line.close.max() == s.close.max()
+        assert line.close.min() == s.close.min()
+
+    def test_short_series_returned_as_is(self) -> None:
+        s = _walk(100)
+        assert downsample_line(s) is s
+
+    def test_memoized_per_series_and_budget(self) -> None:
+        s = _walk(5000)
+        first = downsample_line(s, 300)
+        assert downsample_line(s, 300) is first
+        assert downsample_line(s, 400) is not first
+        assert downsample_line(_walk(5000), 300) is not first
+
+    @pytest.mark.parametrize(
+        "kwargs", [{"max_points": 2}, {"max_points": 10.5}, {"field": "date"}]
+    )
+    def test_invalid_arguments(self, kwargs: dict[str, object]) -> None:
+        with pytest.raises(ValueError):
+            downsample_line(_walk(10), **kwargs)
+
+
+class TestDownsampleOhlc:
+    """Verify min/max-preserving candle bucketing."""
+
+    def test_extremes_and_totals_preserved(self) -> None:
+        s = _walk(10_001)
+        candles = downsample_ohlc(s, max_points=700)
+        assert len(candles) == 700
+        assert candles.high.max() == s.high.max()
+        assert candles.low.min() == s.low.min()
+        assert candles.volume.sum() == s.volume.sum()
+        assert candles.open[0] == s.open[0]
+        assert candles.close[-1] == s.close[-1]
+        assert candles.dates[0] == s.dates[0]
+
+    def test_buckets_cover_consecutive_bars(self) -> None:
+        s = _walk(10)
+        candles = downsample_ohlc(s, max_points=4)
+        assert candles.dates.tolist() == s.dates[[0, 2, 5, 7]].tolist()
+        assert candles.high[1] == s.high[2:5].max()
+
+    def test_memoized(self) -> None:
+        s = _walk(5000)
+        assert downsample_ohlc(s, 100) is downsample_ohlc(s, 100)
+
+    def test_forgotten_with_source(self) -> None:
+        s = _walk(5000)
+        candles = weakref.ref(downsample_ohlc(s, 100))
+        del s
+        gc.collect()
+        assert candles() is None
+        assert not downsample._memo
+
+    def test_invalid_budget(self) -> None:
+        with pytest.raises(ValueError, match="max_points"):
+            downsample_ohlc(_walk(10), 0)
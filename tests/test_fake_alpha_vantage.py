@@ -0,0 +1,197 @@
+"""Tests for the offline Alpha Vantage stand-in server."""
+
+from __future__ import annotations
+
+import datetime as dt
+import time
+from collections.abc import Iterator
+
+import numpy as np
+import pytest
+import requests
+
+from tools import alpha_vantage, fake_alpha_vantage
+from tools.alpha_vantage import (
+    ApiError,
+    InvalidTickerError,
+    RateLimitError,
+    _parse_csv_time_series,
+    _parse_time_series,
+    clear_cache,
+    fetch_daily,
+    fetch_intraday,
+    quota_status,
+)
+from tools.fake_alpha_vantage import FakeAlphaVantage, generate_series
+
+END = dt.date(2025, 1, 17)  # A Friday
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Start each test with a clean cache and no retry delays."""
+    clear_cache()
+    monkeypatch.setattr(alpha_vantage, "_retry_delay", lambda attempt: 0.0)
+    monkeypatch.setenv("ALPHAVANTAGE_API_KEY", "test-api-key-123")
+
+
+def _serve(monkeypatch: pytest.MonkeyPatch, **kwargs: object) -> FakeAlphaVantage:
+    server = FakeAlphaVantage(days=300, intraday_days=3, end=END, **kwargs).start()
+    monkeypatch.setenv("ALPHAVANTAGE_BASE_URL", server.url)
+    return server
+
+
+@pytest.fixture()
+def server(monkeypatch: pytest.MonkeyPatch) -> Iterator[FakeAlphaVantage]:
+    """A running server the client is pointed at."""
+    with _serve(monkeypatch) as server:
+        yield server
+
+
+def _query(server: FakeAlphaVantage, **params: str) -> requests.Response:
+    return requests.get(server.url, params={"apikey": "k", **params}, timeout=5)
+
+
+class TestGenerateSeries:
+    """Verify the synthetic bars."""
+
+    def test_deterministic(self) -> None:
+        first = generate_series("AAPL", days=50, end=END)
+        assert first == generate_series("AAPL", days=50, end=END)
+        assert first != generate_series("MSFT", days=50, end=END)
+        assert first != generate_series("AAPL", days=50, end=END, seed=1)
+
+    def test_daily_bars(self) -> None:
+        series = generate_series("AAPL", days=300, end=dt.date(2025, 1, 19))
+        assert len(series) == 300
+        assert series["date"][-1] == "2025-01-17"
+        assert np.is_busday(series.dates).all()
+        assert (series.high >= np.maximum(series.open, series.close)).all()
+        assert (series.low <= np.minimum(series.open, series.close)).all()
+        assert (series.volume > 0).all()
+
+    def test_intraday_bars(self) -> None:
+        series = generate_series("AAPL", "15min", days=2, end=END)
+        assert len(series) == 2 * 26
+        assert series["date"][0] == "2025-01-16 09:30:00"
+        assert series["date"][-1] == "2025-01-17 15:45:00"
+
+
+class TestResponses:
+    """Verify responses match the Alpha Vantage schema."""
+
+    def test_json_matches_generated(self, server: FakeAlphaVantage) -> None:
+        raw = _query(
+            server, function="TIME_SERIES_DAILY", symbol="aapl", outputsize="full"
+        ).json()
+        assert raw["Meta Data"]["2. Symbol"] == "AAPL"
+        assert next(iter(raw["Time Series (Daily)"])) == "2025-01-17"  # Newest first
+        parsed = _parse_time_series(raw, "Time Series (Daily)")
+        assert parsed == generate_series("AAPL", days=300, end=END)
+
+    def test_csv_compact_is_tail(self, server: FakeAlphaVantage) -> None:
+        text = _query(
+            server,
+            function="TIME_SERIES_INTRADAY",
+            symbol="MSFT",
+            interval="5min",
+            datatype="csv",
+        ).text
+        expected = generate_series("MSFT", "5min", days=3, end=END)[-100:]
+        assert _parse_csv_time_series(text) == expected
+
+    @pytest.mark.parametrize(
+        ("params", "message"),
+        [
+            ({"function": "TIME_SERIES_DAILY", "symbol": "A B"}, "Invalid API call"),
+            (
+                {"function": "TIME_SERIES_INTRADAY", "symbol": "AAPL"},
+                "Invalid API call",
+            ),
+            ({"function": "OVERVIEW", "symbol": "AAPL"}, "does not exist"),
+            ({"function": "TIME_SERIES_DAILY", "apikey": ""}, "apikey"),
+        ],
+    )
+    def test_errors(
+        self, server: FakeAlphaVantage, params: dict[str, str], message: str
+    ) -> None:
+        response = _query(server, **params)
+        assert response.status_code == 200
+        assert message in response.json()["Error Message"]
+
+    def test_unknown_path(self, server: FakeAlphaVantage) -> None:
+        response = requests.get(server.url.replace("/query", "/other"), timeout=5)
+        assert response.status_code == 404
+
+    def test_daily_limit_resets_at_utc_midnight(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        with _serve(monkeypatch, per_day=1) as server:
+            _query(server, function="TIME_SERIES_DAILY", symbol="AAPL")
+            limited = _query(server, function="TIME_SERIES_DAILY", symbol="AAPL")
+            assert "Information" in limited.json()
+            tomorrow = fake_alpha_vantage._utc_today() + dt.timedelta(days=1)
+            monkeypatch.setattr(fake_alpha_vantage, "_utc_today", lambda: tomorrow)
+            response = _query(server, function="TIME_SERIES_DAILY", symbol="AAPL")
+        assert "Meta Data" in response.json()
+
+    def test_invalid_limit_style(self) -> None:
+        with pytest.raises(ValueError, match="limit_style"):
+            FakeAlphaVantage(limit_style="banner")
+
+
+class TestClient:
+    """Verify the client runs end to end against the stand-in."""
+
+    def test_fetch_through_base_url(self, server: FakeAlphaVantage) -> None:
+        daily = fetch_daily("AAPL", outputsize="full")
+        intraday = fetch_intraday("AAPL", interval="15min", datatype="csv")
+        assert len(daily) == 300
+        assert len(intraday) == 78
+        stats = server.stats()
+        assert stats["requests"] == 2
+        assert stats["bytes_sent"] > 0
+
+    def test_invalid_ticker(self, server: FakeAlphaVantage) -> None:
+        with pytest.raises(InvalidTickerError):
+            fetch_daily("NOT A TICKER")
+
+    def test_per_minute_limit(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        with _serve(monkeypatch, per_minute=2) as server:
+            fetch_daily("AAPL")
+            fetch_daily("MSFT")
+            with pytest.raises(RateLimitError):
+                fetch_daily("GOOGL")
+            # The breaker is open: no more calls are sent to be refused
+            with pytest.raises(RateLimitError, match="paused"):
+                fetch_daily("SPY")
+            assert server.stats()["requests"] == 3
+        assert quota_status()["calls_remaining_today"] > 0
+
+    def test_invalid_ticker_remembered(self, server: FakeAlphaVantage) -> None:
+        for _ in range(3):
+            with pytest.raises(InvalidTickerError):
+                fetch_daily("NOT A TICKER")
+        assert server.stats()["requests"] == 1
+
+    def test_per_day_limit_note(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        with _serve(monkeypatch, per_day=1, limit_style="note"):
+            fetch_daily("AAPL")
+            with pytest.raises(RateLimitError):
+                fetch_daily("MSFT")
+        # The client's ledger learns the daily budget is spent
+        assert quota_status()["calls_remaining_today"] == 0
+
+    def test_transient_errors_retried(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        with (
+            _serve(monkeypatch, error_rate=1.0) as server,
+            pytest.raises(ApiError, match="503"),
+        ):
+            fetch_daily("AAPL")
+        assert server.stats()["requests"] == alpha_vantage.MAX_RETRIES + 1
+
+    def test_latency(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        with _serve(monkeypatch, latency=0.05):
+            start = time.monotonic()
+            fetch_daily("AAPL")
+        assert time.monotonic() - start >= 0.05
@@ -0,0 +1,311 @@
+"""Tests for the technical indicator library."""
+
+from __future__ import annotations
+
+import gc
+import weakref
+from typing import Any
+
+import numpy as np
+import pytest
+
+from tools import indicators
+from tools.indicators import atr, bollinger, ema, macd, rsi, sma, vwap
+from tools.timeseries import TimeSeries
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture(autouse=True)
+def _clear_memo() -> None:
+    """Ensure each test starts with no memoized results."""
+    indicators.clear_memo()
+
+
+def _random_series(n: int = 300, intraday: bool = False, seed: int = 0) -> TimeSeries:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    if intraday:
+        # 5-minute bars, 78 per session, spread over consecutive days
+        day, slot = np.divmod(np.arange(n), 78)
+        dates = (
+            np.datetime64("2025-01-02T09:30", "s")
+            + day * np.timedelta64(1, "D")
+            + slot * np.timedelta64(300, "s")
+        )
+    else:
+        dates = np.datetime64("2024-01-01") + np.arange(n)
+    return TimeSeries(
+        dates,
+        close + rng.uniform(-0.5, 0.5, n),
+        close + rng.uniform(0.5, 1.5, n),
+        close - rng.uniform(0.5, 1.5, n),
+        close,
+        rng.integers(1_000, 100_000, n),
+    )
+
+
+# -- per-bar reference implementations --------------------------------------
+
+
+def _ref_ema(x: np.ndarray, span: int) -> np.ndarray:
+    out = np.full(len(x), np.nan)
+    if len(x) < span:
+        return out
+    alpha = 2 / (span + 1)
+    out[span - 1] = x[:span].mean()
+    for i in range(span, len(x)):
+        out[i] = alpha * x[i] + (1 - alpha) * out[i - 1]
+    return out
+
+
+def _ref_wilder(x: np.ndarray, period: int) -> np.ndarray:
+    """Wilder smoothing of ``x[1:]``, aligned with ``x``."""
+    out = np.full(len(x), np.nan)
+    if len(x) <= period:
+        return out
+    out[period] = x[1 : period + 1].mean()
+    for i in range(period + 1, len(x)):
+        out[i] = (out[i - 1] * (period - 1) + x[i]) / period
+    return out
+
+
+def _ref_rsi(close: np.ndarray, period: int) -> np.ndarray:
+    delta = np.r_[0.0, np.diff(close)]
+    gain = _ref_wilder(np.maximum(delta, 0), period)
+    loss = _ref_wilder(np.maximum(-delta, 0), period)
+    return 100 - 100 / (1 + gain / loss)
+
+
+def _ref_atr(s: TimeSeries, period: int) -> np.ndarray:
+    tr = np.zeros(len(s))
+    for i in range(1, len(s)):
+        prev = s.close[i - 1]
+        tr[i] = max(s.high[i] - s.low[i], abs(s.high[i] - prev), abs(s.low[i] - prev))
+    return _ref_wilder(tr, period)
+
+
+def _ref_vwap(s: TimeSeries) -> np.ndarray:
+    out = np.empty(len(s))
+    pv = v = 0.0
+    for i in range(len(s)):
+        if (
+            s.intraday
+            and i
+            and s.dates[i].astype("datetime64[D]")
+            != s.dates[i - 1].astype("datetime64[D]")
+        ):
+            pv = v = 0.0
+        pv += (s.high[i] + s.low[i] + s.close[i]) / 3 * s.volume[i]
+        v += s.volume[i]
+        out[i] = pv / v
+    return out
+
+
+def _assert_close(actual: Any, expected: Any) -> None:
+    np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-9)
+
+
+# ---------------------------------------------------------------------------
+# Indicator values
+# ---------------------------------------------------------------------------
+
+
+class TestIndicatorValues:
+    """Verify each indicator against a straightforward per-bar loop."""
+
+    def test_sma(self) -> None:
+        s = _random_series()
+        expected = [np.nan] * 19 + [
+            s.close[i - 19 : i + 1].mean() for i in range(19, 300)
+        ]
+        _assert_close(sma(s, 20), expected)
+
+    def test_sma_other_field(self) -> None:
+        s = _random_series()
+        _assert_close(sma(s, 1, field="high"), s.high)
+
+    def test_ema(self) -> None:
+        s = _random_series()
+        _assert_close(ema(s, 50), _ref_ema(s.close, 50))
+
+    def test_rsi(self) -> None:
+        s = _random_series()
+        values = rsi(s)
+        _assert_close(values, _ref_rsi(s.close, 14))
+        assert np.isnan(values[:14]).all()
+        assert ((values[14:] >= 0) & (values[14:] <= 100)).all()
+
+    def test_rsi_flat_and_rising(self) -> None:
+        dates = np.datetime64("2024-01-01") + np.arange(6)
+        flat = TimeSeries(dates, *(np.ones(6) for _ in range(4)), np.ones(6, np.int64))
+        assert rsi(flat, 3)[-1] == 50.0
+        rising = np.arange(6.0)
+        up = TimeSeries(dates, rising, rising, rising, rising, np.ones(6, np.int64))
+        assert rsi(up, 3)[-1] == 100.0
+
+    def test_macd(self) -> None:
+        s = _random_series()
+        result = macd(s)
+        line = _ref_ema(s.close, 12) - _ref_ema(s.close, 26)
+        signal = np.full(300, np.nan)
+        signal[25:] = _ref_ema(line[25:], 9)
+        _assert_close(result["macd"], line)
+        _assert_close(result["signal"], signal)
+        _assert_close(result["histogram"], line - signal)
+        assert np.isnan(result["signal"][:33]).all()
+        assert not np.isnan(result["signal"][33])
+
+    def test_bollinger(self) -> None:
+        s = _random_series()
+        bands = bollinger(s, 20, 2.5)
+        std = np.array([s.close[i - 19 : i + 1].std() for i in range(19, 300)])
+        _assert_close(bands["middle"], sma(s, 20))
+        _assert_close(bands["upper"][19:], bands["middle"][19:] + 2.5 * std)
+        _assert_close(bands["lower"][19:], bands["middle"][19:] - 2.5 * std)
+
+    def test_atr(self) -> None:
+        s = _random_series()
+        _assert_close(atr(s), _ref_atr(s, 14))
+
+    @pytest.mark.parametrize("intraday", [False, True])
+    def test_vwap(self, intraday: bool) -> None:
+        s = _random_series(intraday=intraday)
+        _assert_close(vwap(s), _ref_vwap(s))
+
+    def test_long_history_stays_accurate(self) -> None:
+        s = _random_series(n=6000)
+        _assert_close(ema(s, 200), _ref_ema(s.close, 200))
+        _assert_close(rsi(s, 2), _ref_rsi(s.close, 2))
+
+    @pytest.mark.parametrize("n", [0, 1, 5])
+    def test_short_series(self, n: int) -> None:
+        s = _random_series(n=n)
+        for values in (sma(s, 20), ema(s, 20), rsi(s), atr(s)):
+            assert len(values) == n
+            assert np.isnan(values).all()
+        assert all(len(v) == n for v in macd(s).values())
+        assert len(vwap(s)) == n
+
+    @pytest.mark.parametrize(
+        ("call", "match"),
+        [
+            (lambda s: sma(s, 0), "window"),
+            (lambda s: ema(s, 2.5), "span"),
+            (lambda s: rsi(s, -1), "period"),
+            (lambda s: sma(s, field="volume"), "Invalid field"),
+            (lambda s: macd(s, fast=26, slow=12), "shorter"),
+            (lambda s: bollinger(s, num_std=-1), "num_std"),
+        ],
+    )
+    def test_invalid_parameters(self, call: Any, match: str) -> None:
+        with pytest.raises(ValueError, match=match):
+            call(_random_series(n=30))
+
+
+# ---------------------------------------------------------------------------
+# Memoization and incremental updates
+# ---------------------------------------------------------------------------
+
+
+def _all_indicators(s: TimeSeries) -> dict[str, Any]:
+    return {
+        "sma": sma(s, 20),
+        "ema": ema(s, 20),
+        "rsi": rsi(s),
+        "macd": macd(s),
+        "bollinger": bollinger(s),
+        "atr": atr(s),
+        "vwap": vwap(s),
+    }
+
+
+def _assert_same(actual: dict[str, Any], expected: dict[str, Any]) -> None:
+    for name, values in expected.items():
+        if isinstance(values, dict):
+            for line, column in values.items():
+                _assert_close(actual[name][line], column)
+        else:
+            _assert_close(actual[name], values)
+
+
+class TestMemoization:
+    """Verify results are reused and extended instead of recomputed."""
+
+    def test_same_series_reuses_result(self) -> None:
+        s = _random_series()
+        first = rsi(s)
+        assert rsi(s) is first
+        assert not first.flags.writeable
+
+    def test_parameters_are_part_of_the_key(self) -> None:
+        s = _random_series()
+        assert not np.array_equal(sma(s, 10), sma(s, 20), equal_nan=True)
+
+    @pytest.mark.parametrize("intraday", [False, True])
+    def test_appended_bars_match_full_computation(self, intraday: bool) -> None:
+        s = _random_series(n=400, intraday=intraday)
+        expected = _all_indicators(s)
+        indicators.clear_memo()
+
+        _all_indicators(s[:300])
+        _all_indicators(s[:350])
+        _assert_same(_all_indicators(s), expected)
+
+    def test_appended_bars_computed_incrementally(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        starts: list[int] = []
+        kernel = indicators._rsi_kernel
+
+        def spy(series: TimeSeries, start: int, *args: Any, **kwargs: Any) -> Any:
+            starts.append(start)
+            return kernel(series, start, *args, **kwargs)
+
+        monkeypatch.setattr(indicators, "_rsi_kernel", spy)
+        s = _random_series(n=400)
+        rsi(s[:300])
+        starts.clear()
+        rsi(s)
+        # From the old provisional bar, then the new provisional bar
+        assert starts == [299, 399]
+
+    def test_revised_last_bar_recomputed(self) -> None:
+        s = _random_series(n=100)
+        before = macd(s)
+        revised_close = s.close.copy()
+        revised_close[-1] += 5
+        revised = TimeSeries(s.dates, s.open, s.high, s.low, revised_close, s.volume)
+        after = macd(revised)
+        _assert_close(after["macd"][:-1], before["macd"][:-1])
+        assert after["macd"][-1] > before["macd"][-1]
+        indicators.clear_memo()
+        _assert_close(macd(revised)["macd"], after["macd"])
+
+    def test_different_history_not_extended(self) -> None:
+        s = _random_series(n=200)
+        other = _random_series(n=250, seed=1)
+        ema(s, 10)
+        _assert_close(ema(other, 10), _ref_ema(other.close, 10))
+
+    def test_series_not_kept_alive(self) -> None:
+        s = _random_series(n=400)
+        expected = rsi(s)
+        indicators.clear_memo()
+        head = s[:300]
+        ref = weakref.ref(head)
+        rsi(head)
+        del head
+        gc.collect()
+        assert ref() is None
+        assert len(indicators._memo) == 1  # Still extends a refreshed history
+        _assert_close(rsi(s), expected)
+
+    def test_bounded(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(indicators._memo, "max_entries", 2)
+        s = _random_series()
+        for span in (5, 10, 15):
+            ema(s, span)
+        assert len(indicators._memo) == 2
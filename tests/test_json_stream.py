@@ -0,0 +1,107 @@
+"""Tests for the incremental JSON time series decoder."""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+import pytest
+
+from tools import json_stream
+from tools.alpha_vantage import _RESPONSE_FIELDS, _parse_time_series
+from tools.json_stream import decode_time_series
+
+KEY = "Time Series (Daily)"
+
+
+def _payload(num_days: int = 5, **extra: Any) -> dict[str, Any]:
+    series = {
+        f"2025-01-{15 - i:02d}": {
+            "1. open": f"{150.0 + i:.4f}",
+            "2. high": f"{155.0 + i:.4f}",
+            "3. low": f"{148.0 + i:.4f}",
+            "4. close": f"{152.0 + i:.4f}",
+            "5. volume": str(1_000_000 + i),
+        }
+        for i in range(num_days)
+    }
+    return {"Meta Data": {"2. Symbol": "AAPL"}, KEY: series, **extra}
+
+
+def _chunks(payload: Any, size: int, indent: int | None = 4) -> list[bytes]:
+    body = json.dumps(payload, indent=indent, ensure_ascii=False).encode()
+    return [body[i : i + size] for i in range(0, len(body), size)]
+
+
+class TestDecodeTimeSeries:
+    """Verify streaming decode matches the whole-body parser."""
+
+    @pytest.mark.parametrize("size", [1, 7, 64, 65536])
+    def test_matches_json_parser(self, size: int) -> None:
+        payload = _payload()
+        other, series = decode_time_series(
+            _chunks(payload, size), KEY, _RESPONSE_FIELDS
+        )
+        assert series == _parse_time_series(payload, KEY)
+        assert other == {"Meta Data": {"2. Symbol": "AAPL"}}
+
+    def test_compact_encoding(self) -> None:
+        payload = _payload()
+        _, series = decode_time_series(
+            _chunks(payload, 5, indent=None), KEY, _RESPONSE_FIELDS
+        )
+        assert series == _parse_time_series(payload, KEY)
+
+    def test_intraday(self) -> None:
+        key = "Time Series (5min)"
+        payload = {
+            key: {
+                f"2025-01-15 10:{m:02d}:00": {f: "1.0" for f in _RESPONSE_FIELDS[:4]}
+                | {"5. volume": "10"}
+                for m in (10, 5, 0)
+            }
+        }
+        _, series = decode_time_series(_chunks(payload, 3), key, _RESPONSE_FIELDS)
+        assert series is not None
+        assert series.intraday
+        assert series["date"].tolist()[0] == "2025-01-15 10:00:00"
+
+    def test_batches_are_joined(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(json_stream, "BATCH_SIZE", 2)
+        payload = _payload(num_days=9)
+        _, series = decode_time_series(_chunks(payload, 16), KEY, _RESPONSE_FIELDS)
+        assert series == _parse_time_series(payload, KEY)
+
+    def test_empty_series(self) -> None:
+        _, series = decode_time_series(_chunks({KEY: {}}, 4), KEY, _RESPONSE_FIELDS)
+        assert series is not None
+        assert len(series) == 0
+
+    def test_error_payload(self) -> None:
+        payload = {"Error Message": "Invalid API call."}
+        other, series = decode_time_series(_chunks(payload, 4), KEY, _RESPONSE_FIELDS)
+        assert series is None
+        assert other == payload
+
+    def test_multibyte_text_split_across_chunks(self) -> None:
+        payload = {"Information": "Überschreitung — bitte später erneut versuchen"}
+        other, _ = decode_time_series(_chunks(payload, 1), KEY, _RESPONSE_FIELDS)
+        assert other == payload
+
+    def test_number_split_across_chunks(self) -> None:
+        other, _ = decode_time_series([b'{"count": 12', b"345}"], KEY, _RESPONSE_FIELDS)
+        assert other == {"count": 12345}
+
+    def test_not_an_object(self) -> None:
+        with pytest.raises(ValueError):
+            decode_time_series([b"<html></html>"], KEY, _RESPONSE_FIELDS)
+
+    def test_truncated_body(self) -> None:
+        body = json.dumps(_payload()).encode()
+        with pytest.raises(ValueError):
+            decode_time_series([body[:-20]], KEY, _RESPONSE_FIELDS)
+
+    def test_malformed_bar(self) -> None:
+        payload = {KEY: {"2025-01-15": {"1. open": "1.0"}}}
+        with pytest.raises(ValueError, match="Malformed bar"):
+            decode_time_series(_chunks(payload, 8), KEY, _RESPONSE_FIELDS)
@@ -0,0 +1,201 @@
+"""Tests for date-aligned multi-symbol matrices."""
+
+from __future__ import annotations
+
+import gc
+import weakref
+from typing import Any
+
+import numpy as np
+import pytest
+
+from tools import matrix
+from tools.alpha_vantage import InvalidTickerError, clear_cache
+from tools.fake_alpha_vantage import FakeAlphaVantage
+from tools.matrix import PriceMatrix, align, build_matrix
+from tools.timeseries import TimeSeries
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture(autouse=True)
+def _clear_memo() -> None:
+    """Ensure each test starts with no memoized matrices."""
+    matrix.clear_memo()
+
+
+def _series(dates: list[str], closes: list[float]) -> TimeSeries:
+    return TimeSeries.from_values(
+        dates, closes, closes, closes, closes, [100] * len(dates)
+    )
+
+
+@pytest.fixture()
+def pair() -> dict[str, TimeSeries]:
+    """AAPL trades Mon-Wed; MSFT Tue-Thu."""
+    return {
+        "AAPL": _series(["2025-01-06", "2025-01-07", "2025-01-08"], [10, 11, 12]),
+        "MSFT": _series(["2025-01-07", "2025-01-08", "2025-01-09"], [20, 22, 18]),
+    }
+
+
+def _nan_list(values: np.ndarray) -> list[Any]:
+    return [None if np.isnan(v) else v for v in values.tolist()]
+
+
+# ---------------------------------------------------------------------------
+# Alignment
+# ---------------------------------------------------------------------------
+
+
+class TestAlign:
+    """Verify joins, fills and memoization."""
+
+    def test_outer_join(self, pair: dict[str, TimeSeries]) -> None:
+        m = align(pair)
+        assert m.symbols == ("AAPL", "MSFT")
+        assert m.shape == (2, 4)
+        assert m["date"].tolist()[0] == "2025-01-06"
+        assert _nan_list(m["AAPL"]) == [10, 11, 12, None]
+        assert _nan_list(m["MSFT"]) == [None, 20, 22, 18]
+
+    def test_inner_join(self, pair: dict[str, TimeSeries]) -> None:
+        m = align(pair, join="inner")
+        assert m["date"].tolist() == ["2025-01-07", "2025-01-08"]
+        assert m.values.tolist() == [[11, 12], [20, 22]]
+
+    def test_forward_fill(self, pair: dict[str, TimeSeries]) -> None:
+        m = align(pair, fill="ffill")
+        assert _nan_list(m["AAPL"]) == [10, 11, 12, 12]
+        assert _nan_list(m["MSFT"]) == [None, 20, 22, 18]
+
+    def test_other_field(self, pair: dict[str, TimeSeries]) -> None:
+        assert align(pair, field="volume", join="inner").values.tolist() == [
+            [100, 100],
+            [100, 100],
+        ]
+
+    def test_memoized_until_a_series_changes(self, pair: dict[str, TimeSeries]) -> None:
+        first = align(pair)
+        assert align(dict(pair)) is first
+        assert not first.values.flags.writeable
+
+        pair["MSFT"] = _series(["2025-01-07"], [21])
+        assert align(pair) is not first
+        assert align(pair, join="inner") is not align(pair)
+
+    def test_forgotten_with_a_series(self, pair: dict[str, TimeSeries]) -> None:
+        align(pair)
+        align(pair, "open")
+        msft = weakref.ref(pair["MSFT"])
+        pair["MSFT"] = pair["MSFT"][:]
+        gc.collect()
+        assert msft() is None
+        assert not matrix._memo
+
+    def test_empty(self) -> None:
+        assert align({}).shape == (0, 0)
+
+    def test_mixed_units_rejected(self) -> None:
+        intraday = _series(["2025-01-06 10:00:00"], [1])
+        with pytest.raises(ValueError, match="daily and intraday"):
+            align({"A": _series(["2025-01-06"], [1]), "B": intraday})
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [{"field": "date"}, {"join": "left"}, {"fill": "bfill"}],
+    )
+    def test_invalid_arguments(
+        self, pair: dict[str, TimeSeries], kwargs: dict[str, str]
+    ) -> None:
+        with pytest.raises(ValueError, match="Invalid"):
+            align(pair, **kwargs)
+
+
+# ---------------------------------------------------------------------------
+# Derived views
+# ---------------------------------------------------------------------------
+
+
+class TestPriceMatrix:
+    """Verify whole-matrix derived views."""
+
+    def test_normalized(self, pair: dict[str, TimeSeries]) -> None:
+        m = align(pair).normalized()
+        np.testing.assert_allclose(m.values[0], [100, 110, 120, np.nan])
+        np.testing.assert_allclose(m.values[1], [np.nan, 100, 110, 90])
+
+    def test_returns(self, pair: dict[str, TimeSeries]) -> None:
+        r = align(pair, join="inner").returns()
+        assert np.isnan(r.values[:, 0]).all()
+        np.testing.assert_allclose(r.values[:, 1], [12 / 11 - 1, 0.1])
+
+    def test_spread(self, pair: dict[str, TimeSeries]) -> None:
+        assert align(pair, join="inner").spread("msft", "AAPL").tolist() == [9, 10]
+
+    def test_summary(self, pair: dict[str, TimeSeries]) -> None:
+        summary = align(pair).summary()
+        assert summary["AAPL"] == {
+            "first": 10,
+            "last": 12,
+            "change": 2,
+            "change_pct": pytest.approx(20.0),
+            "high": 12,
+            "low": 10,
+        }
+        assert summary["MSFT"]["last"] == 18
+        assert summary["MSFT"]["high"] == 22
+
+    def test_between(self, pair: dict[str, TimeSeries]) -> None:
+        m = align(pair).between("2025-01-07", "2025-01-08")
+        assert m.values.tolist() == [[11, 12], [20, 22]]
+
+    def test_unknown_symbol(self, pair: dict[str, TimeSeries]) -> None:
+        with pytest.raises(KeyError):
+            align(pair).row("GOOGL")
+
+    def test_columns(self, pair: dict[str, TimeSeries]) -> None:
+        columns = align(pair).columns()
+        assert list(columns) == ["date", "AAPL", "MSFT"]
+        assert len(columns["date"]) == 4
+
+
+class TestBuildMatrix:
+    """Verify fetching and aligning in one call."""
+
+    def test_failed_symbols_reported(
+        self, monkeypatch: pytest.MonkeyPatch, pair: dict[str, TimeSeries]
+    ) -> None:
+        error = InvalidTickerError("Invalid ticker symbol 'NOPE'")
+        calls: list[tuple[Any, ...]] = []
+
+        def fake_fetch_many(symbols: Any, function: str, **kwargs: Any) -> Any:
+            calls.append((list(symbols), function, kwargs))
+            return {**pair, "NOPE": error}
+
+        monkeypatch.setattr(matrix, "fetch_many_sync", fake_fetch_many)
+        m = build_matrix(["aapl", "msft", "nope"], outputsize="full")
+
+        assert calls == [(["aapl", "msft", "nope"], "daily", {"outputsize": "full"})]
+        assert isinstance(m, PriceMatrix)
+        assert m.symbols == ("AAPL", "MSFT")
+        assert m.errors == {"NOPE": error}
+        assert m.values is align(pair).values
+
+    def test_compact_from_full_reuses_matrix(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        clear_cache()
+        monkeypatch.setenv("ALPHAVANTAGE_API_KEY", "test-api-key-123")
+        with FakeAlphaVantage(days=200).start() as fake:
+            monkeypatch.setenv("ALPHAVANTAGE_BASE_URL", fake.url)
+            build_matrix(["AAPL", "MSFT"], outputsize="full")
+            first = build_matrix(["AAPL", "MSFT"])
+            second = build_matrix(["AAPL", "MSFT"])
+            requests_made = fake.stats()["requests"]
+
+        assert first.shape == (2, 100)
+        assert second is first
+        assert requests_made == 2
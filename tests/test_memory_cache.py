@@ -0,0 +1,178 @@
+"""Tests for the size-bounded in-memory cache tier."""
+
+from __future__ import annotations
+
+import time
+
+import numpy as np
+import pytest
+
+from tools.memory_cache import ENTRY_OVERHEAD, MemoryCache, sizeof
+from tools.timeseries import TimeSeries
+
+
+def _series(rows: int) -> TimeSeries:
+    """Return a daily series with ``rows`` bars."""
+    dates = np.arange(rows).astype("datetime64[D]")
+    return TimeSeries.from_values(
+        dates.astype(str).tolist(),
+        *([1.0] * rows for _ in range(4)),
+        [1] * rows,
+    )
+
+
+def _fresh() -> float:
+    return time.time() + 60
+
+
+class TestSizeof:
+    """Verify size accounting."""
+
+    def test_timeseries_charged_for_buffers(self) -> None:
+        series = _series(100)
+        assert sizeof(series) == series.nbytes + ENTRY_OVERHEAD
+
+    def test_plain_value_charged_for_json(self) -> None:
+        assert sizeof([1, 2, 3]) == len("[1, 2, 3]") + ENTRY_OVERHEAD
+
+
+class TestMemoryCache:
+    """Verify mapping behaviour, LRU eviction and byte accounting."""
+
+    def test_mapping_operations(self) -> None:
+        cache = MemoryCache(max_bytes=10_000)
+        entry = (_fresh(), [1])
+        cache["a"] = entry
+        assert "a" in cache
+        assert cache["a"] == entry
+        assert len(cache) == 1
+        del cache["a"]
+        assert "a" not in cache
+        assert cache.nbytes == 0
+        with pytest.raises(KeyError):
+            cache["a"]
+
+    def test_overwrite_reaccounts_size(self) -> None:
+        cache = MemoryCache(max_bytes=100_000)
+        cache["a"] = (_fresh(), _series(100))
+        cache["a"] = (_fresh(), _series(10))
+        assert cache.nbytes == sizeof(_series(10))
+
+    def test_evicts_least_recently_used(self) -> None:
+        size = sizeof(_series(100))
+        cache = MemoryCache(max_bytes=size * 2)
+        cache["a"] = (_fresh(), _series(100))
+        cache["b"] = (_fresh(), _series(100))
+        cache.get("a")  # "b" becomes least recently used
+        cache["c"] = (_fresh(), _series(100))
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+        assert cache.nbytes <= cache.max_bytes
+        assert cache.stats()["evictions"] == 1
+
+    def test_oversized_entry_not_kept(self) -> None:
+        cache = MemoryCache(max_bytes=1_000)
+        cache["small"] = (_fresh(), [1])
+        cache["huge"] = (_fresh(), _series(1_000))
+        assert "huge" not in cache
+        assert "small" in cache
+        assert cache.stats()["evictions"] == 1
+
+    def test_purge_expired(self) -> None:
+        cache = MemoryCache(max_bytes=10_000)
+        cache["old"] = (time.time() - 1, [1])
+        cache["new"] = (_fresh(), [2])
+        assert cache.purge_expired() == 1
+        assert list(cache) == ["new"]
+        assert cache.stats()["expirations"] == 1
+
+    def test_purge_keeps_entries_within_grace(self) -> None:
+        cache = MemoryCache(max_bytes=10_000)
+        cache["old"] = (time.time() - 120, [1])
+        cache["recent"] = (time.time() - 1, [2])
+        assert cache.purge_expired(grace=60) == 1
+        assert list(cache) == ["recent"]
+
+    def test_expired_entries_still_evicted_by_budget(self) -> None:
+        cache = MemoryCache(max_bytes=sizeof([1]) * 2)
+        cache["expired"] = (time.time() - 1, [1])
+        cache["a"] = (_fresh(), [2])
+        cache["b"] = (_fresh(), [3])
+        assert list(cache) == ["a", "b"]
+
+    def test_stats_and_clear(self) -> None:
+        cache = MemoryCache(max_bytes=10_000)
+        cache["a"] = (_fresh(), [1])
+        assert cache.stats() == {
+            "entries": 1,
+            "bytes": sizeof([1]),
+            "max_bytes": 10_000,
+            "evictions": 0,
+            "expirations": 0,
+        }
+        cache.clear()
+        assert cache.stats()["entries"] == 0
+        assert cache.nbytes == 0
+
+
+class TestSweeper:
+    """Verify the background expiry sweeper."""
+
+    def test_sweeps_expired_entries(self) -> None:
+        cache = MemoryCache(max_bytes=10_000)
+        swept = []
+        cache["old"] = (time.time() - 1, [1])
+        cache.start_sweeper(0.01, on_sweep=lambda: swept.append(True))
+        try:
+            deadline = time.time() + 5
+            while ("old" in cache or not swept) and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            cache.stop_sweeper()
+        assert "old" not in cache
+        assert swept
+
+    def test_failing_callback_keeps_sweeper_alive(
+        self, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        cache = MemoryCache(max_bytes=10_000)
+
+        def fail() -> None:
+            raise RuntimeError("boom")
+
+        cache.start_sweeper(0.01, on_sweep=fail)
+        try:
+            time.sleep(0.05)
+            cache["old"] = (time.time() - 1, [1])
+            deadline = time.time() + 5
+            while "old" in cache and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            cache.stop_sweeper()
+        assert "old" not in cache
+        assert "Cache sweep callback failed" in caplog.text
+        assert "RuntimeError: boom" in caplog.text
+
+    def test_sweeper_honours_grace(self) -> None:
+        cache = MemoryCache(max_bytes=10_000)
+        cache["old"] = (time.time() - 120, [1])
+        cache["recent"] = (time.time() - 1, [2])
+        cache.start_sweeper(0.01, grace=60)
+        try:
+            deadline = time.time() + 5
+            while "old" in cache and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            cache.stop_sweeper()
+        assert list(cache) == ["recent"]
+
+    def test_start_is_idempotent(self) -> None:
+        cache = MemoryCache(max_bytes=10_000)
+        cache.start_sweeper(60)
+        first = cache._sweeper
+        cache.start_sweeper(60)
+        assert cache._sweeper is first
+        cache.stop_sweeper()
+        assert cache._sweeper is None
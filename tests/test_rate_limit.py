@@ -0,0 +1,357 @@
+"""Tests for the client-side rate limiter and daily quota ledger."""
+
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from tools.rate_limit import (
+    CircuitBreaker,
+    KeyPool,
+    QuotaExceeded,
+    QuotaLedger,
+    RateLimiter,
+    key_bucket,
+)
+
+# ---------------------------------------------------------------------------
+# Ledger tests
+# ---------------------------------------------------------------------------
+
+
+class TestQuotaLedger:
+    """Verify daily call accounting."""
+
+    def test_in_memory_counts(self) -> None:
+        ledger = QuotaLedger(None)
+        assert ledger.used() == 0
+        assert ledger.try_consume(limit=2)
+        assert ledger.try_consume(limit=2)
+        assert not ledger.try_consume(limit=2)
+        assert ledger.used() == 2
+
+    def test_persisted_counts(self, tmp_path: Path) -> None:
+        path = tmp_path / "ledger.db"
+        assert QuotaLedger(path).try_consume(limit=5)
+        assert QuotaLedger(path).try_consume(limit=5)
+        # A fresh handle (as in another process) sees the same count
+        assert QuotaLedger(path).used() == 2
+
+    def test_persisted_limit_enforced(self, tmp_path: Path) -> None:
+        path = tmp_path / "ledger.db"
+        first, second = QuotaLedger(path), QuotaLedger(path)
+        assert first.try_consume(limit=1)
+        assert not second.try_consume(limit=1)
+        assert first.used() == 1
+
+    def test_days_are_separate(self, tmp_path: Path) -> None:
+        ledger = QuotaLedger(tmp_path / "ledger.db")
+        assert ledger.try_consume(limit=1, day="2025-01-01")
+        assert ledger.try_consume(limit=1, day="2025-01-02")
+        assert ledger.used("2025-01-01") == 1
+
+    def test_buckets_are_separate(self, tmp_path: Path) -> None:
+        path = tmp_path / "ledger.db"
+        assert QuotaLedger(path, bucket="a").try_consume(limit=1)
+        assert QuotaLedger(path, bucket="b").try_consume(limit=1)
+
+    def test_mark_exhausted(self, tmp_path: Path) -> None:
+        ledger = QuotaLedger(tmp_path / "ledger.db")
+        ledger.try_consume(limit=25)
+        ledger.mark_exhausted(limit=25)
+        assert ledger.used() == 25
+        assert not ledger.try_consume(limit=25)
+
+    def test_concurrent_consumers_never_overspend(self, tmp_path: Path) -> None:
+        path = tmp_path / "ledger.db"
+        granted: list[bool] = []
+        lock = threading.Lock()
+
+        def worker() -> None:
+            ledger = QuotaLedger(path)
+            for _ in range(10):
+                ok = ledger.try_consume(limit=15)
+                with lock:
+                    granted.append(ok)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert sum(granted) == 15
+
+
+# ---------------------------------------------------------------------------
+# Rate limiter tests
+# ---------------------------------------------------------------------------
+
+
+class TestRateLimiter:
+    """Verify sliding-window pacing and fail-fast behaviour."""
+
+    def test_allows_burst_up_to_minute_budget(self) -> None:
+        limiter = RateLimiter(per_minute=3, per_day=100)
+        for _ in range(3):
+            limiter.acquire(wait=False)
+
+    def test_fail_fast_when_window_full(self) -> None:
+        limiter = RateLimiter(per_minute=1, per_day=100)
+        limiter.acquire(wait=False)
+        with pytest.raises(QuotaExceeded) as exc_info:
+            limiter.acquire(wait=False)
+        assert not exc_info.value.daily
+        assert exc_info.value.next_slot_at > time.time()
+
+    def test_wait_queues_for_next_slot(self) -> None:
+        limiter = RateLimiter(per_minute=3, per_day=100, window=0.1)
+        for _ in range(3):
+            limiter.acquire(wait=False)
+        start = time.monotonic()
+        limiter.acquire(wait=True)
+        assert 0.05 <= time.monotonic() - start < 1.0
+
+    def test_no_window_exceeds_budget(self) -> None:
+        clock = [1_000_000.0]
+        sent: list[float] = []
+        limiter = RateLimiter(per_minute=5, per_day=10_000)
+        with patch("tools.rate_limit.time.time", side_effect=lambda: clock[0]):
+            for _ in range(600):  # Try every half second for five minutes
+                try:
+                    limiter.acquire(wait=False)
+                    sent.append(clock[0])
+                except QuotaExceeded:
+                    pass
+                clock[0] += 0.5
+        assert len(sent) == 25
+        for start in sent:
+            assert sum(start <= t < start + 60 for t in sent) <= 5
+
+    def test_window_shared_through_ledger(self, tmp_path: Path) -> None:
+        path = tmp_path / "ledger.db"
+        RateLimiter(per_minute=2, per_day=100, ledger=QuotaLedger(path)).acquire()
+        other = RateLimiter(per_minute=2, per_day=100, ledger=QuotaLedger(path))
+        other.acquire(wait=False)
+        with pytest.raises(QuotaExceeded) as exc_info:
+            other.acquire(wait=False)
+        assert not exc_info.value.daily
+        assert other.status()["calls_remaining_minute"] == 0
+
+    def test_wait_respects_timeout(self) -> None:
+        limiter = RateLimiter(per_minute=1, per_day=100)
+        limiter.acquire()
+        with pytest.raises(QuotaExceeded):
+            limiter.acquire(wait=True, timeout=0.01)
+
+    def test_daily_budget_fails_fast(self) -> None:
+        limiter = RateLimiter(per_minute=10, per_day=2)
+        limiter.acquire()
+        limiter.acquire()
+        with pytest.raises(QuotaExceeded) as exc_info:
+            limiter.acquire(wait=True)
+        assert exc_info.value.daily
+
+    def test_daily_budget_shared_through_ledger(self, tmp_path: Path) -> None:
+        path = tmp_path / "ledger.db"
+        RateLimiter(per_minute=10, per_day=1, ledger=QuotaLedger(path)).acquire()
+        other = RateLimiter(per_minute=10, per_day=1, ledger=QuotaLedger(path))
+        with pytest.raises(QuotaExceeded):
+            other.acquire()
+
+
+class TestBackgroundPriority:
+    """Verify background callers give way to interactive ones."""
+
+    def test_leaves_one_slot_free(self) -> None:
+        limiter = RateLimiter(per_minute=3, per_day=100)
+        limiter.acquire(wait=False, background=True)
+        limiter.acquire(wait=False, background=True)
+        with pytest.raises(QuotaExceeded):
+            limiter.acquire(wait=False, background=True)
+        limiter.acquire(wait=False)
+
+    def test_single_slot_budget_still_usable(self) -> None:
+        limiter = RateLimiter(per_minute=1, per_day=100)
+        limiter.acquire(wait=False, background=True)
+
+    def test_reserve_keeps_daily_calls(self) -> None:
+        limiter = RateLimiter(per_minute=10, per_day=3)
+        limiter.acquire(background=True, reserve=2)
+        with pytest.raises(QuotaExceeded, match="reserved") as exc_info:
+            limiter.acquire(background=True, reserve=2)
+        assert exc_info.value.daily
+        limiter.acquire()
+        limiter.acquire()
+
+    def test_waits_behind_queued_interactive_caller(self) -> None:
+        limiter = RateLimiter(per_minute=2, per_day=10_000, window=0.1)
+        for _ in range(2):
+            limiter.acquire(wait=False)
+        order: list[str] = []
+
+        def interactive() -> None:
+            limiter.acquire()
+            order.append("interactive")
+
+        def background() -> None:
+            limiter.acquire(background=True)
+            order.append("background")
+
+        first = threading.Thread(target=interactive)
+        first.start()
+        time.sleep(0.02)  # Let the interactive caller queue first
+        second = threading.Thread(target=background)
+        second.start()
+        first.join(2)
+        second.join(2)
+        assert order == ["interactive", "background"]
+
+
+class TestRateLimiterStatus:
+    """Verify the remaining-budget report."""
+
+    def test_fresh_status(self) -> None:
+        status = RateLimiter(per_minute=5, per_day=25).status()
+        assert status["calls_remaining_minute"] == 5
+        assert status["calls_used_today"] == 0
+        assert status["calls_remaining_today"] == 25
+        assert status["next_slot_at"] == pytest.approx(time.time(), abs=1)
+
+    def test_status_after_calls(self) -> None:
+        limiter = RateLimiter(per_minute=2, per_day=25)
+        limiter.acquire()
+        limiter.acquire()
+        status = limiter.status()
+        assert status["calls_remaining_minute"] == 0
+        assert status["calls_used_today"] == 2
+        assert status["calls_remaining_today"] == 23
+        assert status["next_slot_at"] > time.time() + 20
+
+    def test_status_when_daily_spent(self) -> None:
+        limiter = RateLimiter(per_minute=5, per_day=1)
+        limiter.acquire()
+        status = limiter.status()
+        assert status["calls_remaining_minute"] == 0
+        assert status["calls_remaining_today"] == 0
+        # Next slot is tomorrow (UTC)
+        assert status["next_slot_at"] > time.time()
+
+
+# ---------------------------------------------------------------------------
+# Circuit breaker tests
+# ---------------------------------------------------------------------------
+
+
+class TestCircuitBreaker:
+    """Verify the cool-down after a reported rate limit."""
+
+    def test_opens_for_cooldown(self) -> None:
+        breaker = CircuitBreaker(cooldown=0.05)
+        assert breaker.open_until() is None
+        breaker.trip()
+        assert breaker.open_until() == pytest.approx(time.time() + 0.05, abs=0.02)
+        time.sleep(0.06)
+        assert breaker.open_until() is None
+
+    def test_pool_skips_tripped_key(self) -> None:
+        pool = KeyPool(["a", "b"], per_minute=5, per_day=25)
+        pool.trip("a")
+        assert {pool.acquire(), pool.acquire()} == {"b"}
+        assert pool.status()["calls_remaining_minute"] == 3
+
+    def test_pool_fails_fast_while_open(self) -> None:
+        pool = KeyPool(["a"], per_minute=5, per_day=25, cooldown=30)
+        pool.trip("a")
+        start = time.monotonic()
+        with pytest.raises(QuotaExceeded, match="paused") as exc_info:
+            pool.acquire(wait=True)
+        assert time.monotonic() - start < 0.5
+        assert not exc_info.value.daily
+        assert exc_info.value.next_slot_at == pytest.approx(time.time() + 30, abs=1)
+        assert pool.status()["next_slot_at"] >= exc_info.value.next_slot_at
+        assert pool.status()["calls_used_today"] == 0
+
+    def test_pool_waits_on_busy_key_rather_than_failing(self) -> None:
+        pool = KeyPool(["a", "b"], per_minute=2, per_day=10_000)
+        for limiter in pool.limiters.values():
+            limiter.window = 0.1
+        pool.trip("a")
+        for _ in range(2):
+            pool.acquire(wait=False)
+        assert pool.acquire(wait=True) == "b"
+
+
+# ---------------------------------------------------------------------------
+# Key pool tests
+# ---------------------------------------------------------------------------
+
+
+class TestKeyPool:
+    """Verify calls are spread across API keys."""
+
+    def test_budgets_add_up(self) -> None:
+        pool = KeyPool(["a", "b", "a"], per_minute=2, per_day=25)
+        assert pool.keys == ("a", "b")
+        used = [pool.acquire(wait=False) for _ in range(4)]
+        assert sorted(used) == ["a", "a", "b", "b"]
+        with pytest.raises(QuotaExceeded) as exc_info:
+            pool.acquire(wait=False)
+        assert not exc_info.value.daily
+
+    def test_prefers_most_headroom(self) -> None:
+        pool = KeyPool(["a", "b"], per_minute=3, per_day=25)
+        pool.limiters["a"].acquire()
+        assert pool.acquire() == "b"
+        assert pool.acquire() in ("a", "b")
+
+    def test_skips_spent_keys(self) -> None:
+        pool = KeyPool(["a", "b"], per_minute=5, per_day=1)
+        pool.mark_exhausted("a")
+        assert pool.acquire() == "b"
+        with pytest.raises(QuotaExceeded, match="all 2 keys") as exc_info:
+            pool.acquire()
+        assert exc_info.value.daily
+
+    def test_single_key_keeps_limiter_errors(self) -> None:
+        pool = KeyPool(["a"], per_minute=5, per_day=3)
+        pool.acquire()
+        with pytest.raises(QuotaExceeded, match="reserved"):
+            pool.acquire(reserve=2)
+
+    def test_waits_on_soonest_key(self) -> None:
+        pool = KeyPool(["a", "b"], per_minute=2, per_day=10_000)
+        for limiter in pool.limiters.values():
+            limiter.window = 0.1
+        for _ in range(4):
+            pool.acquire(wait=False)
+        start = time.monotonic()
+        assert pool.acquire(wait=True) in ("a", "b")
+        assert time.monotonic() - start < 1.0
+
+    def test_ledgers_persisted_per_key(self, tmp_path: Path) -> None:
+        path = tmp_path / "ledger.db"
+        KeyPool(["a", "b"], per_minute=5, per_day=1, path=path).acquire()
+        other = KeyPool(["a", "b"], per_minute=5, per_day=1, path=path)
+        assert other.status()["calls_used_today"] == 1
+        other.acquire()
+        with pytest.raises(QuotaExceeded):
+            other.acquire()
+        assert QuotaLedger(path, key_bucket("a")).used() == 1
+
+    def test_status_sums_keys(self) -> None:
+        pool = KeyPool(["a", "b"], per_minute=5, per_day=25)
+        pool.acquire()
+        status = pool.status()
+        assert status["keys"] == 2
+        assert status["calls_remaining_minute"] == 9
+        assert status["calls_used_today"] == 1
+        assert status["calls_remaining_today"] == 49
+        assert status["next_slot_at"] <= time.time()
+
+    def test_needs_a_key(self) -> None:
+        with pytest.raises(ValueError, match="at least one"):
+            KeyPool([])
@@ -0,0 +1,145 @@
+"""Tests for local OHLCV resampling."""
+
+from __future__ import annotations
+
+import gc
+import weakref
+
+import numpy as np
+import pytest
+
+from tools.resample import ResampleMemo, resample
+from tools.timeseries import TimeSeries
+
+
+def _minute_bars(start: str, count: int) -> TimeSeries:
+    """Return ``count`` consecutive 1min bars; bar ``i`` has open ``i``."""
+    dates = np.datetime64(start, "s") + np.arange(count) * np.timedelta64(60, "s")
+    values = np.arange(count, dtype=np.float64)
+    return TimeSeries(
+        dates, values, values + 1, values - 1, values + 0.5, np.ones(count, np.int64)
+    )
+
+
+def _daily_bars(dates: list[str]) -> TimeSeries:
+    n = len(dates)
+    return TimeSeries.from_values(
+        dates, range(n), [i + 1 for i in range(n)], range(n), range(n), [10] * n
+    )
+
+
+class TestIntraday:
+    """Verify fixed-window intraday aggregation."""
+
+    def test_ohlcv_aggregates(self) -> None:
+        bars = resample(_minute_bars("2025-01-15T09:30", 30), "15min")
+        assert bars["date"].tolist() == ["2025-01-15 09:30:00", "2025-01-15 09:45:00"]
+        assert bars["open"].tolist() == [0.0, 15.0]
+        assert bars["high"].tolist() == [15.0, 30.0]
+        assert bars["low"].tolist() == [-1.0, 14.0]
+        assert bars["close"].tolist() == [14.5, 29.5]
+        assert bars["volume"].tolist() == [15, 15]
+
+    def test_windows_aligned_to_clock(self) -> None:
+        bars = resample(_minute_bars("2025-01-15T09:58", 4), "60min")
+        assert bars["date"].tolist() == ["2025-01-15 09:00:00", "2025-01-15 10:00:00"]
+        assert bars["volume"].tolist() == [2, 2]
+
+    def test_matches_naive_grouping(self) -> None:
+        source = _minute_bars("2025-01-15T04:00", 500)
+        bars = resample(source, "30min")
+        for row in bars:
+            start = np.datetime64(row["date"].replace(" ", "T"))
+            window = source.between(start, start + np.timedelta64(29, "m"))
+            assert row["high"] == window["high"].max()
+            assert row["low"] == window["low"].min()
+            assert row["volume"] == window["volume"].sum()
+
+    def test_intraday_target_needs_intraday_source(self) -> None:
+        with pytest.raises(ValueError, match="daily bars"):
+            resample(_daily_bars(["2025-01-15"]), "15min")
+
+
+class TestCalendar:
+    """Verify weekly and monthly aggregation of daily bars."""
+
+    def test_weekly_labelled_by_last_trading_day(self) -> None:
+        # Thu, Fri | Mon ... Fri (holiday Wed) | Mon
+        daily = _daily_bars(
+            [
+                "2025-01-02",
+                "2025-01-03",
+                "2025-01-06",
+                "2025-01-07",
+                "2025-01-09",
+                "2025-01-10",
+                "2025-01-13",
+            ]
+        )
+        weekly = resample(daily, "weekly")
+        assert weekly["date"].tolist() == ["2025-01-03", "2025-01-10", "2025-01-13"]
+        assert weekly["open"].tolist() == [0.0, 2.0, 6.0]
+        assert weekly["high"].tolist() == [2.0, 6.0, 7.0]
+        assert weekly["close"].tolist() == [1.0, 5.0, 6.0]
+        assert weekly["volume"].tolist() == [20, 40, 10]
+
+    def test_monthly(self) -> None:
+        daily = _daily_bars(["2024-12-30", "2024-12-31", "2025-01-02", "2025-01-31"])
+        monthly = resample(daily, "monthly")
+        assert monthly["date"].tolist() == ["2024-12-31", "2025-01-31"]
+        assert monthly["volume"].tolist() == [20, 20]
+
+    def test_calendar_target_needs_daily_source(self) -> None:
+        with pytest.raises(ValueError, match="intraday"):
+            resample(_minute_bars("2025-01-15T09:30", 5), "weekly")
+
+    def test_empty(self) -> None:
+        assert len(resample(TimeSeries.empty(), "monthly")) == 0
+
+    def test_invalid_target(self) -> None:
+        with pytest.raises(ValueError, match="Invalid resample target"):
+            resample(_daily_bars(["2025-01-15"]), "yearly")
+
+
+class TestResampleMemo:
+    """Verify memoization per (symbol, source, target)."""
+
+    def test_reuses_result_for_same_source(self) -> None:
+        memo = ResampleMemo()
+        source = _minute_bars("2025-01-15T09:30", 30)
+        first = memo.resample("aapl", "1min", "15min", source)
+        assert memo.resample("AAPL", "1min", "15min", source) is first
+
+    def test_new_source_recomputed(self) -> None:
+        memo = ResampleMemo()
+        old, new = _minute_bars("2025-01-15", 30), _minute_bars("2025-01-16", 30)
+        first = memo.resample("AAPL", "1min", "15min", old)
+        second = memo.resample("AAPL", "1min", "15min", new)
+        assert second is not first
+        assert len(memo) == 1
+
+    def test_forgotten_with_source(self) -> None:
+        memo = ResampleMemo()
+        source = _minute_bars("2025-01-15T09:30", 30)
+        result = weakref.ref(memo.resample("AAPL", "1min", "15min", source))
+        del source
+        gc.collect()
+        assert result() is None
+        assert len(memo) == 0
+
+    def test_empty_source_not_kept_alive(self) -> None:
+        memo = ResampleMemo()
+        source = _minute_bars("2025-01-15T09:30", 0)
+        ref = weakref.ref(source)
+        assert memo.resample("AAPL", "1min", "15min", source) is source
+        del source
+        gc.collect()
+        assert ref() is None
+        assert len(memo) == 0
+
+    def test_bounded(self) -> None:
+        memo = ResampleMemo(max_entries=2)
+        source = _minute_bars("2025-01-15T09:30", 30)
+        for target in ("5min", "15min", "30min"):
+            memo.resample("AAPL", "1min", target, source)
+        assert len(memo) == 2
@@ -0,0 +1,235 @@
+"""Tests for the columnar TimeSeries type."""
+
+from __future__ import annotations
+
+import datetime as dt
+import json
+
+import numpy as np
+import pytest
+
+from tools.timeseries import TimeSeries
+
+
+def _records() -> list[dict[str, object]]:
+    """Return three daily records, deliberately out of order."""
+    return [
+        {
+            "date": "2025-01-15",
+            "open": 3.0,
+            "high": 4.0,
+            "low": 2.0,
+            "close": 3.5,
+            "volume": 300,
+        },
+        {
+            "date": "2025-01-13",
+            "open": 1.0,
+            "high": 2.0,
+            "low": 0.5,
+            "close": 1.5,
+            "volume": 100,
+        },
+        {
+            "date": "2025-01-14",
+            "open": 2.0,
+            "high": 3.0,
+            "low": 1.0,
+            "close": 2.5,
+            "volume": 200,
+        },
+    ]
+
+
+@pytest.fixture()
+def series() -> TimeSeries:
+    """Return a small daily series."""
+    return TimeSeries.from_records(_records())
+
+
+class TestConstruction:
+    """Verify building series from various inputs."""
+
+    def test_sorted_by_date(self, series: TimeSeries) -> None:
+        assert series["date"].tolist() == ["2025-01-13", "2025-01-14", "2025-01-15"]
+        assert series["close"].tolist() == [1.5, 2.5, 3.5]
+
+    def test_typed_columns(self, series: TimeSeries) -> None:
+        assert series.dates.dtype == np.dtype("datetime64[D]")
+        assert series.close.dtype == np.float64
+        assert series.volume.dtype == np.int64
+
+    def test_from_string_values(self) -> None:
+        series = TimeSeries.from_values(
+            ["2025-01-15 10:05:00", "2025-01-15 10:00:00"],
+            ["1.5", "1.0"],
+            ["2.0", "1.5"],
+            ["1.0", "0.5"],
+            ["1.8", "1.2"],
+            ["500", "400"],
+        )
+        assert series.intraday
+        assert series.dates.dtype == np.dtype("datetime64[s]")
+        assert series["open"].tolist() == [1.0, 1.5]
+        assert series["volume"].tolist() == [400, 500]
+
+    def test_columns_roundtrip(self, series: TimeSeries) -> None:
+        columns = json.loads(json.dumps(series.to_columns()))
+        assert TimeSeries.from_columns(columns) == series
+
+    def test_empty(self) -> None:
+        empty = TimeSeries.empty()
+        assert len(empty) == 0
+        assert list(empty) == []
+        assert repr(empty) == "TimeSeries(0 rows)"
+
+
+class TestRecordCompatibility:
+    """Verify the series still behaves like the legacy list of dicts."""
+
+    def test_len(self, series: TimeSeries) -> None:
+        assert len(series) == 3
+
+    def test_iteration_yields_plain_dicts(self, series: TimeSeries) -> None:
+        rows = list(series)
+        assert rows[0] == {
+            "date": "2025-01-13",
+            "open": 1.0,
+            "high": 2.0,
+            "low": 0.5,
+            "close": 1.5,
+            "volume": 100,
+        }
+        assert type(rows[0]["close"]) is float
+        assert type(rows[0]["volume"]) is int
+        assert type(rows[0]["date"]) is str
+
+    def test_list_comprehension_access(self, series: TimeSeries) -> None:
+        assert [r["close"] for r in series] == [1.5, 2.5, 3.5]
+
+    def test_negative_index(self, series: TimeSeries) -> None:
+        assert series[-1]["close"] == 3.5
+        assert series[-2]["date"] == "2025-01-14"
+
+    def test_index_out_of_range(self, series: TimeSeries) -> None:
+        with pytest.raises(IndexError):
+            series[3]
+
+    def test_unknown_column(self, series: TimeSeries) -> None:
+        with pytest.raises(KeyError):
+            series["adjusted"]
+
+    def test_equals_records(self, series: TimeSeries) -> None:
+        assert series == sorted(_records(), key=lambda r: r["date"])
+        assert series.to_records() == list(series)
+
+    def test_json_serialisable_records(self, series: TimeSeries) -> None:
+        parsed = json.loads(json.dumps(series.to_records()))
+        assert len(parsed) == 3
+
+    def test_intraday_row_dates(self) -> None:
+        series = TimeSeries.from_values(
+            ["2025-01-15 10:00:00"], [1], [1], [1], [1], [1]
+        )
+        assert series[0]["date"] == "2025-01-15 10:00:00"
+        assert next(iter(series))["date"] == "2025-01-15 10:00:00"
+
+
+class TestSlicing:
+    """Verify slices are zero-copy views."""
+
+    def test_slice_is_series(self, series: TimeSeries) -> None:
+        tail = series[1:]
+        assert isinstance(tail, TimeSeries)
+        assert tail["close"].tolist() == [2.5, 3.5]
+
+    def test_slice_shares_buffers(self, series: TimeSeries) -> None:
+        tail = series[1:]
+        assert np.shares_memory(tail.close, series.close)
+
+    def test_nbytes(self, series: TimeSeries) -> None:
+        # Six 8-byte columns of three rows
+        assert series.nbytes == 6 * 8 * 3
+
+
+class TestMerge:
+    """Verify overlaying newer bars onto a stored history."""
+
+    def test_overlapping_bars_replaced(self, series: TimeSeries) -> None:
+        newer = TimeSeries.from_values(
+            ["2025-01-15", "2025-01-16"], [9, 9], [9, 9], [9, 9], [9.5, 9.6], [9, 9]
+        )
+        merged = series.merge(newer)
+        assert merged is not None
+        assert merged["date"].tolist() == [
+            "2025-01-13",
+            "2025-01-14",
+            "2025-01-15",
+            "2025-01-16",
+        ]
+        assert merged["close"].tolist() == [1.5, 2.5, 9.5, 9.6]
+
+    def test_gap_cannot_merge(self, series: TimeSeries) -> None:
+        newer = TimeSeries.from_values(["2025-02-01"], [1], [1], [1], [1], [1])
+        assert series.merge(newer) is None
+
+    def test_empty_delta(self, series: TimeSeries) -> None:
+        assert series.merge(TimeSeries.empty()) is series
+
+    def test_merge_into_empty(self, series: TimeSeries) -> None:
+        assert TimeSeries.empty().merge(series) is series
+
+
+class TestBetween:
+    """Verify indexed date-range queries."""
+
+    def test_inclusive_bounds(self, series: TimeSeries) -> None:
+        window = series.between("2025-01-14", "2025-01-15")
+        assert window["date"].tolist() == ["2025-01-14", "2025-01-15"]
+
+    def test_open_ended(self, series: TimeSeries) -> None:
+        assert len(series.between(start="2025-01-14")) == 2
+        assert len(series.between(end="2025-01-13")) == 1
+        assert len(series.between()) == 3
+
+    def test_is_view(self, series: TimeSeries) -> None:
+        window = series.between("2025-01-14")
+        assert np.shares_memory(window.close, series.close)
+
+    def test_accepts_date_objects(self, series: TimeSeries) -> None:
+        window = series.between(dt.date(2025, 1, 14), np.datetime64("2025-01-14"))
+        assert window["date"].tolist() == ["2025-01-14"]
+
+    def test_bounds_between_bars(self, series: TimeSeries) -> None:
+        assert len(series.between("2025-01-01", "2025-01-31")) == 3
+        assert len(series.between("2025-02-01")) == 0
+
+    def test_reversed_bounds_empty(self, series: TimeSeries) -> None:
+        assert len(series.between("2025-01-15", "2025-01-13")) == 0
+
+    def test_intraday_day_bound_covers_whole_day(self) -> None:
+        intraday = TimeSeries.from_values(
+            ["2025-01-14 15:55:00", "2025-01-15 09:30:00", "2025-01-15 16:00:00"],
+            *([1.0] * 3 for _ in range(4)),
+            [1] * 3,
+        )
+        window = intraday.between("2025-01-15", "2025-01-15")
+        assert window["date"].tolist() == [
+            "2025-01-15 09:30:00",
+            "2025-01-15 16:00:00",
+        ]
+        assert len(intraday.between(end="2025-01-15 09:30:00")) == 2
+
+    def test_invalid_date(self, series: TimeSeries) -> None:
+        with pytest.raises(ValueError, match="Invalid date"):
+            series.between("last tuesday")
+
+
+class TestPlotlyCompatibility:
+    """Verify the series can be charted directly."""
+
+    def test_plotly_express_accepts_series(self, series: TimeSeries) -> None:
+        import plotly.express as px
+
+        fig = px.line(series, x="date", y="close")
+        assert list(fig.data[0].y) == [1.5, 2.5, 3.5]
@@ -0,0 +1,334 @@
+"""Tests for the background cache warmer."""
+
+from __future__ import annotations
+
+import datetime as dt
+import os
+import time
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from tests.test_alpha_vantage import (
+    _make_daily_response,
+    _make_intraday_response,
+    _text_response,
+    _to_csv,
+)
+from tools import warmer
+from tools.alpha_vantage import (
+    CACHE_TTL,
+    clear_cache,
+    fetch_daily,
+    get_cached,
+    peek_entry,
+    series_cache_key,
+    set_cached,
+)
+from tools.rate_limit import KeyPool
+from tools.warmer import (
+    EXCHANGE_TZ,
+    CacheWarmer,
+    format_progress,
+    parse_watchlist,
+    settled_until,
+    start_warmer,
+)
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache() -> None:
+    """Ensure each test starts with a clean cache."""
+    clear_cache()
+
+
+@pytest.fixture()
+def api_key_env() -> dict[str, str]:
+    """Return an environment dict with a test API key."""
+    return {"ALPHAVANTAGE_API_KEY": "test-api-key-123"}
+
+
+def _upcoming(weekday: int, hour: int, minute: int = 0) -> dt.datetime:
+    """Return the next exchange-time ``weekday`` at ``hour:minute``.
+
+    Warmed entries are cached until a timestamp derived from this clock, so
+    it must lie ahead of the real one.
+    """
+    now = dt.datetime.now(EXCHANGE_TZ)
+    day = now.date() + dt.timedelta(days=(weekday - now.weekday()) % 7 + 7)
+    return dt.datetime.combine(day, dt.time(hour, minute), tzinfo=EXCHANGE_TZ)
+
+
+def _daily_csv(**kwargs: Any) -> MagicMock:
+    return _text_response(
+        _to_csv(_make_daily_response(**kwargs), "Time Series (Daily)")
+    )
+
+
+def _intraday_csv() -> MagicMock:
+    raw = _make_intraday_response(interval="5min")
+    return _text_response(_to_csv(raw, "Time Series (5min)"))
+
+
+def _expiry(symbol: str, interval: str | None = None) -> float:
+    entry = peek_entry(series_cache_key(symbol, interval))
+    assert entry is not None
+    return entry[0]
+
+
+class TestConfig:
+    """Verify watchlist parsing."""
+
+    def test_parse_watchlist(self) -> None:
+        entries = parse_watchlist(" aapl, MSFT@5min,, AAPL ,spy@")
+        assert entries == [("AAPL", None), ("MSFT", "5min"), ("SPY", None)]
+
+    def test_invalid_interval(self) -> None:
+        with pytest.raises(ValueError, match="Invalid interval '2min'"):
+            parse_watchlist("AAPL@2min")
+
+    def test_start_warmer_without_watchlist(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.delenv("ALPHAVANTAGE_WATCHLIST", raising=False)
+        monkeypatch.setattr(warmer, "_warmer", None)
+        assert start_warmer() is None
+
+    def test_invalid_warm_time(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setenv("ALPHAVANTAGE_WATCHLIST", "AAPL")
+        monkeypatch.setenv("ALPHAVANTAGE_WARM_AT", "late")
+        monkeypatch.setattr(warmer, "_warmer", None)
+        with pytest.raises(ValueError, match="Invalid time"):
+            start_warmer()
+
+
+class TestCalendar:
+    """Verify when fetched data is settled."""
+
+    @pytest.mark.parametrize(
+        ("now", "expected"),
+        [
+            (dt.datetime(2025, 1, 14, 12, 0), None),  # Tuesday, in session
+            (dt.datetime(2025, 1, 14, 16, 15), None),  # Closed, not published
+            (dt.datetime(2025, 1, 14, 17, 0), dt.datetime(2025, 1, 15, 9, 30)),
+            (dt.datetime(2025, 1, 14, 8, 0), dt.datetime(2025, 1, 14, 9, 30)),
+            (dt.datetime(2025, 1, 17, 17, 0), dt.datetime(2025, 1, 20, 9, 30)),
+            (dt.datetime(2025, 1, 18, 12, 0), dt.datetime(2025, 1, 20, 9, 30)),
+        ],
+    )
+    def test_settled_until(self, now: dt.datetime, expected: dt.datetime) -> None:
+        until = settled_until(now.replace(tzinfo=EXCHANGE_TZ))
+        if expected is None:
+            assert until is None
+        else:
+            assert until == expected.replace(tzinfo=EXCHANGE_TZ).timestamp()
+
+    @pytest.mark.parametrize(
+        ("now", "expected"),
+        [
+            (dt.datetime(2025, 1, 14, 17, 0), None),  # Post-market
+            (dt.datetime(2025, 1, 14, 5, 0), None),  # Pre-market
+            (dt.datetime(2025, 1, 14, 21, 0), dt.datetime(2025, 1, 15, 4, 0)),
+            (dt.datetime(2025, 1, 14, 3, 0), dt.datetime(2025, 1, 14, 4, 0)),
+            (dt.datetime(2025, 1, 17, 21, 0), dt.datetime(2025, 1, 20, 4, 0)),
+        ],
+    )
+    def test_intraday_settles_with_extended_hours(
+        self, now: dt.datetime, expected: dt.datetime | None
+    ) -> None:
+        until = settled_until(now.replace(tzinfo=EXCHANGE_TZ), intraday=True)
+        if expected is None:
+            assert until is None
+        else:
+            assert until == expected.replace(tzinfo=EXCHANGE_TZ).timestamp()
+
+    def test_next_warm_skips_weekend(self) -> None:
+        friday = dt.datetime(2025, 1, 17, 17, 0, tzinfo=EXCHANGE_TZ)
+        assert warmer._next_weekday_at(friday, dt.time(16, 30)) == dt.datetime(
+            2025, 1, 20, 16, 30, tzinfo=EXCHANGE_TZ
+        )
+
+
+class TestRunOnce:
+    """Verify a single warming pass."""
+
+    def test_after_close_caches_until_open(self, api_key_env: dict[str, str]) -> None:
+        now = _upcoming(1, 21)  # Tuesday after post-market trading
+        wednesday = now + dt.timedelta(days=1)
+
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch.object(warmer, "_now", return_value=now),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                side_effect=[_daily_csv(), _intraday_csv()],
+            ) as mock_get,
+        ):
+            first = CacheWarmer([("AAPL", None), ("MSFT", "5min")]).run_once()
+            second = CacheWarmer([("AAPL", None), ("MSFT", "5min")]).run_once()
+            fetch_daily("AAPL")
+
+        assert mock_get.call_count == 2
+        assert first["warmed"] == ["AAPL", "MSFT@5min"]
+        assert first["done"] == first["total"] == 2
+        assert first["state"] == "idle"
+        assert second["cached"] == ["AAPL", "MSFT@5min"]
+        assert _expiry("AAPL") == pytest.approx(
+            wednesday.replace(hour=9, minute=30).timestamp(), abs=1
+        )
+        assert _expiry("MSFT", "5min") == pytest.approx(
+            wednesday.replace(hour=4).timestamp(), abs=1
+        )
+        assert mock_get.call_args_list[0].kwargs["params"]["outputsize"] == "full"
+
+    def test_post_market_intraday_uses_normal_ttl(
+        self, api_key_env: dict[str, str]
+    ) -> None:
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch.object(warmer, "_now", return_value=_upcoming(1, 17)),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                side_effect=[_daily_csv(), _intraday_csv()],
+            ),
+        ):
+            CacheWarmer([("AAPL", None), ("MSFT", "5min")]).run_once()
+
+        assert _expiry("AAPL") > time.time() + CACHE_TTL
+        assert _expiry("MSFT", "5min") == pytest.approx(time.time() + CACHE_TTL, abs=5)
+
+    def test_in_session_uses_normal_ttl(self, api_key_env: dict[str, str]) -> None:
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch.object(warmer, "_now", return_value=_upcoming(1, 12)),
+            patch(
+                "tools.alpha_vantage.requests.Session.get", return_value=_daily_csv()
+            ),
+        ):
+            progress = CacheWarmer([("AAPL", None)]).run_once()
+
+        assert progress["warmed"] == ["AAPL"]
+        assert _expiry("AAPL") == pytest.approx(time.time() + CACHE_TTL, abs=5)
+
+    def test_pre_close_entry_refreshed(self, api_key_env: dict[str, str]) -> None:
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                side_effect=[_daily_csv(num_days=5), _daily_csv(num_days=2)],
+            ) as mock_get,
+        ):
+            fetch_daily("AAPL", outputsize="full", datatype="csv")
+            with patch.object(warmer, "_now", return_value=_upcoming(1, 17)):
+                progress = CacheWarmer([("AAPL", None)]).run_once()
+
+        assert progress["warmed"] == ["AAPL"]
+        # Brought up to date with a compact delta, not a second full history
+        assert mock_get.call_args_list[1].kwargs["params"]["outputsize"] == "compact"
+        assert _expiry("AAPL") > time.time() + CACHE_TTL
+
+    def test_failures_do_not_stop_the_run(self, api_key_env: dict[str, str]) -> None:
+        error = _text_response('{"Error Message": "Invalid API call."}')
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch.object(warmer, "_now", return_value=_upcoming(1, 12)),
+            patch(
+                "tools.alpha_vantage.requests.Session.get",
+                side_effect=[error, _daily_csv()],
+            ),
+        ):
+            progress = CacheWarmer([("NOPE", None), ("AAPL", None)]).run_once()
+
+        assert list(progress["failed"]) == ["NOPE"]
+        assert progress["warmed"] == ["AAPL"]
+
+    def test_stops_at_reserve(self, api_key_env: dict[str, str]) -> None:
+        pool = KeyPool(["test-api-key-123"], per_minute=5, per_day=3)
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch.object(warmer, "_now", return_value=_upcoming(1, 12)),
+            patch("tools.alpha_vantage._get_key_pool", return_value=pool),
+            patch(
+                "tools.alpha_vantage.requests.Session.get", return_value=_daily_csv()
+            ) as mock_get,
+        ):
+            entries = [("AAPL", None), ("MSFT", None), ("SPY", None)]
+            progress = CacheWarmer(entries, reserve=2).run_once()
+
+        assert mock_get.call_count == 1
+        assert progress["warmed"] == ["AAPL"]
+        assert list(progress["failed"]) == ["MSFT", "SPY"]
+        assert "reserved" in progress["failed"]["SPY"]
+        assert pool.status()["calls_remaining_today"] == 2
+
+    def test_reports_progress(self, api_key_env: dict[str, str]) -> None:
+        seen: list[str] = []
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch.object(warmer, "_now", return_value=_upcoming(1, 12)),
+            patch(
+                "tools.alpha_vantage.requests.Session.get", return_value=_daily_csv()
+            ),
+        ):
+            CacheWarmer(
+                [("AAPL", None)], on_progress=lambda p: seen.append(format_progress(p))
+            ).run_once()
+
+        assert "Warming cache: 0/1 (AAPL)" in seen
+        assert seen[-1] == "Cache warm: 1/1"
+
+
+class TestThread:
+    """Verify the scheduled background thread."""
+
+    def test_start_and_stop(self, api_key_env: dict[str, str]) -> None:
+        now = _upcoming(1, 12)
+        cache_warmer = CacheWarmer([("AAPL", None)])
+        with (
+            patch.dict(os.environ, api_key_env),
+            patch.object(warmer, "_now", return_value=now),
+            patch(
+                "tools.alpha_vantage.requests.Session.get", return_value=_daily_csv()
+            ),
+        ):
+            cache_warmer.start()
+            cache_warmer.start()  # Idempotent
+            deadline = time.monotonic() + 5
+            while cache_warmer.progress()["next_run_at"] is None:
+                assert time.monotonic() < deadline
+                time.sleep(0.01)
+            cache_warmer.stop(timeout=5)
+
+        progress = cache_warmer.progress()
+        assert progress["state"] == "stopped"
+        assert progress["warmed"] == ["AAPL"]
+        assert progress["last_run_at"] is not None
+
+    def test_start_warmer_is_shared(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setenv("ALPHAVANTAGE_WATCHLIST", "AAPL")
+        monkeypatch.setattr(warmer, "_warmer", None)
+        with patch.object(CacheWarmer, "start") as mock_start:
+            first = start_warmer()
+            assert start_warmer() is first
+        assert first.watchlist == [("AAPL", None)]
+        assert first.reserve == warmer.DEFAULT_RESERVE
+        assert mock_start.call_count == 2
+
+
+def test_format_progress_schedule() -> None:
+    progress = CacheWarmer([("AAPL", None), ("MSFT", None)]).progress()
+    progress.update(
+        warmed=["AAPL"],
+        failed={"MSFT": "boom"},
+        next_run_at=dt.datetime(2025, 1, 15, 16, 30, tzinfo=EXCHANGE_TZ).timestamp(),
+    )
+    assert format_progress(progress) == "Cache warm: 1/2, 1 failed; next Wed 16:30 ET"
+
+
+def test_zero_ttl_keeps_entry_as_refresh_base() -> None:
+    # The warmer expires pre-close entries this way before refreshing them
+    key = series_cache_key("AAPL")
+    set_cached(key, [1, 2], ttl=0)
+    assert get_cached(key) is None
+    assert peek_entry(key) is not None
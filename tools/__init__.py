@@ -9,8 +9,11 @@ from tools.alpha_vantage import (
     InvalidTickerError,
     MissingApiKeyError,
     RateLimitError,
+    cache_stats,
     fetch_daily,
     fetch_intraday,
+    fetch_resampled,
+    quota_status,
 )
 
 __all__ = [
@@ -19,6 +22,9 @@ __all__ = [
     "InvalidTickerError",
     "MissingApiKeyError",
     "RateLimitError",
+    "cache_stats",
     "fetch_daily",
     "fetch_intraday",
+    "fetch_resampled",
+    "quota_status",
 ]
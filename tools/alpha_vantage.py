@@ -2,13 +2,24 @@
 
 This module provides functions to fetch daily and intraday time series data
 from the Alpha Vantage API. It includes:
-- Session-level caching to avoid redundant API calls
-- Structured data output suitable for Plotly charting
+- Two-tier caching (a size-bounded in-memory LRU, backed by a host-wide
+  SQLite database) to avoid redundant API calls
+- Client-side rate limiting with a persisted daily quota ledger, per API
+  key when several are pooled
+- A pooled keep-alive HTTP session that retries transient failures
+- Record/replay of raw responses through :mod:`tools.cassette`
+- An optional resident daemon (:mod:`tools.daemon`) that keeps all of the
+  above warm across CLI calls
+- Columnar :class:`~tools.timeseries.TimeSeries` output suitable for Plotly
+  charting
 - Clear error handling for common failure modes
 
 Usage as a CLI tool (for the agent to call via Bash):
     python -m tools.alpha_vantage daily AAPL
     python -m tools.alpha_vantage intraday AAPL --interval 15min
+    python -m tools.alpha_vantage batch AAPL MSFT SPY@5min
+    python -m tools.alpha_vantage quota
+    python -m tools.alpha_vantage serve   # optional resident daemon
 
 Usage as a Python module:
     from tools.alpha_vantage import fetch_daily, fetch_intraday
@@ -17,42 +28,173 @@ Usage as a Python module:
 
 from __future__ import annotations
 
+import concurrent.futures
+import contextlib
+import contextvars
+import io
 import json
+import logging
 import os
+import random
+import signal
 import sys
+import threading
 import time
-from typing import Any
+from collections.abc import Callable, Iterable, Iterator
+from pathlib import Path
+from typing import Any, TextIO
 
+import numpy as np
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+from tools.cassette import Cassette, cassette_key
+from tools.daemon import CommandServer, forward
+from tools.disk_cache import DiskCache
+from tools.downsample import bucket_ohlc, memoized
+from tools.downsample import clear_memo as _clear_downsample_memo
+from tools.json_stream import decode_time_series
+from tools.memory_cache import MemoryCache
+from tools.rate_limit import KeyPool, QuotaExceeded
+from tools.resample import (
+    CALENDAR_TARGETS,
+    INTRADAY_TARGETS,
+    ResampleMemo,
+    interval_minutes,
+)
+from tools.timeseries import (
+    DAILY_UNIT,
+    INTRADAY_UNIT,
+    PRICE_FIELDS,
+    DateLike,
+    TimeSeries,
+    to_datetime64,
+)
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # ---------------------------------------------------------------------------
 # Constants
 # ---------------------------------------------------------------------------
 
 BASE_URL = "https://www.alphavantage.co/query"
-"""Alpha Vantage API base URL."""
+"""Alpha Vantage API base URL.
+
+Override with the ``ALPHAVANTAGE_BASE_URL`` environment variable, e.g. to
+point the whole app at :mod:`tools.fake_alpha_vantage`. To replay recorded
+responses instead of calling any endpoint, set ``ALPHAVANTAGE_CASSETTE``
+(see :mod:`tools.cassette`).
+"""
 
 VALID_INTERVALS = ("1min", "5min", "15min", "30min", "60min")
 """Supported intraday intervals."""
 
+VALID_OUTPUTSIZES = ("compact", "full")
+"""Supported output sizes. A cached "full" series also answers "compact"."""
+
+VALID_DATATYPES = ("json", "csv")
+"""Supported wire formats. Both parse to the same ``TimeSeries``."""
+
 REQUEST_TIMEOUT = 30
 """HTTP request timeout in seconds."""
 
+DEFAULT_CONCURRENCY = 4
+"""Default number of fetches in flight at once for batch loads."""
+
+MAX_RETRIES = 2
+"""Extra attempts made after a transient failure (timeout, connection, 5xx)."""
+
+RETRY_BACKOFF = 0.5
+"""Base delay in seconds for exponential retry backoff."""
+
+RETRY_STATUSES = frozenset({500, 502, 503, 504})
+"""HTTP statuses treated as transient. 429 is deliberately excluded: a rate
+limit response is never retried, and trips the key's circuit breaker."""
+
+POOL_SIZE = 16
+"""Maximum keep-alive connections held open to the API host."""
+
+COMPACT_SIZE = 100
+"""Number of most recent data points returned for ``outputsize=compact``."""
+
+STREAM_CHUNK_SIZE = 64 * 1024
+"""Bytes read at a time when streaming a full JSON history."""
+
+RATE_LIMIT_PER_MINUTE = int(os.environ.get("ALPHAVANTAGE_CALLS_PER_MINUTE", "5"))
+"""Calls allowed per minute for each API key (free tier: 5)."""
+
+RATE_LIMIT_PER_DAY = int(os.environ.get("ALPHAVANTAGE_CALLS_PER_DAY", "25"))
+"""Calls allowed per UTC day for each API key (free tier: 25)."""
+
 # ---------------------------------------------------------------------------
-# Session-level cache
+# Two-tier cache
 # ---------------------------------------------------------------------------
 
-_cache: dict[str, tuple[float, list[dict[str, Any]]]] = {}
-"""In-memory cache mapping cache keys to (timestamp, data) tuples."""
-
 CACHE_TTL = 300
-"""Cache time-to-live in seconds (5 minutes)."""
+"""Default cache time-to-live in seconds (5 minutes)."""
+
+CACHE_MAX_BYTES = int(os.environ.get("ALPHAVANTAGE_CACHE_MAX_BYTES", str(128 * 2**20)))
+"""Memory budget of the in-memory tier (default 128 MiB)."""
+
+SWEEP_INTERVAL = 60.0
+"""Seconds between background sweeps of expired cache entries."""
+
+CACHE_RETENTION = 30 * 24 * 3600
+"""Seconds an expired entry is kept, in either tier, to be served stale
+(``max_stale``) or used as a base for incremental refresh. The in-memory
+tier's byte budget may evict it sooner."""
+
+INVALID_TICKER_TTL = 600
+"""Seconds an invalid-ticker response is remembered (10 minutes), so a bad
+symbol costs one API call rather than one per dashboard rerun."""
+
+RATE_LIMIT_COOLDOWN = 60.0
+"""Seconds an API key is rested after the API reports a rate limit on it;
+calls that would be refused meanwhile fail locally."""
+
+_cache = MemoryCache(CACHE_MAX_BYTES)
+"""In-memory (L1) LRU cache mapping cache keys to (expires_at, data) tuples."""
+
+_resample_memo = ResampleMemo()
+"""Series derived locally from cached finer-grained ones."""
+
+DEFAULT_CACHE_DB = str(
+    Path(__file__).resolve().parent.parent / "data" / "alpha_vantage_cache.db"
+)
+"""Default location of the shared disk (L2) cache.
+
+Override with the ``ALPHAVANTAGE_CACHE_DB`` environment variable; set it to an
+empty string to disable the disk tier entirely.
+"""
+
+_disk_cache: DiskCache | None = None
+
+
+def _cache_db_path() -> str:
+    """Return the configured disk cache path ("" if the tier is disabled)."""
+    return os.environ.get("ALPHAVANTAGE_CACHE_DB", DEFAULT_CACHE_DB).strip()
+
 
+def _get_disk_cache() -> DiskCache | None:
+    """Return the shared disk cache, or None if the disk tier is disabled."""
+    global _disk_cache
+    path = _cache_db_path()
+    if not path:
+        return None
+    if _disk_cache is None or str(_disk_cache.path) != path:
+        _disk_cache = DiskCache(path)
+    return _disk_cache
 
-def _cache_key(function: str, symbol: str, interval: str | None = None) -> str:
+
+def _cache_key(
+    function: str,
+    symbol: str,
+    interval: str | None = None,
+    outputsize: str | None = None,
+) -> str:
     """Generate a cache key for a given request.
 
     Parameters
@@ -63,6 +205,9 @@ def _cache_key(function: str, symbol: str, interval: str | None = None) -> str:
         The stock ticker symbol.
     interval:
         The intraday interval (only for intraday requests).
+    outputsize:
+        The coverage of the cached series ("compact" or "full"), so a
+        compact result is never mistaken for a full history.
 
     Returns
     -------
@@ -72,12 +217,90 @@ def _cache_key(function: str, symbol: str, interval: str | None = None) -> str:
     parts = [function, symbol.upper()]
     if interval:
         parts.append(interval)
+    if outputsize:
+        parts.append(outputsize)
     return ":".join(parts)
 
 
-def get_cached(key: str) -> list[dict[str, Any]] | None:
+def series_cache_key(
+    symbol: str, interval: str | None = None, outputsize: str = "full"
+) -> str:
+    """Return the cache key of a daily series (``interval=None``) or an
+    intraday one, for use with :func:`peek_entry` and :func:`set_cached`."""
+    function = "TIME_SERIES_INTRADAY" if interval else "TIME_SERIES_DAILY"
+    return _cache_key(function, symbol, interval, outputsize)
+
+
+_coverage_stats: dict[str, dict[str, int]] = {}
+"""Hit/miss counters per requested coverage level."""
+
+_stats_lock = threading.Lock()
+
+
+def _reset_coverage_stats() -> None:
+    with _stats_lock:
+        _coverage_stats.clear()
+        _coverage_stats["full"] = {"hits": 0, "hits_derived": 0, "misses": 0}
+        _coverage_stats["compact"] = {
+            "hits": 0,
+            "hits_from_full": 0,
+            "hits_derived": 0,
+            "misses": 0,
+        }
+
+
+_reset_coverage_stats()
+
+
+def _count(outputsize: str, outcome: str) -> None:
+    """Increment a coverage counter."""
+    with _stats_lock:
+        _coverage_stats[outputsize][outcome] += 1
+
+
+def cache_stats() -> dict[str, Any]:
+    """Report cache effectiveness and in-memory occupancy.
+
+    Returns
+    -------
+    dict[str, Any]
+        A dict with keys:
+
+        - ``coverage``: ``{"full": {...}, "compact": {...}}``, counting
+          ``hits`` and ``misses`` for requests of each output size.
+          ``compact`` also counts ``hits_from_full``: compact requests
+          answered by slicing a cached full history. ``hits_derived``
+          counts intraday requests answered by resampling a cached full
+          series of a finer interval.
+        - ``memory``: occupancy of the in-memory tier (``entries``,
+          ``bytes``, ``max_bytes``) and the number of ``evictions`` and
+          swept ``expirations``.
+    """
+    with _stats_lock:
+        coverage = {k: dict(v) for k, v in _coverage_stats.items()}
+    return {"coverage": coverage, "memory": _cache.stats()}
+
+
+def _encode_cached(data: Any) -> Any:
+    """Convert cached data to a JSON-serialisable form for the disk tier."""
+    if isinstance(data, TimeSeries):
+        return {"timeseries": data.to_columns()}
+    return data
+
+
+def _decode_cached(value: Any) -> Any:
+    """Inverse of :func:`_encode_cached`."""
+    if isinstance(value, dict) and "timeseries" in value:
+        return TimeSeries.from_columns(value["timeseries"])
+    return value
+
+
+def get_cached(key: str) -> Any | None:
     """Retrieve cached data if it exists and hasn't expired.
 
+    The in-memory tier is checked first. On a miss, the disk tier is
+    consulted and a hit there is promoted into memory with its remaining TTL.
+
     Parameters
     ----------
     key:
@@ -85,34 +308,86 @@ def get_cached(key: str) -> list[dict[str, Any]] | None:
 
     Returns
     -------
-    list[dict[str, Any]] | None
-        The cached data, or None if not found or expired.
+    Any | None
+        The cached data (usually a ``TimeSeries``), or None if not found or
+        expired.
     """
-    if key in _cache:
-        timestamp, data = _cache[key]
-        if time.time() - timestamp < CACHE_TTL:
+    entry = _cache.get(key)
+    if entry is not None and time.time() < entry[0]:
+        return entry[1]
+    # An expired entry is left in place: it can still be served stale or
+    # patched by an incremental refresh (see peek_entry)
+
+    disk = _get_disk_cache()
+    if disk is not None:
+        hit = disk.get(key)
+        if hit is not None:
+            expires_at, value = hit
+            data = _decode_cached(value)
+            _cache[key] = (expires_at, data)
             return data
-        # Expired — remove stale entry
-        del _cache[key]
     return None
 
 
-def set_cached(key: str, data: list[dict[str, Any]]) -> None:
-    """Store data in the cache with the current timestamp.
+def peek_entry(key: str) -> tuple[float, Any] | None:
+    """Return ``(expires_at, data)`` for ``key`` from either tier, ignoring expiry.
+
+    Expired entries are no good as fresh answers, but can still be served
+    stale or used as a base for an incremental refresh. Both tiers keep
+    them for :data:`CACHE_RETENTION`.
+    """
+    entry = _cache.get(key)
+    if entry is not None:
+        return entry
+    disk = _get_disk_cache()
+    if disk is not None:
+        hit = disk.get(key, allow_expired=True)
+        if hit is not None:
+            return hit[0], _decode_cached(hit[1])
+    return None
+
+
+def _peek_cached(key: str) -> Any | None:
+    """Return cached data for ``key`` from either tier, ignoring expiry."""
+    entry = peek_entry(key)
+    return entry[1] if entry is not None else None
+
+
+def set_cached(key: str, data: Any, ttl: float = CACHE_TTL) -> None:
+    """Store data in both cache tiers.
 
     Parameters
     ----------
     key:
         The cache key.
     data:
-        The data to cache.
+        The data to cache: a ``TimeSeries`` or any JSON-serialisable value.
+    ttl:
+        Time-to-live in seconds. Defaults to :data:`CACHE_TTL`.
     """
-    _cache[key] = (time.time(), data)
+    _cache.start_sweeper(SWEEP_INTERVAL, _purge_disk_cache, grace=CACHE_RETENTION)
+    _cache[key] = (time.time() + ttl, data)
+    disk = _get_disk_cache()
+    if disk is not None:
+        disk.set(key, _encode_cached(data), ttl)
+
+
+def _purge_disk_cache() -> None:
+    """Drop disk entries that expired more than :data:`CACHE_RETENTION` ago."""
+    disk = _get_disk_cache()
+    if disk is not None:
+        disk.purge_expired(grace=CACHE_RETENTION)
 
 
 def clear_cache() -> None:
-    """Clear all cached data."""
+    """Clear all cached data from both tiers and reset the statistics."""
     _cache.clear()
+    _resample_memo.clear()
+    _clear_downsample_memo()
+    _reset_coverage_stats()
+    disk = _get_disk_cache()
+    if disk is not None:
+        disk.clear()
 
 
 # ---------------------------------------------------------------------------
@@ -125,7 +400,7 @@ class AlphaVantageError(Exception):
 
 
 class MissingApiKeyError(AlphaVantageError):
-    """Raised when the ALPHAVANTAGE_API_KEY is not configured."""
+    """Raised when no Alpha Vantage API key is configured."""
 
 
 class InvalidTickerError(AlphaVantageError):
@@ -145,27 +420,35 @@ class ApiError(AlphaVantageError):
 # ---------------------------------------------------------------------------
 
 
-def _get_api_key() -> str:
-    """Retrieve and validate the Alpha Vantage API key from environment.
+def _get_api_keys() -> tuple[str, ...]:
+    """Retrieve and validate the Alpha Vantage API keys from environment.
+
+    Keys are read from the comma-separated ``ALPHAVANTAGE_API_KEYS`` and
+    from ``ALPHAVANTAGE_API_KEY``; calls are spread across all of them.
 
     Returns
     -------
-    str
-        The API key.
+    tuple[str, ...]
+        The distinct API keys, in configuration order.
 
     Raises
     ------
     MissingApiKeyError
-        If ALPHAVANTAGE_API_KEY is not set or empty.
+        If neither variable holds a key and no cassette is being replayed.
     """
-    key = os.environ.get("ALPHAVANTAGE_API_KEY", "").strip()
-    if not key:
+    configured = os.environ.get("ALPHAVANTAGE_API_KEYS", "").split(",")
+    configured.append(os.environ.get("ALPHAVANTAGE_API_KEY", ""))
+    keys = tuple(dict.fromkeys(key.strip() for key in configured if key.strip()))
+    if not keys and _cassette_mode() == "replay":
+        return ("replay",)  # Never sent, and not part of the cassette key
+    if not keys:
         raise MissingApiKeyError(
             "ALPHAVANTAGE_API_KEY is not set. "
-            "Please add it to your .env file or set it as an environment variable. "
+            "Please add it to your .env file or set it as an environment variable "
+            "(or list several keys in ALPHAVANTAGE_API_KEYS). "
             "Get a free key at https://www.alphavantage.co/support/#api-key"
         )
-    return key
+    return keys
 
 
 # ---------------------------------------------------------------------------
@@ -173,39 +456,31 @@ def _get_api_key() -> str:
 # ---------------------------------------------------------------------------
 
 
-def _parse_time_series(
-    raw_data: dict[str, Any],
-    time_series_key: str,
-) -> list[dict[str, Any]]:
-    """Parse Alpha Vantage time series response into structured records.
+_RESPONSE_FIELDS = ("1. open", "2. high", "3. low", "4. close", "5. volume")
+"""Per-bar keys in a JSON time series response, in OHLCV order."""
 
-    Parameters
-    ----------
-    raw_data:
-        The raw JSON response from the API.
-    time_series_key:
-        The key in the response containing the time series data
-        (e.g., "Time Series (Daily)").
 
-    Returns
-    -------
-    list[dict[str, Any]]
-        A list of dicts with keys: date, open, high, low, close, volume.
-        Sorted by date ascending (oldest first).
+def _raise_for_api_error(raw_data: dict[str, Any]) -> None:
+    """Raise if a response carries an error, Note or Information payload.
 
     Raises
     ------
     InvalidTickerError
-        If the time series key is not found in the response.
+        If the API rejected the symbol or parameters.
     RateLimitError
         If the API indicates a rate limit has been hit.
     ApiError
-        If the response contains an error message.
+        If the API rejected the key, or the response contains any other
+        error message.
     """
     # Check for API error messages
     if "Error Message" in raw_data:
         error_msg = raw_data["Error Message"]
-        if "Invalid API call" in error_msg or "invalid" in error_msg.lower():
+        # "the parameter apikey is invalid or missing" says nothing about
+        # the symbol, so it must not be remembered as a bad ticker
+        if "apikey" in error_msg.lower():
+            raise ApiError(f"Alpha Vantage rejected the API key: {error_msg}")
+        if "Invalid API call" in error_msg:
             raise InvalidTickerError(
                 f"Invalid ticker symbol or API parameters: {error_msg}"
             )
@@ -231,6 +506,38 @@ def _parse_time_series(
         if "premium" in info.lower() or "subscribe" in info.lower():
             raise RateLimitError(f"Alpha Vantage API limit reached: {info}")
 
+
+def _parse_time_series(
+    raw_data: dict[str, Any],
+    time_series_key: str,
+) -> TimeSeries:
+    """Parse Alpha Vantage time series response into a columnar series.
+
+    Parameters
+    ----------
+    raw_data:
+        The raw JSON response from the API.
+    time_series_key:
+        The key in the response containing the time series data
+        (e.g., "Time Series (Daily)").
+
+    Returns
+    -------
+    TimeSeries
+        The bars, sorted by date ascending (oldest first). Iterating yields
+        dicts with keys: date, open, high, low, close, volume.
+
+    Raises
+    ------
+    InvalidTickerError
+        If the time series key is not found in the response.
+    RateLimitError
+        If the API indicates a rate limit has been hit.
+    ApiError
+        If the response contains an error message.
+    """
+    _raise_for_api_error(raw_data)
+
     if time_series_key not in raw_data:
         raise InvalidTickerError(
             f"No data found. The ticker symbol may be invalid or the API "
@@ -238,23 +545,761 @@ def _parse_time_series(
         )
 
     time_series = raw_data[time_series_key]
-    records: list[dict[str, Any]] = []
-
-    for date_str, values in time_series.items():
-        records.append(
-            {
-                "date": date_str,
-                "open": float(values["1. open"]),
-                "high": float(values["2. high"]),
-                "low": float(values["3. low"]),
-                "close": float(values["4. close"]),
-                "volume": int(values["5. volume"]),
-            }
+    values = list(time_series.values())
+    # Columns are converted to typed arrays in bulk and sorted by date
+    # ascending (oldest first) for charting
+    return TimeSeries.from_values(
+        list(time_series.keys()),
+        *([v[field] for v in values] for field in _RESPONSE_FIELDS),
+    )
+
+
+_CSV_HEADER = ("timestamp", "open", "high", "low", "close", "volume")
+"""Column names of a ``datatype=csv`` time series response."""
+
+
+def _parse_csv_time_series(text: str) -> TimeSeries:
+    """Parse a ``datatype=csv`` time series response into a columnar series.
+
+    Every row is converted straight into typed columns by NumPy's C parser in
+    a single pass, with no intermediate dicts or per-value ``float()`` calls.
+
+    Parameters
+    ----------
+    text:
+        The raw CSV body: a header row followed by one row per bar, newest
+        first.
+
+    Returns
+    -------
+    TimeSeries
+        The bars, sorted by date ascending (oldest first).
+
+    Raises
+    ------
+    InvalidTickerError
+        If the body does not start with the expected header.
+    ApiError
+        If the rows are malformed.
+    """
+    header, _, body = text.strip().partition("\n")
+    if tuple(h.strip() for h in header.split(",")) != _CSV_HEADER:
+        raise InvalidTickerError(
+            f"No data found. The ticker symbol may be invalid or the API "
+            f"returned an unexpected response: {header[:100]!r}"
+        )
+    if not body.strip():
+        return TimeSeries.empty()
+
+    first_date = body.lstrip().split(",", 1)[0]
+    row_type = np.dtype(
+        [("date", INTRADAY_UNIT if len(first_date) > 10 else DAILY_UNIT)]
+        + [(field, np.float64) for field in PRICE_FIELDS]
+        + [("volume", np.int64)]
+    )
+    try:
+        rows = np.loadtxt(io.StringIO(body), delimiter=",", dtype=row_type, ndmin=1)
+    except ValueError as exc:
+        raise ApiError(f"Unexpected CSV response from Alpha Vantage: {exc}") from exc
+
+    order = np.argsort(rows["date"], kind="stable")
+    return TimeSeries(*(rows[name][order] for name in row_type.names))
+
+
+# ---------------------------------------------------------------------------
+# Rate limiting
+# ---------------------------------------------------------------------------
+
+_key_pool: KeyPool | None = None
+_key_pool_config: tuple[str, tuple[str, ...], int, int, float] | None = None
+_key_pool_lock = threading.Lock()
+
+
+def _get_key_pool() -> KeyPool:
+    """Return the shared pool of API keys and their rate limiters.
+
+    Each key's daily ledger lives in the disk cache database so every
+    process on the host draws from the same budgets; with the disk tier
+    disabled the ledgers are kept in memory. The pool is rebuilt when the
+    configured keys, limits or database change.
+
+    Raises
+    ------
+    MissingApiKeyError
+        If no API key is configured.
+    """
+    global _key_pool, _key_pool_config
+    config = (
+        _cache_db_path(),
+        _get_api_keys(),
+        RATE_LIMIT_PER_MINUTE,
+        RATE_LIMIT_PER_DAY,
+        RATE_LIMIT_COOLDOWN,
+    )
+    with _key_pool_lock:
+        if _key_pool is None or _key_pool_config != config:
+            path, keys, per_minute, per_day, cooldown = config
+            _key_pool = KeyPool(
+                keys,
+                per_minute=per_minute,
+                per_day=per_day,
+                path=path or None,
+                cooldown=cooldown,
+            )
+            _key_pool_config = config
+        return _key_pool
+
+
+_background_reserve: contextvars.ContextVar[int | None] = contextvars.ContextVar(
+    "alpha_vantage_background_reserve", default=None
+)
+"""Daily calls to leave unused while API calls run as background work, or
+None for interactive calls."""
+
+
+@contextlib.contextmanager
+def background_calls(reserve: int = 0) -> Iterator[None]:
+    """Send the API calls made inside the block at background priority.
+
+    They give way to interactive callers queued on the rate limiter, never
+    take the last free call of the minute, and fail with
+    :class:`RateLimitError` once only ``reserve`` calls of today's budget
+    remain on every API key. Used by :mod:`tools.warmer`.
+
+    Usage:
+        with background_calls(reserve=5):
+            fetch_daily("AAPL", outputsize="full")
+    """
+    token = _background_reserve.set(reserve)
+    try:
+        yield
+    finally:
+        _background_reserve.reset(token)
+
+
+_sent_key: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "alpha_vantage_sent_key", default=None
+)
+"""The API key the latest call in this context was sent with."""
+
+
+def _acquire_call_slot(wait: bool) -> str:
+    """Reserve one API call on the pooled key with the most headroom.
+
+    Parameters
+    ----------
+    wait:
+        Queue for the next per-minute slot (True) or fail fast (False).
+
+    Returns
+    -------
+    str
+        The API key to send the call with.
+
+    Raises
+    ------
+    RateLimitError
+        If no call can be sent within any key's per-minute or daily budget.
+    """
+    reserve = _background_reserve.get()
+    try:
+        key = _get_key_pool().acquire(
+            wait=wait, background=reserve is not None, reserve=reserve or 0
+        )
+    except QuotaExceeded as exc:
+        retry_at = time.strftime("%H:%M:%S", time.localtime(exc.next_slot_at))
+        raise RateLimitError(
+            f"Alpha Vantage rate limit reached: {exc} Next call possible at {retry_at}."
+        ) from exc
+    _sent_key.set(key)
+    return key
+
+
+def _note_rate_limit(raw_data: dict[str, Any]) -> None:
+    """Update the key pool when the API says a rate limit was hit.
+
+    Our counts can lag behind the server's if a key is also used elsewhere.
+    A spent daily limit is written to the key's ledger; any other rate limit
+    trips the key's circuit breaker for :data:`RATE_LIMIT_COOLDOWN`. The key
+    is the one the latest call in this context was sent with.
+    """
+    message = f"{raw_data.get('Note', '')} {raw_data.get('Information', '')}".lower()
+    # The standard per-minute Note quotes both limits ("5 calls per minute
+    # and 500 calls per day"); only a message naming the daily one alone
+    # means the day's budget is spent
+    daily = "per day" in message and "per minute" not in message
+    if not daily and "rate limit" not in message and "call frequency" not in message:
+        return
+    key = _sent_key.get()
+    pool = _get_key_pool()
+    if key not in pool.limiters:
+        return
+    if daily:
+        pool.mark_exhausted(key)
+    else:
+        pool.trip(key)
+
+
+def quota_status() -> dict[str, Any]:
+    """Report the remaining Alpha Vantage call budget.
+
+    Returns
+    -------
+    dict[str, Any]
+        A dict with keys ``calls_remaining_minute``, ``calls_used_today``,
+        ``calls_remaining_today`` and ``next_slot_at`` (a Unix timestamp;
+        now if a call may be sent immediately), summed over all API keys,
+        and ``keys``: the number of keys in the pool.
+
+    Raises
+    ------
+    MissingApiKeyError
+        If no API key is configured.
+    """
+    return _get_key_pool().status()
+
+
+# ---------------------------------------------------------------------------
+# HTTP requests
+# ---------------------------------------------------------------------------
+
+
+_session: requests.Session | None = None
+_session_pid: int | None = None
+_session_lock = threading.Lock()
+
+
+def _get_session() -> requests.Session:
+    """Return the shared HTTP session, creating it on first use.
+
+    A single session keeps TLS connections to the API host alive between
+    calls and is shared by every thread; a forked child gets its own.
+    """
+    global _session, _session_pid
+    with _session_lock:
+        if _session is None or _session_pid != os.getpid():
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers["Accept-Encoding"] = "gzip, deflate"
+            _session = session
+            _session_pid = os.getpid()
+        return _session
+
+
+def _base_url() -> str:
+    """Return the configured API endpoint (:data:`BASE_URL` by default)."""
+    return os.environ.get("ALPHAVANTAGE_BASE_URL", "").strip() or BASE_URL
+
+
+_cassette: Cassette | None = None
+_cassette_lock = threading.Lock()
+
+
+def _cassette_mode() -> str | None:
+    """Return the configured cassette mode, or None if no cassette is set."""
+    if not os.environ.get("ALPHAVANTAGE_CASSETTE", "").strip():
+        return None
+    return os.environ.get("ALPHAVANTAGE_CASSETTE_MODE", "").strip() or "replay"
+
+
+def _get_cassette() -> Cassette | None:
+    """Return the cassette named by ``ALPHAVANTAGE_CASSETTE``, if any.
+
+    It is loaded on first use and reloaded when the path or mode changes.
+
+    Raises
+    ------
+    ValueError
+        If ``ALPHAVANTAGE_CASSETTE_MODE`` is invalid or the file is not a
+        cassette.
+    """
+    global _cassette
+    mode = _cassette_mode()
+    if mode is None:
+        return None
+    path = os.path.abspath(os.environ["ALPHAVANTAGE_CASSETTE"].strip())
+    with _cassette_lock:
+        if _cassette is None or (str(_cassette.path), _cassette.mode) != (path, mode):
+            _cassette = Cassette(path, mode)
+        return _cassette
+
+
+def _retry_delay(attempt: int) -> float:
+    """Return the jittered exponential backoff before retry ``attempt``."""
+    return RETRY_BACKOFF * (2**attempt) * random.uniform(0.5, 1.5)
+
+
+def _request(
+    params: dict[str, str],
+    wait: bool = True,
+    stream: bool = False,
+) -> requests.Response:
+    """Send a query to the Alpha Vantage API.
+
+    Each attempt reserves a slot from the key pool and is sent with the key
+    that has the most headroom. Timeouts, connection
+    errors and 5xx responses are retried up to :data:`MAX_RETRIES` times with
+    jittered exponential backoff; anything else — including rate limit
+    responses — is returned or raised immediately.
+
+    With a cassette in replay mode the recorded response is returned
+    instead, without touching the network or the rate limiter; in record
+    mode every successful response is saved to it.
+
+    Parameters
+    ----------
+    params:
+        The query string parameters; ``apikey`` is added per attempt.
+    wait:
+        Queue for a rate-limit slot (True) or fail fast (False).
+    stream:
+        Defer downloading the body until it is iterated; the caller must
+        close the response.
+
+    Returns
+    -------
+    requests.Response
+        The successful response.
+
+    Raises
+    ------
+    RateLimitError
+        If the local rate limiter has no slot for the call.
+    ApiError
+        For network errors, timeouts, and HTTP error statuses, or a query
+        missing from the cassette being replayed.
+    """
+    cassette = _get_cassette()
+    if cassette is not None and cassette.mode == "replay":
+        response = cassette.play(params)
+        if response is None:
+            raise ApiError(
+                f"No recorded response for '{cassette_key(params)}' "
+                f"in cassette {cassette.path}"
+            )
+        return response
+    session = _get_session()
+    url = _base_url()
+    attempt = 0
+    while True:
+        key = _acquire_call_slot(wait)
+        try:
+            response = session.get(
+                url,
+                params={**params, "apikey": key},
+                timeout=REQUEST_TIMEOUT,
+                stream=stream,
+            )
+            response.raise_for_status()
+        except (requests.ConnectionError, requests.Timeout) as exc:
+            if attempt < MAX_RETRIES:
+                time.sleep(_retry_delay(attempt))
+                attempt += 1
+                continue
+            if isinstance(exc, requests.ConnectionError):
+                raise ApiError(
+                    f"Network error: Could not connect to Alpha Vantage API. "
+                    f"Please check your internet connection. Details: {exc}"
+                ) from exc
+            raise ApiError(
+                f"Request timed out after {REQUEST_TIMEOUT} seconds. "
+                f"The Alpha Vantage API may be slow. Please try again."
+            ) from exc
+        except requests.HTTPError as exc:
+            # Streamed, so the body still holds a pooled connection
+            exc.response.close()
+            if exc.response.status_code == 429:
+                _get_key_pool().trip(key)
+            if exc.response.status_code in RETRY_STATUSES and attempt < MAX_RETRIES:
+                time.sleep(_retry_delay(attempt))
+                attempt += 1
+                continue
+            raise ApiError(
+                f"HTTP error from Alpha Vantage API: {exc.response.status_code} "
+                f"{exc.response.reason}"
+            ) from exc
+        except requests.RequestException as exc:
+            raise ApiError(f"Request failed: {exc}") from exc
+
+        if cassette is not None:
+            try:
+                cassette.record(params, response)
+            except requests.RequestException as exc:
+                response.close()
+                raise ApiError(f"Request failed: {exc}") from exc
+        return response
+
+
+def _request_json(params: dict[str, str], wait: bool = True) -> dict[str, Any]:
+    """Send a query with :func:`_request` and decode the JSON body."""
+    return _request(params, wait=wait).json()
+
+
+def _stream_json(
+    params: dict[str, str],
+    time_series_key: str,
+    wait: bool = True,
+) -> tuple[dict[str, Any], TimeSeries | None]:
+    """Send a query and decode the JSON body incrementally as it arrives.
+
+    Returns
+    -------
+    tuple[dict[str, Any], TimeSeries | None]
+        The top-level members other than the time series, and the series
+        (None if the response has none).
+
+    Raises
+    ------
+    ApiError
+        If the connection fails mid-body or the body is not valid JSON.
+    """
+    response = _request(params, wait=wait, stream=True)
+    try:
+        return decode_time_series(
+            response.iter_content(STREAM_CHUNK_SIZE), time_series_key, _RESPONSE_FIELDS
         )
+    except requests.RequestException as exc:
+        raise ApiError(f"Request failed: {exc}") from exc
+    except ValueError as exc:
+        raise ApiError(f"Malformed JSON response from Alpha Vantage: {exc}") from exc
+    finally:
+        response.close()
+
+
+def _fetch_series(
+    params: dict[str, str],
+    time_series_key: str,
+    wait: bool = True,
+) -> TimeSeries:
+    """Request a time series and parse it according to ``params["datatype"]``.
+
+    Alpha Vantage reports errors as JSON even when CSV was requested, so a
+    CSV body that turns out to be a JSON object goes through the JSON parser
+    for its error checks. Full JSON histories are decoded as they stream in
+    rather than through ``response.json()``, to keep peak memory down.
+    """
+    series = None
+    if params.get("datatype") == "csv":
+        text = _request(params, wait=wait).text
+        if not text.lstrip().startswith("{"):
+            return _parse_csv_time_series(text)
+        raw_data = json.loads(text)
+    elif params.get("outputsize") == "full":
+        raw_data, series = _stream_json(params, time_series_key, wait=wait)
+    else:
+        raw_data = _request_json(params, wait=wait)
+    _note_rate_limit(raw_data)
+    if series is None:
+        return _parse_time_series(raw_data, time_series_key)
+    _raise_for_api_error(raw_data)
+    return series
+
+
+# ---------------------------------------------------------------------------
+# Request coalescing
+# ---------------------------------------------------------------------------
+
+
+class _Flight:
+    """An in-progress load that concurrent callers can wait on."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: TimeSeries | None = None
+        self.error: BaseException | None = None
+
+
+_inflight: dict[str, _Flight] = {}
+"""Loads currently in progress, keyed by cache key."""
+
+_inflight_lock = threading.Lock()
+
+
+def _single_flight(
+    key: str,
+    load: Callable[[], TimeSeries],
+) -> TimeSeries:
+    """Run ``load`` at most once at a time per key.
+
+    The first caller for a key becomes the leader and runs ``load``. Callers
+    that arrive while it is running — from any thread, e.g. concurrent
+    Streamlit sessions — block until it finishes and then share its result,
+    or re-raise its exception.
+
+    Parameters
+    ----------
+    key:
+        The cache key identifying the load.
+    load:
+        Callable that performs the request and returns the parsed series.
+
+    Returns
+    -------
+    TimeSeries
+        The series produced by the leader's ``load`` call.
+    """
+    with _inflight_lock:
+        flight = _inflight.get(key)
+        is_leader = flight is None
+        if flight is None:
+            flight = _inflight[key] = _Flight()
+
+    if not is_leader:
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        assert flight.result is not None
+        return flight.result
+
+    try:
+        flight.result = load()
+    except BaseException as exc:
+        flight.error = exc
+        raise
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+        flight.done.set()
+    return flight.result
+
+
+_revalidating: dict[str, threading.Thread] = {}
+"""Background refreshes currently running, keyed by cache key."""
+
+
+def _revalidate_in_background(key: str, load: Callable[[], TimeSeries]) -> None:
+    """Refresh ``key`` on a daemon thread unless a refresh is already running.
+
+    Errors are only logged: the caller has already been served stale data,
+    and the next call will retry (or raise) as usual.
+    """
+
+    def run() -> None:
+        try:
+            _single_flight(key, load)
+        except (AlphaVantageError, ValueError) as exc:
+            logger.info("Background refresh of %s failed: %s", key, exc)
+        except Exception:
+            logger.exception("Background refresh of %s failed", key)
+        finally:
+            with _inflight_lock:
+                _revalidating.pop(key, None)
+
+    with _inflight_lock:
+        if key in _revalidating or key in _inflight:
+            return
+        thread = _revalidating[key] = threading.Thread(
+            target=run, name=f"revalidate-{key}", daemon=True
+        )
+    thread.start()
+
+
+def _refresh_incrementally(
+    base: TimeSeries,
+    params: dict[str, str],
+    time_series_key: str,
+    wait: bool,
+) -> TimeSeries | None:
+    """Bring a stored full history up to date with a compact delta.
+
+    Fetches only the last :data:`COMPACT_SIZE` points and merges them over
+    the end of ``base``, replacing overlapping bars.
+
+    Returns
+    -------
+    TimeSeries | None
+        The merged history, or None if the delta does not overlap ``base``
+        (the history is too old to patch, so a full fetch is needed).
+    """
+    delta = _fetch_series({**params, "outputsize": "compact"}, time_series_key, wait)
+    return base.merge(delta)
+
+
+def _get_covering(params: dict[str, str], count: bool = False) -> TimeSeries | None:
+    """Return a cached series that covers the request described by ``params``.
+
+    A compact request is answered by its own entry or, failing that, by the
+    last :data:`COMPACT_SIZE` points of a cached full history. A full
+    request is only ever answered by a full entry. An intraday request can
+    also be answered by resampling a cached full series of a finer interval
+    that divides the requested one, since both cover the same trading days.
+
+    Parameters
+    ----------
+    params:
+        The query parameters of the request.
+    count:
+        Record the outcome in :func:`cache_stats`.
+    """
+    function, symbol = params["function"], params["symbol"]
+    interval, outputsize = params.get("interval"), params["outputsize"]
+
+    cached = get_cached(_cache_key(function, symbol, interval, outputsize))
+    if cached is not None:
+        if count:
+            _count(outputsize, "hits")
+        return cached
+
+    if outputsize == "compact":
+        full = get_cached(_cache_key(function, symbol, interval, "full"))
+        if full is not None:
+            if count:
+                _count(outputsize, "hits_from_full")
+            return _compact_tail(full)
+
+    derived = _derive_from_finer(function, symbol, interval)
+    if derived is not None:
+        if count:
+            _count(outputsize, "hits_derived")
+        return _compact_tail(derived) if outputsize == "compact" else derived
+
+    if count:
+        _count(outputsize, "misses")
+    return None
+
 
-    # Sort by date ascending (oldest first) for charting
-    records.sort(key=lambda r: r["date"])
-    return records
+def _compact_tail(series: TimeSeries) -> TimeSeries:
+    """Return the last :data:`COMPACT_SIZE` points of a cached full series.
+
+    The view is memoized on ``series``, so compact requests answered from
+    the same stored history get the same object and the memos keyed on it
+    (candles, matrices, indicators) keep hitting.
+    """
+    return memoized(series, "compact", lambda: series[-COMPACT_SIZE:])
+
+
+def _derive_from_finer(
+    function: str, symbol: str, interval: str | None
+) -> TimeSeries | None:
+    """Resample a cached full series of a finer interval to ``interval``."""
+    if interval not in INTRADAY_TARGETS:
+        return None
+    target = interval_minutes(interval)
+    # Prefer the coarsest usable source: fewer bars to aggregate
+    for finer in reversed(VALID_INTERVALS):
+        minutes = interval_minutes(finer)
+        if minutes >= target or target % minutes:
+            continue
+        source = get_cached(_cache_key(function, symbol, finer, "full"))
+        if isinstance(source, TimeSeries):
+            return _resample_memo.resample(symbol, finer, interval, source)
+    return None
+
+
+def _get_stale(params: dict[str, str], max_stale: float) -> TimeSeries | None:
+    """Return a cached series that expired at most ``max_stale`` seconds ago.
+
+    Follows the same coverage rules as :func:`_get_covering`.
+    """
+    function, symbol = params["function"], params["symbol"]
+    interval, outputsize = params.get("interval"), params["outputsize"]
+    oldest = time.time() - max_stale
+
+    entry = peek_entry(_cache_key(function, symbol, interval, outputsize))
+    if entry is not None and entry[0] >= oldest:
+        return entry[1]
+    if outputsize == "compact":
+        entry = peek_entry(_cache_key(function, symbol, interval, "full"))
+        if entry is not None and entry[0] >= oldest:
+            return _compact_tail(entry[1])
+    return None
+
+
+def _invalid_ticker_key(params: dict[str, str]) -> str:
+    """Return the cache key remembering that a request's symbol was rejected.
+
+    Coverage is left out: a symbol rejected for a compact request is just as
+    invalid for a full one.
+    """
+    return "invalid:" + _cache_key(
+        params["function"], params["symbol"], params.get("interval")
+    )
+
+
+def _load_series(
+    params: dict[str, str],
+    time_series_key: str,
+    wait: bool = True,
+    incremental: bool = True,
+    max_stale: float | None = None,
+) -> TimeSeries:
+    """Return a cached series for the request or fetch, parse and cache it.
+
+    Concurrent misses for the same key are coalesced into a single request,
+    which is scheduled through the rate limiter. A symbol the API rejected
+    is remembered for :data:`INVALID_TICKER_TTL` and rejected again locally.
+
+    Parameters
+    ----------
+    params:
+        The query string parameters for the API call. The function, symbol,
+        interval and outputsize identify the cache entry.
+    time_series_key:
+        The key in the response containing the time series data.
+    wait:
+        Queue for a rate-limit slot (True) or fail fast (False).
+    incremental:
+        For ``outputsize=full`` requests with an expired history still on
+        hand, fetch only a compact delta and merge it in.
+    max_stale:
+        If set, an entry that expired at most this many seconds ago is
+        returned immediately and refreshed on a background thread.
+
+    Returns
+    -------
+    TimeSeries
+        The parsed series, sorted by date ascending.
+
+    Raises
+    ------
+    InvalidTickerError
+        If the API rejected the symbol, now or within the last
+        :data:`INVALID_TICKER_TTL` seconds.
+    """
+    stale = _get_stale(params, max_stale) if max_stale is not None else None
+    cached = _get_covering(params, count=True)
+    if cached is not None:
+        return cached
+    rejected = get_cached(_invalid_ticker_key(params))
+    if rejected is not None:
+        raise InvalidTickerError(rejected)
+
+    key = _cache_key(
+        params["function"],
+        params["symbol"],
+        params.get("interval"),
+        params["outputsize"],
+    )
+
+    def load() -> TimeSeries:
+        # Another leader may have filled the cache between our miss and
+        # the time we took over the key.
+        cached = _get_covering(params)
+        if cached is not None:
+            return cached
+
+        if incremental and params["outputsize"] == "full":
+            base = _peek_cached(key)
+            if isinstance(base, TimeSeries):
+                merged = _refresh_incrementally(base, params, time_series_key, wait)
+                if merged is not None:
+                    set_cached(key, merged)
+                    return merged
+
+        try:
+            series = _fetch_series(params, time_series_key, wait)
+        except InvalidTickerError as exc:
+            set_cached(_invalid_ticker_key(params), str(exc), INVALID_TICKER_TTL)
+            raise
+        set_cached(key, series)
+        return series
+
+    if stale is not None:
+        _revalidate_in_background(key, load)
+        return stale
+    return _single_flight(key, load)
 
 
 # ---------------------------------------------------------------------------
@@ -262,89 +1307,177 @@ def _parse_time_series(
 # ---------------------------------------------------------------------------
 
 
+def _date_bounds(
+    start: DateLike | None, end: DateLike | None
+) -> tuple[np.datetime64 | None, np.datetime64 | None]:
+    """Convert ``start`` / ``end`` up front so bad dates fail before a fetch."""
+    return (
+        to_datetime64(start) if start is not None else None,
+        to_datetime64(end) if end is not None else None,
+    )
+
+
+def _validate_datatype(datatype: str) -> None:
+    """Raise ValueError unless ``datatype`` is supported."""
+    if datatype not in VALID_DATATYPES:
+        raise ValueError(
+            f"Invalid datatype '{datatype}'. "
+            f"Must be one of: {', '.join(VALID_DATATYPES)}"
+        )
+
+
+def _validate_max_points(max_points: int | None) -> None:
+    """Raise ValueError unless ``max_points`` is None or a positive integer."""
+    if max_points is not None and (int(max_points) != max_points or max_points < 1):
+        raise ValueError(f"max_points must be a positive integer, got {max_points!r}")
+
+
+def _select(
+    series: TimeSeries,
+    bounds: tuple[np.datetime64 | None, np.datetime64 | None],
+    max_points: int | None,
+) -> TimeSeries:
+    """Apply a fetch's date range and point budget to the cached series."""
+    if max_points is None:
+        if bounds == (None, None):
+            return series
+        return series.between(*bounds)
+    # Keyed on the cached series, so reruns reuse the candles until it changes
+    return memoized(
+        series,
+        ("fetch", bounds, max_points),
+        lambda: bucket_ohlc(series.between(*bounds), max_points),
+    )
+
+
+def _validate_outputsize(outputsize: str) -> None:
+    """Raise ValueError unless ``outputsize`` is supported."""
+    if outputsize not in VALID_OUTPUTSIZES:
+        raise ValueError(
+            f"Invalid outputsize '{outputsize}'. "
+            f"Must be one of: {', '.join(VALID_OUTPUTSIZES)}"
+        )
+
+
 def fetch_daily(
     symbol: str,
     outputsize: str = "compact",
-) -> list[dict[str, Any]]:
+    wait: bool = True,
+    incremental: bool = True,
+    max_stale: float | None = None,
+    datatype: str = "json",
+    start: DateLike | None = None,
+    end: DateLike | None = None,
+    max_points: int | None = None,
+) -> TimeSeries:
     """Fetch daily time series data for a stock symbol.
 
+    Concurrent calls for the same symbol share a single API request.
+
     Parameters
     ----------
     symbol:
         The stock ticker symbol (e.g., "AAPL", "GOOGL").
     outputsize:
         "compact" (last 100 data points) or "full" (20+ years).
-        Defaults to "compact".
+        Defaults to "compact". A cached full history also answers compact
+        requests, but a cached compact result never answers a full one.
+    wait:
+        On a cache miss, queue until the per-minute rate limit allows the
+        call (True, the default) or raise ``RateLimitError`` immediately if
+        it does not (False).
+    incremental:
+        When a ``full`` history has expired, refresh it by fetching only the
+        latest ``compact`` points and merging them in, instead of
+        downloading the whole history again. Falls back to a full download
+        if the stored history is too old to overlap. Defaults to True.
+    max_stale:
+        Opt in to stale-while-revalidate: if the cached entry expired no
+        more than this many seconds ago, return it immediately and refresh
+        it on a background thread. Refresh errors are not raised. Defaults
+        to None (expired entries are always refetched before returning).
+    datatype:
+        Wire format requested from the API: "json" (default) or "csv". The
+        CSV body is parsed straight into typed arrays and is several times
+        faster to decode, which matters for ``full`` histories. The result
+        is the same either way.
+    start, end:
+        Return only the bars dated from ``start`` through ``end``
+        (inclusive; either may be omitted). Accepts ISO strings, ``date``,
+        ``datetime`` or ``numpy.datetime64``. The range is located by
+        binary search on the cached series and returned as a view, so
+        re-filtering on every rerun is essentially free. See
+        :meth:`TimeSeries.between`.
+    max_points:
+        Chart budget: merge runs of consecutive bars (after the date range
+        is applied) so at most this many are returned, keeping every high
+        and low (see :func:`tools.downsample.downsample_ohlc`). The result
+        is remembered until the cached series changes. Defaults to None
+        (every bar).
 
     Returns
     -------
-    list[dict[str, Any]]
-        A list of dicts with keys: date, open, high, low, close, volume.
-        Sorted by date ascending.
+    TimeSeries
+        Columnar OHLCV data sorted by date ascending. ``data["close"]``
+        gives a column array; iterating yields dicts with keys: date, open,
+        high, low, close, volume.
 
     Raises
     ------
+    ValueError
+        If the outputsize or datatype is not one of the valid options,
+        ``start`` / ``end`` is not a valid date, or ``max_points`` is not a
+        positive integer.
     MissingApiKeyError
         If the API key is not configured.
     InvalidTickerError
         If the ticker symbol is invalid or no data is returned.
     RateLimitError
-        If the API rate limit has been exceeded.
+        If the API rate limit has been exceeded, or the call would exceed
+        the local per-minute or daily budget.
     ApiError
         For network errors or unexpected API responses.
     """
-    api_key = _get_api_key()
+    _validate_outputsize(outputsize)
+    _validate_datatype(datatype)
+    bounds = _date_bounds(start, end)
+    _validate_max_points(max_points)
+    _get_api_keys()
     symbol = symbol.upper().strip()
 
-    # Check cache
-    key = _cache_key("TIME_SERIES_DAILY", symbol)
-    cached = get_cached(key)
-    if cached is not None:
-        return cached
-
     params = {
         "function": "TIME_SERIES_DAILY",
         "symbol": symbol,
         "outputsize": outputsize,
-        "apikey": api_key,
+        "datatype": datatype,
     }
-
-    try:
-        response = requests.get(BASE_URL, params=params, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status()
-    except requests.ConnectionError as exc:
-        raise ApiError(
-            f"Network error: Could not connect to Alpha Vantage API. "
-            f"Please check your internet connection. Details: {exc}"
-        ) from exc
-    except requests.Timeout as exc:
-        raise ApiError(
-            f"Request timed out after {REQUEST_TIMEOUT} seconds. "
-            f"The Alpha Vantage API may be slow. Please try again."
-        ) from exc
-    except requests.HTTPError as exc:
-        raise ApiError(
-            f"HTTP error from Alpha Vantage API: {exc.response.status_code} "
-            f"{exc.response.reason}"
-        ) from exc
-    except requests.RequestException as exc:
-        raise ApiError(f"Request failed: {exc}") from exc
-
-    raw_data = response.json()
-    records = _parse_time_series(raw_data, "Time Series (Daily)")
-
-    # Cache the results
-    set_cached(key, records)
-    return records
+    series = _load_series(
+        params,
+        "Time Series (Daily)",
+        wait=wait,
+        incremental=incremental,
+        max_stale=max_stale,
+    )
+    return _select(series, bounds, max_points)
 
 
 def fetch_intraday(
     symbol: str,
     interval: str = "5min",
     outputsize: str = "compact",
-) -> list[dict[str, Any]]:
+    wait: bool = True,
+    incremental: bool = True,
+    max_stale: float | None = None,
+    datatype: str = "json",
+    start: DateLike | None = None,
+    end: DateLike | None = None,
+    max_points: int | None = None,
+) -> TimeSeries:
     """Fetch intraday time series data for a stock symbol.
 
+    Concurrent calls for the same symbol and interval share a single API
+    request.
+
     Parameters
     ----------
     symbol:
@@ -355,24 +1488,61 @@ def fetch_intraday(
         Defaults to "5min".
     outputsize:
         "compact" (last 100 data points) or "full" (full intraday data).
-        Defaults to "compact".
+        Defaults to "compact". A cached full series also answers compact
+        requests, but a cached compact result never answers a full one.
+    wait:
+        On a cache miss, queue until the per-minute rate limit allows the
+        call (True, the default) or raise ``RateLimitError`` immediately if
+        it does not (False).
+    incremental:
+        When a ``full`` history has expired, refresh it by fetching only the
+        latest ``compact`` points and merging them in, instead of
+        downloading the whole history again. Falls back to a full download
+        if the stored history is too old to overlap. Defaults to True.
+    max_stale:
+        Opt in to stale-while-revalidate: if the cached entry expired no
+        more than this many seconds ago, return it immediately and refresh
+        it on a background thread. Refresh errors are not raised. Defaults
+        to None (expired entries are always refetched before returning).
+    datatype:
+        Wire format requested from the API: "json" (default) or "csv". The
+        CSV body is parsed straight into typed arrays and is several times
+        faster to decode, which matters for ``full`` histories. The result
+        is the same either way.
+    start, end:
+        Return only the bars dated from ``start`` through ``end``
+        (inclusive; either may be omitted). Accepts ISO strings, ``date``,
+        ``datetime`` or ``numpy.datetime64``. The range is located by
+        binary search on the cached series and returned as a view, so
+        re-filtering on every rerun is essentially free. See
+        :meth:`TimeSeries.between`.
+    max_points:
+        Chart budget: merge runs of consecutive bars (after the date range
+        is applied) so at most this many are returned, keeping every high
+        and low (see :func:`tools.downsample.downsample_ohlc`). The result
+        is remembered until the cached series changes. Defaults to None
+        (every bar).
 
     Returns
     -------
-    list[dict[str, Any]]
-        A list of dicts with keys: date, open, high, low, close, volume.
-        Sorted by date ascending.
+    TimeSeries
+        Columnar OHLCV data sorted by date ascending. ``data["close"]``
+        gives a column array; iterating yields dicts with keys: date, open,
+        high, low, close, volume.
 
     Raises
     ------
     ValueError
-        If the interval is not one of the valid options.
+        If the interval, outputsize or datatype is not one of the valid
+        options, ``start`` / ``end`` is not a valid date, or ``max_points``
+        is not a positive integer.
     MissingApiKeyError
         If the API key is not configured.
     InvalidTickerError
         If the ticker symbol is invalid or no data is returned.
     RateLimitError
-        If the API rate limit has been exceeded.
+        If the API rate limit has been exceeded, or the call would exceed
+        the local per-minute or daily budget.
     ApiError
         For network errors or unexpected API responses.
     """
@@ -382,65 +1552,271 @@ def fetch_intraday(
             f"Must be one of: {', '.join(VALID_INTERVALS)}"
         )
 
-    api_key = _get_api_key()
+    _validate_outputsize(outputsize)
+    _validate_datatype(datatype)
+    bounds = _date_bounds(start, end)
+    _validate_max_points(max_points)
+    _get_api_keys()
     symbol = symbol.upper().strip()
 
-    # Check cache
-    key = _cache_key("TIME_SERIES_INTRADAY", symbol, interval)
-    cached = get_cached(key)
-    if cached is not None:
-        return cached
-
     params = {
         "function": "TIME_SERIES_INTRADAY",
         "symbol": symbol,
         "interval": interval,
         "outputsize": outputsize,
-        "apikey": api_key,
+        "datatype": datatype,
     }
+    series = _load_series(
+        params,
+        f"Time Series ({interval})",
+        wait=wait,
+        incremental=incremental,
+        max_stale=max_stale,
+    )
+    return _select(series, bounds, max_points)
 
-    try:
-        response = requests.get(BASE_URL, params=params, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status()
-    except requests.ConnectionError as exc:
-        raise ApiError(
-            f"Network error: Could not connect to Alpha Vantage API. "
-            f"Please check your internet connection. Details: {exc}"
-        ) from exc
-    except requests.Timeout as exc:
-        raise ApiError(
-            f"Request timed out after {REQUEST_TIMEOUT} seconds. "
-            f"The Alpha Vantage API may be slow. Please try again."
-        ) from exc
-    except requests.HTTPError as exc:
-        raise ApiError(
-            f"HTTP error from Alpha Vantage API: {exc.response.status_code} "
-            f"{exc.response.reason}"
-        ) from exc
-    except requests.RequestException as exc:
-        raise ApiError(f"Request failed: {exc}") from exc
 
-    raw_data = response.json()
-    time_series_key = f"Time Series ({interval})"
-    records = _parse_time_series(raw_data, time_series_key)
+def fetch_resampled(
+    symbol: str,
+    target: str,
+    source: str | None = None,
+    start: DateLike | None = None,
+    end: DateLike | None = None,
+    **kwargs: Any,
+) -> TimeSeries:
+    """Fetch bars of one granularity and aggregate them into coarser bars.
+
+    Weekly and monthly bars are derived from the daily history, and coarse
+    intraday bars from a finer interval, so no extra endpoint is called.
+    Results are memoized per (symbol, source interval, target) for as long
+    as the source series stays cached.
+
+    Parameters
+    ----------
+    symbol:
+        The stock ticker symbol (e.g., "AAPL", "GOOGL").
+    target:
+        "weekly" or "monthly" (from daily bars), or "5min", "15min",
+        "30min" or "60min" (from intraday bars).
+    source:
+        The intraday interval to aggregate from; it must be finer than
+        ``target`` and divide it evenly. Defaults to "1min". Ignored for
+        weekly and monthly targets.
+    start, end:
+        Date range applied to the resampled bars (see :func:`fetch_daily`).
+    **kwargs:
+        Passed to :func:`fetch_daily` or :func:`fetch_intraday`. For weekly
+        and monthly targets ``outputsize`` defaults to "full", since 100
+        days make only a handful of monthly bars. For intraday targets a
+        compact source covers only the last 100 source bars; pass
+        ``outputsize="full"`` for whole sessions.
+
+    Returns
+    -------
+    TimeSeries
+        First open, highest high, lowest low, last close and summed volume
+        per period. Weekly and monthly bars are dated by the last trading
+        day of the period; intraday bars by the start of their window.
+
+    Raises
+    ------
+    ValueError
+        If ``target`` or ``source`` is invalid, or ``source`` cannot be
+        aggregated into ``target``.
+    AlphaVantageError
+        As raised by the underlying fetch.
+    """
+    bounds = _date_bounds(start, end)
+    symbol = symbol.upper().strip()
+
+    if target in CALENDAR_TARGETS:
+        kwargs.setdefault("outputsize", "full")
+        source = "daily"
+        series = fetch_daily(symbol, **kwargs)
+    elif target in INTRADAY_TARGETS:
+        source = source or "1min"
+        if source not in VALID_INTERVALS:
+            raise ValueError(
+                f"Invalid interval '{source}'. "
+                f"Must be one of: {', '.join(VALID_INTERVALS)}"
+            )
+        minutes = interval_minutes(source)
+        if minutes >= interval_minutes(target) or interval_minutes(target) % minutes:
+            raise ValueError(f"Cannot resample '{source}' bars to '{target}'")
+        series = fetch_intraday(symbol, interval=source, **kwargs)
+    else:
+        valid = ", ".join([*INTRADAY_TARGETS, *CALENDAR_TARGETS])
+        raise ValueError(f"Invalid resample target '{target}'. Must be one of: {valid}")
+
+    resampled = _resample_memo.resample(symbol, source, target, series)
+    if start is None and end is None:
+        return resampled
+    return resampled.between(*bounds)
+
+
+# ---------------------------------------------------------------------------
+# Batch fetching
+# ---------------------------------------------------------------------------
+
+Entry = tuple[str, str | None]
+"""A series to load: (symbol, intraday interval or None for daily)."""
+
+
+def parse_entries(items: Iterable[str]) -> list[Entry]:
+    """Parse entries such as ``"aapl"`` (daily) or ``"SPY@5min"`` (intraday).
+
+    Each item may itself be a comma-separated list. Symbols are upper-cased,
+    and blank and duplicate entries dropped.
+
+    Raises
+    ------
+    ValueError
+        If an entry names an unsupported interval.
+    """
+    entries: list[Entry] = []
+    for item in (part for text in items for part in text.split(",")):
+        symbol, _, interval = item.strip().partition("@")
+        symbol = symbol.strip().upper()
+        if not symbol:
+            continue
+        interval = interval.strip() or None
+        if interval is not None and interval not in VALID_INTERVALS:
+            raise ValueError(
+                f"Invalid interval '{interval}' in entry '{item.strip()}'. "
+                f"Must be one of: {', '.join(VALID_INTERVALS)}"
+            )
+        if (symbol, interval) not in entries:
+            entries.append((symbol, interval))
+    return entries
+
+
+def format_entry(entry: Entry) -> str:
+    """Return the ``SYMBOL[@INTERVAL]`` text of an entry."""
+    symbol, interval = entry
+    return f"{symbol}@{interval}" if interval else symbol
+
+
+def fetch_batch(
+    entries: Iterable[Entry],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    **kwargs: Any,
+) -> Iterator[tuple[Entry, TimeSeries | Exception]]:
+    """Fetch several series concurrently, yielding each as soon as it loads.
+
+    Each fetch goes through :func:`fetch_daily` or :func:`fetch_intraday`
+    on a worker thread, so the caches, request coalescing and rate limiter
+    apply as usual.
+
+    Parameters
+    ----------
+    entries:
+        The series to load, e.g. from :func:`parse_entries`.
+    concurrency:
+        Maximum number of fetches in flight at once. Calls beyond the
+        per-minute budget still queue in the rate limiter.
+    **kwargs:
+        Passed to every fetch (e.g. ``outputsize``, ``start``,
+        ``max_points``).
+
+    Yields
+    ------
+    tuple[Entry, TimeSeries | Exception]
+        Each entry with its series or the ``AlphaVantageError`` /
+        ``ValueError`` its fetch raised, in completion order. One bad symbol
+        never prevents the others from loading.
 
-    # Cache the results
-    set_cached(key, records)
-    return records
+    Raises
+    ------
+    ValueError
+        If ``concurrency`` is less than 1.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    def load(entry: Entry) -> TimeSeries:
+        symbol, interval = entry
+        if interval is None:
+            return fetch_daily(symbol, **kwargs)
+        return fetch_intraday(symbol, interval=interval, **kwargs)
+
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=concurrency, thread_name_prefix="alpha-vantage-batch"
+    )
+    try:
+        futures = {executor.submit(load, entry): entry for entry in entries}
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                result: TimeSeries | Exception = future.result()
+            except (AlphaVantageError, ValueError) as exc:
+                result = exc
+            yield futures[future], result
+    finally:
+        # A consumer that stops early does not wait for the queued fetches
+        executor.shutdown(wait=False, cancel_futures=True)
 
 
 # ---------------------------------------------------------------------------
 # CLI interface
 # ---------------------------------------------------------------------------
 
+DEFAULT_DAEMON_SOCKET = str(
+    Path(__file__).resolve().parent.parent / "data" / "alpha_vantage.sock"
+)
+"""Default socket of the resident daemon started by the 'serve' subcommand.
+
+Override with the ``ALPHAVANTAGE_DAEMON_SOCKET`` environment variable; set it
+to an empty string to always run commands in-process.
+"""
+
+
+def _daemon_socket_path() -> str:
+    """Return the configured daemon socket ("" if forwarding is disabled)."""
+    return os.environ.get("ALPHAVANTAGE_DAEMON_SOCKET", DEFAULT_DAEMON_SOCKET).strip()
+
+
+class _RelayedStream(io.TextIOBase):
+    """Passes a forwarded command's output through, noting whether any came."""
+
+    def __init__(self, stream: TextIO) -> None:
+        self._stream = stream
+        self.written = False
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        self.written = self.written or bool(text)
+        return self._stream.write(text)
+
+    def flush(self) -> None:
+        self._stream.flush()
 
-def _cli_daily(args: list[str]) -> None:
+
+def _option(args: list[str], name: str) -> str | None:
+    """Return the value following flag ``name`` in ``args``, if present."""
+    if name in args:
+        i = args.index(name)
+        if i + 1 < len(args):
+            return args[i + 1]
+    return None
+
+
+def _int_option(args: list[str], name: str) -> int | None:
+    """Return the integer value following flag ``name`` in ``args``, if present."""
+    value = _option(args, name)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"Invalid {name} value '{value}'") from None
+
+
+def _cli_daily(args: list[str], out: TextIO, err: TextIO) -> int:
     """Handle the 'daily' subcommand."""
     if not args:
-        print(
-            "Error: Please provide a stock symbol. Usage: daily AAPL", file=sys.stderr
-        )
-        sys.exit(1)
+        print("Error: Please provide a stock symbol. Usage: daily AAPL", file=err)
+        return 1
 
     symbol = args[0]
     outputsize = "compact"
@@ -448,21 +1824,30 @@ def _cli_daily(args: list[str]) -> None:
         outputsize = "full"
 
     try:
-        data = fetch_daily(symbol, outputsize=outputsize)
-        print(json.dumps(data, indent=2))
-    except AlphaVantageError as exc:
-        print(f"Error: {exc}", file=sys.stderr)
-        sys.exit(1)
+        # Full histories decode several times faster from CSV
+        data = fetch_daily(
+            symbol,
+            outputsize=outputsize,
+            datatype="csv" if outputsize == "full" else "json",
+            start=_option(args, "--start"),
+            end=_option(args, "--end"),
+            max_points=_int_option(args, "--max-points"),
+        )
+        print(json.dumps(data.to_records(), indent=2), file=out)
+    except (AlphaVantageError, ValueError) as exc:
+        print(f"Error: {exc}", file=err)
+        return 1
+    return 0
 
 
-def _cli_intraday(args: list[str]) -> None:
+def _cli_intraday(args: list[str], out: TextIO, err: TextIO) -> int:
     """Handle the 'intraday' subcommand."""
     if not args:
         print(
             "Error: Please provide a stock symbol. Usage: intraday AAPL --interval 5min",
-            file=sys.stderr,
+            file=err,
         )
-        sys.exit(1)
+        return 1
 
     symbol = args[0]
     interval = "5min"
@@ -482,45 +1867,216 @@ def _cli_intraday(args: list[str]) -> None:
             i += 1
 
     try:
-        data = fetch_intraday(symbol, interval=interval, outputsize=outputsize)
-        print(json.dumps(data, indent=2))
+        data = fetch_intraday(
+            symbol,
+            interval=interval,
+            outputsize=outputsize,
+            datatype="csv" if outputsize == "full" else "json",
+            start=_option(remaining, "--start"),
+            end=_option(remaining, "--end"),
+            max_points=_int_option(remaining, "--max-points"),
+        )
+        print(json.dumps(data.to_records(), indent=2), file=out)
     except (AlphaVantageError, ValueError) as exc:
-        print(f"Error: {exc}", file=sys.stderr)
-        sys.exit(1)
+        print(f"Error: {exc}", file=err)
+        return 1
+    return 0
 
 
-def main() -> None:
-    """CLI entry point for the Alpha Vantage tool.
+_BATCH_OPTIONS = ("--start", "--end", "--max-points", "--concurrency")
+"""Options of the 'batch' subcommand that take a value."""
 
-    Usage:
-        python -m tools.alpha_vantage daily AAPL [--full]
-        python -m tools.alpha_vantage intraday AAPL [--interval 5min] [--full]
+
+def _cli_batch(args: list[str], out: TextIO, err: TextIO) -> int:
+    """Handle the 'batch' subcommand.
+
+    Writes one JSON line per entry as soon as it loads: ``{"symbol",
+    "interval", "data"}`` on success, ``{"symbol", "interval", "error",
+    "error_type"}`` on failure. Returns status 1 if any entry failed.
     """
-    if len(sys.argv) < 2:
+    items = [
+        arg
+        for i, arg in enumerate(args)
+        if not arg.startswith("--") and (i == 0 or args[i - 1] not in _BATCH_OPTIONS)
+    ]
+    try:
+        entries = parse_entries(items)
+        concurrency = _int_option(args, "--concurrency")
+        if concurrency is not None and concurrency < 1:
+            raise ValueError("--concurrency must be at least 1")
+        outputsize = "full" if "--full" in args else "compact"
+        kwargs: dict[str, Any] = {
+            "outputsize": outputsize,
+            "datatype": "csv" if outputsize == "full" else "json",
+            "start": _option(args, "--start"),
+            "end": _option(args, "--end"),
+            "max_points": _int_option(args, "--max-points"),
+        }
+        # Catch bad options and a missing key before starting any fetches
+        _date_bounds(kwargs["start"], kwargs["end"])
+        _validate_max_points(kwargs["max_points"])
+        _get_api_keys()
+    except (AlphaVantageError, ValueError) as exc:
+        print(f"Error: {exc}", file=err)
+        return 1
+    if not entries:
         print(
-            "Usage:\n"
-            "  python -m tools.alpha_vantage daily SYMBOL [--full]\n"
-            "  python -m tools.alpha_vantage intraday SYMBOL [--interval INTERVAL] [--full]\n"
-            "\n"
-            "Intervals: 1min, 5min, 15min, 30min, 60min\n"
-            "Output: JSON array of {date, open, high, low, close, volume}",
-            file=sys.stderr,
+            "Error: Please provide stock symbols. Usage: batch AAPL MSFT SPY@5min",
+            file=err,
         )
-        sys.exit(1)
+        return 1
+
+    failed = False
+    results = fetch_batch(entries, concurrency or DEFAULT_CONCURRENCY, **kwargs)
+    for (symbol, interval), result in results:
+        line: dict[str, Any] = {"symbol": symbol, "interval": interval}
+        if isinstance(result, Exception):
+            failed = True
+            line.update(error=str(result), error_type=type(result).__name__)
+        else:
+            line["data"] = result.to_records()
+        print(json.dumps(line), file=out, flush=True)
+    return 1 if failed else 0
 
-    command = sys.argv[1].lower()
-    args = sys.argv[2:]
 
-    if command == "daily":
-        _cli_daily(args)
-    elif command == "intraday":
-        _cli_intraday(args)
-    else:
+def _cli_quota(out: TextIO, err: TextIO) -> int:
+    """Handle the 'quota' subcommand."""
+    try:
+        status = quota_status()
+    except AlphaVantageError as exc:
+        print(f"Error: {exc}", file=err)
+        return 1
+    status["next_slot_at"] = time.strftime(
+        "%Y-%m-%dT%H:%M:%S%z", time.localtime(status["next_slot_at"])
+    )
+    print(json.dumps(status, indent=2), file=out)
+    return 0
+
+
+def _cli_serve(args: list[str], err: TextIO) -> int:
+    """Handle the 'serve' subcommand: run the resident daemon until interrupted.
+
+    The daemon keeps the in-memory cache, the key pool and the HTTP session
+    warm across CLI calls, which forward to it over
+    ``ALPHAVANTAGE_DAEMON_SOCKET`` while it runs. Commands use the daemon's
+    environment (API keys, cache database), not the calling shell's.
+    """
+    path = _option(args, "--socket") or _daemon_socket_path()
+    if not path:
         print(
-            f"Error: Unknown command '{command}'. Use 'daily' or 'intraday'.",
-            file=sys.stderr,
+            "Error: ALPHAVANTAGE_DAEMON_SOCKET is empty. "
+            "Pass --socket PATH to choose where to listen.",
+            file=err,
         )
-        sys.exit(1)
+        return 1
+    try:
+        server = CommandServer(path, _run_cli)
+    except (FileExistsError, OSError) as exc:
+        print(f"Error: {exc}", file=err)
+        return 1
+    # Stop as cleanly on a plain `kill` as on Ctrl+C, removing the socket
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    with server:
+        print(f"Serving on {server.path} (Ctrl+C to stop)", file=err, flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+_USAGE = (
+    "Usage:\n"
+    "  python -m tools.alpha_vantage daily SYMBOL [--full]"
+    " [--start DATE] [--end DATE] [--max-points N]\n"
+    "  python -m tools.alpha_vantage intraday SYMBOL [--interval INTERVAL] [--full]"
+    " [--start DATE] [--end DATE] [--max-points N]\n"
+    "  python -m tools.alpha_vantage batch SYMBOL[@INTERVAL] ... [--full]"
+    " [--start DATE] [--end DATE] [--max-points N] [--concurrency N]\n"
+    "  python -m tools.alpha_vantage quota\n"
+    "  python -m tools.alpha_vantage serve [--socket PATH]\n"
+    "\n"
+    "Intervals: 1min, 5min, 15min, 30min, 60min\n"
+    "Output: JSON array of {date, open, high, low, close, volume}; batch\n"
+    "writes one JSON line per symbol as it loads\n"
+    "\n"
+    "While 'serve' runs, the other commands are forwarded to it and share its\n"
+    "warm cache, rate limiter and connections."
+)
+
+
+def _run_cli(argv: list[str], out: TextIO, err: TextIO) -> int:
+    """Run one CLI command line and return its exit status.
+
+    This is what :func:`main` runs in-process, and what the daemon runs for
+    each forwarded call.
+    """
+    if not argv:
+        print(_USAGE, file=err)
+        return 1
+
+    command = argv[0].lower()
+    args = argv[1:]
+
+    if command == "daily":
+        return _cli_daily(args, out, err)
+    if command == "intraday":
+        return _cli_intraday(args, out, err)
+    if command == "batch":
+        return _cli_batch(args, out, err)
+    if command == "quota":
+        return _cli_quota(out, err)
+    if command == "serve":
+        if threading.current_thread() is not threading.main_thread():
+            print("Error: The daemon is already running.", file=err)
+            return 1
+        return _cli_serve(args, err)
+    print(
+        f"Error: Unknown command '{command}'. "
+        "Use 'daily', 'intraday', 'batch', 'quota' or 'serve'.",
+        file=err,
+    )
+    return 1
+
+
+def main() -> None:
+    """CLI entry point for the Alpha Vantage tool.
+
+    Commands are forwarded to the resident daemon when one is listening on
+    ``ALPHAVANTAGE_DAEMON_SOCKET``, and run in-process otherwise, or if the
+    daemon goes away before the command has written any output.
+
+    Usage:
+        python -m tools.alpha_vantage daily AAPL [--full] [--start DATE] [--end DATE]
+            [--max-points N]
+        python -m tools.alpha_vantage intraday AAPL [--interval 5min] [--full]
+            [--start DATE] [--end DATE] [--max-points N]
+        python -m tools.alpha_vantage batch AAPL MSFT SPY@5min [--full]
+            [--start DATE] [--end DATE] [--max-points N] [--concurrency N]
+        python -m tools.alpha_vantage quota
+        python -m tools.alpha_vantage serve [--socket PATH]
+    """
+    argv = sys.argv[1:]
+    code = None
+    path = _daemon_socket_path()
+    if path and argv and argv[0].lower() != "serve":
+        out = _RelayedStream(sys.stdout)
+        try:
+            code = forward(path, argv, out, sys.stderr)
+        except ConnectionError as exc:
+            # Every forwarded command only reads, so it is safe to run again,
+            # unless part of its output is already out and would repeat
+            if out.written:
+                print(f"Error: {exc}", file=sys.stderr)
+                sys.exit(1)
+            print(
+                f"Warning: Daemon connection lost ({exc}); retrying locally.",
+                file=sys.stderr,
+            )
+    if code is None:
+        code = _run_cli(argv, sys.stdout, sys.stderr)
+    if code:
+        sys.exit(code)
 
 
 if __name__ == "__main__":
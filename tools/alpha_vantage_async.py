@@ -0,0 +1,138 @@
+"""Asyncio interface to the Alpha Vantage client.
+
+Fetching several symbols one after another makes total latency the sum of
+every round trip. This module runs the fetches concurrently with a bounded
+number in flight. Each fetch goes through the regular
+:mod:`tools.alpha_vantage` functions on a worker thread, so the two-tier cache,
+request coalescing, rate limiter and pooled HTTP session are all shared with
+synchronous callers.
+
+Usage from async code:
+    from tools.alpha_vantage_async import fetch_many
+    results = await fetch_many(["AAPL", "MSFT", "GOOGL"])
+
+Usage from a Streamlit script (or any synchronous code):
+    from tools.alpha_vantage_async import fetch_many_sync
+    results = fetch_many_sync(["AAPL", "MSFT", "GOOGL"])
+    for symbol, result in results.items():
+        if isinstance(result, Exception):
+            ...  # InvalidTickerError, RateLimitError, ...
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+from collections.abc import Iterable
+from typing import Any
+
+from tools.alpha_vantage import (
+    DEFAULT_CONCURRENCY,
+    AlphaVantageError,
+    fetch_daily,
+    fetch_intraday,
+)
+from tools.timeseries import TimeSeries
+
+_FETCHERS = {
+    "daily": fetch_daily,
+    "intraday": fetch_intraday,
+}
+
+
+async def fetch_daily_async(symbol: str, **kwargs: Any) -> TimeSeries:
+    """Async version of :func:`tools.alpha_vantage.fetch_daily`.
+
+    Accepts the same keyword arguments and raises the same exceptions.
+    """
+    return await asyncio.to_thread(fetch_daily, symbol, **kwargs)
+
+
+async def fetch_intraday_async(symbol: str, **kwargs: Any) -> TimeSeries:
+    """Async version of :func:`tools.alpha_vantage.fetch_intraday`.
+
+    Accepts the same keyword arguments and raises the same exceptions.
+    """
+    return await asyncio.to_thread(fetch_intraday, symbol, **kwargs)
+
+
+async def fetch_many(
+    symbols: Iterable[str],
+    function: str = "daily",
+    concurrency: int = DEFAULT_CONCURRENCY,
+    **kwargs: Any,
+) -> dict[str, TimeSeries | Exception]:
+    """Fetch several symbols concurrently.
+
+    Parameters
+    ----------
+    symbols:
+        Ticker symbols to fetch. Duplicates (after upper-casing) are fetched
+        once.
+    function:
+        "daily" or "intraday".
+    concurrency:
+        Maximum number of fetches in flight at once. Requests beyond the
+        per-minute rate limit still queue in the limiter.
+    **kwargs:
+        Passed to the underlying fetch function (e.g. ``outputsize``,
+        ``interval``, ``wait``).
+
+    Returns
+    -------
+    dict[str, TimeSeries | Exception]
+        Maps each upper-cased symbol, in input order, to its series or to
+        the ``AlphaVantageError`` / ``ValueError`` its fetch raised. One bad
+        symbol never prevents the others from loading.
+
+    Raises
+    ------
+    ValueError
+        If ``function`` or ``concurrency`` is invalid.
+    """
+    if function not in _FETCHERS:
+        raise ValueError(
+            f"Invalid function '{function}'. Must be one of: {', '.join(_FETCHERS)}"
+        )
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    fetcher = _FETCHERS[function]
+    unique = list(dict.fromkeys(s.upper().strip() for s in symbols))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch_one(symbol: str) -> TimeSeries | Exception:
+        async with semaphore:
+            try:
+                return await asyncio.to_thread(fetcher, symbol, **kwargs)
+            except (AlphaVantageError, ValueError) as exc:
+                return exc
+
+    results = await asyncio.gather(*(fetch_one(s) for s in unique))
+    return dict(zip(unique, results))
+
+
+def fetch_many_sync(
+    symbols: Iterable[str],
+    function: str = "daily",
+    concurrency: int = DEFAULT_CONCURRENCY,
+    **kwargs: Any,
+) -> dict[str, TimeSeries | Exception]:
+    """Blocking wrapper around :func:`fetch_many`.
+
+    Safe to call from a Streamlit script. If the calling thread already has
+    a running event loop, the fetch runs on a separate thread with its own.
+
+    Parameters and return value are the same as for :func:`fetch_many`.
+    """
+    symbols = list(symbols)
+
+    def run() -> dict[str, TimeSeries | Exception]:
+        return asyncio.run(fetch_many(symbols, function, concurrency, **kwargs))
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return run()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(run).result()
@@ -0,0 +1,164 @@
+"""Record/replay of raw Alpha Vantage responses.
+
+Live responses change every day, so a slow fetch or dashboard seen once
+cannot be reproduced the next. A cassette pins them down:
+
+- In **record** mode every successful API response body is saved, keyed
+  by its query parameters minus ``apikey``.
+- In **replay** mode those bodies are served back without any network
+  access, rate limiting or API key, so benchmark and profiling runs see
+  the same real payloads every time.
+
+Cassettes are gzip-compressed JSON lines, one member appended per
+recorded response, so recording is cheap and a run cut short keeps what
+it had recorded. A response recorded twice replays its latest body.
+
+Selected with environment variables (see :mod:`tools.alpha_vantage`):
+
+- ``ALPHAVANTAGE_CASSETTE``: the cassette file.
+- ``ALPHAVANTAGE_CASSETTE_MODE``: ``replay`` (default) or ``record``.
+
+For fully deterministic replays, also disable the disk cache tier
+(``ALPHAVANTAGE_CACHE_DB=``) so nothing is served from earlier live runs.
+
+Usage:
+    ALPHAVANTAGE_CASSETTE=data/aapl.jsonl.gz ALPHAVANTAGE_CASSETTE_MODE=record \\
+        python -m tools.alpha_vantage daily AAPL --full
+    ALPHAVANTAGE_CASSETTE=data/aapl.jsonl.gz ALPHAVANTAGE_CACHE_DB= \\
+        python -m tools.alpha_vantage daily AAPL --full   # offline, identical
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import threading
+import zlib
+from pathlib import Path
+from urllib.parse import urlencode
+
+import requests
+
+MODES = ("replay", "record")
+"""Supported cassette modes."""
+
+_NOTICE_MAX_BYTES = 4096
+"""Bodies up to this size are checked for rate-limit notices before being
+recorded; real payloads are far larger."""
+
+
+def cassette_key(params: dict[str, str]) -> str:
+    """Return the key a query is recorded under: its sorted parameters
+    without ``apikey``, as a query string."""
+    return urlencode(sorted((k, v) for k, v in params.items() if k != "apikey"))
+
+
+def _is_notice(body: str) -> bool:
+    """Return True if ``body`` is a rate-limit notice rather than data.
+
+    Notices depend on how busy the key was while recording, so replaying
+    one would make the run fail for reasons that no longer apply.
+    """
+    if len(body) > _NOTICE_MAX_BYTES or not body.lstrip().startswith("{"):
+        return False
+    try:
+        decoded = json.loads(body)
+    except ValueError:
+        return False
+    return isinstance(decoded, dict) and ("Note" in decoded or "Information" in decoded)
+
+
+def _replay_response(body: bytes, key: str) -> requests.Response:
+    """Build a completed ``requests.Response`` carrying ``body``."""
+    response = requests.Response()
+    response.status_code = 200
+    response.reason = "OK"
+    response._content = body
+    response._content_consumed = True
+    response.encoding = "utf-8"
+    response.url = f"cassette:?{key}"
+    csv = "datatype=csv" in key and not body.lstrip().startswith(b"{")
+    response.headers["Content-Type"] = (
+        "application/x-download" if csv else "application/json"
+    )
+    return response
+
+
+class Cassette:
+    """Recorded API responses stored in one compressed file.
+
+    Parameters
+    ----------
+    path:
+        Location of the cassette file. Parent directories are created when
+        recording starts; in replay mode a missing file replays nothing.
+    mode:
+        "replay" or "record".
+
+    Raises
+    ------
+    ValueError
+        If ``mode`` is not supported or the file is not a cassette.
+    """
+
+    def __init__(self, path: str | os.PathLike[str], mode: str = "replay") -> None:
+        if mode not in MODES:
+            raise ValueError(
+                f"Invalid cassette mode '{mode}'. Must be one of: {', '.join(MODES)}"
+            )
+        self.path = Path(path)
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._bodies = self._load()
+
+    def _load(self) -> dict[str, str]:
+        """Read every recorded body; a truncated final member is ignored."""
+        bodies: dict[str, str] = {}
+        if not self.path.exists():
+            return bodies
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as lines:
+                for line in lines:
+                    entry = json.loads(line)
+                    bodies[entry["key"]] = entry["body"]
+        except (EOFError, zlib.error):
+            pass  # Cut off mid-write; keep the complete entries
+        except (gzip.BadGzipFile, ValueError, KeyError, TypeError) as exc:
+            raise ValueError(f"Unreadable cassette {self.path}: {exc}") from exc
+        return bodies
+
+    def __len__(self) -> int:
+        return len(self._bodies)
+
+    def keys(self) -> list[str]:
+        """Return the keys of the recorded responses."""
+        with self._lock:
+            return list(self._bodies)
+
+    def play(self, params: dict[str, str]) -> requests.Response | None:
+        """Return the recorded response for a query, or None if there is none."""
+        key = cassette_key(params)
+        with self._lock:
+            body = self._bodies.get(key)
+        if body is None:
+            return None
+        return _replay_response(body.encode("utf-8"), key)
+
+    def record(self, params: dict[str, str], response: requests.Response) -> None:
+        """Save the body of a successful response to a query.
+
+        The body is read in full, so a streamed response is downloaded
+        here; it can still be iterated afterwards. Rate-limit notices are
+        not recorded.
+        """
+        key = cassette_key(params)
+        body = response.content.decode("utf-8")
+        if _is_notice(body):
+            return
+        line = json.dumps({"key": key, "body": body}, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._bodies[key] = body
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with gzip.open(self.path, "ab") as out:
+                out.write(line.encode("utf-8"))
@@ -0,0 +1,212 @@
+"""Resident process that runs CLI commands sent over a Unix socket.
+
+Every ``python -m tools.alpha_vantage`` call the agent makes starts a fresh
+interpreter: the in-memory cache tier, the indicator and chart memos and the
+keep-alive HTTP connections all start cold and die with it. A
+:class:`CommandServer` runs the same command handler inside one long-lived
+process instead, and :func:`forward` is the thin client: it sends a command
+line over the socket and relays the output as it is written, or reports that
+no server is listening so the caller can run the command itself.
+
+The wire protocol is one JSON object per line:
+
+- client to server: ``{"argv": [...]}``
+- server to client: ``{"out": text}`` and ``{"err": text}`` chunks as the
+  command writes them, then ``{"exit": code}``
+
+Commands run with the server's environment and working directory, not the
+client's.
+
+Usage:
+    from tools.daemon import CommandServer, forward
+
+    # handler(argv, out, err) -> exit status
+    with CommandServer("data/alpha_vantage.sock", handler) as server:
+        server.serve_forever()
+
+    code = forward("data/alpha_vantage.sock", ["daily", "AAPL"])
+    if code is None:
+        ...  # No server listening: run the command in-process
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+from collections.abc import Callable
+from pathlib import Path
+from typing import BinaryIO, TextIO
+
+Handler = Callable[[list[str], TextIO, TextIO], int]
+"""Runs one command line, writing to the given stdout and stderr streams,
+and returns its exit status."""
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+
+class _SocketWriter(io.TextIOBase):
+    """Text stream that sends each write to the client as one message."""
+
+    def __init__(self, wfile: BinaryIO, stream: str, lock: threading.Lock) -> None:
+        self._wfile = wfile
+        self._stream = stream
+        self._lock = lock
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        if text:
+            _send(self._wfile, {self._stream: text}, self._lock)
+        return len(text)
+
+
+def _send(wfile: BinaryIO, message: dict[str, object], lock: threading.Lock) -> None:
+    line = json.dumps(message, separators=(",", ":")).encode("utf-8") + b"\n"
+    with lock:
+        wfile.write(line)
+        wfile.flush()
+
+
+class _CommandHandler(socketserver.StreamRequestHandler):
+    """Runs the command line sent on one connection."""
+
+    server: CommandServer
+
+    def handle(self) -> None:
+        try:
+            request = json.loads(self.rfile.readline())
+            argv = request["argv"]
+            if not isinstance(argv, list) or not all(isinstance(a, str) for a in argv):
+                raise TypeError("argv must be a list of strings")
+        except (ValueError, KeyError, TypeError) as exc:
+            message = {"err": f"Error: Malformed request: {exc}\n", "exit": 2}
+            _send(self.wfile, message, threading.Lock())
+            return
+
+        lock = threading.Lock()
+        out = _SocketWriter(self.wfile, "out", lock)
+        err = _SocketWriter(self.wfile, "err", lock)
+        try:
+            try:
+                code = self.server.handler(argv, out, err)
+            except SystemExit as exc:
+                code = exc.code if isinstance(exc.code, int) else 1
+            except Exception as exc:  # noqa: BLE001 - keep serving other clients
+                err.write(f"Error: {type(exc).__name__}: {exc}\n")
+                code = 1
+            _send(self.wfile, {"exit": code}, lock)
+        except OSError:
+            pass  # The client went away; nobody is left to tell
+
+
+class CommandServer(socketserver.ThreadingUnixStreamServer):
+    """Serve a command handler on a Unix socket, one thread per connection.
+
+    The socket is only accessible to the current user. A socket file left
+    behind by a server that is no longer running is replaced.
+
+    Parameters
+    ----------
+    path:
+        Location of the socket file. Parent directories are created.
+    handler:
+        Runs each command line received (see :data:`Handler`).
+
+    Raises
+    ------
+    FileExistsError
+        If a server is already listening on ``path``.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path: str | os.PathLike[str], handler: Handler) -> None:
+        self.path = Path(path)
+        self.handler = handler
+        if self.path.exists():
+            if _is_listening(self.path):
+                raise FileExistsError(f"A server is already listening on {self.path}")
+            self.path.unlink()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        umask = os.umask(0o177)
+        try:
+            super().__init__(str(self.path), _CommandHandler)
+        finally:
+            os.umask(umask)
+
+    def server_close(self) -> None:
+        """Stop listening and remove the socket file."""
+        super().server_close()
+        self.path.unlink(missing_ok=True)
+
+
+def _is_listening(path: Path) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(str(path))
+        except OSError:
+            return False
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+
+def forward(
+    path: str | os.PathLike[str],
+    argv: list[str],
+    out: TextIO | None = None,
+    err: TextIO | None = None,
+) -> int | None:
+    """Run a command line on the server listening at ``path``.
+
+    Output is relayed to ``out`` and ``err`` (default: this process's stdout
+    and stderr) as the server produces it.
+
+    Returns
+    -------
+    int | None
+        The command's exit status, or None if no server is listening, in
+        which case nothing was sent.
+
+    Raises
+    ------
+    ConnectionError
+        If the connection drops before the command finishes. Part of its
+        output may already have been relayed.
+    """
+    out = out if out is not None else sys.stdout
+    err = err if err is not None else sys.stderr
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(os.fspath(path))
+    except OSError:
+        sock.close()
+        return None
+
+    with sock, sock.makefile("rwb") as stream:
+        try:
+            stream.write(json.dumps({"argv": argv}).encode("utf-8") + b"\n")
+            stream.flush()
+            for line in stream:
+                message = json.loads(line)
+                for name, target in (("out", out), ("err", err)):
+                    if name in message:
+                        target.write(message[name])
+                        target.flush()
+                if "exit" in message:
+                    return int(message["exit"])
+        except OSError as exc:
+            raise ConnectionError(f"Lost connection to {path}: {exc}") from exc
+    raise ConnectionError(f"{path} closed the connection before the command finished")
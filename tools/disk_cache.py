@@ -0,0 +1,229 @@
+"""Persistent SQLite-backed cache tier for market data.
+
+The in-memory cache in :mod:`tools.alpha_vantage` only lives as long as a
+single process. This module provides a disk-backed tier that every process on
+the host can share — the Streamlit server, its workers, and each
+``python -m tools.alpha_vantage`` subprocess the agent spawns — so a series
+fetched once is served locally everywhere.
+
+The database runs in WAL mode so concurrent readers never block on a writer,
+and each entry carries its own expiry time.
+
+Usage:
+    from tools.disk_cache import DiskCache
+    cache = DiskCache("data/alpha_vantage_cache.db")
+    cache.set("TIME_SERIES_DAILY:AAPL", {"close": [1.0]}, ttl=300)
+    hit = cache.get("TIME_SERIES_DAILY:AAPL")  # (expires_at, value) or None
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+BUSY_TIMEOUT = 10.0
+"""Seconds a connection waits for a competing writer before giving up."""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    value BLOB NOT NULL
+);
+"""
+
+
+# ---------------------------------------------------------------------------
+# Connections
+# ---------------------------------------------------------------------------
+
+
+class SharedDatabase:
+    """Per-thread connections to a SQLite database shared across processes.
+
+    ``sqlite3`` connections must not cross threads, and a forked child must
+    not reuse its parent's file handle, so one connection is opened lazily
+    for each (process, thread) pair. Every connection runs in WAL mode so
+    readers never block on a writer.
+
+    Parameters
+    ----------
+    path:
+        Location of the database file. Parent directories are created on
+        first use.
+    schema:
+        SQL executed on every new connection; should be idempotent
+        (``CREATE TABLE IF NOT EXISTS ...``).
+    """
+
+    def __init__(self, path: str | os.PathLike[str], schema: str) -> None:
+        self.path = Path(path)
+        self._schema = schema
+        self._local = threading.local()
+
+    def connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(self._schema)
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def close(self) -> None:
+        """Close the calling thread's connection, if one is open."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+# ---------------------------------------------------------------------------
+# Disk cache
+# ---------------------------------------------------------------------------
+
+
+class DiskCache:
+    """A key/value cache stored in a shared SQLite database.
+
+    Values must be JSON-serialisable; they are stored zlib-compressed. Every
+    method swallows ``sqlite3`` and filesystem errors and behaves like a cache
+    miss, so a broken or read-only disk never takes down a data fetch.
+
+    Parameters
+    ----------
+    path:
+        Location of the SQLite database file. Parent directories are created
+        on first use.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        self._db = SharedDatabase(path, _SCHEMA)
+
+    @property
+    def path(self) -> Path:
+        """Location of the database file."""
+        return self._db.path
+
+    def _connect(self) -> sqlite3.Connection:
+        return self._db.connect()
+
+    def close(self) -> None:
+        """Close the calling thread's connection, if one is open."""
+        self._db.close()
+
+    # -- cache operations --------------------------------------------------
+
+    def get(self, key: str, allow_expired: bool = False) -> tuple[float, Any] | None:
+        """Look up a key.
+
+        Parameters
+        ----------
+        key:
+            The cache key.
+        allow_expired:
+            Return the entry even if its TTL has elapsed. Expired rows are
+            kept until :meth:`purge_expired` removes them, so callers can
+            still use them as a fallback or a base for an incremental update.
+
+        Returns
+        -------
+        tuple[float, Any] | None
+            ``(expires_at, value)`` for a hit, or None.
+        """
+        try:
+            row = (
+                self._connect()
+                .execute("SELECT expires_at, value FROM cache WHERE key = ?", (key,))
+                .fetchone()
+            )
+        except (sqlite3.Error, OSError):
+            return None
+
+        if row is None:
+            return None
+        expires_at, blob = row
+        if not allow_expired and expires_at <= time.time():
+            return None
+        try:
+            return expires_at, json.loads(zlib.decompress(blob))
+        except (zlib.error, ValueError):
+            return None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """Store a value that expires ``ttl`` seconds from now.
+
+        Parameters
+        ----------
+        key:
+            The cache key.
+        value:
+            A JSON-serialisable value.
+        ttl:
+            Time-to-live in seconds.
+        """
+        now = time.time()
+        blob = zlib.compress(json.dumps(value, separators=(",", ":")).encode())
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache (key, stored_at, expires_at, value) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, now, now + ttl, blob),
+                )
+        except (sqlite3.Error, OSError):
+            pass
+
+    def delete(self, key: str) -> None:
+        """Remove a single key."""
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+        except (sqlite3.Error, OSError):
+            pass
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM cache")
+        except (sqlite3.Error, OSError):
+            pass
+
+    def purge_expired(self, grace: float = 0.0) -> int:
+        """Delete entries that expired more than ``grace`` seconds ago.
+
+        Returns
+        -------
+        int
+            The number of rows removed.
+        """
+        try:
+            conn = self._connect()
+            with conn:
+                cursor = conn.execute(
+                    "DELETE FROM cache WHERE expires_at <= ?", (time.time() - grace,)
+                )
+            return cursor.rowcount
+        except (sqlite3.Error, OSError):
+            return 0
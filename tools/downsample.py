@@ -0,0 +1,227 @@
+"""Chart-ready downsampling of long series.
+
+A browser chart is only a couple of thousand pixels wide, yet a 20-year
+daily history or a month of 1-minute bars is tens of thousands of points
+per trace, all serialised to the page on every rerun. This module cuts a
+series down to a point budget while keeping what the eye would see:
+
+- :func:`downsample_line` picks representative bars with
+  Largest-Triangle-Three-Buckets (LTTB), which keeps peaks, troughs and the
+  overall shape of a line chart.
+- :func:`downsample_ohlc` merges runs of consecutive bars into candles
+  (first open, highest high, lowest low, last close, summed volume), so no
+  high or low is ever lost from a candlestick or OHLC chart.
+
+Both return ordinary :class:`~tools.timeseries.TimeSeries` objects, so
+chart code does not change, and both are memoized per (series, budget)
+for as long as the input series is the same object.
+
+Usage:
+    from tools.downsample import downsample_line, downsample_ohlc
+    px.line(downsample_line(data), x="date", y="close")
+    candles = downsample_ohlc(data, max_points=1500)
+"""
+
+from __future__ import annotations
+
+import threading
+import weakref
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+import numpy as np
+
+from tools.resample import aggregate
+from tools.timeseries import COLUMNS, PRICE_FIELDS, TimeSeries
+
+DEFAULT_POINTS = 2000
+"""Default point budget: about one point per pixel of a wide chart."""
+
+MEMO_SIZE = 128
+"""Downsampled series kept by the memo."""
+
+
+# ---------------------------------------------------------------------------
+# Algorithms
+# ---------------------------------------------------------------------------
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """Select at most ``max_points`` indices with Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept. The points between are split
+    into ``max_points - 2`` equal buckets, and from each bucket the point
+    forming the largest triangle with the point kept from the previous
+    bucket and the average of the next bucket is kept.
+
+    Parameters
+    ----------
+    x, y:
+        Point coordinates; ``x`` ascending.
+    max_points:
+        The budget; at least 3.
+
+    Returns
+    -------
+    np.ndarray
+        Ascending indices into ``x`` / ``y``.
+    """
+    n = len(x)
+    if n <= max_points:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # Bucket i holds points edges[i]:edges[i + 1]; at least one point each
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    sizes = np.diff(edges)
+    avg_x = np.add.reduceat(x[1 : n - 1], edges[:-1] - 1) / sizes
+    avg_y = np.add.reduceat(y[1 : n - 1], edges[:-1] - 1) / sizes
+    # Each bucket looks ahead to the next bucket's average; the last to the
+    # final point
+    next_x = np.r_[avg_x[1:], x[-1]]
+    next_y = np.r_[avg_y[1:], y[-1]]
+
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(max_points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        ax, ay = x[a], y[a]
+        # Twice the triangle area, as a linear function of the candidate
+        area = np.abs(
+            (ax - next_x[i]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (next_y[i] - ay)
+        )
+        a = lo + int(area.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+def bucket_ohlc(series: TimeSeries, max_points: int) -> TimeSeries:
+    """Merge ``series`` into at most ``max_points`` candles of consecutive bars.
+
+    Each candle is dated by its first bar. Buckets hold the same number of
+    bars, give or take one.
+    """
+    n = len(series)
+    if n <= max_points:
+        return series
+    starts = np.arange(max_points, dtype=np.int64) * n // max_points
+    return aggregate(series, starts, series.dates[starts])
+
+
+# ---------------------------------------------------------------------------
+# Memoization
+# ---------------------------------------------------------------------------
+
+
+_memo: OrderedDict[Hashable, tuple[weakref.ref[TimeSeries], TimeSeries]] = OrderedDict()
+# Reentrant: a source collected while the lock is held evicts its entries
+_memo_lock = threading.RLock()
+
+
+def _evict(key: Hashable, ref: weakref.ref[TimeSeries]) -> None:
+    """Drop ``key`` once its source is collected, unless since replaced."""
+    with _memo_lock:
+        entry = _memo.get(key)
+        if entry is not None and entry[0] is ref:
+            del _memo[key]
+
+
+def memoized(
+    source: TimeSeries, key: Hashable, compute: Callable[[], TimeSeries]
+) -> TimeSeries:
+    """Return ``compute()``, remembered under ``key`` while ``source`` is the
+    same object.
+
+    ``source`` is the series the result derives from; ``key`` identifies the
+    computation (budget, field, date range, ...). Only a weak reference to
+    ``source`` is kept, and the result is forgotten once ``source`` is
+    collected.
+    """
+    key = (id(source), key)
+    with _memo_lock:
+        entry = _memo.get(key)
+        if entry is not None and entry[0]() is source:
+            _memo.move_to_end(key)
+            return entry[1]
+
+    result = compute()
+    if result is source:
+        return result  # Nothing to save, and storing it would pin ``source``
+    with _memo_lock:
+        ref = weakref.ref(source, lambda ref, key=key: _evict(key, ref))
+        _memo[key] = (ref, result)
+        _memo.move_to_end(key)
+        while len(_memo) > MEMO_SIZE:
+            _memo.popitem(last=False)
+    return result
+
+
+def clear_memo() -> None:
+    """Forget every memoized result."""
+    with _memo_lock:
+        _memo.clear()
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+
+def _check_budget(max_points: Any, minimum: int) -> None:
+    if int(max_points) != max_points or max_points < minimum:
+        raise ValueError(
+            f"max_points must be an integer >= {minimum}, got {max_points!r}"
+        )
+
+
+def downsample_line(
+    series: TimeSeries, max_points: int = DEFAULT_POINTS, field: str = "close"
+) -> TimeSeries:
+    """Keep at most ``max_points`` bars that preserve the shape of ``field``.
+
+    The kept bars are whole rows of ``series``, chosen by LTTB on
+    (date, ``field``), so the result still charts any field but is tuned
+    for ``field``.
+
+    Raises
+    ------
+    ValueError
+        If ``max_points`` is below 3 or ``field`` is not a price or volume.
+    """
+    _check_budget(max_points, 3)
+    if field not in (*PRICE_FIELDS, "volume"):
+        raise ValueError(
+            f"Invalid field '{field}'. "
+            f"Must be one of: {', '.join((*PRICE_FIELDS, 'volume'))}"
+        )
+    if len(series) <= max_points:
+        return series
+
+    def compute() -> TimeSeries:
+        x = (series.dates - series.dates[0]).astype(np.int64)
+        rows = lttb_indices(x, getattr(series, field), max_points)
+        return TimeSeries(*(getattr(series, f)[rows] for f in COLUMNS))
+
+    return memoized(series, ("line", max_points, field), compute)
+
+
+def downsample_ohlc(series: TimeSeries, max_points: int = DEFAULT_POINTS) -> TimeSeries:
+    """Merge runs of bars into at most ``max_points`` candles.
+
+    Every bar's high and low is kept in its candle, so candlestick and
+    OHLC charts never lose an extreme.
+
+    Raises
+    ------
+    ValueError
+        If ``max_points`` is below 1.
+    """
+    _check_budget(max_points, 1)
+    if len(series) <= max_points:
+        return series
+    return memoized(
+        series, ("ohlc", max_points), lambda: bucket_ohlc(series, max_points)
+    )
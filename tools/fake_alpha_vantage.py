@@ -0,0 +1,520 @@
+"""Offline stand-in for the Alpha Vantage API.
+
+The free tier allows 25 calls a day, far too few to benchmark or load-test
+:mod:`tools.alpha_vantage` against the real service. This module serves
+the same query schema locally:
+
+- ``TIME_SERIES_DAILY`` and ``TIME_SERIES_INTRADAY`` with ``symbol``,
+  ``interval``, ``outputsize`` (compact / full) and ``datatype``
+  (json / csv), in Alpha Vantage's response layout (newest bar first,
+  prices as 4-decimal strings, JSON errors even for CSV requests).
+- Synthetic but deterministic bars: a seeded geometric Brownian motion per
+  symbol and interval, so every request for the same data returns the same
+  bytes and compact responses are the tail of full ones.
+- Configurable latency, payload size, transient 503s and per-minute /
+  per-day limits answered with Alpha Vantage's ``Note`` or
+  ``Information`` payloads.
+
+Point the client at it with ``ALPHAVANTAGE_BASE_URL`` (and raise
+``ALPHAVANTAGE_CALLS_PER_MINUTE`` / ``ALPHAVANTAGE_CALLS_PER_DAY`` so the
+client-side limiter is not the bottleneck). Any API key is accepted.
+
+Usage as a CLI tool:
+    python -m tools.fake_alpha_vantage --port 8765 --latency 0.2
+    ALPHAVANTAGE_BASE_URL=http://127.0.0.1:8765/query streamlit run app.py
+
+Usage as a Python module:
+    from tools.fake_alpha_vantage import FakeAlphaVantage
+    with FakeAlphaVantage(latency=0.05).start() as server:
+        os.environ["ALPHAVANTAGE_BASE_URL"] = server.url
+"""
+
+from __future__ import annotations
+
+import argparse
+import collections
+import datetime as dt
+import functools
+import gzip
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from tools.timeseries import DAILY_UNIT, INTRADAY_UNIT, TimeSeries, format_dates
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+DEFAULT_PORT = 8765
+"""Port the CLI listens on by default."""
+
+COMPACT_SIZE = 100
+"""Bars returned for ``outputsize=compact``."""
+
+DEFAULT_DAYS = 5000
+"""Trading days in a full daily history (about 20 years)."""
+
+DEFAULT_INTRADAY_DAYS = 20
+"""Trading days in a full intraday series (about a month)."""
+
+INTERVALS = {"1min": 1, "5min": 5, "15min": 15, "30min": 30, "60min": 60}
+"""Supported intraday intervals, in minutes."""
+
+LIMIT_STYLES = ("information", "note")
+"""Payload key used for rate limit responses: current Alpha Vantage
+responses use ``Information``, older ones ``Note``."""
+
+SESSION_MINUTES = 390
+"""Length of the regular 09:30-16:00 session."""
+
+_SYMBOL = re.compile(r"[A-Z0-9.\-]{1,10}")
+"""Symbols that look like tickers; anything else is an invalid call."""
+
+_CSV_HEADER = "timestamp,open,high,low,close,volume\r\n"
+
+
+# ---------------------------------------------------------------------------
+# Synthetic data
+# ---------------------------------------------------------------------------
+
+
+def _rng(seed: int, symbol: str, interval: str | None) -> np.random.Generator:
+    """Return a generator seeded stably (across processes) by the series."""
+    return np.random.default_rng(
+        [seed, zlib.crc32(f"{symbol}:{interval or 'daily'}".encode())]
+    )
+
+
+def _trading_days(end: dt.date, count: int) -> np.ndarray:
+    """Return the ``count`` weekdays ending at or before ``end``, ascending."""
+    last = np.busday_offset(np.datetime64(end, "D"), 0, roll="backward")
+    return np.busday_offset(last, np.arange(-count + 1, 1))
+
+
+def generate_series(
+    symbol: str,
+    interval: str | None = None,
+    days: int | None = None,
+    end: dt.date | None = None,
+    seed: int = 0,
+) -> TimeSeries:
+    """Generate a full synthetic history by geometric Brownian motion.
+
+    Each symbol gets its own starting price and volatility, derived from
+    ``seed`` and the symbol, so series are distinct but reproducible.
+
+    Parameters
+    ----------
+    symbol:
+        The ticker symbol (upper case).
+    interval:
+        An intraday interval, or None for daily bars.
+    days:
+        Trading days covered. Defaults to :data:`DEFAULT_DAYS` for daily
+        and :data:`DEFAULT_INTRADAY_DAYS` for intraday series.
+    end:
+        Last day covered (rolled back to a weekday). Defaults to today.
+    seed:
+        Base seed.
+
+    Returns
+    -------
+    TimeSeries
+        The bars, oldest first.
+    """
+    end = end or dt.date.today()
+    rng = _rng(seed, symbol, interval)
+    start_price = rng.uniform(20, 500)
+    sigma = rng.uniform(0.15, 0.45)  # Annualised volatility
+    mu = rng.uniform(0.0, 0.12)  # Annualised drift
+
+    if interval is None:
+        dates = _trading_days(end, days or DEFAULT_DAYS).astype(DAILY_UNIT)
+        step = 1 / 252
+        base_volume = 2_000_000
+    else:
+        minutes = INTERVALS[interval]
+        per_day = SESSION_MINUTES // minutes
+        sessions = _trading_days(end, days or DEFAULT_INTRADAY_DAYS)
+        offsets = np.timedelta64(9 * 60 + 30, "m") + np.arange(
+            per_day
+        ) * np.timedelta64(minutes, "m")
+        dates = (sessions.astype("datetime64[m]")[:, None] + offsets).ravel()
+        dates = dates.astype(INTRADAY_UNIT)
+        step = minutes / (252 * SESSION_MINUTES)
+        base_volume = 2_000_000 * minutes // SESSION_MINUTES
+
+    n = len(dates)
+    scale = sigma * np.sqrt(step)
+    log_returns = (mu - sigma**2 / 2) * step + scale * rng.standard_normal(n)
+    close = start_price * np.exp(np.cumsum(log_returns))
+    open_ = np.r_[start_price, close[:-1]] * np.exp(scale / 4 * rng.standard_normal(n))
+    body_high = np.maximum(open_, close)
+    body_low = np.minimum(open_, close)
+    high = body_high * np.exp(np.abs(scale / 2 * rng.standard_normal(n)))
+    low = body_low * np.exp(-np.abs(scale / 2 * rng.standard_normal(n)))
+    volume = (base_volume * rng.lognormal(0, 0.5, n)).astype(np.int64) + 1
+    return TimeSeries(
+        dates, *(np.round(p, 4) for p in (open_, high, low, close)), volume
+    )
+
+
+# ---------------------------------------------------------------------------
+# Response encoding
+# ---------------------------------------------------------------------------
+
+
+def _rows(series: TimeSeries) -> list[tuple[str, str, str, str, str, int]]:
+    """Return the bars newest first, formatted as Alpha Vantage strings."""
+    dates = format_dates(series.dates[::-1]).tolist()
+    prices = [
+        np.char.mod("%.4f", getattr(series, f)[::-1]).tolist()
+        for f in ("open", "high", "low", "close")
+    ]
+    return list(zip(dates, *prices, series.volume[::-1].tolist(), strict=True))
+
+
+def encode_json(
+    series: TimeSeries, symbol: str, interval: str | None, outputsize: str
+) -> bytes:
+    """Encode ``series`` as an Alpha Vantage JSON time series response."""
+    key = f"Time Series ({interval})" if interval else "Time Series (Daily)"
+    meta = {
+        "1. Information": (
+            f"Intraday ({interval}) open, high, low, close prices and volume"
+            if interval
+            else "Daily Prices (open, high, low, close) and Volumes"
+        ),
+        "2. Symbol": symbol,
+        "3. Last Refreshed": format_dates(series.dates[-1:])[0],
+        "4. Output Size": "Compact" if outputsize == "compact" else "Full size",
+        "5. Time Zone": "US/Eastern",
+    }
+    bars = ",\n".join(
+        f'        "{d}": {{\n'
+        f'            "1. open": "{o}",\n'
+        f'            "2. high": "{h}",\n'
+        f'            "3. low": "{lo}",\n'
+        f'            "4. close": "{c}",\n'
+        f'            "5. volume": "{v}"\n'
+        f"        }}"
+        for d, o, h, lo, c, v in _rows(series)
+    )
+    head = json.dumps({"Meta Data": meta}, indent=4)[:-2]
+    return f'{head},\n    "{key}": {{\n{bars}\n    }}\n}}'.encode()
+
+
+def encode_csv(series: TimeSeries) -> bytes:
+    """Encode ``series`` as an Alpha Vantage ``datatype=csv`` response."""
+    body = "".join(
+        f"{d},{o},{h},{lo},{c},{v}\r\n" for d, o, h, lo, c, v in _rows(series)
+    )
+    return (_CSV_HEADER + body).encode()
+
+
+def _message(payload: dict[str, str]) -> bytes:
+    return json.dumps(payload, indent=4).encode()
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+
+def _utc_today() -> dt.date:
+    """Return the current UTC date, which the daily limits reset on."""
+    return dt.datetime.now(dt.UTC).date()
+
+
+class FakeAlphaVantage(ThreadingHTTPServer):
+    """A local HTTP server speaking the Alpha Vantage time series API.
+
+    Parameters
+    ----------
+    address:
+        ``(host, port)`` to listen on; port 0 picks a free one.
+    latency:
+        Seconds added to every response.
+    jitter:
+        Extra seconds, drawn uniformly from ``[0, jitter]``, per response.
+    days, intraday_days:
+        Trading days in a full daily / intraday response (the payload
+        size; compact responses are always :data:`COMPACT_SIZE` bars).
+    per_minute, per_day:
+        Calls allowed per API key per rolling minute / per UTC day; 0
+        for unlimited. Calls over the limit get a rate limit payload.
+    limit_style:
+        "information" or "note": the payload key of rate limit responses.
+    error_rate:
+        Fraction of calls answered with HTTP 503, to exercise retries.
+    seed:
+        Base seed for the synthetic data (and the error draws).
+    end:
+        Last day of every series. Defaults to today.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int] = ("127.0.0.1", 0),
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        days: int = DEFAULT_DAYS,
+        intraday_days: int = DEFAULT_INTRADAY_DAYS,
+        per_minute: int = 0,
+        per_day: int = 0,
+        limit_style: str = "information",
+        error_rate: float = 0.0,
+        seed: int = 0,
+        end: dt.date | None = None,
+    ) -> None:
+        if limit_style not in LIMIT_STYLES:
+            raise ValueError(
+                f"Invalid limit_style '{limit_style}'. "
+                f"Must be one of: {', '.join(LIMIT_STYLES)}"
+            )
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.jitter = jitter
+        self.days = days
+        self.intraday_days = intraday_days
+        self.per_minute = per_minute
+        self.per_day = per_day
+        self.limit_style = limit_style
+        self.error_rate = error_rate
+        self.seed = seed
+        self.end = end or dt.date.today()
+        self.requests = 0
+        self.bytes_sent = 0
+        self._random = random.Random(seed)
+        self._calls: dict[str, collections.deque[float]] = {}
+        self._daily_calls: collections.Counter[str] = collections.Counter()
+        self._day = _utc_today()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self.payload = functools.lru_cache(maxsize=256)(self._render)
+
+    @property
+    def url(self) -> str:
+        """The endpoint to use as ``ALPHAVANTAGE_BASE_URL``."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/query"
+
+    def start(self) -> FakeAlphaVantage:
+        """Serve on a daemon thread and return self (for ``with``)."""
+        self._thread = threading.Thread(
+            target=self.serve_forever,
+            args=(0.05,),  # Poll often so shutdown() returns promptly
+            name="fake-alpha-vantage",
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        if self._thread is not None:
+            self.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server_close()
+
+    def stats(self) -> dict[str, Any]:
+        """Return ``{"requests": ..., "bytes_sent": ...}`` served so far."""
+        with self._lock:
+            return {"requests": self.requests, "bytes_sent": self.bytes_sent}
+
+    def _render(
+        self, symbol: str, interval: str | None, outputsize: str, datatype: str
+    ) -> bytes:
+        """Build (once) the body of a successful response."""
+        days = self.intraday_days if interval else self.days
+        series = generate_series(symbol, interval, days, self.end, self.seed)
+        if outputsize == "compact":
+            series = series[-COMPACT_SIZE:]
+        if datatype == "csv":
+            return encode_csv(series)
+        return encode_json(series, symbol, interval, outputsize)
+
+    def _over_limit(self, api_key: str) -> dict[str, str] | None:
+        """Count a call against ``api_key`` and return a payload if over a limit."""
+        now = time.monotonic()
+        today = _utc_today()
+        with self._lock:
+            if today != self._day:
+                self._daily_calls.clear()
+                self._day = today
+            calls = self._calls.setdefault(api_key, collections.deque())
+            while calls and calls[0] <= now - 60:
+                calls.popleft()
+            if self.per_day and self._daily_calls[api_key] >= self.per_day:
+                text = (
+                    "Thank you for using Alpha Vantage! Our standard API rate limit "
+                    f"is {self.per_day} requests per day. Please subscribe to any "
+                    "of the premium plans at https://www.alphavantage.co/premium/ "
+                    "to instantly remove all daily rate limits."
+                )
+            elif self.per_minute and len(calls) >= self.per_minute:
+                text = (
+                    "Thank you for using Alpha Vantage! Our standard API call "
+                    f"frequency is {self.per_minute} calls per minute. Please "
+                    "consider spreading out your free API requests more sparingly."
+                )
+            else:
+                calls.append(now)
+                self._daily_calls[api_key] += 1
+                return None
+        return {self.limit_style.capitalize(): text}
+
+    def respond(self, query: dict[str, str]) -> tuple[int, bytes]:
+        """Answer one API query.
+
+        Returns
+        -------
+        tuple[int, bytes]
+            The HTTP status and JSON or CSV body.
+        """
+        if self.error_rate:
+            with self._lock:
+                failed = self._random.random() < self.error_rate
+            if failed:
+                return 503, b"Service Unavailable"
+
+        function = query.get("function", "")
+        if not query.get("apikey"):
+            return 200, _message(
+                {
+                    "Error Message": "the parameter apikey is invalid or missing. "
+                    "Please claim your free API key on "
+                    "(https://www.alphavantage.co/support/#api-key)."
+                }
+            )
+        if function not in ("TIME_SERIES_DAILY", "TIME_SERIES_INTRADAY"):
+            return 200, _message(
+                {"Error Message": f"This API function ({function}) does not exist."}
+            )
+        invalid = _message(
+            {
+                "Error Message": "Invalid API call. Please retry or visit the "
+                "documentation (https://www.alphavantage.co/documentation/) "
+                f"for {function}."
+            }
+        )
+        symbol = query.get("symbol", "").upper()
+        interval = query.get("interval") if function == "TIME_SERIES_INTRADAY" else None
+        outputsize = query.get("outputsize", "compact")
+        datatype = query.get("datatype", "json")
+        if (
+            not _SYMBOL.fullmatch(symbol)
+            or (function == "TIME_SERIES_INTRADAY" and interval not in INTERVALS)
+            or outputsize not in ("compact", "full")
+            or datatype not in ("json", "csv")
+        ):
+            return 200, invalid
+
+        limited = self._over_limit(query["apikey"])
+        if limited is not None:
+            return 200, _message(limited)
+        return 200, self.payload(symbol, interval, outputsize, datatype)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Serves ``GET /query`` from the :class:`FakeAlphaVantage` server."""
+
+    server: FakeAlphaVantage
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real API
+
+    def do_GET(self) -> None:
+        parts = urlsplit(self.path)
+        if parts.path != "/query":
+            self._send(404, b"Not Found", "text/plain")
+            return
+        query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        delay = self.server.latency + random.uniform(0, self.server.jitter)
+        if delay:
+            time.sleep(delay)
+        status, body = self.server.respond(query)
+        if status != 200:
+            self._send(status, body, "text/plain")
+        elif query.get("datatype") == "csv" and not body.startswith(b"{"):
+            self._send(status, body, "application/x-download")
+        else:
+            self._send(status, body, "application/json")
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        compress = "gzip" in self.headers.get("Accept-Encoding", "")
+        if compress:
+            body = gzip.compress(body, compresslevel=1)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if compress:
+            self.send_header("Content-Encoding", "gzip")
+        self.end_headers()
+        self.wfile.write(body)
+        with self.server._lock:
+            self.server.requests += 1
+            self.server.bytes_sent += len(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Stay quiet; the CLI reports totals instead."""
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+def main() -> None:
+    """CLI entry point: serve until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="seconds")
+    parser.add_argument("--days", type=int, default=DEFAULT_DAYS)
+    parser.add_argument("--intraday-days", type=int, default=DEFAULT_INTRADAY_DAYS)
+    parser.add_argument("--per-minute", type=int, default=0, help="0: unlimited")
+    parser.add_argument("--per-day", type=int, default=0, help="0: unlimited")
+    parser.add_argument("--limit-style", choices=LIMIT_STYLES, default="information")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--end", type=dt.date.fromisoformat, default=None)
+    args = parser.parse_args()
+
+    server = FakeAlphaVantage(
+        (args.host, args.port),
+        latency=args.latency,
+        jitter=args.jitter,
+        days=args.days,
+        intraday_days=args.intraday_days,
+        per_minute=args.per_minute,
+        per_day=args.per_day,
+        limit_style=args.limit_style,
+        error_rate=args.error_rate,
+        seed=args.seed,
+        end=args.end,
+    )
+    print(f"Serving fake Alpha Vantage at {server.url}")
+    print(f"  export ALPHAVANTAGE_BASE_URL={server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        stats = server.stats()
+        print(f"Served {stats['requests']} requests, {stats['bytes_sent']:,} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,512 @@
+"""Vectorised technical indicators with memoized, incremental updates.
+
+Every indicator is computed over the column arrays of a
+:class:`~tools.timeseries.TimeSeries` with NumPy, never with a per-bar
+Python loop, and returns arrays aligned with the input bars (NaN until
+enough history has accumulated).
+
+Results are memoized per (series, indicator, parameters), so a dashboard
+rerun that asks for the same RSI again gets it back without recomputing.
+When the series has grown since the last call, as it does after an
+incremental cache refresh, only the new bars are computed: each indicator
+carries the small recursive state it needs (an EMA value, running VWAP
+sums) from the end of the previous result, so the work per appended bar is
+constant however long the history is. The most recent bar is treated as
+provisional, since the current session's bar is revised until the close,
+and is always recomputed.
+
+Usage:
+    from tools.indicators import sma, rsi, macd
+    data = fetch_daily("AAPL", outputsize="full")
+    sma_50 = sma(data, 50)         # NumPy float64 array, NaN for the first 49
+    rsi_14 = rsi(data)
+    lines = macd(data)             # {"macd": ..., "signal": ..., "histogram": ...}
+"""
+
+from __future__ import annotations
+
+import threading
+import weakref
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from tools.timeseries import COLUMNS, PRICE_FIELDS, TimeSeries
+
+MEMO_SIZE = 256
+"""Indicator results kept by :class:`IndicatorMemo`."""
+
+_MAX_GROWTH = 50.0
+"""Largest exponent of ``1 / decay`` used inside one :func:`_ewm` block."""
+
+Columns = dict[str, np.ndarray]
+Kernel = Callable[..., tuple[Columns, Any]]
+
+
+# ---------------------------------------------------------------------------
+# Recursive smoothing
+# ---------------------------------------------------------------------------
+
+
+def _ewm(x: np.ndarray, alpha: float, prev: float) -> np.ndarray:
+    """Return ``y[i] = (1 - alpha) * y[i - 1] + alpha * x[i]``, ``y[-1] = prev``.
+
+    The recursion is unrolled into closed form,
+    ``y[i] = decay**(i + 1) * (prev + alpha * cumsum(x / decay**(j + 1))[i])``,
+    and evaluated in blocks short enough that ``decay**-block`` stays well
+    inside float64 range.
+    """
+    decay = 1.0 - alpha
+    if decay == 0.0:
+        return x.astype(np.float64, copy=True)
+    block = max(1, int(_MAX_GROWTH / -np.log(decay)))
+    powers = decay ** np.arange(1, min(block, len(x)) + 1)
+    out = np.empty(len(x))
+    for lo in range(0, len(x), block):
+        segment = x[lo : lo + block]
+        scale = powers[: len(segment)]
+        out[lo : lo + len(segment)] = scale * (
+            prev + alpha * np.cumsum(segment / scale)
+        )
+        prev = out[lo + len(segment) - 1]
+    return out
+
+
+def _seeded_ewm(x: np.ndarray, alpha: float, seed_len: int) -> np.ndarray:
+    """Smooth ``x``, seeding with the mean of its first ``seed_len`` values.
+
+    The result is NaN before index ``seed_len - 1``, as in most charting
+    packages.
+    """
+    out = np.full(len(x), np.nan)
+    if len(x) >= seed_len:
+        seed = x[:seed_len].mean()
+        out[seed_len - 1] = seed
+        out[seed_len:] = _ewm(x[seed_len:], alpha, seed)
+    return out
+
+
+def _last(values: np.ndarray) -> float | None:
+    """Return the last value as a float, or None if it is missing or NaN."""
+    if not len(values) or np.isnan(values[-1]):
+        return None
+    return float(values[-1])
+
+
+def _span_alpha(span: int) -> float:
+    return 2.0 / (span + 1)
+
+
+# ---------------------------------------------------------------------------
+# Kernels
+#
+# Each kernel computes its outputs for bars ``start:`` of ``series`` and
+# returns them with a carry: the state needed to continue from the last bar.
+# With ``carry=None`` the kernel works from the first bar; otherwise only the
+# bars from ``start`` onward are touched.
+# ---------------------------------------------------------------------------
+
+
+def _rolling(x: np.ndarray, start: int, window: int) -> tuple[int, np.ndarray]:
+    """Return the first bar at or after ``start`` with a full window, and the
+    ``window``-long slices of ``x`` ending at each bar from there on."""
+    first = max(start, window - 1)
+    if first >= len(x):
+        return first, np.empty((0, window))
+    return first, sliding_window_view(x[first - window + 1 :], window)
+
+
+def _sma_kernel(
+    series: TimeSeries, start: int, carry: Any, *, window: int, field: str
+) -> tuple[Columns, Any]:
+    x = getattr(series, field)
+    out = np.full(len(x) - start, np.nan)
+    first, windows = _rolling(x, start, window)
+    out[first - start :] = windows.mean(axis=1)
+    return {"sma": out}, None
+
+
+def _bollinger_kernel(
+    series: TimeSeries, start: int, carry: Any, *, window: int, num_std: float
+) -> tuple[Columns, Any]:
+    middle = np.full(len(series) - start, np.nan)
+    width = np.full(len(series) - start, np.nan)
+    first, windows = _rolling(series.close, start, window)
+    middle[first - start :] = windows.mean(axis=1)
+    width[first - start :] = num_std * windows.std(axis=1)
+    return {
+        "middle": middle,
+        "upper": middle + width,
+        "lower": middle - width,
+    }, None
+
+
+def _ema_kernel(
+    series: TimeSeries, start: int, carry: float | None, *, span: int, field: str
+) -> tuple[Columns, Any]:
+    x = getattr(series, field)
+    if start >= len(x):
+        return {"ema": np.empty(0)}, carry
+    if carry is None:
+        ema = _seeded_ewm(x, _span_alpha(span), span)[start:]
+    else:
+        ema = _ewm(x[start:], _span_alpha(span), carry)
+    return {"ema": ema}, _last(ema)
+
+
+def _rsi_values(avg_gain: np.ndarray, avg_loss: np.ndarray) -> np.ndarray:
+    """``100 - 100 / (1 + RS)``; a flat stretch (no gains, no losses) is 50."""
+    total = avg_gain + avg_loss
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(total == 0, 50.0, 100.0 * avg_gain / total)
+
+
+def _rsi_kernel(
+    series: TimeSeries, start: int, carry: tuple[float, float] | None, *, period: int
+) -> tuple[Columns, Any]:
+    close = series.close
+    if start >= len(close):
+        return {"rsi": np.empty(0)}, carry
+    alpha = 1.0 / period
+    if carry is None:
+        delta = np.diff(close)
+        gain = np.r_[np.nan, _seeded_ewm(np.maximum(delta, 0.0), alpha, period)]
+        loss = np.r_[np.nan, _seeded_ewm(np.maximum(-delta, 0.0), alpha, period)]
+        gain, loss = gain[start:], loss[start:]
+    else:
+        delta = np.diff(close[start - 1 :])
+        gain = _ewm(np.maximum(delta, 0.0), alpha, carry[0])
+        loss = _ewm(np.maximum(-delta, 0.0), alpha, carry[1])
+    last = (_last(gain), _last(loss))
+    return {"rsi": _rsi_values(gain, loss)}, None if last[0] is None else last
+
+
+def _true_range(series: TimeSeries, start: int) -> np.ndarray:
+    """True range of bars ``max(start, 1):`` (the first bar has no prior close)."""
+    start = max(start, 1)
+    high, low = series.high[start:], series.low[start:]
+    prev_close = series.close[start - 1 : -1]
+    return np.maximum(
+        high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close))
+    )
+
+
+def _atr_kernel(
+    series: TimeSeries, start: int, carry: float | None, *, period: int
+) -> tuple[Columns, Any]:
+    if start >= len(series):
+        return {"atr": np.empty(0)}, carry
+    if carry is None:
+        atr = np.r_[np.nan, _seeded_ewm(_true_range(series, 0), 1.0 / period, period)]
+        atr = atr[start:]
+    else:
+        atr = _ewm(_true_range(series, start), 1.0 / period, carry)
+    return {"atr": atr}, _last(atr)
+
+
+def _macd_kernel(
+    series: TimeSeries,
+    start: int,
+    carry: tuple[float, float, float] | None,
+    *,
+    fast: int,
+    slow: int,
+    signal: int,
+) -> tuple[Columns, Any]:
+    close = series.close
+    if start >= len(close):
+        empty = np.empty(0)
+        return {"macd": empty, "signal": empty, "histogram": empty}, carry
+    if carry is None:
+        fast_ema = _seeded_ewm(close, _span_alpha(fast), fast)
+        slow_ema = _seeded_ewm(close, _span_alpha(slow), slow)
+        line = fast_ema - slow_ema
+        signal_line = np.full(len(close), np.nan)
+        signal_line[slow - 1 :] = _seeded_ewm(
+            line[slow - 1 :], _span_alpha(signal), signal
+        )
+        fast_ema, slow_ema = fast_ema[start:], slow_ema[start:]
+        line, signal_line = line[start:], signal_line[start:]
+    else:
+        fast_ema = _ewm(close[start:], _span_alpha(fast), carry[0])
+        slow_ema = _ewm(close[start:], _span_alpha(slow), carry[1])
+        line = fast_ema - slow_ema
+        signal_line = _ewm(line, _span_alpha(signal), carry[2])
+    last = (_last(fast_ema), _last(slow_ema), _last(signal_line))
+    columns = {"macd": line, "signal": signal_line, "histogram": line - signal_line}
+    return columns, None if last[2] is None else last
+
+
+def _vwap_kernel(
+    series: TimeSeries, start: int, carry: tuple[int, float, float] | None
+) -> tuple[Columns, Any]:
+    if start >= len(series):
+        return {"vwap": np.empty(0)}, carry
+    typical = (series.high[start:] + series.low[start:] + series.close[start:]) / 3
+    volume = series.volume[start:].astype(np.float64)
+    if series.intraday:
+        sessions = series.dates[start:].astype("datetime64[D]").astype(np.int64)
+    else:
+        # Daily bars: one session anchored at the first bar
+        sessions = np.zeros(len(volume), dtype=np.int64)
+
+    new_session = np.r_[
+        carry is None or sessions[0] != carry[0], np.diff(sessions) != 0
+    ]
+    index = np.arange(len(volume))
+    session_start = np.maximum.accumulate(np.where(new_session, index, 0))
+    cum_pv = np.cumsum(typical * volume)
+    cum_v = np.cumsum(volume)
+    session_pv = cum_pv - np.r_[0.0, cum_pv][session_start]
+    session_v = cum_v - np.r_[0.0, cum_v][session_start]
+    if not new_session[0]:
+        continuing = session_start == 0
+        session_pv[continuing] += carry[1]
+        session_v[continuing] += carry[2]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        vwap = np.where(session_v > 0, session_pv / session_v, np.nan)
+    return {"vwap": vwap}, (int(sessions[-1]), session_pv[-1], session_v[-1])
+
+
+# ---------------------------------------------------------------------------
+# Memoization
+# ---------------------------------------------------------------------------
+
+
+def _bar(series: TimeSeries, i: int) -> tuple[Any, ...]:
+    """Return bar ``i`` as a tuple of raw column values, for identity checks."""
+    return tuple(getattr(series, f)[i] for f in COLUMNS)
+
+
+def _concat(head: Columns, tail: Columns) -> Columns:
+    return {name: np.concatenate((head[name], tail[name])) for name in head}
+
+
+class IndicatorMemo:
+    """Remembers indicator results per (series, indicator, parameters).
+
+    A result is reused as is for the very same series object. A different
+    series that starts with the same first bar and still contains the
+    second-to-last bar of a remembered result unchanged is treated as the
+    same history extended: the remembered values are kept and only the last
+    remembered bar and the bars after it are computed, from the carried
+    state. Anything else is computed from scratch. The least recently used
+    results are dropped beyond ``max_entries``.
+
+    Series are only weakly referenced: a remembered result outlives its
+    series, since a refreshed history extends it, but never keeps it alive.
+    """
+
+    def __init__(self, max_entries: int = MEMO_SIZE) -> None:
+        self.max_entries = max_entries
+        # key -> (weak ref to series, values, prefix length, anchor bar, carry)
+        self._entries: OrderedDict[tuple[Any, ...], tuple[Any, ...]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def compute(
+        self, series: TimeSeries, name: str, kernel: Kernel, **params: Any
+    ) -> Columns:
+        """Return ``kernel``'s outputs for every bar of ``series``."""
+        if not len(series):
+            return kernel(series, 0, None, **params)[0]
+        key = (name, tuple(sorted(params.items())), series.dates.dtype.str)
+        key += _bar(series, 0)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if entry is not None and entry[0]() is series:
+            return entry[1]
+
+        # Everything but the newest bar is final; keep its state for next time
+        prefix = len(series) - 1
+        head = series[:prefix]
+        if entry is not None and self._extends(series, entry):
+            _, values, old_prefix, _, carry = entry
+            known = {k: v[:old_prefix] for k, v in values.items()}
+            added, carry = kernel(head, old_prefix, carry, **params)
+            known = _concat(known, added)
+        else:
+            known, carry = kernel(head, 0, None, **params)
+        last, _ = kernel(series, prefix, carry, **params)
+        values = _concat(known, last)
+        for column in values.values():
+            column.flags.writeable = False
+
+        anchor = _bar(series, prefix - 1) if prefix else None
+        with self._lock:
+            self._entries[key] = (weakref.ref(series), values, prefix, anchor, carry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return values
+
+    @staticmethod
+    def _extends(series: TimeSeries, entry: tuple[Any, ...]) -> bool:
+        """True if ``series`` keeps the final bars of a remembered result."""
+        prefix, anchor = entry[2], entry[3]
+        if anchor is None or len(series) <= prefix:
+            return False
+        return _bar(series, prefix - 1) == anchor
+
+    def clear(self) -> None:
+        """Forget every memoized result."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_memo = IndicatorMemo()
+
+
+def clear_memo() -> None:
+    """Forget every memoized indicator result."""
+    _memo.clear()
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+
+def _check_period(name: str, value: int) -> None:
+    if int(value) != value or value < 1:
+        raise ValueError(f"{name} must be a positive integer, got {value!r}")
+
+
+def _check_field(field: str) -> None:
+    if field not in PRICE_FIELDS:
+        raise ValueError(
+            f"Invalid field '{field}'. Must be one of: {', '.join(PRICE_FIELDS)}"
+        )
+
+
+def sma(series: TimeSeries, window: int = 20, field: str = "close") -> np.ndarray:
+    """Simple moving average of ``field`` over ``window`` bars.
+
+    Returns
+    -------
+    np.ndarray
+        Read-only float64 array aligned with ``series``; NaN for the first
+        ``window - 1`` bars.
+
+    Raises
+    ------
+    ValueError
+        If ``window`` is not a positive integer or ``field`` is not a price.
+    """
+    _check_period("window", window)
+    _check_field(field)
+    return _memo.compute(series, "sma", _sma_kernel, window=window, field=field)["sma"]
+
+
+def ema(series: TimeSeries, span: int = 20, field: str = "close") -> np.ndarray:
+    """Exponential moving average of ``field`` with ``alpha = 2 / (span + 1)``.
+
+    The average is seeded with the simple average of the first ``span``
+    bars, so it is NaN for the first ``span - 1`` bars.
+
+    Raises
+    ------
+    ValueError
+        If ``span`` is not a positive integer or ``field`` is not a price.
+    """
+    _check_period("span", span)
+    _check_field(field)
+    return _memo.compute(series, "ema", _ema_kernel, span=span, field=field)["ema"]
+
+
+def rsi(series: TimeSeries, period: int = 14) -> np.ndarray:
+    """Wilder's relative strength index of the closing price, 0 to 100.
+
+    Average gains and losses are smoothed with ``alpha = 1 / period`` and
+    seeded with the simple average of the first ``period`` changes, so the
+    first value is at bar ``period``.
+
+    Raises
+    ------
+    ValueError
+        If ``period`` is not a positive integer.
+    """
+    _check_period("period", period)
+    return _memo.compute(series, "rsi", _rsi_kernel, period=period)["rsi"]
+
+
+def macd(
+    series: TimeSeries, fast: int = 12, slow: int = 26, signal: int = 9
+) -> dict[str, np.ndarray]:
+    """Moving average convergence/divergence of the closing price.
+
+    Returns
+    -------
+    dict[str, np.ndarray]
+        ``"macd"`` (fast EMA minus slow EMA), ``"signal"`` (EMA of the MACD
+        line over ``signal`` bars) and ``"histogram"`` (their difference).
+
+    Raises
+    ------
+    ValueError
+        If a span is not a positive integer or ``fast >= slow``.
+    """
+    for name, value in (("fast", fast), ("slow", slow), ("signal", signal)):
+        _check_period(name, value)
+    if fast >= slow:
+        raise ValueError(f"fast ({fast}) must be shorter than slow ({slow})")
+    return dict(
+        _memo.compute(series, "macd", _macd_kernel, fast=fast, slow=slow, signal=signal)
+    )
+
+
+def bollinger(
+    series: TimeSeries, window: int = 20, num_std: float = 2.0
+) -> dict[str, np.ndarray]:
+    """Bollinger Bands: the ``window``-bar SMA of the close ± ``num_std``
+    population standard deviations.
+
+    Returns
+    -------
+    dict[str, np.ndarray]
+        ``"middle"``, ``"upper"`` and ``"lower"`` bands.
+
+    Raises
+    ------
+    ValueError
+        If ``window`` is not a positive integer or ``num_std`` is negative.
+    """
+    _check_period("window", window)
+    if num_std < 0:
+        raise ValueError(f"num_std must not be negative, got {num_std!r}")
+    return dict(
+        _memo.compute(
+            series, "bollinger", _bollinger_kernel, window=window, num_std=num_std
+        )
+    )
+
+
+def atr(series: TimeSeries, period: int = 14) -> np.ndarray:
+    """Wilder's average true range, first available at bar ``period``.
+
+    Raises
+    ------
+    ValueError
+        If ``period`` is not a positive integer.
+    """
+    _check_period("period", period)
+    return _memo.compute(series, "atr", _atr_kernel, period=period)["atr"]
+
+
+def vwap(series: TimeSeries) -> np.ndarray:
+    """Volume-weighted average of the typical price ``(high + low + close) / 3``.
+
+    Intraday bars restart the average at each calendar day; daily bars are
+    averaged from the first bar of the series (an anchored VWAP). Bars
+    before any volume has traded are NaN.
+    """
+    return _memo.compute(series, "vwap", _vwap_kernel)["vwap"]
@@ -0,0 +1,207 @@
+"""Incremental decoding of large JSON time series responses.
+
+``response.json()`` holds a full 20-year history in memory three times over:
+as the body text, as the decoded dict-of-dicts, and as the parsed columns.
+This module reads the body chunk by chunk instead and writes each bar into
+typed column arrays as soon as it is decoded, so only one chunk of text and
+one small batch of bars exist alongside the output at any time.
+
+Only the time series member is streamed. Every other top-level member
+(``Meta Data``, or an ``Error Message`` / ``Note`` / ``Information``
+payload) is small and is decoded whole and returned, so callers can run
+their usual error checks on it.
+
+Usage:
+    from tools.json_stream import decode_time_series
+    response = session.get(url, params=params, stream=True)
+    other, series = decode_time_series(
+        response.iter_content(65536), "Time Series (Daily)", fields
+    )
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+import re
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Any
+
+import numpy as np
+
+from tools.timeseries import DAILY_UNIT, INTRADAY_UNIT, PRICE_FIELDS, TimeSeries
+
+BATCH_SIZE = 1024
+"""Bars buffered as strings before being converted to typed arrays."""
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+
+
+class _Reader:
+    """A JSON token reader over an iterator of UTF-8 byte chunks."""
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks: Iterator[bytes] = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Append the next chunk to the buffer; False once the stream is done."""
+        if self._eof:
+            return False
+        if self._pos > len(self._buf) // 2:
+            # Drop consumed text so the buffer stays around one chunk long
+            self._buf = self._buf[self._pos :]
+            self._pos = 0
+        for chunk in self._chunks:
+            if chunk:
+                self._buf += self._utf8.decode(chunk)
+                return True
+        self._buf += self._utf8.decode(b"", final=True)
+        self._eof = True
+        return False
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character ("" at the end)."""
+        while True:
+            self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        """Consume the next character, which must be one of ``chars``."""
+        char = self.peek()
+        if not char or char not in chars:
+            found = repr(char) if char else "end of data"
+            raise ValueError(f"Expected one of {chars!r}, found {found}")
+        self._pos += 1
+        return char
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number at the very end of the buffer may continue in the
+            # next chunk
+            if end == len(self._buf) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def key(self) -> str:
+        """Decode an object key and the colon that follows it."""
+        if self.peek() != '"':
+            raise ValueError("Expected an object key")
+        key = self.value()
+        self.expect(":")
+        return key
+
+
+class _ColumnBuilder:
+    """Accumulates bars in small string batches and converts them in bulk."""
+
+    def __init__(self) -> None:
+        self._batch: list[list[str]] = [[] for _ in range(6)]
+        self._chunks: list[list[np.ndarray]] = [[] for _ in range(6)]
+        self._unit: str | None = None
+
+    def append(self, date: str, values: Sequence[str]) -> None:
+        self._batch[0].append(date)
+        for column, value in zip(self._batch[1:], values):
+            column.append(value)
+        if len(self._batch[0]) >= BATCH_SIZE:
+            self._flush()
+
+    def _flush(self) -> None:
+        dates = self._batch[0]
+        if not dates:
+            return
+        if self._unit is None:
+            self._unit = INTRADAY_UNIT if len(dates[0]) > 10 else DAILY_UNIT
+        dtypes = [self._unit] + [np.float64] * len(PRICE_FIELDS) + [np.int64]
+        for chunks, batch, dtype in zip(self._chunks, self._batch, dtypes):
+            chunks.append(np.array(batch, dtype=dtype))
+            batch.clear()
+
+    def build(self) -> TimeSeries:
+        """Return the accumulated bars as a date-sorted series."""
+        self._flush()
+        if not self._chunks[0]:
+            return TimeSeries.empty()
+        columns = [np.concatenate(chunks) for chunks in self._chunks]
+        order = np.argsort(columns[0], kind="stable")
+        return TimeSeries(*(column[order] for column in columns))
+
+
+def _decode_series(reader: _Reader, fields: Sequence[str]) -> TimeSeries:
+    """Decode a ``{date: {field: value, ...}, ...}`` object bar by bar."""
+    builder = _ColumnBuilder()
+    reader.expect("{")
+    if reader.peek() == "}":
+        reader.expect("}")
+        return builder.build()
+    while True:
+        date = reader.key()
+        bar = reader.value()
+        try:
+            builder.append(date, [bar[field] for field in fields])
+        except (KeyError, TypeError) as exc:
+            raise ValueError(f"Malformed bar for {date!r}: {exc!r}") from exc
+        if reader.expect(",}") == "}":
+            return builder.build()
+
+
+def decode_time_series(
+    chunks: Iterable[bytes],
+    time_series_key: str,
+    fields: Sequence[str],
+) -> tuple[dict[str, Any], TimeSeries | None]:
+    """Decode a JSON time series response from a stream of byte chunks.
+
+    Parameters
+    ----------
+    chunks:
+        The response body, e.g. ``response.iter_content(65536)``.
+    time_series_key:
+        The top-level member holding the bars (e.g. "Time Series (Daily)").
+    fields:
+        Per-bar keys in open, high, low, close, volume order.
+
+    Returns
+    -------
+    tuple[dict[str, Any], TimeSeries | None]
+        Every other top-level member, decoded in full, and the series, or
+        None if ``time_series_key`` was absent.
+
+    Raises
+    ------
+    ValueError
+        If the body is not a JSON object or a bar is malformed.
+    """
+    reader = _Reader(chunks)
+    other: dict[str, Any] = {}
+    series: TimeSeries | None = None
+
+    reader.expect("{")
+    if reader.peek() == "}":
+        reader.expect("}")
+        return other, series
+    while True:
+        key = reader.key()
+        if key == time_series_key:
+            series = _decode_series(reader, fields)
+        else:
+            other[key] = reader.value()
+        if reader.expect(",}") == "}":
+            return other, series
@@ -0,0 +1,354 @@
+"""Date-aligned multi-symbol price matrices.
+
+Comparison charts and metrics need several symbols on one date axis, and
+doing that per symbol and per row (matching dates, normalising, computing
+spreads) is repeated on every dashboard rerun. :func:`align` lines the
+series up once into an N×T :class:`PriceMatrix` (one row per symbol, one
+column per date), and every derived view is then a whole-matrix NumPy
+operation.
+
+Matrices are memoized per (symbols, field, join, fill) for as long as the
+input series are the very same objects, i.e. until one of them is
+refetched, so a rerun that loads the same cached data gets the same matrix
+back without any work.
+
+Usage:
+    from tools.matrix import build_matrix
+    m = build_matrix(["AAPL", "MSFT", "GOOGL"], join="outer", fill="ffill")
+    px.line(m.normalized().columns(), x="date", y=list(m.symbols))
+    m.summary()["AAPL"]["change_pct"]
+    m.spread("AAPL", "MSFT")
+"""
+
+from __future__ import annotations
+
+import threading
+import weakref
+from collections import OrderedDict
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+import numpy as np
+
+from tools.alpha_vantage_async import fetch_many_sync
+from tools.timeseries import FIELDS, DateLike, TimeSeries, format_dates, to_datetime64
+
+JOINS = ("outer", "inner")
+"""``outer`` keeps every date any symbol traded; ``inner`` only common dates."""
+
+FILLS = (None, "ffill")
+"""Gap handling: leave missing values as NaN, or carry the last value forward."""
+
+MEMO_SIZE = 64
+"""Matrices kept by :func:`align`'s memo."""
+
+
+class PriceMatrix:
+    """One OHLCV field of several symbols on a shared date axis.
+
+    Parameters
+    ----------
+    symbols:
+        Row labels, in row order.
+    dates:
+        Sorted datetime64 column labels.
+    values:
+        float64 array of shape ``(len(symbols), len(dates))``; NaN where a
+        symbol has no bar on a date. Read-only for aligned matrices.
+    errors:
+        Symbols that could not be loaded, mapped to the exception raised.
+    """
+
+    __slots__ = ("dates", "errors", "symbols", "values")
+
+    def __init__(
+        self,
+        symbols: tuple[str, ...],
+        dates: np.ndarray,
+        values: np.ndarray,
+        errors: dict[str, Exception] | None = None,
+    ) -> None:
+        self.symbols = symbols
+        self.dates = dates
+        self.values = values
+        self.errors = errors or {}
+
+    def _with(self, values: np.ndarray) -> PriceMatrix:
+        return PriceMatrix(self.symbols, self.dates, values, self.errors)
+
+    # -- access ------------------------------------------------------------
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """``(symbols, dates)``."""
+        return self.values.shape
+
+    def row(self, symbol: str) -> np.ndarray:
+        """Return the values of ``symbol`` across all dates.
+
+        Raises
+        ------
+        KeyError
+            If ``symbol`` is not in the matrix.
+        """
+        try:
+            return self.values[self.symbols.index(symbol.upper())]
+        except ValueError:
+            raise KeyError(symbol) from None
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        """``m["date"]`` returns date strings; ``m["AAPL"]`` a row."""
+        if key == "date":
+            return format_dates(self.dates)
+        return self.row(key)
+
+    def columns(self) -> dict[str, np.ndarray]:
+        """Return ``{"date": ..., symbol: row, ...}``, the wide form Plotly
+        Express accepts as ``data_frame``."""
+        return {
+            "date": format_dates(self.dates),
+            **dict(zip(self.symbols, self.values)),
+        }
+
+    def between(
+        self, start: DateLike | None = None, end: DateLike | None = None
+    ) -> PriceMatrix:
+        """Return the dates from ``start`` through ``end`` as a view.
+
+        Bounds behave as in :meth:`TimeSeries.between`.
+        """
+        lo, hi = 0, len(self.dates)
+        if start is not None:
+            lo = int(np.searchsorted(self.dates, to_datetime64(start), side="left"))
+        if end is not None:
+            after = to_datetime64(end) + 1
+            hi = int(np.searchsorted(self.dates, after, side="left"))
+        hi = max(lo, hi)
+        return PriceMatrix(
+            self.symbols, self.dates[lo:hi], self.values[:, lo:hi], self.errors
+        )
+
+    # -- derived views -----------------------------------------------------
+
+    def _first_valid(self) -> np.ndarray:
+        """Return each row's first non-NaN value (NaN for an empty row)."""
+        valid = ~np.isnan(self.values)
+        first = np.full(len(self.symbols), np.nan)
+        has = valid.any(axis=1)
+        index = valid.argmax(axis=1)
+        first[has] = self.values[has, index[has]]
+        return first
+
+    def normalized(self, base: float = 100.0) -> PriceMatrix:
+        """Rebase each row so its first available value equals ``base``."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self._with(self.values / self._first_valid()[:, None] * base)
+
+    def returns(self) -> PriceMatrix:
+        """Return the fractional change from each date to the next.
+
+        The first column, and any column following a gap, is NaN.
+        """
+        values = np.full(self.values.shape, np.nan)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            values[:, 1:] = self.values[:, 1:] / self.values[:, :-1] - 1
+        return self._with(values)
+
+    def spread(self, a: str, b: str) -> np.ndarray:
+        """Return ``a - b`` on every date."""
+        return self.row(a) - self.row(b)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Return metric rows: ``{symbol: {first, last, change, change_pct,
+        high, low}}`` over the matrix's date range, ignoring gaps."""
+        if not self.values.size:
+            return {symbol: {} for symbol in self.symbols}
+        first = self._first_valid()
+        valid = ~np.isnan(self.values)
+        last_index = self.values.shape[1] - 1 - valid[:, ::-1].argmax(axis=1)
+        last = np.where(
+            valid.any(axis=1), self.values[np.arange(len(first)), last_index], np.nan
+        )
+        with np.errstate(invalid="ignore", divide="ignore"):
+            metrics = {
+                "first": first,
+                "last": last,
+                "change": last - first,
+                "change_pct": (last / first - 1) * 100,
+                "high": np.fmax.reduce(self.values, axis=1),
+                "low": np.fmin.reduce(self.values, axis=1),
+            }
+        rows = {name: column.tolist() for name, column in metrics.items()}
+        return {
+            symbol: {name: rows[name][i] for name in rows}
+            for i, symbol in enumerate(self.symbols)
+        }
+
+    def __repr__(self) -> str:
+        n, t = self.shape
+        return f"PriceMatrix({n} symbols x {t} dates)"
+
+
+# ---------------------------------------------------------------------------
+# Alignment
+# ---------------------------------------------------------------------------
+
+
+def _forward_fill(values: np.ndarray) -> np.ndarray:
+    """Replace each NaN with the last non-NaN value before it in its row."""
+    index = np.where(np.isnan(values), 0, np.arange(values.shape[1]))
+    np.maximum.accumulate(index, axis=1, out=index)
+    return np.take_along_axis(values, index, axis=1)
+
+
+def _align(
+    series: Mapping[str, TimeSeries], field: str, join: str, fill: str | None
+) -> PriceMatrix:
+    symbols = tuple(series)
+    if not symbols:
+        return PriceMatrix((), np.array([], dtype="datetime64[D]"), np.empty((0, 0)))
+    if len({s.dates.dtype for s in series.values()}) > 1:
+        raise ValueError("Cannot align daily and intraday series")
+
+    stacked = np.concatenate([s.dates for s in series.values()])
+    dates, counts = np.unique(stacked, return_counts=True)
+    if join == "inner":
+        dates = dates[counts == len(symbols)]
+
+    values = np.full((len(symbols), len(dates)), np.nan)
+    for row, s in zip(values, series.values()):
+        position = np.searchsorted(dates, s.dates)
+        found = position < len(dates)
+        found[found] = dates[position[found]] == s.dates[found]
+        row[position[found]] = getattr(s, field)[found]
+
+    if fill == "ffill":
+        values = _forward_fill(values)
+    # Shared by every caller of the memoized matrix
+    values.flags.writeable = False
+    return PriceMatrix(symbols, dates, values)
+
+
+_memo: OrderedDict[
+    tuple[Any, ...], tuple[tuple[weakref.ref[TimeSeries], ...], PriceMatrix]
+] = OrderedDict()
+# Reentrant: a series collected while the lock is held evicts its entries
+_memo_lock = threading.RLock()
+
+
+def _evict(key: tuple[Any, ...], ref: weakref.ref[TimeSeries]) -> None:
+    """Drop ``key`` once one of its series is collected, unless since replaced."""
+    with _memo_lock:
+        entry = _memo.get(key)
+        if entry is not None and any(r is ref for r in entry[0]):
+            del _memo[key]
+
+
+def align(
+    series: Mapping[str, TimeSeries],
+    field: str = "close",
+    join: str = "outer",
+    fill: str | None = None,
+) -> PriceMatrix:
+    """Line several series up on one date axis.
+
+    Parameters
+    ----------
+    series:
+        Maps each symbol to its series; rows follow the mapping's order.
+    field:
+        The OHLCV field to place in the matrix.
+    join:
+        "outer" (every date of any series) or "inner" (dates all share).
+    fill:
+        None leaves missing values as NaN; "ffill" carries each symbol's
+        last value forward (values before its first bar stay NaN).
+
+    Returns
+    -------
+    PriceMatrix
+        Memoized: the same matrix object is returned while every input
+        series is the same object as last time. The series are only weakly
+        referenced, and the matrix is forgotten once one is collected.
+
+    Raises
+    ------
+    ValueError
+        If an argument is invalid, or daily and intraday series are mixed.
+    """
+    if field not in FIELDS[1:]:
+        raise ValueError(
+            f"Invalid field '{field}'. Must be one of: {', '.join(FIELDS[1:])}"
+        )
+    if join not in JOINS:
+        raise ValueError(f"Invalid join '{join}'. Must be one of: {', '.join(JOINS)}")
+    if fill not in FILLS:
+        raise ValueError(f"Invalid fill '{fill}'. Must be None or 'ffill'")
+
+    key = (tuple(series), field, join, fill)
+    versions = tuple(series.values())
+    with _memo_lock:
+        entry = _memo.get(key)
+        if entry is not None and all(r() is s for r, s in zip(entry[0], versions)):
+            _memo.move_to_end(key)
+            return entry[1]
+
+    matrix = _align(series, field, join, fill)
+    with _memo_lock:
+        refs = tuple(
+            weakref.ref(s, lambda ref, key=key: _evict(key, ref)) for s in versions
+        )
+        _memo[key] = (refs, matrix)
+        _memo.move_to_end(key)
+        while len(_memo) > MEMO_SIZE:
+            _memo.popitem(last=False)
+    return matrix
+
+
+def clear_memo() -> None:
+    """Forget every memoized matrix."""
+    with _memo_lock:
+        _memo.clear()
+
+
+def build_matrix(
+    symbols: Iterable[str],
+    field: str = "close",
+    join: str = "outer",
+    fill: str | None = None,
+    function: str = "daily",
+    **kwargs: Any,
+) -> PriceMatrix:
+    """Fetch several symbols concurrently and align them into a matrix.
+
+    Parameters
+    ----------
+    symbols:
+        Ticker symbols; duplicates are loaded once.
+    field, join, fill:
+        See :func:`align`.
+    function:
+        "daily" or "intraday".
+    **kwargs:
+        Passed to the fetch function (e.g. ``outputsize``, ``interval``,
+        ``max_stale``).
+
+    Returns
+    -------
+    PriceMatrix
+        One row per symbol that loaded. Symbols whose fetch failed are left
+        out and reported in :attr:`PriceMatrix.errors`, so one bad ticker
+        never blanks a comparison chart.
+
+    Raises
+    ------
+    ValueError
+        If an argument is invalid.
+    """
+    results = fetch_many_sync(symbols, function, **kwargs)
+    loaded = {s: r for s, r in results.items() if isinstance(r, TimeSeries)}
+    errors = {s: r for s, r in results.items() if isinstance(r, Exception)}
+    matrix = align(loaded, field, join, fill)
+    if not errors:
+        return matrix
+    return PriceMatrix(matrix.symbols, matrix.dates, matrix.values, errors)
@@ -0,0 +1,267 @@
+"""Size-bounded in-process cache tier for market data.
+
+The in-memory (L1) tier in :mod:`tools.alpha_vantage` sits in front of the
+shared disk cache. A long-running Streamlit server that browses many tickers
+and intervals would keep every series it has ever loaded, so this tier holds
+a byte budget instead: entries are accounted by the size of their column
+buffers and the least recently used ones are evicted once the budget is
+exceeded. Expired entries are kept for a retention period, since a stale
+series is still worth serving or patching, and then dropped by a background
+sweeper rather than waiting for the same key to be looked up again.
+
+Usage:
+    from tools.memory_cache import MemoryCache
+    cache = MemoryCache(max_bytes=64 * 2**20)
+    cache["TIME_SERIES_DAILY:AAPL"] = (time.time() + 300, series)
+    hit = cache.get("TIME_SERIES_DAILY:AAPL")  # (expires_at, data) or None
+    cache.stats()  # {"entries": 1, "bytes": ..., "evictions": 0, ...}
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+ENTRY_OVERHEAD = 256
+"""Bytes charged per entry for the key, tuple and object headers."""
+
+
+def sizeof(data: Any) -> int:
+    """Estimate the memory held by a cached value.
+
+    Values exposing ``nbytes`` (a ``TimeSeries`` or NumPy array) are charged
+    for their buffers; anything else for the length of its JSON encoding.
+    """
+    nbytes = getattr(data, "nbytes", None)
+    if nbytes is not None:
+        return int(nbytes) + ENTRY_OVERHEAD
+    try:
+        return len(json.dumps(data, default=str)) + ENTRY_OVERHEAD
+    except (TypeError, ValueError):
+        return ENTRY_OVERHEAD
+
+
+# ---------------------------------------------------------------------------
+# Memory cache
+# ---------------------------------------------------------------------------
+
+
+class MemoryCache:
+    """A thread-safe LRU mapping of keys to ``(expires_at, data)`` entries.
+
+    Supports the mapping operations the client needs (``cache[key]``,
+    ``key in cache``, ``del cache[key]``, ``len(cache)``, ``clear()``) so it
+    can stand in for a plain dict.
+
+    Parameters
+    ----------
+    max_bytes:
+        Budget for the accounted size of all entries. When storing an entry
+        pushes the total over budget, least recently used entries are
+        evicted. An entry larger than the whole budget is not kept at all.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[float, Any, int]] = OrderedDict()
+        self._bytes = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._lock = threading.RLock()
+        self._sweeper: threading.Thread | None = None
+        self._sweeper_pid: int | None = None
+        self._stop = threading.Event()
+
+    # -- mapping protocol --------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._entries))
+
+    def __getitem__(self, key: str) -> tuple[float, Any]:
+        entry = self.get(key)
+        if entry is None:
+            raise KeyError(key)
+        return entry
+
+    def __setitem__(self, key: str, entry: tuple[float, Any]) -> None:
+        expires_at, data = entry
+        size = sizeof(data)
+        with self._lock:
+            self._discard(key)
+            if size > self.max_bytes:
+                self._evictions += 1
+                return
+            self._entries[key] = (expires_at, data, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self._evictions += 1
+
+    def __delitem__(self, key: str) -> None:
+        with self._lock:
+            if not self._discard(key):
+                raise KeyError(key)
+
+    def _discard(self, key: str) -> bool:
+        """Remove ``key`` if present. Caller holds the lock."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= entry[2]
+        return True
+
+    def get(self, key: str) -> tuple[float, Any] | None:
+        """Return ``(expires_at, data)`` for ``key`` and mark it recently used.
+
+        Expiry is not checked; that is up to the caller.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0], entry[1]
+
+    def pop(self, key: str) -> tuple[float, Any] | None:
+        """Remove ``key`` and return its entry, or None if it was absent."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._discard(key)
+            return entry[0], entry[1]
+
+    def clear(self) -> None:
+        """Remove every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._evictions = 0
+            self._expirations = 0
+
+    # -- maintenance -------------------------------------------------------
+
+    @property
+    def nbytes(self) -> int:
+        """Accounted size of all entries."""
+        return self._bytes
+
+    def purge_expired(self, grace: float = 0.0) -> int:
+        """Remove entries that expired more than ``grace`` seconds ago.
+
+        Returns
+        -------
+        int
+            The number of entries removed.
+        """
+        cutoff = time.time() - grace
+        with self._lock:
+            expired = [k for k, (exp, _, _) in self._entries.items() if exp <= cutoff]
+            for key in expired:
+                self._discard(key)
+            self._expirations += len(expired)
+        return len(expired)
+
+    def stats(self) -> dict[str, int]:
+        """Report occupancy and eviction counters.
+
+        Returns
+        -------
+        dict[str, int]
+            A dict with keys:
+
+            - ``entries`` / ``bytes``: current occupancy.
+            - ``max_bytes``: the configured budget.
+            - ``evictions``: entries dropped (or refused) to stay in budget.
+            - ``expirations``: expired entries removed by sweeping.
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
+
+    def start_sweeper(
+        self,
+        interval: float,
+        on_sweep: Callable[[], None] | None = None,
+        grace: float = 0.0,
+    ) -> None:
+        """Purge expired entries every ``interval`` seconds on a daemon thread.
+
+        Safe to call repeatedly; a sweeper already running in this process
+        is left alone. A forked child starts its own.
+
+        Parameters
+        ----------
+        interval:
+            Seconds between sweeps.
+        on_sweep:
+            Extra work to run after each sweep (e.g. purging another tier).
+            Exceptions it raises are logged and the sweeper carries on.
+        grace:
+            Seconds an entry is kept after it expires; see
+            :meth:`purge_expired`.
+        """
+        with self._lock:
+            if (
+                self._sweeper is not None
+                and self._sweeper_pid == os.getpid()
+                and self._sweeper.is_alive()
+            ):
+                return
+            self._stop = threading.Event()
+            self._sweeper = threading.Thread(
+                target=self._sweep_forever,
+                args=(interval, on_sweep, grace, self._stop),
+                name="memory-cache-sweeper",
+                daemon=True,
+            )
+            self._sweeper_pid = os.getpid()
+            self._sweeper.start()
+
+    def stop_sweeper(self) -> None:
+        """Stop the background sweeper, if one is running."""
+        with self._lock:
+            sweeper, self._sweeper = self._sweeper, None
+            self._stop.set()
+        if sweeper is not None and sweeper.is_alive():
+            sweeper.join()
+
+    def _sweep_forever(
+        self,
+        interval: float,
+        on_sweep: Callable[[], None] | None,
+        grace: float,
+        stop: threading.Event,
+    ) -> None:
+        while not stop.wait(interval):
+            self.purge_expired(grace)
+            if on_sweep is not None:
+                try:
+                    on_sweep()
+                except Exception:  # Keep the sweeper alive
+                    logger.exception("Cache sweep callback failed")
@@ -0,0 +1,683 @@
+"""Client-side rate limiting for the Alpha Vantage API.
+
+Alpha Vantage enforces a per-minute and a per-day call limit (5/minute and
+25/day on the free tier) and only tells us about a breach *after* the call
+has been spent. This module keeps us inside both budgets up front:
+
+- A sliding window of send times holds calls to the per-minute budget: a
+  call goes out only while fewer than that many were sent in the last 60
+  seconds. Callers either queue for the next free slot or fail fast.
+- A daily ledger counts the calls made today.
+
+Both are persisted in the shared SQLite database, so every process on the
+host (CLI calls, the Streamlit app, the daemon) draws from the same budgets.
+
+Background work (e.g. cache warming) can ask for a slot at low priority: it
+gives way to queued interactive callers, leaves one call of the minute
+budget free, and can be told to leave part of the daily budget unused.
+
+Each API key has its own budgets. A :class:`KeyPool` holds a limiter per key
+and sends every call with the key that has the most headroom, so several
+keys multiply the calls that can run in parallel.
+
+When the API reports a rate limit anyway (e.g. the key is also used
+elsewhere), a per-key :class:`CircuitBreaker` opens for a cool-down: calls
+that would certainly be refused fail locally instead of being sent.
+
+Usage:
+    from tools.rate_limit import KeyPool, QuotaLedger, RateLimiter
+    limiter = RateLimiter(per_minute=5, per_day=25, ledger=QuotaLedger(path))
+    limiter.acquire(wait=True)   # blocks until a call may be sent
+    limiter.status()             # {"calls_remaining_today": 24, ...}
+
+    pool = KeyPool(["KEY1", "KEY2"], per_minute=5, per_day=25, path=path)
+    key = pool.acquire()         # the key to send this call with
+    pool.trip(key)               # the API said no: rest the key
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Sequence
+from typing import Any
+
+from tools.disk_cache import SharedDatabase
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quota_ledger (
+    day TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    calls INTEGER NOT NULL,
+    PRIMARY KEY (day, bucket)
+);
+CREATE TABLE IF NOT EXISTS call_log (
+    bucket TEXT NOT NULL,
+    sent_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS call_log_bucket ON call_log (bucket, sent_at);
+"""
+
+WINDOW = 60.0
+"""Seconds covered by the per-minute budget's sliding window."""
+
+
+class QuotaExceeded(Exception):
+    """Raised when a call cannot be scheduled within the rate limits.
+
+    Attributes
+    ----------
+    next_slot_at:
+        Unix timestamp at which the next call could be sent.
+    daily:
+        True if the daily budget (rather than the per-minute one) is spent.
+    """
+
+    def __init__(self, message: str, next_slot_at: float, daily: bool) -> None:
+        super().__init__(message)
+        self.next_slot_at = next_slot_at
+        self.daily = daily
+
+
+def _today() -> str:
+    """Return the current UTC date, which identifies a ledger day."""
+    return dt.datetime.now(dt.UTC).date().isoformat()
+
+
+def _next_day_start() -> float:
+    """Return the Unix timestamp of the next UTC midnight."""
+    today = dt.datetime.now(dt.UTC).date()
+    tomorrow = dt.datetime.combine(
+        today + dt.timedelta(days=1), dt.time(), tzinfo=dt.UTC
+    )
+    return tomorrow.timestamp()
+
+
+def _window_delay(
+    sends: list[float], per_window: int, window: float, now: float
+) -> float:
+    """Return how long until fewer than ``per_window`` of ``sends`` fall in
+    the window ending at ``now`` (0 if that is already the case).
+
+    ``sends`` are the send times inside the window, oldest first.
+    """
+    if len(sends) < per_window:
+        return 0.0
+    # Enough of the oldest sends must leave the window to make room for one
+    return sends[len(sends) - per_window] + window - now
+
+
+# ---------------------------------------------------------------------------
+# Daily ledger
+# ---------------------------------------------------------------------------
+
+
+class QuotaLedger:
+    """Count of API calls made per UTC day, and log of recent send times.
+
+    With a ``path`` both live in SQLite and are shared by every process
+    using the same database; without one they are kept in memory.
+
+    Parameters
+    ----------
+    path:
+        Location of the SQLite database, or None for an in-process ledger.
+    bucket:
+        Name of the budget being counted, so several budgets (e.g. one per
+        API key) can share a database.
+    """
+
+    def __init__(self, path: str | os.PathLike[str] | None, bucket: str = "default"):
+        self.bucket = bucket
+        self._db = SharedDatabase(path, _SCHEMA) if path is not None else None
+        self._memory: dict[str, int] = {}
+        self._sends: list[float] = []  # In-memory send log, oldest first
+        self._lock = threading.Lock()
+
+    def used(self, day: str | None = None) -> int:
+        """Return the number of calls recorded for ``day`` (default: today)."""
+        day = day or _today()
+        if self._db is None:
+            with self._lock:
+                return self._memory.get(day, 0)
+        try:
+            row = (
+                self._db.connect()
+                .execute(
+                    "SELECT calls FROM quota_ledger WHERE day = ? AND bucket = ?",
+                    (day, self.bucket),
+                )
+                .fetchone()
+            )
+        except (sqlite3.Error, OSError):
+            with self._lock:
+                return self._memory.get(day, 0)
+        return row[0] if row else 0
+
+    def try_consume(self, limit: int, day: str | None = None) -> bool:
+        """Record one call if fewer than ``limit`` have been made on ``day``.
+
+        The check and the increment happen in a single statement, so two
+        processes can never both take the last call of the day.
+
+        Returns
+        -------
+        bool
+            True if the call was recorded, False if the budget is spent.
+        """
+        day = day or _today()
+        if self._db is not None:
+            try:
+                conn = self._db.connect()
+                with conn:
+                    return self._consume(conn, limit, day)
+            except (sqlite3.Error, OSError):
+                pass  # Fall back to counting in memory
+        with self._lock:
+            return self._consume_in_memory(limit, day)
+
+    def _consume(self, conn: sqlite3.Connection, limit: int, day: str) -> bool:
+        cursor = conn.execute(
+            "INSERT INTO quota_ledger (day, bucket, calls) VALUES (?, ?, 1) "
+            "ON CONFLICT (day, bucket) DO UPDATE SET calls = calls + 1 "
+            "WHERE calls < ?",
+            (day, self.bucket, limit),
+        )
+        return cursor.rowcount == 1 and limit > 0
+
+    def _consume_in_memory(self, limit: int, day: str) -> bool:
+        """Count one call in memory. Caller holds the lock."""
+        calls = self._memory.get(day, 0)
+        if calls >= limit:
+            return False
+        self._memory[day] = calls + 1
+        return True
+
+    def sends(self, window: float = WINDOW, now: float | None = None) -> list[float]:
+        """Return the send times recorded in the last ``window`` seconds,
+        oldest first."""
+        now = time.time() if now is None else now
+        since = now - window
+        if self._db is not None:
+            try:
+                rows = (
+                    self._db.connect()
+                    .execute(
+                        "SELECT sent_at FROM call_log "
+                        "WHERE bucket = ? AND sent_at > ? ORDER BY sent_at",
+                        (self.bucket, since),
+                    )
+                    .fetchall()
+                )
+                return [row[0] for row in rows]
+            except (sqlite3.Error, OSError):
+                pass
+        with self._lock:
+            return [t for t in self._sends if t > since]
+
+    def try_send(
+        self,
+        per_window: int,
+        limit: int,
+        window: float = WINDOW,
+        day: str | None = None,
+        now: float | None = None,
+    ) -> float:
+        """Record one call sent at ``now`` if both budgets allow it.
+
+        The call is recorded only if fewer than ``per_window`` calls were
+        sent in the last ``window`` seconds and fewer than ``limit`` on
+        ``day``. Checks and record happen in one transaction, so processes
+        sharing the database never overrun either budget between them.
+
+        Returns
+        -------
+        float
+            0.0 if the call was recorded. Otherwise the seconds until the
+            window has room again, or ``math.inf`` if the daily budget is
+            spent.
+        """
+        day = day or _today()
+        now = time.time() if now is None else now
+        if self._db is not None:
+            try:
+                conn = self._db.connect()
+                with conn:
+                    conn.execute("BEGIN IMMEDIATE")
+                    conn.execute(
+                        "DELETE FROM call_log WHERE bucket = ? AND sent_at <= ?",
+                        (self.bucket, now - window),
+                    )
+                    recent = [
+                        row[0]
+                        for row in conn.execute(
+                            "SELECT sent_at FROM call_log "
+                            "WHERE bucket = ? ORDER BY sent_at",
+                            (self.bucket,),
+                        )
+                    ]
+                    delay = _window_delay(recent, per_window, window, now)
+                    if delay:
+                        return delay
+                    if not self._consume(conn, limit, day):
+                        return math.inf
+                    conn.execute(
+                        "INSERT INTO call_log (bucket, sent_at) VALUES (?, ?)",
+                        (self.bucket, now),
+                    )
+                return 0.0
+            except (sqlite3.Error, OSError):
+                pass  # Fall back to counting in memory
+        with self._lock:
+            self._sends = [t for t in self._sends if t > now - window]
+            delay = _window_delay(self._sends, per_window, window, now)
+            if delay:
+                return delay
+            if not self._consume_in_memory(limit, day):
+                return math.inf
+            self._sends.append(now)
+            return 0.0
+
+    def mark_exhausted(self, limit: int, day: str | None = None) -> None:
+        """Record that the budget for ``day`` is spent.
+
+        Used when the API reports the daily limit before our own count does,
+        e.g. because another client shares the key.
+        """
+        day = day or _today()
+        if self._db is not None:
+            try:
+                conn = self._db.connect()
+                with conn:
+                    conn.execute(
+                        "INSERT INTO quota_ledger (day, bucket, calls) VALUES (?, ?, ?) "
+                        "ON CONFLICT (day, bucket) DO UPDATE "
+                        "SET calls = MAX(calls, excluded.calls)",
+                        (day, self.bucket, limit),
+                    )
+                return
+            except (sqlite3.Error, OSError):
+                pass
+        with self._lock:
+            self._memory[day] = max(self._memory.get(day, 0), limit)
+
+
+# ---------------------------------------------------------------------------
+# Rate limiter
+# ---------------------------------------------------------------------------
+
+
+class RateLimiter:
+    """Scheduler for the per-minute and per-day budgets.
+
+    The per-minute budget is a sliding window, which is how the API counts:
+    a call may be sent only while fewer than ``per_minute`` calls were sent
+    in the last ``window`` seconds. Send times are recorded in the ledger,
+    so limiters sharing a ledger database share the window as well.
+
+    Parameters
+    ----------
+    per_minute:
+        Maximum calls in any ``window`` seconds.
+    per_day:
+        Maximum calls per UTC day.
+    ledger:
+        Where daily usage and send times are recorded. Defaults to an
+        in-process ledger.
+    window:
+        Length of the per-minute window, in seconds.
+    """
+
+    def __init__(
+        self,
+        per_minute: int = 5,
+        per_day: int = 25,
+        ledger: QuotaLedger | None = None,
+        window: float = WINDOW,
+    ) -> None:
+        self.per_minute = per_minute
+        self.per_day = per_day
+        self.ledger = ledger if ledger is not None else QuotaLedger(None)
+        self.window = window
+        self._cond = threading.Condition()
+        self._queued = 0  # Interactive callers waiting for a slot
+
+    def _try_send(self, limit: int, background: bool) -> float:
+        """Record a call if a slot is free; see :meth:`QuotaLedger.try_send`.
+        Caller holds the lock.
+
+        Background callers wait while interactive ones are queued, and leave
+        one call of the window free (when the budget allows more than one).
+        """
+        per_window = self.per_minute
+        if background:
+            if self._queued:
+                return self.window / self.per_minute
+            per_window -= min(1, self.per_minute - 1)
+        return self.ledger.try_send(per_window, limit, self.window)
+
+    def _daily_exhausted(self, reserve: int = 0) -> QuotaExceeded:
+        if reserve:
+            message = (
+                f"Daily API budget of {self.per_day} calls is used up, apart "
+                f"from {reserve} reserved for interactive use."
+            )
+        else:
+            message = f"Daily API budget of {self.per_day} calls is used up."
+        return QuotaExceeded(message, next_slot_at=_next_day_start(), daily=True)
+
+    def acquire(
+        self,
+        wait: bool = True,
+        timeout: float | None = None,
+        background: bool = False,
+        reserve: int = 0,
+    ) -> None:
+        """Reserve one API call.
+
+        Parameters
+        ----------
+        wait:
+            If True, queue until the per-minute budget has a free slot. If
+            False, fail immediately when no slot is free.
+        timeout:
+            Maximum seconds to wait when ``wait`` is True. None waits as long
+            as needed (at most one window per queued caller).
+        background:
+            Schedule the call at low priority: it waits while interactive
+            callers are queued and never takes the last free slot of the
+            minute, so a user never queues behind background work.
+        reserve:
+            Number of today's calls to leave unused; the call is refused
+            once only this many remain. Meant for background callers.
+
+        Raises
+        ------
+        QuotaExceeded
+            If the daily budget (less ``reserve``) is spent, or no per-minute
+            slot became available (immediately when ``wait`` is False, or
+            within ``timeout``).
+        """
+        limit = self.per_day - reserve
+        if self.ledger.used() >= limit:
+            raise self._daily_exhausted(reserve)
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            queued = False
+            try:
+                while True:
+                    delay = self._try_send(limit, background)
+                    if delay == 0:
+                        return
+                    if math.isinf(delay):
+                        raise self._daily_exhausted(reserve)
+                    if not wait or (
+                        deadline is not None and time.monotonic() + delay > deadline
+                    ):
+                        raise QuotaExceeded(
+                            f"Per-minute API budget of {self.per_minute} calls is "
+                            f"used up; next slot in {delay:.0f}s.",
+                            next_slot_at=time.time() + delay,
+                            daily=False,
+                        )
+                    if not background and not queued:
+                        queued = True
+                        self._queued += 1
+                    self._cond.wait(delay)
+            finally:
+                if queued:
+                    self._queued -= 1
+                    # Let waiting background callers re-check the queue
+                    self._cond.notify_all()
+
+    def status(self) -> dict[str, Any]:
+        """Report the remaining budget.
+
+        Returns
+        -------
+        dict[str, Any]
+            A dict with keys:
+
+            - ``calls_remaining_minute``: calls that could be sent right now.
+            - ``calls_used_today`` / ``calls_remaining_today``: daily usage.
+            - ``next_slot_at``: Unix timestamp of the next permitted call
+              (now, if one is available).
+        """
+        used = self.ledger.used()
+        remaining_today = max(0, self.per_day - used)
+        now = time.time()
+        sends = self.ledger.sends(self.window, now)
+        remaining_minute = max(0, self.per_minute - len(sends))
+        delay = _window_delay(sends, self.per_minute, self.window, now)
+        if remaining_today == 0:
+            next_slot_at = _next_day_start()
+        else:
+            next_slot_at = now + delay
+        return {
+            "calls_remaining_minute": min(remaining_minute, remaining_today),
+            "calls_used_today": used,
+            "calls_remaining_today": remaining_today,
+            "next_slot_at": next_slot_at,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Circuit breaker
+# ---------------------------------------------------------------------------
+
+
+class CircuitBreaker:
+    """Pause for API calls after the API reports a rate limit.
+
+    Every call sent while the API's limit is in force is refused too, so
+    once tripped the breaker stays open for ``cooldown`` seconds and callers
+    are expected to fail locally until it closes.
+
+    Parameters
+    ----------
+    cooldown:
+        Seconds the breaker stays open after a trip.
+    """
+
+    def __init__(self, cooldown: float = 60.0) -> None:
+        self.cooldown = cooldown
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+
+    def trip(self) -> None:
+        """Open the breaker for the cool-down, starting now."""
+        with self._lock:
+            self._open_until = max(self._open_until, time.time() + self.cooldown)
+
+    def open_until(self) -> float | None:
+        """Return the Unix timestamp the breaker closes at, or None if closed."""
+        with self._lock:
+            return self._open_until if self._open_until > time.time() else None
+
+
+# ---------------------------------------------------------------------------
+# Key pool
+# ---------------------------------------------------------------------------
+
+
+def key_bucket(key: str) -> str:
+    """Return the ledger bucket an API key's daily usage is counted in.
+
+    A digest of the key, so keys never reach the database.
+    """
+    return "key-" + hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+
+class KeyPool:
+    """API keys with a rate limiter and daily ledger each.
+
+    Parameters
+    ----------
+    keys:
+        The API keys; repeats are ignored.
+    per_minute:
+        Maximum calls in any 60 seconds, for each key.
+    per_day:
+        Maximum calls per UTC day, for each key.
+    path:
+        Location of the SQLite database holding the daily ledgers, or None
+        for in-process ledgers.
+    cooldown:
+        Seconds a key is rested after :meth:`trip`.
+
+    Raises
+    ------
+    ValueError
+        If ``keys`` is empty.
+    """
+
+    def __init__(
+        self,
+        keys: Sequence[str],
+        per_minute: int = 5,
+        per_day: int = 25,
+        path: str | os.PathLike[str] | None = None,
+        cooldown: float = 60.0,
+    ) -> None:
+        if not keys:
+            raise ValueError("A key pool needs at least one API key.")
+        self.keys = tuple(dict.fromkeys(keys))
+        self.limiters = {
+            key: RateLimiter(per_minute, per_day, QuotaLedger(path, key_bucket(key)))
+            for key in self.keys
+        }
+        self.breakers = {key: CircuitBreaker(cooldown) for key in self.keys}
+
+    def _headroom(self, key: str) -> tuple[int, int]:
+        status = self.limiters[key].status()
+        return status["calls_remaining_minute"], status["calls_remaining_today"]
+
+    def acquire(
+        self,
+        wait: bool = True,
+        timeout: float | None = None,
+        background: bool = False,
+        reserve: int = 0,
+    ) -> str:
+        """Reserve one API call on the key with the most headroom.
+
+        Keys are tried without waiting, those with the most free calls this
+        minute (then today) first; keys whose breaker is open are skipped.
+        If none has a free slot and ``wait`` is True, the caller queues on
+        the key whose next slot comes soonest. It never waits for a breaker
+        to close.
+
+        Parameters
+        ----------
+        wait, timeout, background:
+            As for :meth:`RateLimiter.acquire`.
+        reserve:
+            Number of today's calls to leave unused on each key.
+
+        Returns
+        -------
+        str
+            The key to send the call with.
+
+        Raises
+        ------
+        QuotaExceeded
+            If every key's daily budget (less ``reserve``) is spent or its
+            breaker is open, or no per-minute slot became available on any
+            key.
+        """
+        pending: list[tuple[QuotaExceeded, str]] = []
+        daily: list[QuotaExceeded] = []
+        reopen_at: list[float] = []
+        for key in sorted(self.keys, key=self._headroom, reverse=True):
+            open_until = self.breakers[key].open_until()
+            if open_until is not None:
+                reopen_at.append(open_until)
+                continue
+            try:
+                self.limiters[key].acquire(
+                    wait=False, background=background, reserve=reserve
+                )
+                return key
+            except QuotaExceeded as exc:
+                if exc.daily:
+                    daily.append(exc)
+                else:
+                    pending.append((exc, key))
+
+        if not pending and reopen_at:
+            raise self._breaker_open(min(reopen_at))
+        if not pending:
+            if len(self.keys) == 1:
+                raise daily[0]
+            raise QuotaExceeded(
+                f"Daily API budgets of all {len(self.keys)} keys are used up.",
+                next_slot_at=daily[0].next_slot_at,
+                daily=True,
+            )
+        soonest, key = min(pending, key=lambda item: item[0].next_slot_at)
+        if not wait:
+            raise soonest
+        self.limiters[key].acquire(
+            wait=True, timeout=timeout, background=background, reserve=reserve
+        )
+        return key
+
+    def _breaker_open(self, next_slot_at: float) -> QuotaExceeded:
+        wait = max(0.0, next_slot_at - time.time())
+        return QuotaExceeded(
+            "The API reported a rate limit; calls are paused for "
+            f"{wait:.0f}s instead of being sent to fail.",
+            next_slot_at=next_slot_at,
+            daily=False,
+        )
+
+    def trip(self, key: str) -> None:
+        """Open ``key``'s breaker after the API refused a call for its limit.
+
+        Calls then go to the other keys, or fail locally for the cool-down.
+        """
+        self.breakers[key].trip()
+
+    def mark_exhausted(self, key: str) -> None:
+        """Record that ``key``'s daily budget is spent.
+
+        See :meth:`QuotaLedger.mark_exhausted`.
+        """
+        limiter = self.limiters[key]
+        limiter.ledger.mark_exhausted(limiter.per_day)
+
+    def status(self) -> dict[str, Any]:
+        """Report the remaining budget across all keys.
+
+        Returns
+        -------
+        dict[str, Any]
+            The keys of :meth:`RateLimiter.status`, summed over the pool
+            (``next_slot_at`` is the soonest of any key), plus ``keys``: the
+            number of keys. Keys with an open breaker have no calls left
+            this minute.
+        """
+        statuses = []
+        for key, limiter in self.limiters.items():
+            status = limiter.status()
+            open_until = self.breakers[key].open_until()
+            if open_until is not None:
+                status["calls_remaining_minute"] = 0
+                status["next_slot_at"] = max(status["next_slot_at"], open_until)
+            statuses.append(status)
+        return {
+            "calls_remaining_minute": sum(
+                s["calls_remaining_minute"] for s in statuses
+            ),
+            "calls_used_today": sum(s["calls_used_today"] for s in statuses),
+            "calls_remaining_today": sum(s["calls_remaining_today"] for s in statuses),
+            "next_slot_at": min(s["next_slot_at"] for s in statuses),
+            "keys": len(self.keys),
+        }
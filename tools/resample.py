@@ -0,0 +1,190 @@
+"""Local OHLCV resampling.
+
+Coarser bars can be derived exactly from finer ones, so there is no need to
+spend an API call on 15-minute bars when the 1-minute history for the same
+days is already cached, or on separate weekly and monthly endpoints when the
+daily history is on hand. Each output bar takes the first open, the highest
+high, the lowest low, the last close and the summed volume of the bars it
+covers.
+
+Bars are grouped in a single vectorised pass: the input is already sorted,
+so every group is a contiguous run and NumPy's ``reduceat`` aggregates all
+groups at once.
+
+- Intraday targets (``"5min"`` … ``"60min"``) group bars into fixed
+  windows aligned to the hour and labelled by their start time, matching
+  Alpha Vantage's own intraday timestamps.
+- Calendar targets (``"weekly"``, ``"monthly"``) group daily bars into
+  Monday-to-Sunday weeks or calendar months, labelled by the last trading
+  day in the period, as Alpha Vantage's weekly and monthly series are.
+
+Usage:
+    from tools.resample import resample
+    bars_15m = resample(bars_1m, "15min")
+    weekly = resample(daily, "weekly")
+"""
+
+from __future__ import annotations
+
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+from tools.timeseries import TimeSeries
+
+INTRADAY_TARGETS = {"5min": 5, "15min": 15, "30min": 30, "60min": 60}
+"""Intraday targets and their width in minutes."""
+
+CALENDAR_TARGETS = ("weekly", "monthly")
+"""Calendar-period targets, derived from daily bars."""
+
+MEMO_SIZE = 256
+"""Resampled series kept by :class:`ResampleMemo`."""
+
+_MONDAY_OFFSET = 3
+"""Shift that makes ``days // 7`` weeks start on Monday (1970-01-01 was a
+Thursday)."""
+
+
+def interval_minutes(interval: str) -> int:
+    """Return the width of an Alpha Vantage intraday interval in minutes."""
+    return int(interval.removesuffix("min"))
+
+
+def _group_keys(series: TimeSeries, target: str) -> np.ndarray:
+    """Return one integer group key per bar, non-decreasing along the series."""
+    if target in INTRADAY_TARGETS:
+        if not series.intraday:
+            raise ValueError(f"Cannot resample daily bars to '{target}'")
+        minutes = series.dates.astype("datetime64[m]").astype(np.int64)
+        return minutes // INTRADAY_TARGETS[target]
+    if target in CALENDAR_TARGETS:
+        if series.intraday:
+            raise ValueError(f"Resample intraday bars to daily before '{target}'")
+        if target == "monthly":
+            return series.dates.astype("datetime64[M]").astype(np.int64)
+        days = series.dates.astype(np.int64)
+        return (days + _MONDAY_OFFSET) // 7
+    valid = ", ".join([*INTRADAY_TARGETS, *CALENDAR_TARGETS])
+    raise ValueError(f"Invalid resample target '{target}'. Must be one of: {valid}")
+
+
+def resample(series: TimeSeries, target: str) -> TimeSeries:
+    """Aggregate a series into coarser OHLCV bars.
+
+    Parameters
+    ----------
+    series:
+        The source bars. For intraday targets they must be intraday bars
+        whose interval divides the target evenly; for calendar targets,
+        daily bars.
+    target:
+        One of :data:`INTRADAY_TARGETS` or :data:`CALENDAR_TARGETS`.
+
+    Returns
+    -------
+    TimeSeries
+        The aggregated bars, sorted by date ascending. A window only
+        partially covered by ``series`` (e.g. the current, unfinished hour)
+        aggregates the bars that are present.
+
+    Raises
+    ------
+    ValueError
+        If the target is unknown or does not suit the source bars.
+    """
+    keys = _group_keys(series, target)
+    if not len(series):
+        return series
+
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    if target in INTRADAY_TARGETS:
+        width = INTRADAY_TARGETS[target]
+        dates = (
+            (keys[starts] * width).astype("datetime64[m]").astype(series.dates.dtype)
+        )
+    else:
+        dates = series.dates[np.r_[starts[1:], len(series)] - 1]
+    return aggregate(series, starts, dates)
+
+
+def aggregate(series: TimeSeries, starts: np.ndarray, dates: np.ndarray) -> TimeSeries:
+    """Merge runs of consecutive bars into one bar each.
+
+    Parameters
+    ----------
+    series:
+        The source bars (non-empty).
+    starts:
+        Index of the first bar of each run, ascending and starting at 0.
+    dates:
+        The date to give each merged bar.
+    """
+    ends = np.r_[starts[1:], len(series)] - 1
+    return TimeSeries(
+        dates=dates,
+        open=series.open[starts],
+        high=np.maximum.reduceat(series.high, starts),
+        low=np.minimum.reduceat(series.low, starts),
+        close=series.close[ends],
+        volume=np.add.reduceat(series.volume, starts),
+    )
+
+
+class ResampleMemo:
+    """Remembers resampled series per (symbol, source interval, target).
+
+    A stored result is reused only while it was computed from the very same
+    source object, so a refreshed source is always resampled afresh. Sources
+    are only weakly referenced, and a result is dropped once its source is
+    collected. The least recently used results are dropped beyond
+    ``max_entries``.
+    """
+
+    def __init__(self, max_entries: int = MEMO_SIZE) -> None:
+        self.max_entries = max_entries
+        # (symbol, source, target) -> (weak ref to source, resampled series)
+        self._entries: OrderedDict[
+            tuple[str, ...], tuple[weakref.ref[TimeSeries], TimeSeries]
+        ] = OrderedDict()
+        # Reentrant: a source collected while the lock is held evicts its entry
+        self._lock = threading.RLock()
+
+    def resample(
+        self, symbol: str, source: str, target: str, series: TimeSeries
+    ) -> TimeSeries:
+        """Return ``resample(series, target)``, reusing a memoized result."""
+        key = (symbol.upper(), source, target)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0]() is series:
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        result = resample(series, target)
+        if result is series:
+            return result  # Nothing to save, and storing it would pin ``series``
+        with self._lock:
+            ref = weakref.ref(series, lambda ref, key=key: self._evict(key, ref))
+            self._entries[key] = (ref, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+    def _evict(self, key: tuple[str, ...], ref: weakref.ref[TimeSeries]) -> None:
+        """Drop ``key`` once its source is collected, unless since replaced."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is ref:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """Forget every memoized result."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
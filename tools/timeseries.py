@@ -0,0 +1,318 @@
+"""Columnar OHLCV time series.
+
+A list of one dict per bar costs six boxed Python objects plus a dict per
+row, and every chart has to re-extract columns with
+``[r["date"] for r in data]``. :class:`TimeSeries` stores each field as a
+single NumPy array instead, so a 20-year daily history is a few hundred
+kilobytes and columns are available without any per-row Python.
+
+For backward compatibility a ``TimeSeries`` still behaves like the old
+``list[dict]`` records: ``len(ts)``, ``ts[-1]["close"]`` and
+``for row in ts`` all work, and rows are plain dicts with ``str`` dates,
+``float`` prices and ``int`` volumes.
+
+Usage:
+    from tools.alpha_vantage import fetch_daily
+    data = fetch_daily("AAPL")
+    data["close"]          # NumPy float64 array of closing prices
+    data.dates             # NumPy datetime64 array
+    data[-1]               # {"date": "2025-01-15", "open": ..., ...}
+    data.to_records()      # list[dict] for JSON output
+    data.between("2024-01-01", "2024-06-30")  # O(log n) date-range view
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+from collections.abc import Iterator, Sequence
+from typing import Any
+
+import numpy as np
+
+FIELDS = ("date", "open", "high", "low", "close", "volume")
+"""Row keys, in output order."""
+
+PRICE_FIELDS = ("open", "high", "low", "close")
+"""Fields stored as float64 arrays."""
+
+COLUMNS = ("dates", *FIELDS[1:])
+"""Column attributes of a :class:`TimeSeries`, in constructor order."""
+
+DAILY_UNIT = "datetime64[D]"
+"""Date dtype for daily (and coarser) series."""
+
+INTRADAY_UNIT = "datetime64[s]"
+"""Date dtype for intraday series."""
+
+DateLike = str | dt.date | dt.datetime | np.datetime64
+"""Anything :func:`to_datetime64` accepts as a date-range bound."""
+
+
+def _date_unit(date_strings: Sequence[str]) -> str:
+    """Pick the date dtype from the shape of the first timestamp."""
+    if len(date_strings) and len(str(date_strings[0])) > 10:
+        return INTRADAY_UNIT
+    return DAILY_UNIT
+
+
+def to_datetime64(value: DateLike) -> np.datetime64:
+    """Convert a date-range bound to ``datetime64``, keeping its precision.
+
+    ``"2025-01-15"`` and ``date(2025, 1, 15)`` become day-precision values;
+    ``"2025-01-15 10:30"`` and ``datetime`` objects keep their time of day.
+
+    Raises
+    ------
+    ValueError
+        If ``value`` cannot be interpreted as a date.
+    """
+    try:
+        converted = np.datetime64(value)
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"Invalid date {value!r}: {exc}") from exc
+    if np.isnat(converted):
+        raise ValueError(f"Invalid date {value!r}")
+    return converted
+
+
+def format_dates(dates: np.ndarray) -> np.ndarray:
+    """Format a datetime64 array as Alpha Vantage-style strings.
+
+    Daily dates become ``"2025-01-15"`` and intraday timestamps become
+    ``"2025-01-15 10:00:00"``.
+    """
+    strings = np.datetime_as_string(dates)
+    if dates.dtype == np.dtype(INTRADAY_UNIT):
+        strings = np.char.replace(strings, "T", " ")
+    return strings
+
+
+class TimeSeries:
+    """An immutable, date-sorted OHLCV series stored column by column.
+
+    Parameters
+    ----------
+    dates:
+        ``datetime64[D]`` (daily) or ``datetime64[s]`` (intraday) array,
+        sorted ascending.
+    open, high, low, close:
+        float64 price arrays.
+    volume:
+        int64 volume array.
+
+    Indexing
+    --------
+    - ``ts[i]`` returns row ``i`` as a dict.
+    - ``ts[i:j]`` returns a ``TimeSeries`` view sharing the same buffers.
+    - ``ts["close"]`` returns a column array; ``ts["date"]`` returns the
+      dates as strings (use :attr:`dates` for the datetime64 array).
+    """
+
+    # Weak references let memos remember results without pinning the series
+    __slots__ = (*COLUMNS, "__weakref__")
+
+    def __init__(
+        self,
+        dates: np.ndarray,
+        open: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        volume: np.ndarray,
+    ) -> None:
+        self.dates = dates
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+    # -- construction ------------------------------------------------------
+
+    @classmethod
+    def from_values(
+        cls,
+        dates: Sequence[str],
+        open: Sequence[Any],
+        high: Sequence[Any],
+        low: Sequence[Any],
+        close: Sequence[Any],
+        volume: Sequence[Any],
+    ) -> TimeSeries:
+        """Build a series from parallel sequences in any order.
+
+        Values may be numbers or numeric strings (as in API responses);
+        rows are sorted by date ascending.
+        """
+        date_array = np.array(dates, dtype=_date_unit(dates))
+        order = np.argsort(date_array, kind="stable")
+        return cls(
+            dates=date_array[order],
+            open=np.array(open, dtype=np.float64)[order],
+            high=np.array(high, dtype=np.float64)[order],
+            low=np.array(low, dtype=np.float64)[order],
+            close=np.array(close, dtype=np.float64)[order],
+            volume=np.array(volume, dtype=np.int64)[order],
+        )
+
+    @classmethod
+    def from_records(cls, records: Sequence[dict[str, Any]]) -> TimeSeries:
+        """Build a series from ``{date, open, high, low, close, volume}`` dicts."""
+        return cls.from_values(*([r[f] for r in records] for f in FIELDS))
+
+    @classmethod
+    def from_columns(cls, columns: dict[str, list[Any]]) -> TimeSeries:
+        """Inverse of :meth:`to_columns`."""
+        return cls.from_values(*(columns[f] for f in FIELDS))
+
+    @classmethod
+    def empty(cls, intraday: bool = False) -> TimeSeries:
+        """Return a series with no rows."""
+        unit = INTRADAY_UNIT if intraday else DAILY_UNIT
+        return cls(
+            np.array([], dtype=unit),
+            *(np.array([], dtype=np.float64) for _ in PRICE_FIELDS),
+            np.array([], dtype=np.int64),
+        )
+
+    def merge(self, newer: TimeSeries) -> TimeSeries | None:
+        """Overlay a more recent series onto the end of this one.
+
+        Bars of ``newer`` replace bars of this series from ``newer``'s first
+        date onward; earlier bars are kept.
+
+        Returns
+        -------
+        TimeSeries | None
+            The merged series, or None if ``newer`` starts after this series
+            ends — there may be missing bars in between, so the two cannot
+            be joined safely.
+        """
+        if not len(newer):
+            return self
+        if not len(self):
+            return newer
+        if newer.dates[0] > self.dates[-1]:
+            return None
+        cut = int(np.searchsorted(self.dates, newer.dates[0], side="left"))
+        return TimeSeries(
+            *(
+                np.concatenate((getattr(self, f)[:cut], getattr(newer, f)))
+                for f in COLUMNS
+            )
+        )
+
+    def between(
+        self, start: DateLike | None = None, end: DateLike | None = None
+    ) -> TimeSeries:
+        """Return the bars dated from ``start`` through ``end``, inclusive.
+
+        Both bounds are found by binary search, and the result is a view
+        sharing this series' buffers, so the cost is O(log n) whatever the
+        length of the history.
+
+        Parameters
+        ----------
+        start, end:
+            Date-range bounds (see :func:`to_datetime64`); None leaves that
+            side open. A bound is inclusive at its own precision: on an
+            intraday series, ``end="2025-01-15"`` includes every bar of
+            January 15.
+
+        Raises
+        ------
+        ValueError
+            If a bound is not a valid date.
+        """
+        lo, hi = 0, len(self)
+        if start is not None:
+            lo = int(np.searchsorted(self.dates, to_datetime64(start), side="left"))
+        if end is not None:
+            # The first instant after ``end`` at its own precision
+            after = to_datetime64(end) + 1
+            hi = int(np.searchsorted(self.dates, after, side="left"))
+        return self[lo : max(lo, hi)]
+
+    # -- conversion --------------------------------------------------------
+
+    @property
+    def intraday(self) -> bool:
+        """True if the dates carry a time of day."""
+        return self.dates.dtype == np.dtype(INTRADAY_UNIT)
+
+    def date_strings(self) -> np.ndarray:
+        """Return the dates formatted as Alpha Vantage-style strings."""
+        return format_dates(self.dates)
+
+    def to_columns(self) -> dict[str, list[Any]]:
+        """Return a JSON-serialisable dict of column lists."""
+        return {
+            "date": self.date_strings().tolist(),
+            "open": self.open.tolist(),
+            "high": self.high.tolist(),
+            "low": self.low.tolist(),
+            "close": self.close.tolist(),
+            "volume": self.volume.tolist(),
+        }
+
+    def to_records(self) -> list[dict[str, Any]]:
+        """Return the legacy ``list[dict]`` representation."""
+        return list(self)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the column buffers."""
+        return sum(getattr(self, f).nbytes for f in COLUMNS)
+
+    # -- sequence protocol -------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        columns = self.to_columns()
+        for values in zip(*(columns[f] for f in FIELDS)):
+            yield dict(zip(FIELDS, values))
+
+    def _row(self, i: int) -> dict[str, Any]:
+        return {
+            "date": str(format_dates(self.dates[i : i + 1])[0]),
+            "open": float(self.open[i]),
+            "high": float(self.high[i]),
+            "low": float(self.low[i]),
+            "close": float(self.close[i]),
+            "volume": int(self.volume[i]),
+        }
+
+    def __getitem__(self, item: int | slice | str) -> Any:
+        if isinstance(item, str):
+            if item == "date":
+                return self.date_strings()
+            if item in FIELDS:
+                return getattr(self, item)
+            raise KeyError(item)
+        if isinstance(item, slice):
+            return TimeSeries(*(getattr(self, f)[item] for f in COLUMNS))
+        index = int(item)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("TimeSeries index out of range")
+        return self._row(index)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, TimeSeries):
+            return self.dates.dtype == other.dates.dtype and all(
+                np.array_equal(getattr(self, f), getattr(other, f)) for f in COLUMNS
+            )
+        if isinstance(other, list):
+            return self.to_records() == other
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        if not len(self):
+            return "TimeSeries(0 rows)"
+        first, last = self.date_strings()[[0, -1]]
+        return f"TimeSeries({len(self)} rows, {first} .. {last})"
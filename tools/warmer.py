@@ -0,0 +1,451 @@
+"""Background cache warmer for a configured watchlist.
+
+After a restart, the first rerun of a dashboard pays a full API round trip
+for every symbol it shows, one after another. The warmer fetches a
+watchlist ahead of time on a daemon thread, so those reruns are served
+from the cache:
+
+- once at startup, and
+- every weekday shortly after the US market close, when the day's final
+  bars are published.
+
+Data fetched while nothing is being published cannot change before
+publishing resumes, so it is cached until then rather than for the usual
+:data:`~tools.alpha_vantage.CACHE_TTL`. For daily bars that is from the
+daily warm to the next regular open; intraday series include pre- and
+post-market bars, so for them it is from 20:00 to 04:00. A history warmed
+by a previous process (through the shared disk tier) is not fetched again.
+
+Warming is background work: its API calls give way to interactive ones on
+the rate limiter, and it stops for the day once only ``reserve`` calls of
+the daily budget remain (see :func:`tools.alpha_vantage.background_calls`).
+
+Configuration (environment or ``.env``):
+
+- ``ALPHAVANTAGE_WATCHLIST``: comma-separated entries. ``AAPL`` warms the
+  full daily history; ``AAPL@5min`` the full intraday series.
+- ``ALPHAVANTAGE_WARM_AT``: exchange time of the daily warm (default
+  ``16:30``, New York time).
+- ``ALPHAVANTAGE_WARM_RESERVE``: daily calls left for interactive use, on
+  each pooled API key (default 5).
+
+Usage as a CLI tool (warms the shared disk cache for every process):
+    python -m tools.warmer               # warm now, then after every close
+    python -m tools.warmer --once AAPL MSFT@5min
+
+Usage as a Python module:
+    from tools.warmer import start_warmer
+    warmer = start_warmer()   # None when no watchlist is configured
+    warmer.progress()         # {"state": "warming", "done": 3, "total": 8, ...}
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import json
+import os
+import sys
+import threading
+import time
+import zoneinfo
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from tools.alpha_vantage import (
+    AlphaVantageError,
+    Entry,
+    RateLimitError,
+    background_calls,
+    fetch_daily,
+    fetch_intraday,
+    format_entry,
+    parse_entries,
+    peek_entry,
+    series_cache_key,
+    set_cached,
+)
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+EXCHANGE_TZ = zoneinfo.ZoneInfo("America/New_York")
+"""Time zone of the exchange whose sessions drive the schedule."""
+
+MARKET_OPEN = dt.time(9, 30)
+"""Regular session open, exchange time."""
+
+EXTENDED_OPEN = dt.time(4, 0)
+"""Start of pre-market trading, whose bars intraday series include."""
+
+EXTENDED_CLOSE = dt.time(20, 0)
+"""End of post-market trading, whose bars intraday series include."""
+
+DEFAULT_WARM_AT = dt.time(16, 30)
+"""Default daily warm: half an hour after the 16:00 close, once the day's
+bars have been published."""
+
+DEFAULT_RESERVE = 5
+"""Default number of daily API calls left for interactive use."""
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+
+def parse_watchlist(text: str) -> list[Entry]:
+    """Parse a comma-separated watchlist such as ``"AAPL, msft, SPY@5min"``.
+
+    Symbols are upper-cased and duplicate entries dropped (see
+    :func:`tools.alpha_vantage.parse_entries`).
+
+    Raises
+    ------
+    ValueError
+        If an entry names an unsupported interval.
+    """
+    return parse_entries([text])
+
+
+def _parse_time(text: str) -> dt.time:
+    """Parse an ``HH:MM`` time of day."""
+    try:
+        return dt.time.fromisoformat(text.strip())
+    except ValueError:
+        raise ValueError(f"Invalid time '{text}'. Expected HH:MM") from None
+
+
+def _load_config() -> tuple[list[Entry], dt.time, int]:
+    """Return the watchlist, warm time and reserve from the environment."""
+    watchlist = parse_watchlist(os.environ.get("ALPHAVANTAGE_WATCHLIST", ""))
+    warm_at = os.environ.get("ALPHAVANTAGE_WARM_AT", "").strip()
+    reserve = os.environ.get("ALPHAVANTAGE_WARM_RESERVE", "").strip()
+    return (
+        watchlist,
+        _parse_time(warm_at) if warm_at else DEFAULT_WARM_AT,
+        int(reserve) if reserve else DEFAULT_RESERVE,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Market calendar
+# ---------------------------------------------------------------------------
+
+
+def _now() -> dt.datetime:
+    """Return the current time on the exchange clock."""
+    return dt.datetime.now(EXCHANGE_TZ)
+
+
+def _next_weekday_at(now: dt.datetime, at: dt.time) -> dt.datetime:
+    """Return the first Monday-to-Friday ``at`` strictly after ``now``.
+
+    Exchange holidays are not modelled; on one, the warm simply fetches
+    the previous session again.
+    """
+    day = now.date()
+    while True:
+        moment = dt.datetime.combine(day, at, tzinfo=now.tzinfo)
+        if moment > now and day.weekday() < 5:
+            return moment
+        day += dt.timedelta(days=1)
+
+
+def settled_until(
+    now: dt.datetime, warm_at: dt.time = DEFAULT_WARM_AT, intraday: bool = False
+) -> float | None:
+    """Return when data fetched at ``now`` may next change.
+
+    Daily bars are final from the daily warm until the next regular open.
+    Intraday series also carry pre- and post-market bars, so they are final
+    only from :data:`EXTENDED_CLOSE` until the next :data:`EXTENDED_OPEN`.
+
+    Returns
+    -------
+    float | None
+        Unix timestamp at which new bars may next appear, or None while
+        they still can (the market is open, or closed but not yet
+        published).
+    """
+    opens, settles = (
+        (EXTENDED_OPEN, EXTENDED_CLOSE) if intraday else (MARKET_OPEN, warm_at)
+    )
+    if now.weekday() < 5 and opens <= now.time() < settles:
+        return None
+    return _next_weekday_at(now, opens).timestamp()
+
+
+# ---------------------------------------------------------------------------
+# Warmer
+# ---------------------------------------------------------------------------
+
+
+def _warm_entry(entry: Entry, reserve: int, warm_at: dt.time) -> bool:
+    """Bring one watchlist entry into the cache.
+
+    Returns
+    -------
+    bool
+        True if the entry was fetched (or refreshed), False if a settled
+        copy was already cached.
+    """
+    symbol, interval = entry
+    key = series_cache_key(symbol, interval)
+    until = settled_until(_now(), warm_at, intraday=interval is not None)
+
+    cached = peek_entry(key)
+    if until is not None and cached is not None:
+        expires_at, data = cached
+        if expires_at >= until:
+            return False
+        if expires_at > time.time():
+            # Fetched before the close: expire it so the fetch below brings
+            # in the final bars (as a compact delta merged over it).
+            set_cached(key, data, ttl=0)
+
+    with background_calls(reserve):
+        if interval:
+            series = fetch_intraday(
+                symbol, interval=interval, outputsize="full", datatype="csv"
+            )
+        else:
+            series = fetch_daily(symbol, outputsize="full", datatype="csv")
+    if until is not None:
+        set_cached(key, series, ttl=until - time.time())
+    return True
+
+
+class CacheWarmer:
+    """Keeps a watchlist warm in the series cache.
+
+    Parameters
+    ----------
+    watchlist:
+        Entries to warm, as returned by :func:`parse_watchlist`.
+    warm_at:
+        Exchange time of the daily warm.
+    reserve:
+        Daily API calls left for interactive use, on each API key.
+    on_progress:
+        Called with :meth:`progress` after each entry.
+    """
+
+    def __init__(
+        self,
+        watchlist: Iterable[Entry],
+        warm_at: dt.time = DEFAULT_WARM_AT,
+        reserve: int = DEFAULT_RESERVE,
+        on_progress: Callable[[dict[str, Any]], None] | None = None,
+    ) -> None:
+        self.watchlist = list(watchlist)
+        self.warm_at = warm_at
+        self.reserve = reserve
+        self.on_progress = on_progress
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._progress: dict[str, Any] = {
+            "state": "idle",
+            "total": len(self.watchlist),
+            "done": 0,
+            "current": None,
+            "warmed": [],
+            "cached": [],
+            "failed": {},
+            "last_run_at": None,
+            "next_run_at": None,
+        }
+
+    def progress(self) -> dict[str, Any]:
+        """Report what the warmer is doing.
+
+        Returns
+        -------
+        dict[str, Any]
+            A dict with keys:
+
+            - ``state``: "idle", "warming" or "stopped".
+            - ``total`` / ``done``: entries in the watchlist and entries
+              handled so far in the current (or last) run.
+            - ``current``: the entry being fetched, or None.
+            - ``warmed``: entries fetched in the last run; ``cached``:
+              entries that were already warm.
+            - ``failed``: ``{entry: error message}``, including entries
+              skipped because the daily budget is down to the reserve.
+            - ``last_run_at`` / ``next_run_at``: Unix timestamps, or None.
+        """
+        with self._lock:
+            progress = dict(self._progress)
+            progress["warmed"] = list(progress["warmed"])
+            progress["cached"] = list(progress["cached"])
+            progress["failed"] = dict(progress["failed"])
+            return progress
+
+    def _update(self, **changes: Any) -> None:
+        with self._lock:
+            self._progress.update(changes)
+        if self.on_progress is not None:
+            self.on_progress(self.progress())
+
+    def run_once(self) -> dict[str, Any]:
+        """Warm every entry now, in order, and return :meth:`progress`.
+
+        A failure on one entry does not stop the others, but once the daily
+        budget is down to the reserve the remaining entries are skipped.
+        """
+        warmed: list[str] = []
+        cached: list[str] = []
+        failed: dict[str, str] = {}
+        self._update(
+            state="warming", done=0, warmed=warmed, cached=cached, failed=failed
+        )
+        exhausted: str | None = None
+        for done, entry in enumerate(self.watchlist, start=1):
+            label = format_entry(entry)
+            if self._stop.is_set():
+                break
+            if exhausted is not None:
+                failed[label] = exhausted
+            else:
+                self._update(current=label)
+                try:
+                    if _warm_entry(entry, self.reserve, self.warm_at):
+                        warmed.append(label)
+                    else:
+                        cached.append(label)
+                except RateLimitError as exc:
+                    exhausted = failed[label] = str(exc)
+                except (AlphaVantageError, ValueError) as exc:
+                    failed[label] = str(exc)
+            self._update(done=done, current=None)
+        self._update(state="idle", last_run_at=time.time())
+        return self.progress()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.run_once()
+            next_run = _next_weekday_at(_now(), self.warm_at).timestamp()
+            self._update(next_run_at=next_run)
+            if self._stop.wait(max(0.0, next_run - time.time())):
+                break
+        self._update(state="stopped", next_run_at=None)
+
+    def start(self) -> None:
+        """Warm now and after every close on a daemon thread. Idempotent."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="cache-warmer", daemon=True
+            )
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Stop after the entry in progress and wait for the thread to exit."""
+        self._stop.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout)
+
+
+_warmer: CacheWarmer | None = None
+_warmer_lock = threading.Lock()
+
+
+def start_warmer() -> CacheWarmer | None:
+    """Start the process-wide warmer for the configured watchlist.
+
+    Safe to call on every Streamlit rerun: the warmer is created and
+    started once.
+
+    Returns
+    -------
+    CacheWarmer | None
+        The running warmer, or None if ``ALPHAVANTAGE_WATCHLIST`` is empty.
+
+    Raises
+    ------
+    ValueError
+        If the configuration is invalid.
+    """
+    global _warmer
+    with _warmer_lock:
+        if _warmer is None:
+            watchlist, warm_at, reserve = _load_config()
+            if not watchlist:
+                return None
+            _warmer = CacheWarmer(watchlist, warm_at=warm_at, reserve=reserve)
+        _warmer.start()
+        return _warmer
+
+
+def format_progress(progress: dict[str, Any]) -> str:
+    """Return a one-line summary of :meth:`CacheWarmer.progress`."""
+    if progress["state"] == "warming":
+        current = f" ({progress['current']})" if progress["current"] else ""
+        return f"Warming cache: {progress['done']}/{progress['total']}{current}"
+    ready = len(progress["warmed"]) + len(progress["cached"])
+    text = f"Cache warm: {ready}/{progress['total']}"
+    if progress["failed"]:
+        text += f", {len(progress['failed'])} failed"
+    if progress["next_run_at"] is not None:
+        next_run = dt.datetime.fromtimestamp(progress["next_run_at"], EXCHANGE_TZ)
+        text += f"; next {next_run:%a %H:%M} ET"
+    return text
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+def main() -> None:
+    """CLI entry point for running the warmer in the foreground.
+
+    Usage:
+        python -m tools.warmer [--once] [ENTRY ...]
+
+    Entries given on the command line replace ``ALPHAVANTAGE_WATCHLIST``.
+    Progress is reported on stderr; with ``--once`` the final report is
+    printed to stdout as JSON.
+    """
+    args = sys.argv[1:]
+    once = "--once" in args
+    entries = [a for a in args if a != "--once"]
+    try:
+        watchlist, warm_at, reserve = _load_config()
+        if entries:
+            watchlist = parse_watchlist(",".join(entries))
+    except ValueError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        sys.exit(1)
+    if not watchlist:
+        print(
+            "Usage: python -m tools.warmer [--once] [ENTRY ...]\n"
+            "\n"
+            "Set ALPHAVANTAGE_WATCHLIST (e.g. 'AAPL,MSFT,SPY@5min') or pass entries.",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+    warmer = CacheWarmer(
+        watchlist,
+        warm_at=warm_at,
+        reserve=reserve,
+        on_progress=lambda p: print(format_progress(p), file=sys.stderr),
+    )
+    if once:
+        print(json.dumps(warmer.run_once(), indent=2))
+        return
+    warmer.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        warmer.stop()
+
+
+if __name__ == "__main__":
+    main()